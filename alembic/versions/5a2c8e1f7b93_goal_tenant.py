@@ -0,0 +1,78 @@
+"""goal tenant
+
+Revision ID: 5a2c8e1f7b93
+Revises: e91f3b6c0d24
+Create Date: 2024-12-09 10:42:17.503846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2c8e1f7b93'
+down_revision: Union[str, None] = 'e91f3b6c0d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_TENANT_ID = 'default'
+TENANT_INDEXES = (
+    ('ix_goal_name', ['name']),
+    ('ix_goal_status', ['status']),
+    ('ix_goal_priority', ['priority']),
+    ('ix_goal_change_seq', ['change_seq']),
+)
+
+
+def _partial(where: str) -> dict:
+    return {'sqlite_where': sa.text(where), 'postgresql_where': sa.text(where)}
+
+
+def _tenant_column() -> sa.Column:
+    # The existing rows belong to the default tenant.
+    return sa.Column('tenant_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False,
+                     server_default=DEFAULT_TENANT_ID)
+
+
+def upgrade() -> None:
+    for table_name in ('goal', 'goalarchive', 'goaltombstone'):
+        op.add_column(table_name, _tenant_column())
+
+    for name, columns in TENANT_INDEXES:
+        op.drop_index(name, table_name='goal')
+        op.create_index(name, 'goal', ['tenant_id', *columns], unique=False,
+                        **_partial('deleted_at IS NULL'))
+    op.create_index('ix_goal_tenant_id', 'goal', ['tenant_id', 'id'], unique=False,
+                    **_partial('deleted_at IS NULL'))
+    op.create_index('ix_goalarchive_tenant_id', 'goalarchive', ['tenant_id', 'id'], unique=False)
+    op.drop_index('ix_goaltombstone_change_seq', table_name='goaltombstone')
+    op.create_index('ix_goaltombstone_change_seq', 'goaltombstone', ['tenant_id', 'change_seq'],
+                    unique=False)
+
+    op.execute(f"UPDATE changesequence SET name = 'goal:{DEFAULT_TENANT_ID}' WHERE name = 'goal'")
+
+
+def downgrade() -> None:
+    # The sequences of the tenants are merged into one, continuing after the highest
+    # value handed out, so the values stay increasing for the sync clients.
+    op.execute(
+        "INSERT INTO changesequence (name, value) "
+        "SELECT 'goal', MAX(value) FROM changesequence WHERE name LIKE 'goal:%' "
+        "HAVING COUNT(*) > 0"
+    )
+    op.execute("DELETE FROM changesequence WHERE name LIKE 'goal:%'")
+
+    op.drop_index('ix_goaltombstone_change_seq', table_name='goaltombstone')
+    op.create_index('ix_goaltombstone_change_seq', 'goaltombstone', ['change_seq'], unique=False)
+    op.drop_index('ix_goalarchive_tenant_id', table_name='goalarchive')
+    op.drop_index('ix_goal_tenant_id', table_name='goal')
+    for name, columns in TENANT_INDEXES:
+        op.drop_index(name, table_name='goal')
+        op.create_index(name, 'goal', columns, unique=False, **_partial('deleted_at IS NULL'))
+
+    for table_name in ('goaltombstone', 'goalarchive', 'goal'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('tenant_id')
@@ -0,0 +1,40 @@
+"""goal parent
+
+Revision ID: 7d3f1a9b2c65
+Revises: 5a2c8e1f7b93
+Create Date: 2024-12-12 15:08:31.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f1a9b2c65'
+down_revision: Union[str, None] = '5a2c8e1f7b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partial(where: str) -> dict:
+    return {'sqlite_where': sa.text(where), 'postgresql_where': sa.text(where)}
+
+
+def upgrade() -> None:
+    # Not a foreign key: the parent can be archived or purged before its sub-goals.
+    op.add_column('goal', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('goalarchive', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_index('ix_goal_parent_id', 'goal', ['tenant_id', 'parent_id'], unique=False,
+                    **_partial('deleted_at IS NULL'))
+    op.create_index('ix_goalarchive_parent_id', 'goalarchive', ['tenant_id', 'parent_id'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_goalarchive_parent_id', table_name='goalarchive')
+    op.drop_index('ix_goal_parent_id', table_name='goal')
+    for table_name in ('goalarchive', 'goal'):
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column('parent_id')
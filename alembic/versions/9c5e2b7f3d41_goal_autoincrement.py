@@ -0,0 +1,52 @@
+"""goal autoincrement
+
+Revision ID: 9c5e2b7f3d41
+Revises: 4e8b2d6a1c93
+Create Date: 2024-12-20 10:12:07.385519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5e2b7f3d41'
+down_revision: Union[str, None] = '4e8b2d6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every table naming a goal ID, so the IDs that already left the goal table are not given again.
+GOAL_IDS = (
+    ('goal', 'id'),
+    ('goalarchive', 'id'),
+    ('goaltombstone', 'goal_id'),
+    ('goalstatusevent', 'goal_id'),
+)
+
+
+def upgrade() -> None:
+    # Postgres sequences never give an ID twice, only the SQLite table needs AUTOINCREMENT.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table(
+        'goal', recreate='always', table_kwargs={'sqlite_autoincrement': True}
+    ):
+        pass
+    highest = ' UNION ALL '.join(
+        f"SELECT MAX({column}) AS id FROM {table_name}" for table_name, column in GOAL_IDS
+    )
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'goal'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) "
+        f"SELECT 'goal', COALESCE(MAX(id), 0) FROM ({highest})"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table(
+        'goal', recreate='always', table_kwargs={'sqlite_autoincrement': False}
+    ):
+        pass
@@ -0,0 +1,61 @@
+"""goal status event
+
+Revision ID: b62e0d9f4a18
+Revises: 7d3f1a9b2c65
+Create Date: 2024-12-16 09:27:44.918305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b62e0d9f4a18'
+down_revision: Union[str, None] = '7d3f1a9b2c65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GOAL_STATUSES = ('TO_REFINE', 'NOT_STARTED', 'IN_PROGRESS', 'BLOCKED', 'COMPLETED', 'ABANDONED')
+GOAL_PRIORITIES = ('LOW', 'MEDIUM', 'HIGH')
+
+
+def _existing_enum(*values: str, name: str) -> sa.Enum:
+    # The types were created with the goal table, Postgres must not create them again.
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+def upgrade() -> None:
+    op.create_table('goalstatusevent',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tenant_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('goal_id', sa.Integer(), nullable=False),
+    sa.Column('status', _existing_enum(*GOAL_STATUSES, name='goalstatus'), nullable=False),
+    sa.Column('previous_status', _existing_enum(*GOAL_STATUSES, name='goalstatus'), nullable=True),
+    sa.Column('priority', _existing_enum(*GOAL_PRIORITIES, name='goalpriority'), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_goalstatusevent_goal_id', 'goalstatusevent',
+                    ['tenant_id', 'goal_id', 'id'], unique=False)
+    op.create_index('ix_goalstatusevent_status', 'goalstatusevent',
+                    ['tenant_id', 'status', 'changed_at'], unique=False)
+
+    # The history starts with the current status of the goals, as of their last update.
+    for table_name, where in (('goal', 'WHERE deleted_at IS NULL'), ('goalarchive', '')):
+        op.execute(
+            "INSERT INTO goalstatusevent (tenant_id, goal_id, status, priority, changed_at) "
+            f"SELECT tenant_id, id, status, priority, updated_at FROM {table_name} {where} "
+            "ORDER BY id"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_goalstatusevent_status', table_name='goalstatusevent')
+    op.drop_index('ix_goalstatusevent_goal_id', table_name='goalstatusevent')
+    op.drop_table('goalstatusevent')
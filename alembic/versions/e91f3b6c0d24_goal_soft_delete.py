@@ -0,0 +1,52 @@
+"""goal soft delete
+
+Revision ID: e91f3b6c0d24
+Revises: c4d7a9e3b812
+Create Date: 2024-12-02 14:05:38.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91f3b6c0d24'
+down_revision: Union[str, None] = 'c4d7a9e3b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE_INDEXES = (
+    ('ix_goal_name', ['name']),
+    ('ix_goal_status', ['status']),
+    ('ix_goal_priority', ['priority']),
+    ('ix_goal_due_date', ['due_date']),
+    ('ix_goal_change_seq', ['change_seq']),
+    ('ix_goal_status_updated_at', ['status', 'updated_at']),
+)
+
+
+def _partial(where: str) -> dict:
+    return {'sqlite_where': sa.text(where), 'postgresql_where': sa.text(where)}
+
+
+def upgrade() -> None:
+    op.add_column('goal', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    # The indexes are rebuilt to only hold the live goals.
+    for name, columns in LIVE_INDEXES:
+        op.drop_index(name, table_name='goal')
+        op.create_index(name, 'goal', columns, unique=False, **_partial('deleted_at IS NULL'))
+    op.create_index('ix_goal_deleted_at', 'goal', ['deleted_at'], unique=False,
+                    **_partial('deleted_at IS NOT NULL'))
+
+
+def downgrade() -> None:
+    # Soft deleted goals are deleted for good, as before the soft delete.
+    op.execute("DELETE FROM goal WHERE deleted_at IS NOT NULL")
+    op.drop_index('ix_goal_deleted_at', table_name='goal')
+    for name, columns in LIVE_INDEXES:
+        op.drop_index(name, table_name='goal')
+        op.create_index(name, 'goal', columns, unique=False)
+    with op.batch_alter_table('goal') as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,96 @@
+"""
+bulk_import.py
+
+This module measures the bulk import of goals from a generated CSV or NDJSON file
+into an empty SQLite database, through `mycareer.importer.import_goals`.
+
+It reports the throughput and the growth of the maximum resident set size of
+the process during the import, which stays flat as the file grows since the
+rows are streamed and inserted in chunks. One row in a thousand is invalid, so
+the rejection path is measured too.
+
+Usage:
+    python -m benchmarks.bulk_import [--rows ROWS] [--format {csv,ndjson}] [--chunk-size CHUNK_SIZE]
+
+Functions:
+    write_file: Writes a file of goals to import.
+    main: Runs the benchmark and prints the results.
+"""
+
+import argparse
+import csv
+import json
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+from sqlmodel import Session, SQLModel, create_engine
+from mycareer.importer import GoalImportOptions, import_chunk_size, import_goals
+from mycareer.models import DEFAULT_TENANT_ID
+
+STATUSES = ("to refine", "not started", "in progress", "blocked", "completed", "abandoned")
+PRIORITIES = ("low", "medium", "high")
+
+def write_file(path: Path, rows: int, file_format: str) -> None:
+    """Write a file of goals to import, one row in a thousand having no name.
+
+    Args:
+        path (Path): The path of the file.
+        rows (int): The number of rows.
+        file_format (str): `csv` or `ndjson`.
+    """
+    with path.open("w", encoding="utf-8", newline="") as stream:
+        writer = csv.writer(stream)
+        if file_format == "csv":
+            writer.writerow(("name", "description", "status", "priority", "due_date"))
+        for index in range(rows):
+            row = {
+                "name": f"Goal {index}" if index % 1000 != 999 else "",
+                "description": f"Description of goal {index}" if index % 3 else None,
+                "status": STATUSES[index % len(STATUSES)],
+                "priority": PRIORITIES[index % len(PRIORITIES)],
+                "due_date": f"2025-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00",
+            }
+            if file_format == "csv":
+                writer.writerow(value or "" for value in row.values())
+            else:
+                stream.write(json.dumps(row) + "\n")
+
+def _max_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the results.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the bulk import of goals.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv", dest="file_format")
+    parser.add_argument("--chunk-size", type=int, default=import_chunk_size)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / f"goals.{args.file_format}"
+        write_file(path, args.rows, args.file_format)
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bulk_import.db'}")
+        SQLModel.metadata.create_all(engine)
+
+        rss_before = _max_rss_mib()
+        start = time.perf_counter()
+        with path.open("rb") as stream, Session(engine) as session:
+            options = GoalImportOptions(file_format=args.file_format, chunk_size=args.chunk_size)
+            report = import_goals(session, DEFAULT_TENANT_ID, stream, options)
+        elapsed = time.perf_counter() - start
+        rss_growth = _max_rss_mib() - rss_before
+        size_mib = path.stat().st_size / 1024 / 1024
+        engine.dispose()
+
+    print(f"{args.file_format} file of {size_mib:.1f} MiB, chunks of {args.chunk_size} rows")
+    print(f"imported {report.imported:,d} rejected {report.rejected:,d} in {elapsed:.1f} s "
+          f"({report.imported / elapsed:,.0f} rows/s), max RSS growth {rss_growth:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
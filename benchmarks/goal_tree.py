@@ -0,0 +1,137 @@
+"""
+goal_tree.py
+
+This module measures the reads of a tree of sub-goals in a SQLite database, by
+default 10 levels deep with 10k goals, a fifth of them completed.
+
+It compares the recursive CTE of `mycareer.queries.select_goal_subtree_rows`
+and `mycareer.tree.get_goal_progress`, one query each, with fetching the
+children of every goal one goal at a time, and one level at a time, reporting
+the time and the number of queries of each.
+
+Usage:
+    python -m benchmarks.goal_tree [--goals GOALS] [--depth DEPTH] [--repeat REPEAT]
+
+Functions:
+    create_tree: Inserts a random tree of goals.
+    main: Runs the benchmark and prints the results.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import event, insert, select
+from sqlmodel import Session, SQLModel, create_engine
+from mycareer.models import DEFAULT_TENANT_ID, Goal, GoalStatus
+from mycareer.queries import select_goal_children, select_goal_subtree_rows
+from mycareer.tree import get_goal_progress
+
+def create_tree(session: Session, goals: int, depth: int) -> None:
+    """Insert a random tree of goals under the goal 1, twice as wide at every level.
+
+    Args:
+        session (Session): The database session.
+        goals (int): The number of goals.
+        depth (int): The number of levels.
+    """
+    rng = random.Random(42)
+    weights = [2 ** level for level in range(1, depth)]
+    sizes = [1] + [max(1, (goals - 1) * weight // sum(weights)) for weight in weights]
+    sizes[-1] += goals - sum(sizes)
+    rows, previous_level, next_id = [], [], 1
+    for size in sizes:
+        level = list(range(next_id, next_id + size))
+        for goal_id in level:
+            rows.append({
+                "id": goal_id,
+                "tenant_id": DEFAULT_TENANT_ID,
+                "name": f"Goal {goal_id}",
+                "status": GoalStatus.COMPLETED if rng.random() < 0.2 else GoalStatus.IN_PROGRESS,
+                "parent_id": rng.choice(previous_level) if previous_level else None,
+                "change_seq": goal_id,
+            })
+        previous_level, next_id = level, next_id + size
+    session.execute(insert(Goal), rows)
+    session.commit()
+
+def _per_goal(session: Session) -> int:
+    pending, count = [1], 1
+    while pending:
+        children = session.execute(select_goal_children(DEFAULT_TENANT_ID, pending.pop()))
+        child_ids = [goal.id for goal in children.scalars()]
+        count += len(child_ids)
+        pending.extend(child_ids)
+    session.expunge_all()
+    return count
+
+def _per_level(session: Session) -> int:
+    columns = (Goal.id, Goal.name, Goal.description, Goal.status, Goal.priority, Goal.due_date,
+               Goal.parent_id)
+    level, count = [1], 1
+    while level:
+        rows = session.connection().execute(
+            select(*columns).where(Goal.tenant_id == DEFAULT_TENANT_ID,
+                                   Goal.parent_id.in_(level), Goal.deleted_at.is_(None))
+        ).all()
+        level = [row.id for row in rows]
+        count += len(level)
+    return count
+
+def _cte(session: Session) -> int:
+    return len(session.connection().execute(select_goal_subtree_rows(DEFAULT_TENANT_ID, 1)).all())
+
+def _progress(session: Session) -> int:
+    return get_goal_progress(session, DEFAULT_TENANT_ID, 1).descendants + 1
+
+def _measure(
+    session: Session, read: Callable[[Session], int], repeat: int
+) -> Tuple[float, int, int]:
+    statements = []
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+    engine = session.get_bind()
+    read(session)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            count = read(session)
+        elapsed = (time.perf_counter() - start) / repeat
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return elapsed, len(statements) // repeat, count
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the results.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the reads of a tree of sub-goals.")
+    parser.add_argument("--goals", type=int, default=10_000)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'goal_tree.db'}")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            create_tree(session, args.goals, args.depth)
+            print(f"tree of {args.goals:,d} goals, {args.depth} levels deep")
+            for label, read in (
+                ("one goal at a time", _per_goal),
+                ("one level at a time", _per_level),
+                ("recursive CTE subtree", _cte),
+                ("recursive CTE progress", _progress),
+            ):
+                elapsed, queries, count = _measure(session, read, args.repeat)
+                print(f"{label:<24} {elapsed * 1000:8.1f} ms {queries:6,d} queries "
+                      f"{count:,d} goals")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+list_goals.py
+
+This module compares the two read paths of the goal list on the same rows:
+    - orm: `Goal` instances, `GoalRead` validation from attributes and JSON
+      serialization, as FastAPI does with a response model (the former path),
+    - core: tuple rows encoded straight to JSON by `mycareer.rows`.
+
+For each path it reports the time per 100k rows, the peak of traced memory
+while the body is built and the number of memory blocks still held with it.
+
+Usage:
+    python -m benchmarks.list_goals [--rows ROWS]
+
+Functions:
+    orm_path: Reads and serializes the goals through the ORM.
+    core_path: Reads and serializes the goals through the Core read path.
+    measure: Measures a read path.
+    main: Runs the benchmark and prints the results.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from benchmarks.point_lookup import seed
+from mycareer.models import DEFAULT_TENANT_ID
+from mycareer.queries import select_goals
+from mycareer.rows import encode_goal_rows, fetch_goal_rows
+from mycareer.schemas import GoalRead
+
+GOAL_LIST_ADAPTER = TypeAdapter(List[GoalRead])
+
+def orm_path(engine: Engine) -> bytes:
+    """Read and serialize the goals through the ORM.
+
+    Args:
+        engine (Engine): The engine of the seeded database.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    with Session(engine) as session:
+        goals = session.execute(select_goals(DEFAULT_TENANT_ID)).scalars().all()
+        return GOAL_LIST_ADAPTER.dump_json(
+            [GoalRead.model_validate(goal, from_attributes=True) for goal in goals]
+        )
+
+def core_path(engine: Engine) -> bytes:
+    """Read and serialize the goals through the Core read path.
+
+    Args:
+        engine (Engine): The engine of the seeded database.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    with Session(engine) as session:
+        return encode_goal_rows(fetch_goal_rows(session, DEFAULT_TENANT_ID))
+
+def measure(path: Callable[[Engine], bytes], engine: Engine, rows: int) -> Dict[str, float]:
+    """Measure a read path.
+
+    Args:
+        path (Callable[[Engine], bytes]): The read path.
+        engine (Engine): The engine of the seeded database.
+        rows (int): The number of rows in the database.
+
+    Returns:
+        Dict[str, float]: The time per 100k rows in milliseconds, the number of
+        retained blocks and the peak of traced memory in MiB.
+    """
+    path(engine)
+
+    start = time.perf_counter()
+    path(engine)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    body = path(engine)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del body
+
+    return {
+        "ms_per_100k": elapsed * 1000 * 100_000 / rows,
+        "retained_blocks": retained,
+        "peak_mib": peak / 1024 / 1024,
+    }
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the results.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compare the read paths of the goal list.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = seed(Path(directory) / "list_goals.db", args.rows)
+        assert orm_path(engine) == core_path(engine)
+        results = {name: measure(path, engine, args.rows)
+                   for name, path in (("orm", orm_path), ("core", core_path))}
+        engine.dispose()
+
+    for name, result in results.items():
+        print(f"{name:<5} {result['ms_per_100k']:>9.1f} ms/100k rows  "
+              f"{result['peak_mib']:>7.1f} MiB peak  "
+              f"{result['retained_blocks']:>8,d} blocks retained")
+
+if __name__ == "__main__":
+    main()
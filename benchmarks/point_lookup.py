@@ -0,0 +1,105 @@
+"""
+point_lookup.py
+
+This module measures the per-request ORM overhead of a point lookup of a goal by ID.
+
+Each lookup opens a new session, as a request does, and reads one goal with:
+    - select: a `select(Goal).where(...)` statement built on every call (the former path),
+    - session_get: `Session.get`,
+    - lambda_stmt: the cached statement of `mycareer.queries.select_goal_by_id`.
+
+Usage:
+    python -m benchmarks.point_lookup [--goals GOALS] [--lookups LOOKUPS]
+
+Functions:
+    seed: Creates a database with goals, from their cached snapshot.
+    run: Measures every lookup path.
+    main: Runs the benchmark and prints the results.
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, create_engine, select
+from mycareer.datagen import get_snapshot
+from mycareer.models import DEFAULT_TENANT_ID, Goal
+from mycareer.queries import select_goal_by_id
+
+def seed(path: Path, goals: int) -> Engine:
+    """Create a database with generated goals, copied from their cached snapshot.
+
+    Args:
+        path (Path): The path of the SQLite file.
+        goals (int): The number of goals.
+
+    Returns:
+        Engine: The engine of the database.
+    """
+    shutil.copyfile(get_snapshot(goals), path)
+    return create_engine(f"sqlite:///{path}")
+
+def _select(session: Session, goal_id: int) -> Optional[Goal]:
+    return session.exec(select(Goal).where(Goal.id == goal_id)).first()
+
+def _session_get(session: Session, goal_id: int) -> Optional[Goal]:
+    return session.get(Goal, goal_id)
+
+def _lambda_stmt(session: Session, goal_id: int) -> Optional[Goal]:
+    return session.execute(select_goal_by_id(DEFAULT_TENANT_ID, goal_id)).scalar_one_or_none()
+
+PATHS: Dict[str, Callable[[Session, int], Optional[Goal]]] = {
+    "select": _select,
+    "session_get": _session_get,
+    "lambda_stmt": _lambda_stmt,
+}
+
+def run(engine: Engine, lookups: int) -> Dict[str, float]:
+    """Measure every lookup path, on the goals that are not deleted.
+
+    Args:
+        engine (Engine): The engine of the seeded database.
+        lookups (int): The number of lookups per path.
+
+    Returns:
+        Dict[str, float]: The mean time of a lookup in microseconds, by path.
+    """
+    with Session(engine) as session:
+        goal_ids = session.exec(select(Goal.id).where(Goal.deleted_at.is_(None))).all()
+    results = {}
+    for name, lookup in PATHS.items():
+        for goal_id in goal_ids[:100]:
+            with Session(engine) as session:
+                lookup(session, goal_id)
+        start = time.perf_counter()
+        for index in range(lookups):
+            with Session(engine) as session:
+                assert lookup(session, goal_ids[index % len(goal_ids)]) is not None
+        results[name] = (time.perf_counter() - start) / lookups * 1_000_000
+    return results
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the results.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the point lookup of a goal.")
+    parser.add_argument("--goals", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = seed(Path(directory) / "point_lookup.db", args.goals)
+        results = run(engine, args.lookups)
+        engine.dispose()
+
+    baseline = results["select"]
+    for name, value in results.items():
+        print(f"{name:<12} {value:>8.1f} us/lookup  ({value / baseline:.2f}x select)")
+
+if __name__ == "__main__":
+    main()
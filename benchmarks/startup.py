@@ -0,0 +1,121 @@
+"""
+startup.py
+
+This module measures the cold start of the application: the import time of
+`mycareer.main` reported by `python -X importtime`, and the time from the start
+of a fresh interpreter to the first response. Each measure runs in a new process
+and the median of several runs is compared to the budget of `startup_budget.json`.
+
+Usage:
+    python -m benchmarks.startup [--runs RUNS] [--lazy]
+
+Functions:
+    load_budget: Loads the startup budget.
+    measure_import_ms: Measures the import time of a module.
+    measure_first_response_ms: Measures the time to the first response.
+    main: Runs the benchmark and checks the budget.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BUDGET_FILE: Path = Path(__file__).with_name("startup_budget.json")
+ROOT: Path = Path(__file__).resolve().parent.parent
+
+FIRST_RESPONSE_SCRIPT = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+from mycareer.main import app
+with TestClient(app) as client:
+    assert client.get("/echo").status_code == 200
+print((time.perf_counter() - start) * 1000)
+"""
+
+def load_budget() -> Dict[str, float]:
+    """Load the startup budget.
+
+    Returns:
+        Dict[str, float]: The budget in milliseconds of each measure.
+    """
+    return json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+
+def _environment(lazy: bool) -> Dict[str, str]:
+    environment = dict(os.environ)
+    environment["LAZY_ROUTERS"] = "1" if lazy else ""
+    return environment
+
+def measure_import_ms(module: str = "mycareer.main", lazy: bool = False) -> float:
+    """Measure the import time of a module in a fresh interpreter.
+
+    Args:
+        module (str): The module to import.
+        lazy (bool): Whether the routers are loaded lazily.
+
+    Returns:
+        float: The cumulative import time of the module in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_environment(lazy), capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"{module} is missing from the import time report")
+
+def measure_first_response_ms(lazy: bool = False) -> float:
+    """Measure the time from the start of an interpreter to the first response.
+
+    Args:
+        lazy (bool): Whether the routers are loaded lazily.
+
+    Returns:
+        float: The time to the first response in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RESPONSE_SCRIPT],
+        cwd=ROOT, env=_environment(lazy), capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark and check the budget.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+
+    Returns:
+        int: 0 if the measures are within the budget, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Measure the cold start of the application.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lazy", action="store_true", help="Load the routers lazily.")
+    args = parser.parse_args(argv)
+
+    budget = load_budget()
+    measures = {
+        "import_ms": statistics.median(
+            measure_import_ms(lazy=args.lazy) for _ in range(args.runs)
+        ),
+        "first_response_ms": statistics.median(
+            measure_first_response_ms(lazy=args.lazy) for _ in range(args.runs)
+        ),
+    }
+
+    exit_code = 0
+    for name, value in measures.items():
+        status = "ok" if value <= budget[name] else "OVER BUDGET"
+        exit_code = exit_code if value <= budget[name] else 1
+        print(f"{name:<20} {value:>10.1f} ms  (budget {budget[name]:.0f} ms)  {status}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+validation.py
+
+This module measures the validation throughput of the goal schemas, per 10k payloads.
+
+It validates request bodies with `GoalCreate`, from Python dicts and from JSON,
+against the same schema defaulting the null status and priority with a
+`mode='before'` model validator, the way it was written for Pydantic v1. It
+also validates `GoalRead` from the attributes of `Goal` instances and
+serializes the list to JSON, as the read endpoints do.
+
+Usage:
+    python -m benchmarks.validation [--payloads PAYLOADS] [--repeat REPEAT]
+
+Classes:
+    LegacyGoalCreate: GoalCreate with its defaults set by a Python validator.
+
+Functions:
+    make_payloads: Builds request bodies of goals.
+    main: Runs the benchmark and prints the results.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
+from typing_extensions import Annotated
+from mycareer.models import Goal, GoalPriority, GoalStatus
+from mycareer.schemas import GoalCreate, GoalRead
+
+STATUSES = (None, "to refine", "in progress", "blocked", "completed")
+PRIORITIES = (None, "low", "medium", "high")
+
+class LegacyGoalCreate(BaseModel):
+    """
+    ## Description
+
+    GoalCreate with the null status and priority replaced by a Python validator
+    running before every validation.
+    """
+    name: Annotated[str, Field(..., min_length=1)]
+    description: Optional[str] = None
+    status: Optional[GoalStatus] = GoalStatus.TO_REFINE
+    priority: Optional[GoalPriority] = GoalPriority.MEDIUM
+    due_date: Optional[datetime] = None
+    parent_id: Optional[int] = None
+
+    @model_validator(mode='before')
+    @classmethod
+    def set_defaults(cls, values):
+        """Set default values for status and priority if they are None."""
+        if values.get('status') is None:
+            values['status'] = GoalStatus.TO_REFINE
+        if values.get('priority') is None:
+            values['priority'] = GoalPriority.MEDIUM
+        return values
+
+def make_payloads(count: int) -> List[dict]:
+    """Build request bodies of goals, a fifth of them with a null status.
+
+    Args:
+        count (int): The number of bodies.
+
+    Returns:
+        List[dict]: The bodies.
+    """
+    return [
+        {
+            "name": f"Goal {index}",
+            "description": f"Description of goal {index}" if index % 2 else None,
+            "status": STATUSES[index % len(STATUSES)],
+            "priority": PRIORITIES[index % len(PRIORITIES)],
+            "due_date": f"2025-{index % 12 + 1:02d}-{index % 28 + 1:02d}T00:00:00",
+        }
+        for index in range(count)
+    ]
+
+def _per_10k(run: Callable[[], object], payloads: int, repeat: int) -> float:
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat / payloads * 10_000
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmark and print the results.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the validation of the goal schemas.")
+    parser.add_argument("--payloads", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    payloads = make_payloads(args.payloads)
+    bodies = [json.dumps(payload) for payload in payloads]
+    goals = [Goal(id=index + 1, **GoalCreate.model_validate(payload).model_dump())
+             for index, payload in enumerate(payloads)]
+    goal_list = TypeAdapter(List[GoalRead])
+
+    # The legacy validator mutates its input, every run gets fresh copies.
+    cases = (
+        ("GoalCreate from dicts, Python defaults",
+         lambda: [LegacyGoalCreate.model_validate(dict(payload)) for payload in payloads]),
+        ("GoalCreate from dicts, core defaults",
+         lambda: [GoalCreate.model_validate(dict(payload)) for payload in payloads]),
+        ("GoalCreate from JSON, Python defaults",
+         lambda: [LegacyGoalCreate.model_validate_json(body) for body in bodies]),
+        ("GoalCreate from JSON, core defaults",
+         lambda: [GoalCreate.model_validate_json(body) for body in bodies]),
+        ("GoalRead from attributes",
+         lambda: [GoalRead.model_validate(goal) for goal in goals]),
+        ("GoalRead list to JSON",
+         lambda: goal_list.dump_json(goal_list.validate_python(goals, from_attributes=True))),
+    )
+    print(f"{args.payloads:,d} payloads, mean of {args.repeat} runs")
+    for label, run in cases:
+        print(f"{label:<40} {_per_10k(run, args.payloads, args.repeat) * 1000:8.1f} ms per 10k")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Entry point of `python -m mycareer`.
+"""
+from mycareer.cli import main
+
+main()
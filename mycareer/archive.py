@@ -0,0 +1,210 @@
+"""
+archive.py
+
+This module moves the goals that are no longer worked on out of the goal table.
+
+Completed and abandoned goals not updated for `ARCHIVE_AFTER_DAYS` are moved in
+batches to the archive table, which only has its primary key index, so the
+indexes of the goal table only hold the goals still worked on. The goals keep
+their ID: the reads by ID fall back to the archive, the list reads it on demand
+and an update moves the goal back to the goal table.
+
+Deleted goals are kept with their `deleted_at` date, out of the partial indexes,
+and purged in batches `PURGE_AFTER_DAYS` after their deletion.
+
+Functions:
+    archive_goals: Moves the goals due for archival to the archive table.
+    restore_goal: Moves an archived goal back to the goal table.
+    purge_deleted_goals: Deletes the goals soft deleted before a date.
+    run_archival: Archives the goals periodically.
+    run_purge: Purges the deleted goals periodically.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, delete, insert, literal, select
+from sqlmodel import Session
+from mycareer.database import get_engine
+from mycareer.invalidation import invalidation_bus
+from mycareer.models import Goal, GoalArchive
+from mycareer.metrics import metrics
+from mycareer.queries import CLOSED_STATUSES
+
+ARCHIVED_STATUSES = CLOSED_STATUSES
+COLUMNS = (
+    "id", "tenant_id", "name", "description", "status", "priority", "due_date", "parent_id",
+    "change_seq", "updated_at",
+)
+
+archive_after_days: float = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+archive_interval: float = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))
+archive_batch_size: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+purge_after_days: float = float(os.getenv("PURGE_AFTER_DAYS", "30"))
+purge_interval: float = float(os.getenv("PURGE_INTERVAL_SECONDS", "0"))
+purge_batch_size: int = int(os.getenv("PURGE_BATCH_SIZE", "1000"))
+
+logger = logging.getLogger(__name__)
+
+def archive_goals(
+    session: Session,
+    older_than: datetime,
+    batch_size: int = archive_batch_size,
+    tenant_id: Optional[str] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Move the goals in a terminal status not updated since a date to the archive table.
+
+    Every batch is copied and deleted in its own transaction. The selected rows
+    are locked, skipping the ones locked by a concurrent update or archival. The
+    batches are read from the `status, updated_at` index in its order, one range
+    per status, without sorting the goals by date.
+
+    Args:
+        session (Session): The database session.
+        older_than (datetime): The date before which the goals were last updated.
+        batch_size (int): The number of goals moved per transaction.
+        tenant_id (Optional[str]): The ID of the tenant whose goals are archived, None
+        for every tenant.
+        on_progress (Optional[Callable[[int], None]]): Called after every batch with the
+        number of goals archived so far.
+
+    Returns:
+        int: The number of goals archived.
+    """
+    goal_table = Goal.__table__
+    criteria = [
+        goal_table.c.status.in_(ARCHIVED_STATUSES),
+        goal_table.c.updated_at < older_than,
+        goal_table.c.deleted_at.is_(None),
+    ]
+    if tenant_id is not None:
+        criteria.append(goal_table.c.tenant_id == tenant_id)
+    archived = 0
+    while True:
+        goal_ids = session.execute(
+            select(goal_table.c.id)
+            .where(*criteria)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not goal_ids:
+            return archived
+
+        session.execute(
+            insert(GoalArchive.__table__).from_select(
+                [*COLUMNS, "archived_at"],
+                select(
+                    *(goal_table.c[column] for column in COLUMNS),
+                    literal(datetime.utcnow(), DateTime()),
+                ).where(goal_table.c.id.in_(goal_ids)),
+            )
+        )
+        session.execute(delete(goal_table).where(goal_table.c.id.in_(goal_ids)))
+        session.commit()
+        # The archived goals leave the lists without `include_archived`, published for
+        # every batch so that a failure in a later batch keeps the committed ones out.
+        invalidation_bus.publish([None])
+        archived += len(goal_ids)
+        metrics.increment("archive.goals", len(goal_ids))
+        if on_progress is not None:
+            on_progress(archived)
+
+def restore_goal(session: Session, tenant_id: str, goal_id: int) -> Optional[Goal]:
+    """Move an archived goal of a tenant back to the goal table, in the session's transaction.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the goal.
+
+    Returns:
+        Optional[Goal]: The restored goal, or None if the tenant has no archived goal with this ID.
+    """
+    archived_goal = session.get(GoalArchive, goal_id)
+    if archived_goal is None or archived_goal.tenant_id != tenant_id:
+        return None
+    goal = Goal(**{column: getattr(archived_goal, column) for column in COLUMNS})
+    session.delete(archived_goal)
+    session.add(goal)
+    session.flush()
+    return goal
+
+def purge_deleted_goals(
+    session: Session, older_than: datetime, batch_size: int = purge_batch_size
+) -> int:
+    """Delete the goals soft deleted before a date.
+
+    Every batch is deleted in its own transaction, so the locks are held briefly.
+    The tombstones of the goals stay, for the sync clients.
+
+    Args:
+        session (Session): The database session.
+        older_than (datetime): The date before which the goals were deleted.
+        batch_size (int): The number of goals deleted per transaction.
+
+    Returns:
+        int: The number of goals purged.
+    """
+    goal_table = Goal.__table__
+    purged = 0
+    while True:
+        goal_ids = session.execute(
+            select(goal_table.c.id)
+            .where(goal_table.c.deleted_at.is_not(None), goal_table.c.deleted_at < older_than)
+            .limit(batch_size)
+        ).scalars().all()
+        if not goal_ids:
+            return purged
+
+        session.execute(delete(goal_table).where(goal_table.c.id.in_(goal_ids)))
+        session.commit()
+        purged += len(goal_ids)
+        metrics.increment("purge.goals", len(goal_ids))
+
+def _run_once(job: Callable[[Session, datetime], int], after_days: float) -> int:
+    with Session(get_engine()) as session:
+        return job(session, datetime.utcnow() - timedelta(days=after_days))
+
+async def _run_periodically(
+    job: Callable[[Session, datetime], int], interval: float, after_days: float,
+    action: str, done: str,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            count = await run_in_threadpool(_run_once, job, after_days)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("The %s of the goals failed", action)
+        else:
+            if count:
+                logger.info("%s %d goals", done, count)
+
+async def run_archival(
+    interval: float = archive_interval, after_days: float = archive_after_days
+) -> None:
+    """Archive the goals periodically, until cancelled.
+
+    The archival runs in a worker thread, so the event loop keeps serving requests.
+    A failed run is logged and retried at the next period.
+
+    Args:
+        interval (float): The delay in seconds between two runs.
+        after_days (float): The number of days after their last update the goals are archived.
+    """
+    await _run_periodically(archive_goals, interval, after_days, "archival", "Archived")
+
+async def run_purge(interval: float = purge_interval, after_days: float = purge_after_days) -> None:
+    """Purge the deleted goals periodically, until cancelled.
+
+    The purge runs in a worker thread, so the event loop keeps serving requests.
+    A failed run is logged and retried at the next period.
+
+    Args:
+        interval (float): The delay in seconds between two runs.
+        after_days (float): The number of days after their deletion the goals are purged.
+    """
+    await _run_periodically(purge_deleted_goals, interval, after_days, "purge", "Purged")
@@ -0,0 +1,94 @@
+"""
+cache.py
+
+This module provides the in-process cache of goals read by ID.
+
+The cache is disabled unless `GOAL_CACHE_SIZE` is set. It is kept consistent
+with the other workers through the invalidation bus.
+
+The goal IDs are unique across the tenants, so the goals are keyed by ID and
+carry their tenant: a goal is only served to the tenant owning it.
+
+Classes:
+    GoalCache: A size-bounded LRU cache of serialized goals.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from mycareer.invalidation import invalidation_bus
+
+class GoalCache:
+    """
+    ## Description
+
+    A size-bounded LRU cache of serialized goals, keyed by goal ID and checked against
+    the tenant.
+
+    ## Args
+
+        max_size (int): The maximum number of goals kept, 0 to disable the cache.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[int, Tuple[str, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache keeps entries."""
+        return self.max_size > 0
+
+    def get(self, tenant_id: str, goal_id: int) -> Optional[Dict[str, Any]]:
+        """Get a cached goal of a tenant.
+
+        Args:
+            tenant_id (str): The ID of the tenant.
+            goal_id (int): The ID of the goal.
+
+        Returns:
+            Optional[Dict[str, Any]]: The serialized goal, or None if it is not cached
+            or belongs to another tenant.
+        """
+        with self._lock:
+            entry = self._entries.get(goal_id)
+            if entry is None or entry[0] != tenant_id:
+                return None
+            self._entries.move_to_end(goal_id)
+            return entry[1]
+
+    def set(self, tenant_id: str, goal_id: int, goal: Dict[str, Any]) -> None:
+        """Cache a goal, evicting the least recently used one when full.
+
+        Args:
+            tenant_id (str): The ID of the tenant owning the goal.
+            goal_id (int): The ID of the goal.
+            goal (Dict[str, Any]): The serialized goal.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[goal_id] = (tenant_id, goal)
+            self._entries.move_to_end(goal_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, goal_id: Optional[int]) -> None:
+        """Remove a goal from the cache.
+
+        Args:
+            goal_id (Optional[int]): The ID of the goal, None to remove every goal.
+        """
+        with self._lock:
+            if goal_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(goal_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+goal_cache = GoalCache(int(os.getenv("GOAL_CACHE_SIZE", "0")))
+invalidation_bus.subscribe(goal_cache.invalidate)
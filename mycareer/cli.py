@@ -0,0 +1,219 @@
+"""
+cli.py
+
+This module defines the command line interface of the My Career API.
+
+Usage:
+    python -m mycareer serve [--host HOST] [--port PORT] [--workers WORKERS]
+                             [--loop {auto,uvloop,asyncio}] [--http {auto,httptools,h11}]
+                             [--http2] [--keep-alive KEEP_ALIVE] [--backlog BACKLOG]
+                             [--graceful-timeout GRACEFUL_TIMEOUT] [--max-requests MAX_REQUESTS]
+    python -m mycareer import-goals FILE [--format {csv,ndjson}] [--chunk-size CHUNK_SIZE]
+                                         [--tenant TENANT]
+    python -m mycareer archive-goals [--after-days AFTER_DAYS]
+    python -m mycareer purge-goals [--after-days AFTER_DAYS]
+    python -m mycareer generate-goals --goals GOALS [--seed SEED] [--tenants TENANTS]
+                                      [--snapshot]
+
+Functions:
+    default_workers: Gets the default number of worker processes.
+    build_parser: Builds the argument parser.
+    serve: Runs the application server.
+    import_goals_file: Imports goals in bulk from a CSV or NDJSON file.
+    archive_goals: Archives the goals in a terminal status once.
+    purge_goals: Purges the deleted goals once.
+    generate_goals: Loads synthetic goals, or builds their cached SQLite snapshot.
+    main: Entry point of the command line interface.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import List, Optional
+import uvicorn
+from pydantic import ValidationError
+from sqlmodel import Session
+from mycareer import archive, datagen, deadline
+from mycareer.database import get_engine
+from mycareer.importer import GoalImportOptions, import_chunk_size, import_goals
+from mycareer.server import ServerHttp, ServerLoop, ServerSettings
+from mycareer.tenancy import default_tenant_id
+
+APP: str = "mycareer.main:app"
+
+logger = logging.getLogger(__name__)
+
+def default_workers() -> int:
+    """Get the default number of worker processes.
+
+    The handlers are asynchronous, so one worker per core keeps every core
+    busy. `WEB_CONCURRENCY` overrides the value.
+
+    Returns:
+        int: The number of worker processes.
+    """
+    if "WEB_CONCURRENCY" in os.environ:
+        return int(os.environ["WEB_CONCURRENCY"])
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    return max(cores or 1, 1)
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The argument parser.
+    """
+    parser = argparse.ArgumentParser(prog="mycareer", description="My Career API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the application server.")
+    serve_parser.add_argument("--host", help="defaults to HOST or 127.0.0.1")
+    serve_parser.add_argument("--port", type=int, help="defaults to PORT or 8000")
+    serve_parser.add_argument("--workers", type=int, help="defaults to one per core")
+    serve_parser.add_argument("--loop", choices=[loop.value for loop in ServerLoop])
+    serve_parser.add_argument("--http", choices=[http.value for http in ServerHttp])
+    serve_parser.add_argument("--http2", action="store_true", default=None)
+    serve_parser.add_argument("--keep-alive", type=int, dest="keep_alive_seconds")
+    serve_parser.add_argument("--backlog", type=int)
+    serve_parser.add_argument("--graceful-timeout", type=int, dest="graceful_timeout_seconds")
+    serve_parser.add_argument("--max-requests", type=int)
+    serve_parser.set_defaults(handler=serve)
+
+    import_parser = commands.add_parser(
+        "import-goals", help="Import goals in bulk from a CSV or NDJSON file."
+    )
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=("csv", "ndjson"), dest="file_format",
+                               help="defaults to the extension of the file")
+    import_parser.add_argument("--chunk-size", type=int, default=None)
+    import_parser.add_argument("--tenant", default=None, help="defaults to DEFAULT_TENANT_ID")
+    import_parser.set_defaults(handler=import_goals_file)
+
+    archive_parser = commands.add_parser(
+        "archive-goals", help="Archive the completed and abandoned goals once."
+    )
+    archive_parser.add_argument("--after-days", type=float, default=None,
+                                help="defaults to ARCHIVE_AFTER_DAYS")
+    archive_parser.set_defaults(handler=archive_goals)
+
+    purge_parser = commands.add_parser(
+        "purge-goals", help="Delete for good the goals deleted for a while, once."
+    )
+    purge_parser.add_argument("--after-days", type=float, default=None,
+                              help="defaults to PURGE_AFTER_DAYS")
+    purge_parser.set_defaults(handler=purge_goals)
+
+    generate_parser = commands.add_parser(
+        "generate-goals", help="Load synthetic goals into the database, or into a snapshot."
+    )
+    generate_parser.add_argument("--goals", type=int, required=True)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--tenants", default=None,
+                                 help="comma separated, defaults to DEFAULT_TENANT_ID")
+    generate_parser.add_argument("--snapshot", action="store_true",
+                                 help="build the cached SQLite snapshot and print its path")
+    generate_parser.set_defaults(handler=generate_goals)
+
+    return parser
+
+def serve(args: argparse.Namespace) -> None:
+    """Run the application server.
+
+    The settings are validated and the application is imported once in the
+    supervisor process before the workers are started, so a configuration
+    error fails the launch instead of every worker.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    overrides = {field: getattr(args, field, None) for field in ServerSettings.model_fields}
+    if overrides["workers"] is None and not os.getenv("WEB_CONCURRENCY"):
+        overrides["workers"] = default_workers()
+    try:
+        settings = ServerSettings.from_env(**overrides)
+    except ValidationError as error:
+        sys.exit(f"Invalid server settings: {error}")
+
+    module_name, _, _ = APP.partition(":")
+    importlib.import_module(module_name)
+
+    shared = os.getenv("INVALIDATION_BUS_URL")
+    if settings.workers > 1 and not shared and os.getenv("GOAL_CACHE_SIZE"):
+        logger.warning("GOAL_CACHE_SIZE is set without INVALIDATION_BUS_URL, "
+                       "the workers will not see each other's writes")
+    if settings.graceful_timeout_seconds < deadline.default_timeout:
+        logger.warning("SERVER_GRACEFUL_TIMEOUT_SECONDS is shorter than REQUEST_TIMEOUT_SECONDS, "
+                       "a shutdown may cut the requests in flight")
+
+    uvicorn.run(APP, **settings.uvicorn_options())
+
+def import_goals_file(args: argparse.Namespace) -> None:
+    """Import goals in bulk from a CSV or NDJSON file and print the report as JSON.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    tenant_id = args.tenant or default_tenant_id
+    file_format = args.file_format
+    if file_format is None:
+        file_format = "csv" if args.file.lower().endswith(".csv") else "ndjson"
+    with open(args.file, "rb") as stream, Session(get_engine()) as session:
+        options = GoalImportOptions(
+            file_format=file_format, chunk_size=args.chunk_size or import_chunk_size
+        )
+        report = import_goals(session, tenant_id, stream, options)
+    json.dump(report.model_dump(), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+def archive_goals(args: argparse.Namespace) -> None:
+    """Archive the goals in a terminal status once and print their number.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    after_days = archive.archive_after_days if args.after_days is None else args.after_days
+    with Session(get_engine()) as session:
+        archived = archive.archive_goals(session, datetime.utcnow() - timedelta(days=after_days))
+    print(f"Archived {archived} goals")
+
+def purge_goals(args: argparse.Namespace) -> None:
+    """Purge the deleted goals once and print their number.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    after_days = archive.purge_after_days if args.after_days is None else args.after_days
+    with Session(get_engine()) as session:
+        purged = archive.purge_deleted_goals(
+            session, datetime.utcnow() - timedelta(days=after_days)
+        )
+    print(f"Purged {purged} goals")
+
+def generate_goals(args: argparse.Namespace) -> None:
+    """Load synthetic goals into the database, or build their cached SQLite snapshot,
+    and print what was done.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+    """
+    tenants = [tenant.strip() for tenant in (args.tenants or default_tenant_id).split(",")
+               if tenant.strip()]
+    if args.snapshot:
+        print(datagen.get_snapshot(args.goals, args.seed, tenants))
+        return
+    with Session(get_engine()) as session:
+        first_id = datagen.load_goals(session, args.goals, args.seed, tenants)
+    print(f"Generated {args.goals} goals from ID {first_id}")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the command line interface.
+
+    Args:
+        argv (Optional[List[str]]): The arguments, defaults to the process arguments.
+    """
+    args = build_parser().parse_args(argv)
+    args.handler(args)
@@ -1,20 +1,188 @@
 """
 database.py
 
-This module sets up the database connection and provides a function to get a new database session.
+This module sets up the database connections and provides functions to get a new database session.
+
+The engines are created by `init_engines`, called from the application lifespan or on first
+use, so importing the module does not touch the database.
+
+Writes always go to the primary database. When `DATABASE_REPLICA_URLS` is set, reads go to
+the replicas, except for the clients that wrote recently: they keep reading from the primary
+for `DATABASE_STICKY_SECONDS` so they see their own writes.
+
+Classes:
+    ReplicaRouter: Chooses the replica engine serving a read.
 
 Functions:
-    get_session: Yields a new database session.
+    instrument_engine: Enforces the current request deadline on the statements of an engine.
+    init_engines: Creates the primary and replica engines.
+    dispose_engines: Closes the connection pools of the engines.
+    get_engine: Gets the primary engine.
+    get_replica_router: Gets the replica router, if replicas are configured.
+    get_session: Yields a new database session on the primary database.
+    get_write_session: Yields a new session on the primary database and marks the client as sticky.
+    is_sticky: Checks whether a client must read from the primary database.
+    get_read_session: Yields a new session on a replica, or on the primary for sticky clients.
 """
 
+import itertools
 import os
-from typing import Generator
+import threading
+import time
+from typing import Generator, List
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
 from sqlmodel import Session, create_engine
+from mycareer import deadline
+from mycareer.metrics import metrics
+
+STICKY_COOKIE: str = "mycareer_primary_until"
 
 database_url: str = os.getenv("DATABASE_URL", "sqlite:///mycareer_test.db")
+replica_urls: List[str] = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+replica_strategy: str = os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin")
+sticky_seconds: float = float(os.getenv("DATABASE_STICKY_SECONDS", "5"))
+query_cache_size: int = int(os.getenv("DATABASE_QUERY_CACHE_SIZE", "500"))
+
+def _connect_args(url: str) -> dict:
+    """Get the DBAPI connection arguments for a database URL.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: The connection arguments.
+    """
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+def _count_compiled_cache(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+    if context is None:
+        return
+    if context.cache_hit == CACHE_HIT:
+        metrics.increment("db.compiled_cache.hits")
+    elif context.cache_hit == CACHE_MISS:
+        metrics.increment("db.compiled_cache.misses")
+
+def instrument_engine(engine: Engine) -> None:
+    """Enforce the current request deadline on the statements of an engine.
+
+    Args:
+        engine (Engine): The engine.
+    """
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", deadline.on_sqlite_connect)
+    elif engine.dialect.name == "postgresql":
+        event.listen(engine, "begin", deadline.on_postgresql_begin)
+
+def _create_engine(url: str) -> Engine:
+    """Create an engine counting its compiled statement cache hits and misses and
+    enforcing the request deadlines.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        Engine: The engine.
+    """
+    new_engine = create_engine(
+        url, connect_args=_connect_args(url), query_cache_size=query_cache_size
+    )
+    event.listen(new_engine, "after_cursor_execute", _count_compiled_cache)
+    instrument_engine(new_engine)
+    return new_engine
+
+class ReplicaRouter:
+    """
+    ## Description
+
+    Chooses the replica engine serving a read.
+
+    ## Args
+
+        engines (List[Engine]): The replica engines.
+
+        strategy (str): `round_robin` to rotate over the replicas, or `least_connections`
+        to pick the replica with the fewest checked out connections.
+
+    ## Raises
+
+        ValueError: If there is no engine or the strategy is unknown.
+    """
+
+    STRATEGIES = ("round_robin", "least_connections")
+
+    def __init__(self, engines: List[Engine], strategy: str = "round_robin") -> None:
+        if not engines:
+            raise ValueError("At least one replica engine is required")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+        self.engines = engines
+        self.strategy = strategy
+        self._cycle = itertools.cycle(engines)
+        self._lock = threading.Lock()
 
-connect_args: dict = {"check_same_thread": False}
-engine = create_engine(database_url, connect_args=connect_args)
+    def choose(self) -> Engine:
+        """Choose the replica engine serving the next read.
+
+        Returns:
+            Engine: The replica engine.
+        """
+        if self.strategy == "least_connections":
+            return min(self.engines, key=lambda replica: replica.pool.checkedout())
+        with self._lock:
+            return next(self._cycle)
+
+_engine: Engine | None = None  # pylint: disable=invalid-name
+_replica_router: ReplicaRouter | None = None  # pylint: disable=invalid-name
+_init_lock = threading.Lock()
+
+def init_engines() -> None:
+    """Create the primary and replica engines, if they are not created yet."""
+    global _engine, _replica_router  # pylint: disable=global-statement
+    with _init_lock:
+        if _engine is not None:
+            return
+        if replica_urls:
+            _replica_router = ReplicaRouter(
+                [_create_engine(url) for url in replica_urls],
+                replica_strategy,
+            )
+        _engine = _create_engine(database_url)
+
+def dispose_engines() -> None:
+    """Close the connection pools of the engines and forget them."""
+    global _engine, _replica_router  # pylint: disable=global-statement
+    with _init_lock:
+        if _engine is not None:
+            _engine.dispose()
+        if _replica_router is not None:
+            for replica in _replica_router.engines:
+                replica.dispose()
+        _engine, _replica_router = None, None
+
+def get_engine() -> Engine:
+    """Get the primary engine, creating it on first use.
+
+    Returns:
+        Engine: The primary engine.
+    """
+    if _engine is None:
+        init_engines()
+    return _engine
+
+def get_replica_router() -> ReplicaRouter | None:
+    """Get the replica router, creating the engines on first use.
+
+    Returns:
+        ReplicaRouter | None: The replica router, or None if no replica is configured.
+    """
+    if _engine is None:
+        init_engines()
+    return _replica_router
 
 def get_session() -> Generator[Session, None, None]:
     """Get a new database session.
@@ -22,5 +190,57 @@ def get_session() -> Generator[Session, None, None]:
     Yields:
         Session: A new database session.
     """
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
+        yield session
+
+def get_write_session(response: Response) -> Generator[Session, None, None]:
+    """Get a new session on the primary database for a request that writes.
+
+    The client is marked as sticky so its next reads are served by the primary.
+
+    Args:
+        response (Response): The response of the request.
+
+    Yields:
+        Session: A new database session on the primary database.
+    """
+    if get_replica_router() is not None:
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + sticky_seconds),
+            max_age=max(int(sticky_seconds), 1),
+            httponly=True,
+        )
+    with Session(get_engine()) as session:
+        yield session
+
+def is_sticky(request: Request) -> bool:
+    """Check whether a client wrote recently and must read from the primary.
+
+    Args:
+        request (Request): The request of the client.
+
+    Returns:
+        bool: Whether the client is sticky.
+    """
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+def get_read_session(request: Request) -> Generator[Session, None, None]:
+    """Get a new session for a request that only reads.
+
+    Args:
+        request (Request): The request.
+
+    Yields:
+        Session: A new database session on a replica, or on the primary database
+        when there is no replica or the client is sticky.
+    """
+    read_engine = get_engine()
+    replica_router = get_replica_router()
+    if replica_router is not None and not is_sticky(request):
+        read_engine = replica_router.choose()
+    with Session(read_engine) as session:
         yield session
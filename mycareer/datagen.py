@@ -0,0 +1,296 @@
+"""
+datagen.py
+
+This module generates synthetic goals at production scale, for the tests and the benchmarks.
+
+The goals are drawn from a seeded random generator, so a seed always gives the
+same rows. The statuses, priorities, due dates and description lengths follow
+skewed distributions, the tenants have Zipf-like sizes, two goals in five are
+sub-goals of an earlier goal of their tenant and one in a hundred is soft deleted,
+with its tombstone. Every goal gets its status history: its creation, then its
+current status when it moved on.
+
+The rows are bulk-loaded with Core `INSERT` statements of `DATAGEN_CHUNK_SIZE`
+rows. Generating a large data set still takes a while, so `get_snapshot` keeps
+the generated SQLite databases in `DATAGEN_CACHE_DIR`, keyed by the parameters,
+the schema and the version of the generator, and `restore_snapshot` copies one
+into the database of an engine with the SQLite backup API, in seconds for a
+million goals.
+
+Functions:
+    generate_goals: Generates the rows of goals.
+    load_goals: Bulk-loads generated goals, their status history and their tombstones.
+    snapshot_path: Gets the path of the cached snapshot of a data set.
+    get_snapshot: Gets the cached snapshot of a data set, generating it on first use.
+    restore_snapshot: Copies a snapshot into the SQLite database of an engine.
+"""
+
+import hashlib
+import itertools
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Session, SQLModel, create_engine
+from mycareer.models import (
+    DEFAULT_TENANT_ID, Goal, GoalArchive, GoalPriority, GoalStatus, GoalStatusEvent, GoalTombstone
+)
+from mycareer.sync import goal_sequence, next_change_seq
+
+# Bumped when the generated rows change, so the cached snapshots are generated again.
+DATAGEN_VERSION: int = 1
+GENERATION_DATE: datetime = datetime(2025, 1, 1)
+
+STATUS_WEIGHTS: Dict[GoalStatus, int] = {
+    GoalStatus.TO_REFINE: 10,
+    GoalStatus.NOT_STARTED: 20,
+    GoalStatus.IN_PROGRESS: 30,
+    GoalStatus.BLOCKED: 5,
+    GoalStatus.COMPLETED: 28,
+    GoalStatus.ABANDONED: 7,
+}
+PRIORITY_WEIGHTS: Dict[GoalPriority, int] = {
+    GoalPriority.LOW: 25,
+    GoalPriority.MEDIUM: 55,
+    GoalPriority.HIGH: 20,
+}
+WORDS = (
+    "improve deliver mentor learn lead review present certify automate document design "
+    "migrate measure publish negotiate plan hire coach ship refactor team quarter customer "
+    "roadmap skills conference budget release feedback project service quality"
+).split()
+
+datagen_chunk_size: int = int(os.getenv("DATAGEN_CHUNK_SIZE", "10000"))
+datagen_cache_dir: str = os.getenv("DATAGEN_CACHE_DIR", ".datagen")
+
+_STATUS_CUM_WEIGHTS = list(itertools.accumulate(STATUS_WEIGHTS.values()))
+_PRIORITY_CUM_WEIGHTS = list(itertools.accumulate(PRIORITY_WEIGHTS.values()))
+# A text long enough to cut any description from, at a random offset.
+_TEXT = " ".join(random.Random(0).choice(WORDS) for _ in range(2000))
+
+def _due_date(
+    rng: random.Random, status: GoalStatus, updated_at: datetime, now: datetime
+) -> Optional[datetime]:
+    if rng.random() < 1 / 3:
+        return None
+    if status in (GoalStatus.COMPLETED, GoalStatus.ABANDONED):
+        return updated_at + timedelta(days=rng.gauss(-20, 30))
+    return now + timedelta(days=rng.gauss(30, 30))
+
+def _description(rng: random.Random) -> Optional[str]:
+    if rng.random() < 0.25:
+        return None
+    length = min(int(rng.lognormvariate(4.5, 0.8)) + 1, 2000)
+    offset = rng.randrange(len(_TEXT) - length)
+    return _TEXT[offset:offset + length].strip().capitalize() or None
+
+def generate_goals(
+    count: int,
+    seed: int = 0,
+    tenants: Sequence[str] = (DEFAULT_TENANT_ID,),
+    first_id: int = 1,
+    now: datetime = GENERATION_DATE,
+) -> Iterator[dict]:
+    """Generate the rows of goals, the same ones for the same arguments.
+
+    The goals are updated over the year before `now`, the open ones are due
+    around the next month and the closed ones before their last update. A third
+    of the due dates and a quarter of the descriptions are null, the lengths of
+    the others follow a log-normal distribution around 90 characters.
+
+    Args:
+        count (int): The number of goals.
+        seed (int): The seed of the random generator.
+        tenants (Sequence[str]): The tenants, the first one owning the most goals.
+        first_id (int): The ID of the first goal, the others follow.
+        now (datetime): The date of the generation.
+
+    Yields:
+        dict: The columns of a goal, without its change sequence value.
+    """
+    rng = random.Random(seed)
+    tenant_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(tenants) + 1)))
+    goal_ids: Dict[str, List[int]] = {tenant_id: [] for tenant_id in tenants}
+
+    for goal_id in range(first_id, first_id + count):
+        tenant_id = rng.choices(tenants, cum_weights=tenant_weights)[0]
+        status = rng.choices(list(STATUS_WEIGHTS), cum_weights=_STATUS_CUM_WEIGHTS)[0]
+        updated_at = now - timedelta(seconds=rng.randrange(365 * 86400))
+        due_date = _due_date(rng, status, updated_at, now)
+        description = _description(rng)
+
+        parent_id = None
+        if goal_ids[tenant_id] and rng.random() < 0.4:
+            parent_id = rng.choice(goal_ids[tenant_id])
+        goal_ids[tenant_id].append(goal_id)
+        yield {
+            "id": goal_id,
+            "tenant_id": tenant_id,
+            "name": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {goal_id}",
+            "description": description,
+            "status": status,
+            "priority": rng.choices(
+                list(PRIORITY_WEIGHTS), cum_weights=_PRIORITY_CUM_WEIGHTS
+            )[0],
+            "due_date": due_date,
+            "parent_id": parent_id,
+            "updated_at": updated_at,
+            "deleted_at": (
+                min(updated_at + timedelta(days=7), now) if rng.random() < 0.01 else None
+            ),
+        }
+
+def _insert_chunk(session: Session, goals: List[dict]) -> None:
+    # Every tenant of the chunk gets a range of its change sequence, as an import does.
+    by_tenant: Dict[str, List[dict]] = {}
+    for goal in goals:
+        by_tenant.setdefault(goal["tenant_id"], []).append(goal)
+    for tenant_id, tenant_goals in by_tenant.items():
+        last_seq = next_change_seq(session, goal_sequence(tenant_id), count=len(tenant_goals))
+        for offset, goal in enumerate(tenant_goals, last_seq - len(tenant_goals) + 1):
+            goal["change_seq"] = offset
+
+    events, tombstones = [], []
+    for goal in goals:
+        created_at = goal["updated_at"] - timedelta(hours=goal["id"] % 2160)
+        events.append({
+            "tenant_id": goal["tenant_id"], "goal_id": goal["id"], "status": GoalStatus.TO_REFINE,
+            "previous_status": None, "priority": goal["priority"], "changed_at": created_at,
+        })
+        if goal["status"] != GoalStatus.TO_REFINE:
+            events.append({
+                "tenant_id": goal["tenant_id"], "goal_id": goal["id"], "status": goal["status"],
+                "previous_status": GoalStatus.TO_REFINE, "priority": goal["priority"],
+                "changed_at": goal["updated_at"],
+            })
+        if goal["deleted_at"] is not None:
+            tombstones.append({
+                "tenant_id": goal["tenant_id"], "goal_id": goal["id"],
+                "change_seq": goal["change_seq"], "deleted_at": goal["deleted_at"],
+            })
+
+    connection = session.connection()
+    connection.execute(insert(Goal.__table__), goals)
+    connection.execute(insert(GoalStatusEvent.__table__), events)
+    if tombstones:
+        connection.execute(insert(GoalTombstone.__table__), tombstones)
+
+def load_goals(
+    session: Session,
+    count: int,
+    seed: int = 0,
+    tenants: Sequence[str] = (DEFAULT_TENANT_ID,),
+    chunk_size: int = datagen_chunk_size,
+) -> int:
+    """Bulk-load generated goals, their status history and their tombstones, in one transaction.
+
+    The goals get the IDs following the ones of the goals already in the database,
+    live or archived, and the next values of the change sequences of their tenants.
+
+    Args:
+        session (Session): The database session.
+        count (int): The number of goals.
+        seed (int): The seed of the random generator.
+        tenants (Sequence[str]): The tenants, the first one owning the most goals.
+        chunk_size (int): The number of goals inserted per statement.
+
+    Returns:
+        int: The ID of the first goal loaded.
+    """
+    first_id = max(
+        session.execute(select(func.max(Goal.id))).scalar() or 0,
+        session.execute(select(func.max(GoalArchive.id))).scalar() or 0,
+    ) + 1
+    goals = generate_goals(count, seed, tenants, first_id)
+    while chunk := list(itertools.islice(goals, chunk_size)):
+        _insert_chunk(session, chunk)
+    session.commit()
+    return first_id
+
+def _schema_fingerprint() -> str:
+    dialect = sqlite.dialect()
+    statements = []
+    for table in SQLModel.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)))
+        statements.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        )
+    return "".join(statements)
+
+def snapshot_path(
+    count: int, seed: int = 0, tenants: Sequence[str] = (DEFAULT_TENANT_ID,)
+) -> Path:
+    """Get the path of the cached snapshot of a data set.
+
+    Args:
+        count (int): The number of goals.
+        seed (int): The seed of the random generator.
+        tenants (Sequence[str]): The tenants.
+
+    Returns:
+        Path: The path of the SQLite file in `DATAGEN_CACHE_DIR`, which may not exist yet.
+    """
+    key = hashlib.blake2b(
+        repr((DATAGEN_VERSION, count, seed, tuple(tenants), _schema_fingerprint())).encode(),
+        digest_size=8,
+    ).hexdigest()
+    return Path(datagen_cache_dir) / f"goals-{count}-{seed}-{key}.db"
+
+def get_snapshot(
+    count: int, seed: int = 0, tenants: Sequence[str] = (DEFAULT_TENANT_ID,)
+) -> Path:
+    """Get the cached snapshot of a data set, generating it on first use.
+
+    The snapshot is generated in a temporary file and moved into place once
+    complete, so a concurrent or interrupted run never leaves a partial snapshot.
+
+    Args:
+        count (int): The number of goals.
+        seed (int): The seed of the random generator.
+        tenants (Sequence[str]): The tenants, the first one owning the most goals.
+
+    Returns:
+        Path: The path of the SQLite file.
+    """
+    path = snapshot_path(count, seed, tenants)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    building = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    building.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{building}")
+    try:
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            load_goals(session, count, seed, tenants)
+    finally:
+        engine.dispose()
+    os.replace(building, path)
+    return path
+
+def restore_snapshot(engine: Engine, path: Path) -> None:
+    """Copy a snapshot into the SQLite database of an engine, replacing its content.
+
+    Args:
+        engine (Engine): The engine of the database.
+        path (Path): The path of the snapshot.
+
+    Raises:
+        ValueError: If the database is not a SQLite database.
+    """
+    if engine.dialect.name != "sqlite":
+        raise ValueError("Snapshots can only be restored into a SQLite database")
+    source = sqlite3.connect(path)
+    connection = engine.raw_connection()
+    try:
+        source.backup(connection.driver_connection)
+    finally:
+        connection.close()
+        source.close()
@@ -0,0 +1,281 @@
+"""
+dbpool.py
+
+This module runs the database work of the requests on a dedicated pool of threads.
+
+The handlers are `async def` and the sessions are synchronous, so by default their
+queries run on the event loop and block it while they run. When `DB_THREADS` is
+set, `run_db` sends the work to a pool of dedicated threads instead, separate from
+the anyio pool that FastAPI uses for the sync dependencies, so slow queries neither
+stall the event loop nor starve the other threaded work.
+
+The jobs wait in a queue bounded by `DB_QUEUE_SIZE`: when it is full, the request
+answers 503 with a `Retry-After` header instead of queueing without limit. Every
+thread keeps one connection per engine and binds the session of a job to it for
+the duration of the job, so a SQLite connection is only used by the thread that
+opened it. The application checks at startup that the threads leave a connection
+of each engine pool to the rest of the work. The jobs run in a copy of the context
+of the request, so its deadline still interrupts their statements.
+
+Classes:
+    DatabaseExecutor: A pool of dedicated threads running database jobs from a bounded queue.
+
+Functions:
+    run_db: Runs the database work of a request, on the pool when it is enabled.
+"""
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import QueuePool
+from sqlmodel import Session
+from mycareer.metrics import metrics
+
+T = TypeVar("T")
+
+db_threads: int = int(os.getenv("DB_THREADS", "0"))
+db_queue_size: int = int(os.getenv("DB_QUEUE_SIZE", "64"))
+
+class _Job:
+    __slots__ = ("session", "function", "args", "context", "loop", "future", "queued_at")
+
+    def __init__(
+        self, session: Optional[Session], function: Callable, args: tuple,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        self.session = session
+        self.function = function
+        self.args = args
+        self.context = contextvars.copy_context()
+        self.loop = loop
+        self.future = loop.create_future()
+        self.queued_at = time.monotonic()
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future: asyncio.Future, error: BaseException) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+class DatabaseExecutor:
+    """
+    ## Description
+
+    A pool of dedicated threads running database jobs from a bounded queue.
+
+    The threads are started on first use, or by `start`.
+
+    ## Args
+
+        threads (int): The number of threads, 0 to disable the pool.
+
+        queue_size (int): The maximum number of jobs waiting for a thread.
+
+    ## Raises
+
+        ValueError: If the pool is enabled with a queue size below 1.
+    """
+
+    def __init__(self, threads: int, queue_size: int) -> None:
+        if threads > 0 and queue_size < 1:
+            raise ValueError("The queue of the database threads needs room for a job")
+        self.threads = threads
+        self.queue_size = queue_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._workers: List[threading.Thread] = []
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the database work runs on the pool."""
+        return self.threads > 0
+
+    def check_pool(self, engine: Engine) -> None:
+        """Check that the pool of an engine has room for the connections of the threads.
+
+        Every thread keeps a connection of the engine for its whole life, so the
+        threads must leave at least one connection of the pool to the work running
+        outside them, or that work waits for the pool timeout.
+
+        Args:
+            engine (Engine): The engine.
+
+        Raises:
+            ValueError: If the threads need every connection of a bounded pool.
+        """
+        pool = engine.pool
+        if not self.enabled or not isinstance(pool, QueuePool):
+            return
+        max_overflow = pool._max_overflow  # pylint: disable=protected-access
+        if max_overflow < 0:
+            return
+        capacity = pool.size() + max_overflow
+        if self.threads >= capacity:
+            raise ValueError(
+                f"DB_THREADS ({self.threads}) must stay below the {capacity} connections "
+                "of the pool (pool size plus overflow)"
+            )
+
+    def start(self) -> None:
+        """Start the threads, if the pool is enabled and they are not started yet."""
+        with self._lock:
+            if self._workers or not self.enabled:
+                return
+            for index in range(self.threads):
+                worker = threading.Thread(
+                    target=self._work, name=f"mycareer-db-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def shutdown(self) -> None:
+        """Stop the threads once the queued jobs are done, and close their connections."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def submit(
+        self, session: Optional[Session], function: Callable[..., T], *args: Any
+    ) -> asyncio.Future:
+        """Queue a job for the threads.
+
+        Args:
+            session (Optional[Session]): The session used by the job, bound to the
+            connection of the thread while it runs, or None if the job opens its own.
+            function (Callable[..., T]): The function of the job.
+            *args (Any): The arguments of the function.
+
+        Returns:
+            asyncio.Future: The future of the result of the function, on the running loop.
+
+        Raises:
+            HTTPException: If the queue is full.
+        """
+        self.start()
+        job = _Job(session, function, args, asyncio.get_running_loop())
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            metrics.increment("db_pool.rejected")
+            raise HTTPException(
+                status_code=503, detail="Database overloaded", headers={"Retry-After": "1"}
+            ) from None
+        return job.future
+
+    def stats(self) -> Dict[str, int]:
+        """Get the state of the pool.
+
+        Returns:
+            Dict[str, int]: The number of `threads`, of `busy` threads, of `queued`
+            jobs and the `queue_size`.
+        """
+        with self._lock:
+            return {
+                "threads": len(self._workers),
+                "busy": self._busy,
+                "queued": self._queue.qsize(),
+                "queue_size": self.queue_size,
+            }
+
+    def _work(self) -> None:
+        connections: Dict[Engine, Connection] = {}
+        try:
+            while (job := self._queue.get()) is not None:
+                started = time.monotonic()
+                metrics.increment("db_pool.jobs")
+                metrics.increment("db_pool.wait_seconds", started - job.queued_at)
+                with self._lock:
+                    self._busy += 1
+                try:
+                    result = job.context.run(_run_job, job, connections)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    _resolve(job, _set_exception, error)
+                else:
+                    _resolve(job, _set_result, result)
+                finally:
+                    with self._lock:
+                        self._busy -= 1
+                    metrics.increment("db_pool.run_seconds", time.monotonic() - started)
+        finally:
+            for connection in connections.values():
+                connection.close()
+
+def _run_job(job: _Job, connections: Dict[Engine, Connection]) -> Any:
+    """Run a job, with its session bound to the connection of the thread.
+
+    Args:
+        job (_Job): The job.
+        connections (Dict[Engine, Connection]): The connections of the thread by engine.
+
+    Returns:
+        Any: The result of the function of the job.
+    """
+    engine = job.session.bind if job.session is not None else None
+    if not isinstance(engine, Engine):
+        return job.function(*job.args)
+
+    connection = connections.get(engine)
+    if connection is None or connection.closed or connection.invalidated:
+        if connection is not None:
+            connection.close()
+        connection = connections[engine] = engine.connect()
+    job.session.bind = connection
+    try:
+        return job.function(*job.args)
+    finally:
+        # The request closes the session again on the event loop, with nothing left to release.
+        job.session.close()
+        job.session.bind = engine
+
+def _resolve(job: _Job, setter: Callable[[asyncio.Future, Any], None], value: Any) -> None:
+    try:
+        job.loop.call_soon_threadsafe(setter, job.future, value)
+    except RuntimeError:
+        # The loop of the request is closed, nobody waits for the result.
+        pass
+
+async def run_db(
+    session: Optional[Session], function: Callable[..., T], *args: Any, offload: bool = False
+) -> T:
+    """Run the database work of a request, on the pool when it is enabled.
+
+    Args:
+        session (Optional[Session]): The session used by the function, or None if
+        the function opens its own.
+        function (Callable[..., T]): The function doing the work.
+        *args (Any): The arguments of the function.
+        offload (bool): Whether to run the function in the default thread pool when
+        the database pool is disabled, for the long jobs, instead of on the event loop.
+
+    Returns:
+        T: The result of the function.
+
+    Raises:
+        HTTPException: If the queue of the pool is full.
+    """
+    if db_executor.enabled:
+        future = db_executor.submit(session, function, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The job uses the session until it ends, the request must not close it before.
+            await asyncio.wait([future])
+            raise
+    if offload:
+        return await run_in_threadpool(function, *args)
+    return function(*args)
+
+db_executor = DatabaseExecutor(db_threads, db_queue_size)
@@ -0,0 +1,196 @@
+"""
+deadline.py
+
+This module enforces a deadline on the requests of the API endpoints.
+
+The deadline of a request comes from its route (`REQUEST_TIMEOUTS`, falling back to
+`REQUEST_TIMEOUT_SECONDS`), and a client can ask for another one with the
+`X-Request-Timeout` header, up to `REQUEST_TIMEOUT_CAP_SECONDS` or the deadline of
+the route if it is longer. It is enforced:
+    - on the handler, by the middleware, which answers 504 once it is exceeded,
+    - on the database, because the handlers block the event loop while they query it,
+      or wait for a database thread that cancelling them does not stop: SQLite
+      connections get a progress handler interrupting the running statement, and
+      Postgres transactions get a `statement_timeout`.
+
+The interrupted statement raises in the handler, the session rolls back and its
+connection goes back to the pool.
+
+Classes:
+    DeadlineMiddleware: The ASGI middleware enforcing the deadline of the requests.
+
+Functions:
+    parse_timeouts: Parses the timeouts by route.
+    request_timeout: Gets the timeout of a request.
+    deadline_scope: Sets the deadline of the code running in the block.
+    remaining: Gets the time left before the current deadline.
+    on_sqlite_connect: Interrupts the statements of a SQLite connection past the deadline.
+    on_postgresql_begin: Bounds the statements of a Postgres transaction by the deadline.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+from mycareer.metrics import metrics
+from mycareer.routing import TRANSFER_ROUTES, route_key
+
+TIMEOUT_HEADER: bytes = b"x-request-timeout"
+SQLITE_PROGRESS_STEPS: int = 1000
+
+def parse_timeouts(value: str) -> Dict[str, float]:
+    """Parse the timeouts by route.
+
+    Args:
+        value (str): The timeouts, e.g. `GET /v1/goals=5;GET /v1/goals/{id}=1`.
+
+    Returns:
+        Dict[str, float]: The timeouts in seconds by method and route.
+    """
+    timeouts = {}
+    for item in filter(None, (item.strip() for item in value.split(";"))):
+        route, _, seconds = item.rpartition("=")
+        timeouts[route.strip()] = float(seconds)
+    return timeouts
+
+default_timeout: float = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "10"))
+timeout_cap: float = float(os.getenv("REQUEST_TIMEOUT_CAP_SECONDS", "30"))
+# The transfers run for minutes. The other routes keep the default unless configured.
+route_timeouts: Dict[str, float] = {
+    **dict.fromkeys(TRANSFER_ROUTES, 600.0),
+    **parse_timeouts(os.getenv("REQUEST_TIMEOUTS", "")),
+}
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+def request_timeout(method: str, path: str, header: Optional[str] = None) -> float:
+    """Get the timeout of a request.
+
+    Args:
+        method (str): The method of the request.
+        path (str): The path of the request.
+        header (Optional[str]): The value of the `X-Request-Timeout` header.
+
+    Returns:
+        float: The timeout in seconds, the requested one being capped by
+        `REQUEST_TIMEOUT_CAP_SECONDS` or by the timeout of the route if it is longer.
+    """
+    timeout = route_timeouts.get(f"{method} {route_key(path)}", default_timeout)
+    if header:
+        try:
+            requested = float(header)
+        except ValueError:
+            return timeout
+        if requested > 0 and math.isfinite(requested):
+            timeout = min(requested, max(timeout, timeout_cap))
+    return timeout
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[None]:
+    """Set the deadline of the code running in the block.
+
+    Args:
+        timeout (float): The time left in seconds.
+    """
+    token = _deadline.set(time.monotonic() + timeout)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Get the time left before the current deadline.
+
+    Returns:
+        Optional[float]: The time left in seconds, or None outside of a deadline.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def _sqlite_progress_handler() -> int:
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() > deadline:
+        metrics.increment("timeouts.database")
+        return 1
+    return 0
+
+def on_sqlite_connect(dbapi_connection, _connection_record) -> None:
+    """Interrupt the statements of a new SQLite connection once the current deadline passes.
+
+    Args:
+        dbapi_connection (sqlite3.Connection): The DBAPI connection.
+        _connection_record (ConnectionRecord): The pool record of the connection.
+    """
+    dbapi_connection.set_progress_handler(_sqlite_progress_handler, SQLITE_PROGRESS_STEPS)
+
+def on_postgresql_begin(connection) -> None:
+    """Set the `statement_timeout` of a Postgres transaction to the time left, if any.
+
+    Args:
+        connection (Connection): The connection beginning the transaction.
+    """
+    left = remaining()
+    if left is not None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(left * 1000), 1)}")
+
+class DeadlineMiddleware:
+    """
+    ## Description
+
+    The ASGI middleware enforcing the deadline of the requests whose path starts
+    with one of the protected prefixes.
+
+    ## Args
+
+        app (ASGIApp): The wrapped application.
+
+        prefixes (Tuple[str, ...]): The path prefixes of the protected endpoints.
+    """
+
+    def __init__(self, app, prefixes: Tuple[str, ...] = ("/v1/",)) -> None:
+        self.app = app
+        self.prefixes = prefixes
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        header = dict(scope["headers"]).get(TIMEOUT_HEADER, b"").decode("latin-1")
+        timeout = request_timeout(scope["method"], scope["path"], header)
+        started = False
+
+        async def send_wrapper(message) -> None:
+            nonlocal started
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        with deadline_scope(timeout):
+            try:
+                await asyncio.wait_for(self.app(scope, receive, send_wrapper), timeout)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                if started or remaining() > 0 or not _timed_out(error):
+                    raise
+                metrics.increment("timeouts.requests")
+                await _timeout_response(send)
+
+def _timed_out(error: Exception) -> bool:
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    # The statements interrupted by the deadline raise an OperationalError, and SQLAlchemy
+    # is only loaded once the database is used.
+    exc = sys.modules.get("sqlalchemy.exc")
+    return exc is not None and isinstance(error, exc.OperationalError)
+
+async def _timeout_response(send) -> None:
+    body = b'{"detail":"Request timed out"}'
+    headers: List[Tuple[bytes, bytes]] = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    await send({"type": "http.response.start", "status": 504, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,153 @@
+"""
+exporter.py
+
+This module exports the goals of a tenant to CSV or NDJSON files.
+
+The goals are read by keyset pages of `EXPORT_CHUNK_SIZE` goals along the
+`tenant_id, id` index, each page in its own short transaction, and written as
+they are read, so neither the memory used nor the time a transaction stays
+open depends on the number of goals. The files have the fields of `GoalRead`,
+and can be imported again.
+
+Classes:
+    GoalExportOptions: The options of an export.
+
+Functions:
+    count_goals: Counts the goals of a tenant an export writes.
+    export_goals: Exports the goals of a tenant to a CSV or NDJSON file.
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Annotated, Any, BinaryIO, Callable, Optional, Sequence, TextIO, Tuple
+from pydantic import BaseModel, Field
+from sqlalchemy import Row, func, select
+from sqlmodel import Session
+from mycareer.models import Goal, GoalArchive
+
+EXPORT_FORMATS: Tuple[str, ...] = ("csv", "ndjson")
+EXPORT_FIELDS: Tuple[str, ...] = (
+    "id", "name", "description", "status", "priority", "due_date", "parent_id"
+)
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+export_chunk_size: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+class GoalExportOptions(BaseModel):
+    """
+    ## Description
+
+    The options of an export.
+
+    ## Attributes
+
+        file_format (str): `csv` or `ndjson`.
+
+        include_archived (bool): Whether to export the archived goals too. Defaults to False.
+
+        chunk_size (int): The number of goals read per transaction. Defaults to
+        `EXPORT_CHUNK_SIZE`.
+    """
+    file_format: str
+    include_archived: bool = False
+    chunk_size: Annotated[int, Field(ge=1)] = export_chunk_size
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _write_rows(text: TextIO, writer: Optional[Any], rows: Sequence[Row]) -> None:
+    for row in rows:
+        values = [_plain(value) for value in row]
+        if writer is not None:
+            writer.writerow(["" if value is None else value for value in values])
+        else:
+            text.write(json.dumps(dict(zip(EXPORT_FIELDS, values)),
+                                  ensure_ascii=False, separators=(",", ":")))
+            text.write("\n")
+
+def count_goals(session: Session, tenant_id: str, include_archived: bool = False) -> int:
+    """Count the goals of a tenant an export writes.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        include_archived (bool): Whether to count the archived goals.
+
+    Returns:
+        int: The number of goals.
+    """
+    count = session.execute(
+        select(func.count()).where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None))
+    ).scalar_one()
+    if include_archived:
+        count += session.execute(
+            select(func.count()).where(GoalArchive.tenant_id == tenant_id)
+        ).scalar_one()
+    return count
+
+def export_goals(
+    session: Session,
+    tenant_id: str,
+    stream: BinaryIO,
+    options: GoalExportOptions,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Export the goals of a tenant to a CSV or NDJSON file, ordered by ID, the archived
+    goals after the others.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        stream (BinaryIO): The file, written in UTF-8.
+        options (GoalExportOptions): The format, whether to export the archived goals
+        and the number of goals read per transaction.
+        on_progress (Optional[Callable[[int], None]]): Called after every page with the
+        number of goals written so far.
+
+    Returns:
+        int: The number of goals written.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if options.file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {options.file_format}")
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    writer = csv.writer(text) if options.file_format == "csv" else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+
+    written = 0
+    try:
+        for model in (Goal, GoalArchive) if options.include_archived else (Goal,):
+            criteria = [model.tenant_id == tenant_id]
+            if model is Goal:
+                criteria.append(Goal.deleted_at.is_(None))
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(*(getattr(model, field) for field in EXPORT_FIELDS))
+                    .where(*criteria, model.id > last_id)
+                    .order_by(model.id)
+                    .limit(options.chunk_size)
+                ).all()
+                session.commit()
+                if not rows:
+                    break
+                _write_rows(text, writer, rows)
+                last_id = rows[-1].id
+                written += len(rows)
+                if on_progress is not None:
+                    on_progress(written)
+    finally:
+        text.flush()
+        text.detach()
+    return written
@@ -0,0 +1,297 @@
+"""
+goal_query.py
+
+This module runs the declarative goal queries of `POST /v1/goals/query`.
+
+A query reads a page of goals with the filters, the sort and the fields it asks
+for, then adds the related data of the whole page with one batched query per kind
+of data, through a `BatchLoader`, instead of one query per goal: the parents with
+an `IN` query on the goals, then on the archive for the ones not found, the
+sub-goals with an `IN` query on the parent index and the history with an `IN`
+query on the goal index of the events. The aggregates are computed over all the
+matching goals in one more query. A query thus runs at most 6 statements in its
+session, whatever the size of the page.
+
+Everything is read with Core statements on the connection of the session, as the
+goal list is, so no `Goal` instance is created.
+
+Classes:
+    BatchLoader: Loads values by key in batches, once per key.
+
+Functions:
+    select_goal_query_rows: Selects a page of the goals of a tenant matching a query.
+    select_goal_query_aggregates: Selects the aggregates of the goals of a tenant matching
+    a query.
+    run_goal_query: Runs a goal query.
+"""
+
+from typing import Any, Callable, Dict, Generic, Iterable, List, Sequence, Tuple, TypeVar
+from sqlalchemy import Connection, Row, Select, case, func, select
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus, GoalStatusEvent
+from mycareer.schemas import (
+    GoalAggregate, GoalField, GoalInclude, GoalQuery, GoalQueryFilter, GoalSortField
+)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+class BatchLoader(Generic[K, V]):
+    """
+    ## Description
+
+    Loads values by key in batches, once per key, in the style of a DataLoader.
+
+    The keys asked together are loaded with a single call of the batch function,
+    and the values, or their absence, are kept for the later calls.
+
+    ## Args
+
+        load_batch (Callable[[List[K]], Dict[K, V]]): The function loading the values
+        of a list of keys, returning the keys found.
+    """
+
+    def __init__(self, load_batch: Callable[[List[K]], Dict[K, V]]) -> None:
+        self._load_batch = load_batch
+        self._values: Dict[K, V] = {}
+        self._missing: set = set()
+
+    def prime(self, key: K, value: V) -> None:
+        """Set the value of a key already at hand, so it is not loaded.
+
+        Args:
+            key (K): The key.
+            value (V): The value.
+        """
+        self._values[key] = value
+
+    def load_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        """Load the values of keys, calling the batch function once for the unknown ones.
+
+        Args:
+            keys (Iterable[K]): The keys, repeated or not.
+
+        Returns:
+            Dict[K, V]: The values of the keys found.
+        """
+        keys = list(dict.fromkeys(keys))
+        unknown = [key for key in keys if key not in self._values and key not in self._missing]
+        if unknown:
+            found = self._load_batch(unknown)
+            self._values.update(found)
+            self._missing.update(key for key in unknown if key not in found)
+        return {key: self._values[key] for key in keys if key in self._values}
+
+def _fields(query: GoalQuery) -> List[GoalField]:
+    return list(dict.fromkeys(query.fields)) if query.fields is not None else list(GoalField)
+
+def _criteria(tenant_id: str, filters: GoalQueryFilter) -> List[ColumnElement]:
+    criteria = [Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None)]
+    if filters.ids is not None:
+        criteria.append(Goal.id.in_(filters.ids))
+    if filters.status is not None:
+        criteria.append(Goal.status.in_(filters.status))
+    if filters.priority is not None:
+        criteria.append(Goal.priority.in_(filters.priority))
+    if filters.parent_id is not None:
+        criteria.append(Goal.parent_id == filters.parent_id)
+    if filters.root_only:
+        criteria.append(Goal.parent_id.is_(None))
+    if filters.due_after is not None:
+        criteria.append(Goal.due_date >= filters.due_after)
+    if filters.due_before is not None:
+        criteria.append(Goal.due_date < filters.due_before)
+    if filters.name_contains is not None:
+        criteria.append(Goal.name.contains(filters.name_contains, autoescape=True))
+    return criteria
+
+# The statuses and the priorities sort in the order of their enumeration, not of their names.
+_SORT_KEYS: Dict[GoalSortField, ColumnElement] = {
+    GoalSortField.ID: Goal.id,
+    GoalSortField.NAME: Goal.name,
+    GoalSortField.STATUS: case(
+        *((Goal.status == status, rank) for rank, status in enumerate(GoalStatus))
+    ),
+    GoalSortField.PRIORITY: case(
+        *((Goal.priority == priority, rank) for rank, priority in enumerate(GoalPriority))
+    ),
+    GoalSortField.DUE_DATE: Goal.due_date,
+}
+
+def select_goal_query_rows(tenant_id: str, query: GoalQuery) -> Select:
+    """Select a page of the goals of a tenant matching a query.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        query (GoalQuery): The query.
+
+    Returns:
+        Select: The statement, returning `id`, the selected fields and `parent_id`,
+        in the order of the query, with one row more than the page to tell if more follow.
+    """
+    fields = _fields(query)
+    if GoalInclude.PARENT in query.include and GoalField.PARENT_ID not in fields:
+        fields.append(GoalField.PARENT_ID)
+    order_by = [
+        _SORT_KEYS[sort.field].desc() if sort.descending else _SORT_KEYS[sort.field]
+        for sort in query.sort
+    ]
+    if all(sort.field != GoalSortField.ID for sort in query.sort):
+        order_by.append(Goal.id)
+    return (
+        select(Goal.id, *(getattr(Goal, field.value) for field in fields))
+        .where(*_criteria(tenant_id, query.filters))
+        .order_by(*order_by)
+        .limit(query.page.limit + 1)
+        .offset(query.page.offset)
+    )
+
+def _aggregate_keys(aggregates: Sequence[GoalAggregate]) -> List[Tuple[GoalAggregate, Any]]:
+    keys: List[Tuple[GoalAggregate, Any]] = [(GoalAggregate.COUNT, None)]
+    if GoalAggregate.STATUS in aggregates:
+        keys.extend((GoalAggregate.STATUS, status) for status in GoalStatus)
+    if GoalAggregate.PRIORITY in aggregates:
+        keys.extend((GoalAggregate.PRIORITY, priority) for priority in GoalPriority)
+    return keys
+
+def select_goal_query_aggregates(tenant_id: str, query: GoalQuery) -> Select:
+    """Select the aggregates of all the goals of a tenant matching a query, in one row.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        query (GoalQuery): The query.
+
+    Returns:
+        Select: The statement, returning the number of goals, then the number of
+        goals in every status and of every priority, when asked, in enumeration order.
+    """
+    columns = []
+    for aggregate, value in _aggregate_keys(query.aggregates):
+        if aggregate == GoalAggregate.COUNT:
+            columns.append(func.count())
+        else:
+            column = Goal.status if aggregate == GoalAggregate.STATUS else Goal.priority
+            columns.append(func.count(case((column == value, 1))))
+    return select(*columns).where(*_criteria(tenant_id, query.filters))
+
+def _to_dict(row: Row, fields: Sequence[GoalField]) -> Dict[str, Any]:
+    mapping = row._mapping  # pylint: disable=protected-access
+    return {"id": mapping["id"], **{field.value: mapping[field.value] for field in fields}}
+
+def _parent_loader(
+    connection: Connection, tenant_id: str, fields: Sequence[GoalField]
+) -> BatchLoader[int, Dict[str, Any]]:
+    def load(goal_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        found = {}
+        for model in (Goal, GoalArchive):
+            misses = [goal_id for goal_id in goal_ids if goal_id not in found]
+            if not misses:
+                break
+            criteria = [model.tenant_id == tenant_id, model.id.in_(misses)]
+            if model is Goal:
+                criteria.append(Goal.deleted_at.is_(None))
+            statement = select(
+                model.id, *(getattr(model, field.value) for field in fields)
+            ).where(*criteria)
+            for row in connection.execute(statement):
+                found[row.id] = _to_dict(row, fields)
+        return found
+
+    return BatchLoader(load)
+
+def _sub_goal_loader(
+    connection: Connection, tenant_id: str, fields: Sequence[GoalField]
+) -> BatchLoader[int, List[Dict[str, Any]]]:
+    def load(goal_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        statement = (
+            select(Goal.id, Goal.parent_id.label("of_parent"),
+                   *(getattr(Goal, field.value) for field in fields))
+            .where(Goal.tenant_id == tenant_id, Goal.parent_id.in_(goal_ids),
+                   Goal.deleted_at.is_(None))
+            .order_by(Goal.parent_id, Goal.id)
+        )
+        found: Dict[int, List[Dict[str, Any]]] = {}
+        for row in connection.execute(statement):
+            found.setdefault(row.of_parent, []).append(_to_dict(row, fields))
+        return found
+
+    return BatchLoader(load)
+
+def _history_loader(
+    connection: Connection, tenant_id: str
+) -> BatchLoader[int, List[Dict[str, Any]]]:
+    def load(goal_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        statement = (
+            select(GoalStatusEvent.goal_id, GoalStatusEvent.status,
+                   GoalStatusEvent.previous_status, GoalStatusEvent.priority,
+                   GoalStatusEvent.changed_at)
+            .where(GoalStatusEvent.tenant_id == tenant_id,
+                   GoalStatusEvent.goal_id.in_(goal_ids))
+            .order_by(GoalStatusEvent.goal_id, GoalStatusEvent.id)
+        )
+        found: Dict[int, List[Dict[str, Any]]] = {}
+        for goal_id, status, previous_status, priority, changed_at in connection.execute(
+            statement
+        ):
+            found.setdefault(goal_id, []).append({
+                "status": status, "previous_status": previous_status,
+                "priority": priority, "changed_at": changed_at,
+            })
+        return found
+
+    return BatchLoader(load)
+
+def _fetch_aggregates(
+    connection: Connection, tenant_id: str, query: GoalQuery
+) -> Dict[str, Any]:
+    values = connection.execute(select_goal_query_aggregates(tenant_id, query)).one()
+    aggregates: Dict[str, Any] = {}
+    for (aggregate, key), value in zip(_aggregate_keys(query.aggregates), values):
+        if aggregate != GoalAggregate.COUNT:
+            aggregates.setdefault(aggregate.value, {})[key] = value
+        elif GoalAggregate.COUNT in query.aggregates:
+            aggregates["count"] = value
+    return aggregates
+
+def run_goal_query(session: Session, tenant_id: str, query: GoalQuery) -> Dict[str, Any]:
+    """Run a goal query, with one statement per kind of data whatever the size of the page.
+
+    The parents already on the page are not read again.
+
+    Args:
+        session (Session): The database session, only its connection is used.
+        tenant_id (str): The ID of the tenant.
+        query (GoalQuery): The query.
+
+    Returns:
+        Dict[str, Any]: The fields of `GoalQueryResult`.
+    """
+    connection = session.connection()
+    fields = _fields(query)
+    rows = connection.execute(select_goal_query_rows(tenant_id, query)).all()
+    result: Dict[str, Any] = {"has_more": len(rows) > query.page.limit}
+    rows = rows[:query.page.limit]
+    goals = result["goals"] = [_to_dict(row, fields) for row in rows]
+
+    if rows and GoalInclude.PARENT in query.include:
+        parents = _parent_loader(connection, tenant_id, fields)
+        for row in rows:
+            parents.prime(row.id, _to_dict(row, fields))
+        found = parents.load_many(row.parent_id for row in rows if row.parent_id is not None)
+        for goal, row in zip(goals, rows):
+            goal["parent"] = found.get(row.parent_id)
+    if rows and GoalInclude.SUB_GOALS in query.include:
+        found = _sub_goal_loader(connection, tenant_id, fields).load_many(
+            goal["id"] for goal in goals
+        )
+        for goal in goals:
+            goal["sub_goals"] = found.get(goal["id"], [])
+    if rows and GoalInclude.HISTORY in query.include:
+        found = _history_loader(connection, tenant_id).load_many(goal["id"] for goal in goals)
+        for goal in goals:
+            goal["history"] = found.get(goal["id"], [])
+
+    if query.aggregates:
+        result["aggregates"] = _fetch_aggregates(connection, tenant_id, query)
+    return result
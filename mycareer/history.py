@@ -0,0 +1,298 @@
+"""
+history.py
+
+This module keeps the history of the status and priority of the goals, and the
+analytics computed over it.
+
+Every change of the status or the priority of a goal appends a `GoalStatusEvent`
+in the transaction of the change, so the history is never out of step with the
+goals. The analytics are aggregate queries over the log: the time spent in a
+status is the gap to the next event of the goal, read with the `LEAD` window
+function along `ix_goalstatusevent_goal_id`, and the goals closed over a period
+are a range scan of `ix_goalstatusevent_status`, grouped by period.
+
+Classes:
+    EpochSeconds: The SQL expression of a date as seconds since the epoch.
+    WeekStart: The SQL expression of the Monday of the week of a date.
+    MonthStart: The SQL expression of the first day of the month of a date.
+
+Functions:
+    record_goal_event: Records the status and priority of a goal after a change.
+    record_imported_goal_events: Records the creation of the goals of an import chunk.
+    select_time_in_status: Selects the time spent by the goals of a tenant in each status.
+    select_closed_goals_by_period: Selects the goals of a tenant completed and abandoned per period.
+    get_time_in_status: Gets the time spent by the goals of a tenant in each status.
+    get_closed_goals_by_period: Gets the goals of a tenant completed and abandoned per period.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import Date, Float, Select, case, cast, distinct, func, insert, literal, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import Session
+from mycareer.models import Goal, GoalStatus, GoalStatusEvent, GoalTombstone
+from mycareer.schemas import AnalyticsPeriod, ClosedGoalsPeriod, StatusTime
+
+class EpochSeconds(FunctionElement):
+    """
+    ## Description
+
+    The SQL expression of a date as seconds since the epoch, with its fraction.
+
+    ## Args
+
+        date (ColumnElement): The date.
+    """
+    type = Float()
+    inherit_cache = True
+
+class WeekStart(FunctionElement):
+    """
+    ## Description
+
+    The SQL expression of the Monday of the week of a date.
+
+    ## Args
+
+        date (ColumnElement): The date.
+    """
+    type = Date()
+    inherit_cache = True
+
+class MonthStart(FunctionElement):
+    """
+    ## Description
+
+    The SQL expression of the first day of the month of a date.
+
+    ## Args
+
+        date (ColumnElement): The date.
+    """
+    type = Date()
+    inherit_cache = True
+
+PERIOD_STARTS = {AnalyticsPeriod.WEEK: WeekStart, AnalyticsPeriod.MONTH: MonthStart}
+
+@compiles(EpochSeconds, "sqlite")
+def _sqlite_epoch_seconds(element, compiler, **kw) -> str:
+    return f"((julianday({compiler.process(element.clauses, **kw)}) - 2440587.5) * 86400.0)"
+
+@compiles(EpochSeconds)
+def _epoch_seconds(element, compiler, **kw) -> str:
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+@compiles(WeekStart, "sqlite")
+def _sqlite_week_start(element, compiler, **kw) -> str:
+    # The next Sunday, or the day itself, then back to its Monday.
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+@compiles(WeekStart)
+def _week_start(element, compiler, **kw) -> str:
+    return f"CAST(date_trunc('week', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+@compiles(MonthStart, "sqlite")
+def _sqlite_month_start(element, compiler, **kw) -> str:
+    return f"date({compiler.process(element.clauses, **kw)}, 'start of month')"
+
+@compiles(MonthStart)
+def _month_start(element, compiler, **kw) -> str:
+    return f"CAST(date_trunc('month', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+def record_goal_event(
+    session: Session, goal: Goal, previous_status: Optional[GoalStatus] = None
+) -> GoalStatusEvent:
+    """Record the status and priority of a goal after a change, in the session's transaction.
+
+    Args:
+        session (Session): The database session.
+        goal (Goal): The goal, flushed so that it has an ID.
+        previous_status (Optional[GoalStatus]): The status before the change, None
+        for the creation of the goal.
+
+    Returns:
+        GoalStatusEvent: The event added to the session.
+    """
+    event = GoalStatusEvent(
+        tenant_id=goal.tenant_id,
+        goal_id=goal.id,
+        status=goal.status,
+        previous_status=previous_status,
+        priority=goal.priority,
+        changed_at=goal.updated_at,
+    )
+    session.add(event)
+    return event
+
+def record_imported_goal_events(
+    session: Session, tenant_id: str, first_seq: int, last_seq: int
+) -> None:
+    """Record the creation of the goals of an import chunk, in the session's transaction.
+
+    The events are copied from the inserted goals with one `INSERT ... SELECT`,
+    found by their change sequence values with the `change_seq` index, in its
+    order, which is the order of the IDs of the chunk.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant owning the goals.
+        first_seq (int): The change sequence value of the first goal of the chunk.
+        last_seq (int): The change sequence value of the last goal of the chunk.
+    """
+    session.connection().execute(
+        insert(GoalStatusEvent.__table__).from_select(
+            ["tenant_id", "goal_id", "status", "priority", "changed_at"],
+            select(Goal.tenant_id, Goal.id, Goal.status, Goal.priority, Goal.updated_at)
+            .where(
+                Goal.tenant_id == tenant_id,
+                Goal.change_seq.between(first_seq, last_seq),
+                Goal.deleted_at.is_(None),
+            )
+            .order_by(Goal.change_seq),
+        )
+    )
+
+def select_time_in_status(
+    tenant_id: str, now: datetime, goal_id: Optional[int] = None
+) -> Select:
+    """Select the time spent by the goals of a tenant in each status.
+
+    A status lasts from its event to the next event of the goal. The current status
+    of the goal lasts until its deletion, read from its tombstone, which outlives the
+    purge, or to `now` for a goal not deleted.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        now (datetime): The end of the current statuses.
+        goal_id (Optional[int]): The ID of a goal, None for every goal of the tenant.
+
+    Returns:
+        Select: The statement, returning `status`, the number of `goals`, their
+        `total_seconds` and their `average_seconds` in the status.
+    """
+    event = GoalStatusEvent
+    next_changed_at = func.lead(event.changed_at).over(
+        partition_by=event.goal_id, order_by=event.id
+    )
+    deleted_at = (
+        select(func.min(GoalTombstone.deleted_at))
+        .where(GoalTombstone.goal_id == event.goal_id, GoalTombstone.tenant_id == tenant_id)
+        .scalar_subquery()
+    )
+    segments = select(
+        event.goal_id,
+        event.status,
+        (
+            EpochSeconds(func.coalesce(
+                next_changed_at, deleted_at, literal(now, event.changed_at.type)
+            ))
+            - EpochSeconds(event.changed_at)
+        ).label("seconds"),
+    ).where(event.tenant_id == tenant_id)
+    if goal_id is not None:
+        segments = segments.where(event.goal_id == goal_id)
+    segments = segments.subquery("segments")
+
+    goals = func.count(distinct(segments.c.goal_id))
+    return select(
+        segments.c.status,
+        goals.label("goals"),
+        func.sum(segments.c.seconds).label("total_seconds"),
+        (func.sum(segments.c.seconds) / goals).label("average_seconds"),
+    ).group_by(segments.c.status)
+
+def select_closed_goals_by_period(
+    tenant_id: str,
+    period: AnalyticsPeriod,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Select:
+    """Select the goals of a tenant completed and abandoned per period.
+
+    A goal is counted in the period it entered the status, the changes of the
+    priority of a closed goal are not counted again.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        period (AnalyticsPeriod): The length of the periods.
+        since (Optional[datetime]): The start of the range, included, None for no start.
+        until (Optional[datetime]): The end of the range, excluded, None for no end.
+
+    Returns:
+        Select: The statement, returning `period_start`, the `completed` and
+        `abandoned` goals and the `completion_rate`, in period order.
+    """
+    event = GoalStatusEvent
+    period_start = PERIOD_STARTS[period](event.changed_at).label("period_start")
+    completed = func.count(case((event.status == GoalStatus.COMPLETED, 1)))
+    statement = select(
+        period_start,
+        completed.label("completed"),
+        func.count(case((event.status == GoalStatus.ABANDONED, 1))).label("abandoned"),
+        (cast(completed, Float) / func.count()).label("completion_rate"),
+    ).where(
+        event.tenant_id == tenant_id,
+        event.status.in_((GoalStatus.COMPLETED, GoalStatus.ABANDONED)),
+        event.previous_status.is_distinct_from(event.status),
+    )
+    if since is not None:
+        statement = statement.where(event.changed_at >= since)
+    if until is not None:
+        statement = statement.where(event.changed_at < until)
+    return statement.group_by(period_start).order_by(period_start)
+
+def get_time_in_status(
+    session: Session, tenant_id: str, goal_id: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[StatusTime]:
+    """Get the time spent by the goals of a tenant in each status.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        goal_id (Optional[int]): The ID of a goal, None for every goal of the tenant.
+        now (Optional[datetime]): The end of the current statuses. Defaults to now.
+
+    Returns:
+        List[StatusTime]: The time in every status reached, in the order of `GoalStatus`.
+    """
+    rows = session.execute(
+        select_time_in_status(tenant_id, now or datetime.utcnow(), goal_id)
+    ).all()
+    order = list(GoalStatus)
+    return [
+        StatusTime(
+            status=row.status, goals=row.goals, total_seconds=row.total_seconds,
+            average_seconds=row.average_seconds,
+        )
+        for row in sorted(rows, key=lambda row: order.index(row.status))
+    ]
+
+def get_closed_goals_by_period(
+    session: Session,
+    tenant_id: str,
+    period: AnalyticsPeriod,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[ClosedGoalsPeriod]:
+    """Get the goals of a tenant completed and abandoned per period.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        period (AnalyticsPeriod): The length of the periods.
+        since (Optional[datetime]): The start of the range, included, None for no start.
+        until (Optional[datetime]): The end of the range, excluded, None for no end.
+
+    Returns:
+        List[ClosedGoalsPeriod]: The periods with a closed goal, in order.
+    """
+    rows = session.execute(select_closed_goals_by_period(tenant_id, period, since, until)).all()
+    return [
+        ClosedGoalsPeriod(
+            period_start=row.period_start, completed=row.completed, abandoned=row.abandoned,
+            completion_rate=row.completion_rate,
+        )
+        for row in rows
+    ]
@@ -0,0 +1,294 @@
+"""
+importer.py
+
+This module imports goals in bulk from CSV or NDJSON files.
+
+The file is parsed as a stream, one row at a time. The rows are validated
+against `GoalCreate` and buffered into chunks, and every chunk is inserted with
+one batched `INSERT` in its own transaction, so the memory used does not
+depend on the size of the file. The creation events of the status history are
+copied from the chunk in the same transaction. The rows failing validation, and
+the rows whose parent is not a live or archived goal of the tenant, checked with one
+query per chunk, are skipped and reported at the end, with their line in the file.
+
+Classes:
+    GoalImportOptions: The options of an import.
+
+Functions:
+    detect_format: Gets the import format of a content type.
+    iter_csv_records: Iterates over the records of a CSV file.
+    iter_ndjson_records: Iterates over the records of an NDJSON file.
+    import_goals: Imports goals of a tenant from a CSV or NDJSON file.
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import Annotated, Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session
+from mycareer.history import record_imported_goal_events
+from mycareer.invalidation import invalidation_bus
+from mycareer.models import Goal
+from mycareer.queries import select_existing_goal_ids
+from mycareer.schemas import GoalCreate, GoalImportRejection, GoalImportReport
+from mycareer.sync import goal_sequence, next_change_seq
+
+IMPORT_FORMATS: Tuple[str, ...] = ("csv", "ndjson")
+CONTENT_TYPES: Dict[str, str] = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+import_chunk_size: int = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+import_max_rejections: int = int(os.getenv("IMPORT_MAX_REJECTIONS", "1000"))
+
+# A record and the line it starts on, or the reason it could not be parsed.
+Record = Tuple[int, Any, Optional[str]]
+
+class GoalImportOptions(BaseModel):
+    """
+    ## Description
+
+    The options of an import.
+
+    ## Attributes
+
+        file_format (str): `csv` or `ndjson`.
+
+        chunk_size (int): The number of goals inserted per statement. Defaults to
+        `IMPORT_CHUNK_SIZE`.
+
+        max_rejections (int): The maximum number of rejected rows detailed in the
+        report. Defaults to `IMPORT_MAX_REJECTIONS`.
+
+        skip (int): The number of records already imported, to resume an import.
+        Defaults to 0.
+
+        report (Optional[GoalImportReport]): The report of the records already
+        imported, to resume an import. Defaults to None.
+    """
+    file_format: str
+    chunk_size: Annotated[int, Field(ge=1)] = import_chunk_size
+    max_rejections: Annotated[int, Field(ge=0)] = import_max_rejections
+    skip: Annotated[int, Field(ge=0)] = 0
+    report: Optional[GoalImportReport] = None
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Get the import format of a content type.
+
+    Args:
+        content_type (Optional[str]): The value of the `Content-Type` header.
+
+    Returns:
+        Optional[str]: `csv` or `ndjson`, or None if the content type is not supported.
+    """
+    if not content_type:
+        return None
+    return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+def _decode_lines(stream: BinaryIO, invalid: Dict[int, str]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line, raw in enumerate(stream, start=1):
+        try:
+            yield decoder.decode(raw)
+        except UnicodeDecodeError as error:
+            invalid[line] = f"invalid UTF-8: {error.reason}"
+            decoder.reset()
+            yield raw.decode("utf-8", errors="replace")
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[Record]:
+    """Iterate over the records of a CSV file with a header row, skipping the blank lines.
+
+    Empty cells are read as missing values, so the defaults of `GoalCreate` apply.
+    A header that cannot be read stops the file, with the parsing error of its line.
+
+    Args:
+        stream (BinaryIO): The UTF-8 encoded file.
+
+    Yields:
+        Record: The line of the record, the record or None, and the parsing error if any.
+    """
+    invalid: Dict[int, str] = {}
+    reader = csv.reader(_decode_lines(stream, invalid))
+    try:
+        header = next(reader, None)
+    except csv.Error as error:
+        header, invalid[1] = None, f"invalid CSV: {error}"
+    if 1 in invalid:
+        yield 1, None, invalid[1]
+        return
+    if header is None:
+        return
+
+    while True:
+        line = reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            invalid.setdefault(line, f"invalid CSV: {error}")
+            row = None
+        errors = [invalid.pop(number) for number in range(line, reader.line_num + 1)
+                  if number in invalid]
+        if errors:
+            yield line, None, errors[0]
+        elif row:
+            yield line, {key: value or None for key, value in zip(header, row) if key}, None
+
+def iter_ndjson_records(stream: BinaryIO) -> Iterator[Record]:
+    """Iterate over the records of an NDJSON file, skipping the blank lines.
+
+    Args:
+        stream (BinaryIO): The UTF-8 encoded file.
+
+    Yields:
+        Record: The line of the record, the record or None, and the parsing error if any.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for line, raw in enumerate(stream, start=1):
+        try:
+            text = decoder.decode(raw)
+        except UnicodeDecodeError as error:
+            yield line, None, f"invalid UTF-8: {error.reason}"
+            decoder.reset()
+            continue
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text), None
+        except json.JSONDecodeError as error:
+            yield line, None, f"invalid JSON: {error.msg}"
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+def _check_parents(
+    session: Session, tenant_id: str, chunk: List[Tuple[int, GoalCreate]]
+) -> Tuple[List[GoalCreate], List[GoalImportRejection]]:
+    parent_ids = list({goal.parent_id for _, goal in chunk if goal.parent_id is not None})
+    found = set()
+    if parent_ids:
+        found = set(
+            session.execute(select_existing_goal_ids(tenant_id, parent_ids)).scalars().all()
+        )
+    goals, rejections = [], []
+    for line, goal in chunk:
+        if goal.parent_id is None or goal.parent_id in found:
+            goals.append(goal)
+        else:
+            rejections.append(
+                GoalImportRejection(line=line, errors=["parent_id: Parent goal not found"])
+            )
+    return goals, rejections
+
+def _insert_chunk(session: Session, tenant_id: str, goals: List[GoalCreate]) -> None:
+    last_seq = next_change_seq(session, goal_sequence(tenant_id), count=len(goals))
+    first_seq = last_seq - len(goals) + 1
+    # An executemany of one cached statement: the driver batches it into multi-row
+    # inserts where it can, instead of compiling a new `VALUES` list per chunk.
+    session.connection().execute(
+        insert(Goal.__table__),
+        [
+            {**goal.model_dump(), "tenant_id": tenant_id, "change_seq": first_seq + offset}
+            for offset, goal in enumerate(goals)
+        ],
+    )
+    record_imported_goal_events(session, tenant_id, first_seq, last_seq)
+
+def _read_record(
+    chunk: List[Tuple[int, GoalCreate]], line: int, record: Any, parse_error: Optional[str]
+) -> Optional[List[str]]:
+    if parse_error is None and not isinstance(record, dict):
+        parse_error = "row: expected an object"
+    if parse_error:
+        return [parse_error]
+    try:
+        chunk.append((line, GoalCreate.model_validate(record)))
+    except ValidationError as error:
+        return _validation_errors(error)
+    return None
+
+def import_goals(
+    session: Session,
+    tenant_id: str,
+    stream: BinaryIO,
+    options: GoalImportOptions,
+    on_progress: Optional[Callable[[int, GoalImportReport], None]] = None,
+) -> GoalImportReport:
+    """Import goals of a tenant from a CSV or NDJSON file.
+
+    Every chunk is committed on its own, so the goals of the chunks inserted
+    before a database error stay imported. An interrupted import resumes after
+    the records of its last committed chunk, with the report as of that chunk.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant owning the goals.
+        stream (BinaryIO): The UTF-8 encoded file.
+        options (GoalImportOptions): The format, the chunk size, the bound on the
+        detailed rejections, and the records already imported with their report.
+        on_progress (Optional[Callable[[int, GoalImportReport], None]]): Called in the
+        transaction of every chunk, before its commit, with the number of records read
+        and the report so far.
+
+    Returns:
+        GoalImportReport: The number of goals imported and the rejected rows.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if options.file_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {options.file_format}")
+    if options.file_format == "csv":
+        records = iter_csv_records(stream)
+    else:
+        records = iter_ndjson_records(stream)
+
+    report = options.report.model_copy(deep=True) if options.report else GoalImportReport()
+    chunk: List[Tuple[int, GoalCreate]] = []
+    read = 0
+
+    def reject(rejection: GoalImportRejection) -> None:
+        report.rejected += 1
+        if len(report.rejections) < options.max_rejections:
+            report.rejections.append(rejection)
+
+    def commit_chunk() -> None:
+        goals, rejections = _check_parents(session, tenant_id, chunk)
+        for rejection in rejections:
+            reject(rejection)
+        if goals:
+            _insert_chunk(session, tenant_id, goals)
+            report.imported += len(goals)
+        if on_progress is not None:
+            on_progress(read, report)
+        session.commit()
+        chunk.clear()
+
+    try:
+        for read, (line, *parsed) in enumerate(records, start=1):
+            if read <= options.skip:
+                continue
+            errors = _read_record(chunk, line, *parsed)
+            if errors:
+                reject(GoalImportRejection(line=line, errors=errors))
+            if len(chunk) >= options.chunk_size:
+                commit_chunk()
+
+        if chunk:
+            commit_chunk()
+    finally:
+        if report.imported:
+            # One message for the whole file, the new goals can change every list.
+            invalidation_bus.publish([None])
+    return report
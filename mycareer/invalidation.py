@@ -0,0 +1,185 @@
+"""
+invalidation.py
+
+This module provides the bus used to invalidate cached goal data across the
+worker processes serving the application.
+
+A write publishes the IDs of the goals it changed. The subscribers of the
+publishing process are called right away, the other processes receive the
+message the next time they poll the bus.
+
+Classes:
+    InvalidationBus: The base class of the invalidation buses.
+    LocalInvalidationBus: A bus delivering messages inside the current process only.
+    SQLiteInvalidationBus: A bus sharing messages between processes through a SQLite table.
+
+Functions:
+    create_invalidation_bus: Creates the bus matching a URL.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, List, Optional
+
+Subscriber = Callable[[Optional[int]], None]
+
+class InvalidationBus(ABC):
+    """
+    ## Description
+
+    The base class of the invalidation buses.
+
+    A message is a goal ID, or None to invalidate every goal. Subclasses
+    implement `_send` and `_receive` to reach the other processes.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: List[Subscriber] = []
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Register a function called with every message.
+
+        Args:
+            subscriber (Subscriber): The function to call.
+        """
+        self._subscribers.append(subscriber)
+
+    def publish(self, goal_ids: Iterable[Optional[int]]) -> None:
+        """Publish invalidation messages.
+
+        Args:
+            goal_ids (Iterable[Optional[int]]): The IDs of the changed goals, None for all goals.
+        """
+        goal_ids = list(goal_ids)
+        self._dispatch(goal_ids)
+        self._send(goal_ids)
+
+    def poll(self) -> None:
+        """Deliver the messages published by the other processes."""
+        self._dispatch(self._receive())
+
+    def close(self) -> None:
+        """Release the resources held by the bus."""
+
+    def _dispatch(self, goal_ids: List[Optional[int]]) -> None:
+        for goal_id in goal_ids:
+            for subscriber in self._subscribers:
+                subscriber(goal_id)
+
+    @abstractmethod
+    def _send(self, goal_ids: List[Optional[int]]) -> None:
+        pass
+
+    @abstractmethod
+    def _receive(self) -> List[Optional[int]]:
+        pass
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    ## Description
+
+    A bus delivering messages inside the current process only.
+
+    It is the default, suited to a single worker.
+    """
+
+    def _send(self, goal_ids: List[Optional[int]]) -> None:
+        pass
+
+    def _receive(self) -> List[Optional[int]]:
+        return []
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """
+    ## Description
+
+    A bus sharing messages between the processes of one machine through a
+    table of a SQLite file.
+
+    Each process reads the rows after the last one it has seen, skipping its
+    own, and old rows are pruned when publishing.
+
+    ## Args
+
+        path (str): The path of the SQLite file.
+
+        poll_interval (float): The minimum delay in seconds between two reads of the table.
+
+        retention (float): The delay in seconds after which the messages are pruned.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.0, retention: float = 300.0) -> None:
+        super().__init__()
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._last_poll = 0.0
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS invalidation ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "origin TEXT NOT NULL, "
+            "goal_id INTEGER, "
+            "created_at REAL NOT NULL)"
+        )
+        self._watermark = self._connection.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM invalidation"
+        ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _send(self, goal_ids: List[Optional[int]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO invalidation (origin, goal_id, created_at) VALUES (?, ?, ?)",
+                [(self._origin, goal_id, now) for goal_id in goal_ids],
+            )
+            self._connection.execute(
+                "DELETE FROM invalidation WHERE created_at < ?", (now - self.retention,)
+            )
+
+    def _receive(self) -> List[Optional[int]]:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_poll < self.poll_interval:
+                return []
+            self._last_poll = now
+            rows = self._connection.execute(
+                "SELECT id, origin, goal_id FROM invalidation WHERE id > ? ORDER BY id",
+                (self._watermark,),
+            ).fetchall()
+            if rows:
+                self._watermark = rows[-1][0]
+        return [goal_id for _, origin, goal_id in rows if origin != self._origin]
+
+def create_invalidation_bus(url: str) -> InvalidationBus:
+    """Create the bus matching a URL.
+
+    Args:
+        url (str): An empty string for a local bus, or `sqlite:///<path>` for a SQLite bus.
+
+    Returns:
+        InvalidationBus: The invalidation bus.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+    """
+    if not url:
+        return LocalInvalidationBus()
+    if url.startswith("sqlite:///"):
+        return SQLiteInvalidationBus(
+            url[len("sqlite:///"):],
+            poll_interval=float(os.getenv("INVALIDATION_POLL_INTERVAL", "0")),
+        )
+    raise ValueError(f"Unsupported invalidation bus URL: {url}")
+
+invalidation_bus: InvalidationBus = create_invalidation_bus(os.getenv("INVALIDATION_BUS_URL", ""))
@@ -0,0 +1,451 @@
+"""
+jobs.py
+
+This module runs the heavy goal operations as background jobs.
+
+The exports, the imports and the archival of the closed goals of a tenant can
+run longer than a request should. Submitted as jobs, they are stored in the
+`job` table and answered at once with the ID of the job, which the client polls
+for its status and progress, then for its result. The table is the queue: no
+broker is needed, and the jobs survive the restarts of the workers.
+
+Every worker of the application runs a `JobRunner`, started by the lifespan,
+with `JOB_WORKERS` tasks. A task claims the oldest queued job with a conditional
+`UPDATE`, so two workers never run the same job, and runs it in a thread of the
+FastAPI pool, so the event loop keeps serving requests and the database threads of
+`DB_THREADS` stay free for them. The jobs commit their work in chunks
+and record their progress, with a heartbeat, as they go:
+    - a job interrupted by a shutdown is queued again, and resumes after its last
+      committed chunk where its operation allows it, as the imports do,
+    - a job whose worker died is found by its stale heartbeat and queued again,
+      or failed after `JOB_MAX_ATTEMPTS` starts. Every update of a running job is
+      conditional on the start that claimed it, so a start found stale while it still
+      runs rolls back its chunk and stops at its next report, and never overwrites
+      the status written by the next start,
+    - the finished jobs and their files are purged after `JOB_RETENTION_HOURS`.
+
+The files of the jobs, the uploaded imports and the written exports, are kept
+in `JOB_DIR`, which every worker of a deployment must share.
+
+Classes:
+    JobInterrupted: Raised in a job when its runner stops or it was queued again.
+    JobContext: The session of a running job, and the recording of its progress.
+    JobRunner: Runs the queued jobs on a bounded number of tasks.
+
+Functions:
+    update_claimed_job: Updates a running job, unless it was queued again.
+    job_file_path: Gets the path of a file of a job.
+    submit_job: Queues a job for a tenant.
+    recover_jobs: Queues again the jobs whose worker stopped, and purges the expired ones.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlmodel import Session
+from mycareer.archive import archive_goals
+from mycareer.database import get_engine
+from mycareer.exporter import GoalExportOptions, count_goals, export_goals
+from mycareer.importer import GoalImportOptions, import_goals
+from mycareer.metrics import metrics
+from mycareer.models import Job, JobKind, JobStatus
+from mycareer.schemas import GoalImportReport
+
+PENDING_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+FINISHED_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+job_max_pending: int = int(os.getenv("JOB_MAX_PENDING", "10"))
+job_poll_interval: float = float(os.getenv("JOB_POLL_SECONDS", "30"))
+job_stale_seconds: float = float(os.getenv("JOB_STALE_SECONDS", "120"))
+job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+job_retention_hours: float = float(os.getenv("JOB_RETENTION_HOURS", "24"))
+job_dir: str = os.getenv("JOB_DIR", ".jobs")
+
+logger = logging.getLogger(__name__)
+
+class JobInterrupted(Exception):
+    """
+    ## Description
+
+    Raised in a job when its runner stops, the job is then queued again, or when the
+    job was queued again by the recovery while it ran.
+    """
+
+class JobContext:
+    """
+    ## Description
+
+    The session of a running job, and the recording of its progress.
+
+    ## Args
+
+        session (Session): The session of the job.
+
+        job (Job): The job, detached from any session.
+
+        stopping (threading.Event): Set when the runner stops.
+    """
+
+    def __init__(self, session: Session, job: Job, stopping: threading.Event) -> None:
+        self.session = session
+        self.job = job
+        self.stopping = stopping
+        self.result_path: Optional[str] = None
+
+    def report(
+        self, progress: int, total: Optional[int] = None, result: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Record the progress of the job and its heartbeat, and commit the session.
+
+        The work of the session is committed with the progress, so a job resumed
+        after an interruption starts from the progress of its last report.
+
+        Args:
+            progress (int): The number of items done.
+            total (Optional[int]): The number of items to do, None to keep the current one.
+            result (Optional[Dict[str, Any]]): The partial result, None to keep the current one.
+
+        Raises:
+            JobInterrupted: If the runner stops, or the job was queued again by the
+            recovery, in which case the work of the session is rolled back.
+        """
+        values: Dict[str, Any] = {"progress": progress, "heartbeat_at": datetime.utcnow()}
+        if total is not None:
+            values["total"] = total
+        if result is not None:
+            values["result"] = json.dumps(result)
+        if not update_claimed_job(self.session, self.job, values):
+            self.session.rollback()
+            raise JobInterrupted()
+        self.session.commit()
+        if self.stopping.is_set():
+            raise JobInterrupted()
+
+def update_claimed_job(session: Session, job: Job, values: Dict[str, Any]) -> bool:
+    """Update a running job, unless it was queued again or claimed by another start since
+    the job was claimed.
+
+    Args:
+        session (Session): The database session.
+        job (Job): The job, as claimed.
+        values (Dict[str, Any]): The values of the columns to update.
+
+    Returns:
+        bool: True if the job was updated.
+    """
+    return bool(session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == JobStatus.RUNNING, Job.attempts == job.attempts)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount)
+
+def job_file_path(job_id: int, suffix: str) -> str:
+    """Get the path of a file of a job, in `JOB_DIR`.
+
+    Args:
+        job_id (int): The ID of the job.
+        suffix (str): The suffix of the file, e.g. its format.
+
+    Returns:
+        str: The path.
+    """
+    return os.path.join(job_dir, f"{job_id}.{suffix}")
+
+def _export(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    job = context.job
+    include_archived = params.get("include_archived", False)
+    context.report(0, total=count_goals(context.session, job.tenant_id, include_archived))
+    path = job_file_path(job.id, params["format"])
+    os.makedirs(job_dir, exist_ok=True)
+    # Written aside then renamed, so a download never reads a partial file.
+    try:
+        with open(f"{path}.tmp", "wb") as stream:
+            options = GoalExportOptions(
+                file_format=params["format"], include_archived=include_archived
+            )
+            exported = export_goals(context.session, job.tenant_id, stream, options,
+                                    on_progress=context.report)
+        os.replace(f"{path}.tmp", path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(f"{path}.tmp")
+        raise
+    context.result_path = path
+    return {"exported": exported}
+
+def _import(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    job = context.job
+    report = GoalImportReport.model_validate_json(job.result) if job.result else None
+
+    def on_progress(read: int, partial: GoalImportReport) -> None:
+        context.report(read, result=partial.model_dump(mode="json"))
+
+    with open(params["path"], "rb") as stream:
+        options = GoalImportOptions(file_format=params["format"], skip=job.progress, report=report)
+        report = import_goals(context.session, job.tenant_id, stream, options, on_progress)
+    os.remove(params["path"])
+    return report.model_dump(mode="json")
+
+def _archive(context: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    archived = archive_goals(
+        context.session, datetime.utcnow() - timedelta(days=params["after_days"]),
+        tenant_id=context.job.tenant_id, on_progress=context.report,
+    )
+    return {"archived": archived}
+
+# The handlers run the job with the parameters of its submission, and return its result.
+JOB_HANDLERS: Dict[JobKind, Callable[[JobContext, Dict[str, Any]], Dict[str, Any]]] = {
+    JobKind.EXPORT: _export,
+    JobKind.IMPORT: _import,
+    JobKind.ARCHIVE: _archive,
+}
+
+def submit_job(
+    session: Session,
+    tenant_id: str,
+    kind: JobKind,
+    params: Dict[str, Any],
+    max_pending: int = job_max_pending,
+) -> Optional[Job]:
+    """Queue a job for a tenant, unless the tenant has too many jobs pending.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        kind (JobKind): The kind of the job.
+        params (Dict[str, Any]): The parameters of the job.
+        max_pending (int): The maximum number of queued and running jobs of the tenant.
+
+    Returns:
+        Optional[Job]: The queued job, or None if the tenant has `max_pending` jobs pending.
+    """
+    pending = session.execute(
+        select(func.count())
+        .where(Job.tenant_id == tenant_id, Job.status.in_(PENDING_STATUSES))
+    ).scalar_one()
+    if pending >= max_pending:
+        return None
+    job = Job(tenant_id=tenant_id, kind=kind, params=json.dumps(params))
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+def _remove_files(job: Job) -> None:
+    paths = [job.result_path, json.loads(job.params).get("path")]
+    for path in paths:
+        if path:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+def recover_jobs(
+    session: Session,
+    now: Optional[datetime] = None,
+    stale_seconds: float = job_stale_seconds,
+    max_attempts: int = job_max_attempts,
+    retention_hours: float = job_retention_hours,
+) -> int:
+    """Queue again the running jobs whose heartbeat is stale, fail the ones started
+    `max_attempts` times, and purge the jobs finished for `retention_hours` with their files.
+
+    Args:
+        session (Session): The database session.
+        now (Optional[datetime]): The current UTC date, for tests.
+        stale_seconds (float): The delay without heartbeat after which a running job
+        is considered stopped.
+        max_attempts (int): The number of starts after which a stopped job fails.
+        retention_hours (float): The number of hours the finished jobs are kept.
+
+    Returns:
+        int: The number of jobs queued, the ones queued again included.
+    """
+    now = now or datetime.utcnow()
+    stale = [Job.status == JobStatus.RUNNING,
+             Job.heartbeat_at < now - timedelta(seconds=stale_seconds)]
+    requeued = session.execute(
+        update(Job).where(*stale, Job.attempts < max_attempts)
+        .values(status=JobStatus.QUEUED)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    session.execute(
+        update(Job).where(*stale)
+        .values(status=JobStatus.FAILED, finished_at=now,
+                error=f"The job stopped {max_attempts} times")
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+    expired = session.execute(
+        select(Job).where(Job.status.in_(FINISHED_STATUSES),
+                          Job.finished_at < now - timedelta(hours=retention_hours))
+    ).scalars().all()
+    for job in expired:
+        _remove_files(job)
+    if expired:
+        session.execute(delete(Job).where(Job.id.in_([job.id for job in expired])))
+    queued = session.execute(
+        select(func.count()).where(Job.status == JobStatus.QUEUED)
+    ).scalar_one()
+    session.commit()
+    if requeued:
+        logger.info("Queued %d stopped jobs again", requeued)
+    return queued
+
+class JobRunner:
+    """
+    ## Description
+
+    Runs the queued jobs on a bounded number of tasks, each job in a worker thread.
+
+    The tasks wait until a job is submitted in this worker, or until a poll finds
+    queued jobs: the ones submitted in the other workers, or queued again by the
+    recovery the poll runs first. The tasks thus run no statement while the queue
+    stays empty.
+
+    ## Args
+
+        workers (int): The number of jobs run at the same time, 0 to disable the runner.
+
+        poll_interval (float): The delay in seconds between two polls of the queue.
+    """
+
+    def __init__(
+        self, workers: int = job_workers, poll_interval: float = job_poll_interval
+    ) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = threading.Event()
+
+    async def start(self) -> None:
+        """Recover the jobs stopped with the previous workers, then start the tasks."""
+        if self.workers <= 0:
+            return
+        self._stopping = threading.Event()
+        self._wake = asyncio.Event()
+        if await self._recover():
+            self._wake.set()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+
+    def notify(self) -> None:
+        """Wake the tasks waiting for a job, after a submission."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self) -> None:
+        """Stop the tasks, the running jobs are queued again at their next progress report."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        self._wake = None
+
+    def stats(self) -> Dict[str, int]:
+        """Get the state of the runner.
+
+        Returns:
+            Dict[str, int]: The number of tasks running jobs.
+        """
+        return {"workers": self.workers, "tasks": len(self._tasks)}
+
+    async def _recover(self) -> int:
+        try:
+            return await run_in_threadpool(self._recover_once)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("The recovery of the jobs failed")
+            return 0
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if await self._recover():
+                self.notify()
+
+    async def _work(self) -> None:
+        wake = self._wake
+        while True:
+            await wake.wait()
+            wake.clear()
+            try:
+                while not self._stopping.is_set() and await run_in_threadpool(self._run_next):
+                    pass
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("The background jobs failed")
+
+    @staticmethod
+    def _recover_once() -> int:
+        with Session(get_engine()) as session:
+            return recover_jobs(session)
+
+    def _run_next(self) -> bool:
+        with Session(get_engine()) as session:
+            job = self._claim(session)
+            if job is None:
+                return False
+            self._execute(session, job)
+            return True
+
+    @staticmethod
+    def _claim(session: Session) -> Optional[Job]:
+        while True:
+            job_id = session.execute(
+                select(Job.id).where(Job.status == JobStatus.QUEUED).order_by(Job.id).limit(1)
+            ).scalar()
+            if job_id is None:
+                session.rollback()
+                return None
+            now = datetime.utcnow()
+            claimed = session.execute(
+                update(Job).where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+                .values(status=JobStatus.RUNNING, attempts=Job.attempts + 1,
+                        started_at=now, heartbeat_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if claimed:
+                job = session.get(Job, job_id)
+                session.expunge(job)
+                session.commit()
+                return job
+            # Claimed by another worker in between, try the next one.
+            session.rollback()
+
+    def _execute(self, session: Session, job: Job) -> None:
+        context = JobContext(session, job, self._stopping)
+        values: Dict[str, Any]
+        try:
+            result = JOB_HANDLERS[job.kind](context, json.loads(job.params))
+        except JobInterrupted:
+            session.rollback()
+            # The interrupted start does not count, the job did not fail.
+            values = {"status": JobStatus.QUEUED, "attempts": Job.attempts - 1}
+            metrics.increment("jobs.interrupted")
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            session.rollback()
+            logger.exception("The %s job %d failed", job.kind.value, job.id)
+            values = {"status": JobStatus.FAILED, "error": str(error) or type(error).__name__,
+                      "finished_at": datetime.utcnow()}
+            metrics.increment("jobs.failed")
+        else:
+            values = {"status": JobStatus.SUCCEEDED, "result": json.dumps(result),
+                      "result_path": context.result_path, "finished_at": datetime.utcnow()}
+            metrics.increment("jobs.succeeded")
+        if not update_claimed_job(session, job, values):
+            logger.warning("The %s job %d was queued again while it ran",
+                           job.kind.value, job.id)
+        session.commit()
+
+job_runner = JobRunner()
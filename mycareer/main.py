@@ -1,8 +1,38 @@
 """
 This module contains the FastAPI application and its endpoints.
+
+The database engines are created by the lifespan handler, which also starts the database
+threads when `DB_THREADS` is set, runs the archival of the goals when
+`ARCHIVE_INTERVAL_SECONDS` is set, the purge of the deleted goals when
+`PURGE_INTERVAL_SECONDS` is set and the due date reminders when `REMINDER_INTERVAL_SECONDS`
+is set, and starts the runner of the background jobs. When `LAZY_ROUTERS` is set,
+the routers and the database layer are also imported by the lifespan handler instead of
+at import time, which shortens the import of the module for platforms that measure it.
+The middleware measuring the allocations of the requests is only installed when
+`PROFILING_TOKEN` is set.
 """
+import asyncio
+import contextlib
+import importlib
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
-from mycareer.routers.v1_goals import router as v1_goals_router
+# These modules import SQLAlchemy and the database layer inside the functions using
+# them, so that with `LAZY_ROUTERS` the import of the application does not load them.
+from mycareer.deadline import DeadlineMiddleware
+from mycareer.metrics import compiled_cache_hit_rate, metrics
+from mycareer.profiling import AllocationMiddleware, profiling_token
+from mycareer.ratelimit import AdmissionControlMiddleware
+
+ROUTERS = [
+    "mycareer.routers.v1_goals",
+    "mycareer.routers.v1_analytics",
+    "mycareer.routers.v1_jobs",
+    "mycareer.routers.admin_profiling",
+]
+
+lazy_routers: bool = os.getenv("LAZY_ROUTERS", "").lower() in ("1", "true", "yes")
 
 tags_metadata = [
      {
@@ -13,10 +43,79 @@ tags_metadata = [
         "name": "goals",
         "description": "The endpoints to manages goals.",
     },
+    {
+        "name": "analytics",
+        "description": "The endpoints to analyze the status history of the goals.",
+    },
+    {
+        "name": "jobs",
+        "description": "The endpoints to run heavy goal operations in the background.",
+    },
+    {
+        "name": "profiling",
+        "description": "The admin endpoints to diagnose the memory of a worker.",
+    },
 ]
 
-app = FastAPI(openapi_tags=tags_metadata)
-app.include_router(v1_goals_router)
+def include_routers(application: FastAPI) -> None:
+    """Import the routers and include them in the application.
+
+    Args:
+        application (FastAPI): The application.
+    """
+    for module_name in ROUTERS:
+        application.include_router(importlib.import_module(module_name).router)
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    """Create the resources of the application on startup and release them on shutdown.
+
+    Args:
+        application (FastAPI): The application.
+    """
+    database = importlib.import_module("mycareer.database")
+    database.init_engines()
+    dbpool = importlib.import_module("mycareer.dbpool")
+    replica_router = database.get_replica_router()
+    for engine in [database.get_engine(), *(replica_router.engines if replica_router else [])]:
+        dbpool.db_executor.check_pool(engine)
+    dbpool.db_executor.start()
+    if lazy_routers and not application.state.routers_included:
+        include_routers(application)
+        application.state.routers_included = True
+
+    tasks, sink = [], None
+    archive = importlib.import_module("mycareer.archive")
+    if archive.archive_interval > 0:
+        tasks.append(asyncio.create_task(archive.run_archival()))
+    if archive.purge_interval > 0:
+        tasks.append(asyncio.create_task(archive.run_purge()))
+    reminders = importlib.import_module("mycareer.reminders")
+    if reminders.reminder_interval > 0:
+        sink = reminders.create_reminder_sink(reminders.reminder_sink_url)
+        tasks.append(asyncio.create_task(reminders.ReminderScheduler(sink).run()))
+    jobs = importlib.import_module("mycareer.jobs")
+    await jobs.job_runner.start()
+    yield
+    await jobs.job_runner.stop()
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    if sink is not None:
+        sink.close()
+    dbpool.db_executor.shutdown()
+    database.dispose_engines()
+
+app = FastAPI(openapi_tags=tags_metadata, lifespan=lifespan)
+if profiling_token:
+    app.add_middleware(AllocationMiddleware)
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.state.routers_included = False
+if not lazy_routers:
+    include_routers(app)
+    app.state.routers_included = True
 
 @app.get("/echo", tags=["server tools"])
 async def echo() -> dict:
@@ -30,3 +129,22 @@ async def echo() -> dict:
         dict: A dictionary containing a greeting message.
     """
     return {"message": "echo"}
+
+@app.get("/metrics", tags=["server tools"])
+async def get_metrics() -> dict:
+    """
+    ## Description
+
+    Endpoint that returns the in-process metrics of the worker.
+
+    ## Returns
+
+        dict: The counters by name, the hit rate of the compiled statement cache, the
+        state of the database threads and of the job runner.
+    """
+    return {
+        "counters": metrics.snapshot(),
+        "compiled_cache_hit_rate": compiled_cache_hit_rate(),
+        "db_pool": importlib.import_module("mycareer.dbpool").db_executor.stats(),
+        "jobs": importlib.import_module("mycareer.jobs").job_runner.stats(),
+    }
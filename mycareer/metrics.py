@@ -0,0 +1,74 @@
+"""
+metrics.py
+
+This module collects the in-process metrics of the application.
+
+Classes:
+    Metrics: A thread-safe registry of counters.
+
+Functions:
+    compiled_cache_hit_rate: Gets the share of statements served by the compiled statement cache.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict
+
+class Metrics:
+    """
+    ## Description
+
+    A thread-safe registry of counters.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (float): The increment. Defaults to 1.
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        """Get the value of a counter.
+
+        Args:
+            name (str): The name of the counter.
+
+        Returns:
+            float: The value of the counter, 0 if it was never incremented.
+        """
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get the values of all counters.
+
+        Returns:
+            Dict[str, float]: The values by counter name.
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        with self._lock:
+            self._counters.clear()
+
+metrics = Metrics()
+
+def compiled_cache_hit_rate() -> float:
+    """Get the share of statements whose compiled form came from the cache.
+
+    Returns:
+        float: The hit rate between 0 and 1, 0 if no statement ran.
+    """
+    hits = metrics.get("db.compiled_cache.hits")
+    total = hits + metrics.get("db.compiled_cache.misses")
+    return hits / total if total else 0.0
@@ -8,12 +8,23 @@ Classes:
     GoalPriority: An enumeration representing the possible priorities of a goal.
     Goal: A model representing a goal with attributes such as id, name, description, 
     status, priority, and due date.
+    GoalArchive: A model holding the archived goals.
+    GoalTombstone: A model recording the deletion of a goal for sync consumers.
+    GoalStatusEvent: A model recording a change of the status or priority of a goal.
+    ChangeSequence: A model holding the change sequence counters.
+    ReminderWatermark: A model holding the progress of the reminder scheduler.
+    JobKind: An enumeration representing the kinds of background jobs.
+    JobStatus: An enumeration representing the statuses of a background job.
+    Job: A model holding a background job and its progress.
 """
 
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 
+DEFAULT_TENANT_ID: str = "default"
+
 class GoalStatus(str, Enum):
     """
     ## Description
@@ -68,6 +79,8 @@ class Goal(SQLModel, table=True):
     ## Attributes
         
         id (int | None): The unique identifier for the goal. Defaults to None.
+
+        tenant_id (str): The tenant owning the goal. Defaults to `default`.
         
         name (str): The name of the goal.
         
@@ -78,10 +91,302 @@ class Goal(SQLModel, table=True):
         priority (GoalPriority): The priority of the goal. Defaults to GoalPriority.MEDIUM.
         
         due_date (datetime | None): The due date of the goal. Defaults to None.
+
+        parent_id (int | None): The ID of the parent goal, None for a root goal. Defaults to None.
+
+        change_seq (int): The change sequence of the last insert or update. Defaults to 0.
+
+        updated_at (datetime): The date of the last insert or update. Defaults to now.
+
+        deleted_at (datetime | None): The date of the deletion, None while the goal is live.
     """
+    # The indexes only hold the live goals, the queries filter on `deleted_at IS NULL`
+    # to use them. The deleted goals are only indexed for the purge.
+    # The indexes read by the requests lead with the tenant, so a tenant only reads
+    # its own entries. The ones read by the background jobs span every tenant.
+    # The IDs of the archived and purged goals are never given again: SQLite would
+    # otherwise reuse the ID of the last goal once it leaves the table.
+    __table_args__ = (
+        *(
+            Index(name, *columns, sqlite_where=text(where), postgresql_where=text(where))
+            for name, columns, where in (
+                ("ix_goal_tenant_id", ("tenant_id", "id"), "deleted_at IS NULL"),
+                ("ix_goal_name", ("tenant_id", "name"), "deleted_at IS NULL"),
+                ("ix_goal_status", ("tenant_id", "status"), "deleted_at IS NULL"),
+                ("ix_goal_priority", ("tenant_id", "priority"), "deleted_at IS NULL"),
+                ("ix_goal_change_seq", ("tenant_id", "change_seq"), "deleted_at IS NULL"),
+                ("ix_goal_parent_id", ("tenant_id", "parent_id"), "deleted_at IS NULL"),
+                ("ix_goal_due_date", ("due_date",), "deleted_at IS NULL"),
+                ("ix_goal_status_updated_at", ("status", "updated_at"), "deleted_at IS NULL"),
+                ("ix_goal_deleted_at", ("deleted_at",), "deleted_at IS NOT NULL"),
+            )
+        ),
+        {"sqlite_autoincrement": True},
+    )
+
     id: int | None = Field(default=None, primary_key=True)
-    name: str = Field(index=True)
+    tenant_id: str = Field(default=DEFAULT_TENANT_ID)
+    name: str
+    description: str | None = Field(default=None)
+    status: GoalStatus = Field(default=GoalStatus.TO_REFINE)
+    priority: GoalPriority = Field(default=GoalPriority.MEDIUM)
+    due_date: datetime | None = Field(default=None)
+    # Not a foreign key: the parent can be archived or purged before its sub-goals.
+    parent_id: int | None = Field(default=None)
+    change_seq: int = Field(default=0)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow, sa_column_kwargs={"default": datetime.utcnow}
+    )
+    deleted_at: datetime | None = Field(default=None)
+
+class GoalArchive(SQLModel, table=True):
+    """
+    ## Description
+
+    A model holding the goals moved out of the goal table by the archival job.
+
+    The table only has its primary key, tenant and parent indexes, so the archived
+    goals do not weigh on the indexes of the active goals.
+
+    ## Attributes
+
+        id (int): The identifier of the goal, kept from the goal table.
+
+        tenant_id (str): The tenant owning the goal.
+
+        name (str): The name of the goal.
+
+        description (str | None): A description of the goal. Defaults to None.
+
+        status (GoalStatus): The status of the goal.
+
+        priority (GoalPriority): The priority of the goal.
+
+        due_date (datetime | None): The due date of the goal. Defaults to None.
+
+        parent_id (int | None): The ID of the parent goal, None for a root goal. Defaults to None.
+
+        change_seq (int): The change sequence of the last insert or update.
+
+        updated_at (datetime): The date of the last insert or update.
+
+        archived_at (datetime): The date of the archival.
+    """
+    __table_args__ = (
+        Index("ix_goalarchive_tenant_id", "tenant_id", "id"),
+        Index("ix_goalarchive_parent_id", "tenant_id", "parent_id"),
+    )
+
+    id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    tenant_id: str = Field(default=DEFAULT_TENANT_ID)
+    name: str
     description: str | None = Field(default=None)
-    status: GoalStatus = Field(default=GoalStatus.TO_REFINE, index=True)
-    priority: GoalPriority = Field(default=GoalPriority.MEDIUM, index=True)
-    due_date: datetime | None = Field(default=None, index=True)
+    status: GoalStatus
+    priority: GoalPriority
+    due_date: datetime | None = Field(default=None)
+    parent_id: int | None = Field(default=None)
+    change_seq: int
+    updated_at: datetime
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+class GoalTombstone(SQLModel, table=True):
+    """
+    ## Description
+
+    A model recording the deletion of a goal, so that sync consumers can
+    remove it from their caches.
+
+    ## Attributes
+
+        id (int | None): The unique identifier for the tombstone. Defaults to None.
+
+        tenant_id (str): The tenant owning the deleted goal.
+
+        goal_id (int): The identifier of the deleted goal.
+
+        change_seq (int): The change sequence of the deletion, in the sequence of the tenant.
+
+        deleted_at (datetime): The date of the deletion.
+    """
+    __table_args__ = (Index("ix_goaltombstone_change_seq", "tenant_id", "change_seq"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    tenant_id: str = Field(default=DEFAULT_TENANT_ID)
+    goal_id: int = Field(index=True)
+    change_seq: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+class GoalStatusEvent(SQLModel, table=True):
+    """
+    ## Description
+
+    A model recording the status and priority of a goal after a change of either,
+    in an append-only log.
+
+    The rows only hold what the analytics read, and are kept when the goal is
+    archived, deleted or purged.
+
+    ## Attributes
+
+        id (int | None): The unique identifier for the event, increasing with time.
+        Defaults to None.
+
+        tenant_id (str): The tenant owning the goal.
+
+        goal_id (int): The identifier of the goal.
+
+        status (GoalStatus): The status of the goal after the change.
+
+        previous_status (GoalStatus | None): The status of the goal before the change,
+        None for the creation of the goal.
+
+        priority (GoalPriority): The priority of the goal after the change.
+
+        changed_at (datetime): The date of the change.
+    """
+    # The first index reads the history of the goals in order, for the time in
+    # each status. The second one reads the transitions to a status over a period.
+    __table_args__ = (
+        Index("ix_goalstatusevent_goal_id", "tenant_id", "goal_id", "id"),
+        Index("ix_goalstatusevent_status", "tenant_id", "status", "changed_at"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    tenant_id: str = Field(default=DEFAULT_TENANT_ID)
+    goal_id: int
+    status: GoalStatus
+    previous_status: GoalStatus | None = Field(default=None)
+    priority: GoalPriority
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ChangeSequence(SQLModel, table=True):
+    """
+    ## Description
+
+    A model holding a named, monotonically increasing change sequence counter.
+
+    ## Attributes
+
+        name (str): The name of the sequence.
+
+        value (int): The last value handed out. Defaults to 0.
+    """
+    name: str = Field(primary_key=True)
+    value: int = Field(default=0)
+
+class ReminderWatermark(SQLModel, table=True):
+    """
+    ## Description
+
+    A model holding how far the reminder scheduler has scanned the due dates.
+
+    ## Attributes
+
+        name (str): The name of the scan.
+
+        due_before (datetime): The due date before which the goals were reminded.
+    """
+    name: str = Field(primary_key=True)
+    due_before: datetime
+
+class JobKind(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the kinds of background jobs.
+
+    ## Attributes
+
+        EXPORT (str): Writes the goals of the tenant to a file.
+
+        IMPORT (str): Imports goals from an uploaded file.
+
+        ARCHIVE (str): Archives the closed goals of the tenant.
+    """
+    EXPORT = "export"
+    IMPORT = "import"
+    ARCHIVE = "archive"
+
+class JobStatus(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the statuses of a background job.
+
+    ## Attributes
+
+        QUEUED (str): The job waits for a worker.
+
+        RUNNING (str): The job runs on a worker.
+
+        SUCCEEDED (str): The job is done and its result can be downloaded.
+
+        FAILED (str): The job stopped on an error.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(SQLModel, table=True):
+    """
+    ## Description
+
+    A model holding a background job, its progress and its result.
+
+    ## Attributes
+
+        id (int | None): The unique identifier for the job. Defaults to None.
+
+        tenant_id (str): The tenant owning the job.
+
+        kind (JobKind): The kind of the job.
+
+        status (JobStatus): The status of the job. Defaults to JobStatus.QUEUED.
+
+        params (str): The parameters of the job, as a JSON object. Defaults to `{}`.
+
+        progress (int): The number of items done, and committed. Defaults to 0.
+
+        total (int | None): The number of items to do, None if unknown. Defaults to None.
+
+        result (str | None): The result of the job, or its partial result while it
+        runs, as a JSON object. Defaults to None.
+
+        result_path (str | None): The path of the file written by the job. Defaults to None.
+
+        error (str | None): The reason of the failure. Defaults to None.
+
+        attempts (int): The number of times a worker started the job. Defaults to 0.
+
+        created_at (datetime): The date of the submission. Defaults to now.
+
+        started_at (datetime | None): The date of the last start. Defaults to None.
+
+        heartbeat_at (datetime | None): The date of the last sign of life of the
+        worker running the job. Defaults to None.
+
+        finished_at (datetime | None): The date of the end. Defaults to None.
+    """
+    # The first index finds the next queued job and the jobs to recover or purge,
+    # the second one counts the pending jobs of a tenant.
+    __table_args__ = (
+        Index("ix_job_status", "status", "id"),
+        Index("ix_job_tenant_id", "tenant_id", "status"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    tenant_id: str = Field(default=DEFAULT_TENANT_ID)
+    kind: JobKind
+    status: JobStatus = Field(default=JobStatus.QUEUED)
+    params: str = Field(default="{}")
+    progress: int = Field(default=0)
+    total: int | None = Field(default=None)
+    result: str | None = Field(default=None)
+    result_path: str | None = Field(default=None)
+    error: str | None = Field(default=None)
+    attempts: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = Field(default=None)
+    heartbeat_at: datetime | None = Field(default=None)
+    finished_at: datetime | None = Field(default=None)
@@ -0,0 +1,392 @@
+"""
+profiling.py
+
+This module holds the memory diagnostics of a worker.
+
+The diagnostics are off unless `PROFILING_TOKEN` is set, and the admin endpoints
+then require it in the `X-Admin-Token` header. They tell where the memory of a worker
+goes:
+    - tracemalloc is started and stopped on demand, and each snapshot is compared
+      with the previous one to show the allocation sites that grew in between,
+    - while tracemalloc runs, the middleware measures the `/v1/` requests: the bytes
+      allocated at the peak and still held after the response, and the allocation
+      sites alive while the response body is sent, which hold the ORM objects, the
+      response models and the JSON buffer of the request,
+    - the statistics of the garbage collector, and the size of the identity maps of
+      the live database sessions.
+
+Without `PROFILING_TOKEN` the middleware is not installed, and tracemalloc cannot be
+started, so the requests pay nothing. With it, the requests pay a check of a flag
+until tracemalloc is started. The snapshots of a measured request walk the traces
+on the event loop, so only the first request of a route and then one in
+`PROFILING_SAMPLE_EVERY` are measured. The requests are measured one at a time, and
+the allocations of the requests running concurrently are counted with the measured
+one, so the figures of a route are best read from a single worker under its load alone.
+
+Classes:
+    AllocationTracker: The tracemalloc snapshots and the allocations by route of a worker.
+    AllocationMiddleware: The ASGI middleware measuring the allocations of the requests.
+
+Functions:
+    require_admin: Dependency checking the admin token of a request.
+    gc_stats: Gets the statistics of the garbage collector.
+    session_stats: Gets the size of the identity maps of the live database sessions.
+"""
+
+import gc
+import hmac
+import os
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Header, HTTPException
+from mycareer.routing import route_key
+
+ADMIN_TOKEN_HEADER: str = "X-Admin-Token"
+# The frames of tracemalloc itself and of the imports are not allocation sites of the application.
+IGNORED_FRAMES: Tuple[tracemalloc.Filter, ...] = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+profiling_token: str = os.getenv("PROFILING_TOKEN", "")
+profiling_max_sites: int = int(os.getenv("PROFILING_MAX_SITES", "50"))
+profiling_sample_every: int = int(os.getenv("PROFILING_SAMPLE_EVERY", "10"))
+
+def require_admin(
+    x_admin_token: Optional[str] = Header(default=None, alias=ADMIN_TOKEN_HEADER),
+) -> None:
+    """Check the admin token of a request.
+
+    Args:
+        x_admin_token (Optional[str]): The value of the `X-Admin-Token` header.
+
+    Raises:
+        HTTPException: 404 if the diagnostics are disabled, 403 if the token is wrong.
+    """
+    if not profiling_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), profiling_token.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def _site(trace: tracemalloc.Traceback, key_type: str) -> str:
+    if key_type == "traceback":
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in trace)
+    frame = trace[0]
+    return frame.filename if key_type == "filename" else f"{frame.filename}:{frame.lineno}"
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(IGNORED_FRAMES)
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _RouteAllocations:
+    __slots__ = ("requests", "measured", "peak", "retained", "sites")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.measured = 0
+        self.peak = 0
+        self.retained = 0
+        self.sites: Counter = Counter()
+
+class AllocationTracker:
+    """
+    ## Description
+
+    The tracemalloc snapshots and the allocations by route of a worker.
+
+    ## Args
+
+        max_sites (int): The number of allocation sites kept per route.
+
+        sample_every (int): Measure the first request of a route, then one request
+        in this many.
+    """
+
+    def __init__(
+        self, max_sites: int = profiling_max_sites, sample_every: int = profiling_sample_every,
+    ) -> None:
+        self.max_sites = max_sites
+        self.sample_every = max(sample_every, 1)
+        self.tracing = False
+        self._measuring = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._routes: Dict[str, _RouteAllocations] = {}
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1) -> Dict[str, Any]:
+        """Start tracemalloc and take the first snapshot, unless it is running.
+
+        Args:
+            frames (int): The number of frames kept per allocation. Defaults to 1.
+
+        Returns:
+            Dict[str, Any]: The status of tracemalloc.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            if self._snapshot is None:
+                self._snapshot = _take_snapshot()
+                self._routes.clear()
+            self.tracing = True
+        return self.status()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop tracemalloc and drop its snapshot and the allocations by route.
+
+        Returns:
+            Dict[str, Any]: The status of tracemalloc.
+        """
+        with self._lock:
+            self.tracing = False
+            tracemalloc.stop()
+            self._snapshot = None
+            self._routes.clear()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Get the status of tracemalloc.
+
+        Returns:
+            Dict[str, Any]: Whether it runs, the frames kept per allocation, the traced
+            bytes now and at the peak, the bytes used by tracemalloc itself and the
+            resident memory of the process, None where unknown.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "rss_bytes": _rss_bytes(),
+        }
+
+    def snapshot_diff(self, limit: int = 20, key_type: str = "lineno") -> List[Dict[str, Any]]:
+        """Take a snapshot and compare it with the previous one, which it replaces.
+
+        Args:
+            limit (int): The number of allocation sites returned. Defaults to 20.
+            key_type (str): `lineno`, `filename` or `traceback`. Defaults to `lineno`.
+
+        Returns:
+            List[Dict[str, Any]]: The sites whose size changed most, with their size and
+            count now and their difference.
+
+        Raises:
+            RuntimeError: If tracemalloc is not running.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._snapshot is None:
+                raise RuntimeError("tracemalloc is not running")
+            snapshot = _take_snapshot()
+            stats = snapshot.compare_to(self._snapshot, key_type)
+            self._snapshot = snapshot
+        return [
+            {
+                "site": _site(stat.traceback, key_type),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:limit]
+        ]
+
+    def routes(self, limit: int = 10) -> Dict[str, Dict[str, Any]]:
+        """Get the allocations of the measured requests by route.
+
+        Args:
+            limit (int): The number of allocation sites returned per route. Defaults to 10.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: By method and route, the requests seen and
+            measured, the largest peak and the bytes retained on average per measured
+            request, and the sites holding the most bytes on average while the response
+            is sent.
+        """
+        with self._lock:
+            return {
+                route: {
+                    "requests": allocations.requests,
+                    "measured": allocations.measured,
+                    "peak_bytes": allocations.peak,
+                    "retained_bytes": allocations.retained // max(allocations.measured, 1),
+                    "sites": [
+                        {"site": site, "size": size // max(allocations.measured, 1)}
+                        for site, size in allocations.sites.most_common(limit)
+                    ],
+                }
+                for route, allocations in self._routes.items()
+            }
+
+    def begin(self, route: str) -> Optional[Tuple[int, tracemalloc.Snapshot]]:
+        """Count a request, and start measuring it if it is sampled and no other one is measured.
+
+        Args:
+            route (str): The method and route of the request.
+
+        Returns:
+            Optional[Tuple[int, tracemalloc.Snapshot]]: The traced bytes and the
+            snapshot before the request, None if it is not measured.
+        """
+        with self._lock:
+            if not self.tracing:
+                return None
+            allocations = self._routes.setdefault(route, _RouteAllocations())
+            allocations.requests += 1
+            if self._measuring or (allocations.requests - 1) % self.sample_every:
+                return None
+            self._measuring = True
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], _take_snapshot()
+
+    def end(
+        self, route: str, before: Tuple[int, tracemalloc.Snapshot],
+        sending: Optional[tracemalloc.Snapshot],
+    ) -> None:
+        """Record the allocations of a measured request.
+
+        Args:
+            route (str): The method and route of the request.
+            before (Tuple[int, tracemalloc.Snapshot]): The result of `begin`.
+            sending (Optional[tracemalloc.Snapshot]): The snapshot taken while the
+            response body was sent, None if there was no body.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        traced, snapshot = before
+        sites = Counter()
+        if sending is not None:
+            for stat in sending.compare_to(snapshot, "lineno"):
+                if stat.size_diff > 0:
+                    sites[_site(stat.traceback, "lineno")] = stat.size_diff
+        with self._lock:
+            self._measuring = False
+            allocations = self._routes.get(route)
+            if not self.tracing or allocations is None:
+                return
+            allocations.measured += 1
+            allocations.peak = max(allocations.peak, peak - traced)
+            allocations.retained += current - traced
+            allocations.sites.update(sites)
+            if len(allocations.sites) > self.max_sites:
+                allocations.sites = Counter(dict(allocations.sites.most_common(self.max_sites)))
+
+allocation_tracker = AllocationTracker()
+
+class AllocationMiddleware:
+    """
+    ## Description
+
+    The ASGI middleware measuring the allocations of the requests whose path starts
+    with one of the measured prefixes, while tracemalloc is started by the tracker.
+
+    ## Args
+
+        app (ASGIApp): The wrapped application.
+
+        tracker (AllocationTracker): The tracker recording the allocations.
+
+        prefixes (Tuple[str, ...]): The path prefixes of the measured endpoints.
+    """
+
+    def __init__(
+        self, app, tracker: AllocationTracker = allocation_tracker,
+        prefixes: Tuple[str, ...] = ("/v1/",),
+    ) -> None:
+        self.app = app
+        self.tracker = tracker
+        self.prefixes = prefixes
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            not self.tracker.tracing
+            or scope["type"] != "http"
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {route_key(scope['path'])}"
+        before = self.tracker.begin(route)
+        if before is None:
+            await self.app(scope, receive, send)
+            return
+        sending: Optional[tracemalloc.Snapshot] = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal sending
+            if sending is None and message["type"] == "http.response.body":
+                sending = _take_snapshot()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.tracker.end(route, before, sending)
+
+def gc_stats() -> Dict[str, Any]:
+    """Get the statistics of the garbage collector.
+
+    Returns:
+        Dict[str, Any]: Whether it is enabled, its thresholds, the objects counted
+        since the last collection of each generation, the objects tracked by
+        generation, the collections by generation with the objects they collected,
+        the frozen objects and the uncollectable ones.
+    """
+    return {
+        "enabled": gc.isenabled(),
+        "thresholds": gc.get_threshold(),
+        "counts": gc.get_count(),
+        "objects": [len(gc.get_objects(generation)) for generation in range(3)],
+        "generations": gc.get_stats(),
+        "frozen": gc.get_freeze_count(),
+        "garbage": len(gc.garbage),
+    }
+
+def session_stats(limit: int = 10) -> Dict[str, Any]:
+    """Get the size of the identity maps of the live database sessions.
+
+    The sessions are found among the objects tracked by the garbage collector, so
+    the call walks the whole heap and is meant for diagnostics only.
+
+    Args:
+        limit (int): The number of sessions returned, the largest first. Defaults to 10.
+
+    Returns:
+        Dict[str, Any]: The number of live sessions, the objects of all their identity
+        maps, and the largest sessions with their objects by class.
+    """
+    from sqlalchemy.orm import Session  # pylint: disable=import-outside-toplevel
+    sessions = [obj for obj in gc.get_objects() if isinstance(obj, Session)]
+    sizes = sorted(
+        ((len(session.identity_map), session) for session in sessions),
+        key=lambda item: item[0], reverse=True,
+    )
+    return {
+        "sessions": len(sessions),
+        "objects": sum(size for size, _ in sizes),
+        "largest": [
+            {
+                "identity_map": size,
+                "new": len(session.new),
+                "in_transaction": session.in_transaction(),
+                "classes": dict(Counter(
+                    type(obj).__name__ for obj in session.identity_map.values()
+                )),
+            }
+            for size, session in sizes[:limit]
+        ],
+    }
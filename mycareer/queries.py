@@ -0,0 +1,400 @@
+"""
+queries.py
+
+This module defines the hot statements on goals once, as lambda statements.
+
+The statements on the goal table only read the live goals: their `deleted_at IS NULL`
+term lets the database use the partial indexes, which only hold the live goals.
+
+The statements serving the requests are scoped to a tenant, and their `tenant_id`
+term is the leading column of the indexes they use.
+
+A lambda statement is cached by the code location of its lambda, so the statement
+is neither rebuilt nor recompiled by the later calls: only the values of the
+closure variables are extracted and sent as bound parameters.
+
+Functions:
+    select_goals: Selects all goals of a tenant.
+    select_goal_rows: Selects the columns of all goals of a tenant, for the Core read path.
+    select_goal_by_id: Selects a goal of a tenant by ID.
+    select_goal_rows_by_ids: Selects the columns of the goals of a tenant with the given IDs.
+    select_goal_rows_with_archive: Selects the columns of all goals of a tenant, archived
+    ones included.
+    select_archived_goal_by_id: Selects an archived goal of a tenant by ID.
+    select_archived_goal_rows_by_ids: Selects the columns of the archived goals of a tenant
+    with the given IDs.
+    select_existing_goal_ids: Selects the IDs of the live or archived goals of a tenant
+    among the given IDs.
+    select_goal_children: Selects the sub-goals of a goal of a tenant.
+    select_goal_subtree_rows: Selects the columns of a goal of a tenant and of all its sub-goals.
+    select_goal_progress: Selects the completion counts of the subtree of a goal of a tenant.
+    select_goal_ancestor_ids: Selects the IDs of a goal of a tenant and of its ancestors.
+    select_goals_due_between: Selects a page of the open goals of every tenant due in a
+    date range.
+    select_goals_changed_since: Selects the goals of a tenant changed after a change sequence
+    value.
+    select_tombstones_since: Selects the tombstones of a tenant recorded after a change
+    sequence value.
+"""
+
+from datetime import datetime
+from typing import List
+from sqlalchemy import (
+    CTE, Integer, ScalarSelect, Select, StatementLambdaElement, and_, bindparam, case, func,
+    lambda_stmt, literal, or_, select, union_all
+)
+from mycareer.models import Goal, GoalArchive, GoalStatus, GoalTombstone
+
+CLOSED_STATUSES = (GoalStatus.COMPLETED, GoalStatus.ABANDONED)
+MAX_TREE_DEPTH: int = 100
+
+def select_goals(tenant_id: str) -> StatementLambdaElement:
+    """Select all goals of a tenant, ordered by ID.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(Goal)
+        .where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None))
+        .order_by(Goal.id)
+    )
+
+def select_goal_rows(tenant_id: str) -> StatementLambdaElement:
+    """Select the columns of all goals of a tenant, for the Core read path.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+
+    Returns:
+        StatementLambdaElement: The statement, returning `id`, `name`, `description`,
+        `status`, `priority`, `due_date` and `parent_id` ordered by ID.
+    """
+    return lambda_stmt(
+        lambda: select(
+            Goal.id, Goal.name, Goal.description, Goal.status, Goal.priority, Goal.due_date,
+            Goal.parent_id,
+        ).where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None)).order_by(Goal.id)
+    )
+
+def select_goal_by_id(tenant_id: str, goal_id: int) -> StatementLambdaElement:
+    """Select a goal of a tenant by ID.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the goal.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(Goal).where(
+            Goal.id == goal_id, Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None)
+        )
+    )
+
+def select_goal_rows_by_ids(tenant_id: str, goal_ids: List[int]) -> StatementLambdaElement:
+    """Select the columns of the goals of a tenant with the given IDs, in a single `IN` query.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_ids (List[int]): The IDs of the goals.
+
+    Returns:
+        StatementLambdaElement: The statement, returning the columns of `select_goal_rows`.
+    """
+    return lambda_stmt(
+        lambda: select(
+            Goal.id, Goal.name, Goal.description, Goal.status, Goal.priority, Goal.due_date,
+            Goal.parent_id,
+        ).where(Goal.id.in_(goal_ids), Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None))
+    )
+
+def select_goal_rows_with_archive(tenant_id: str) -> StatementLambdaElement:
+    """Select the columns of all goals of a tenant, archived ones included, for the Core
+    read path.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+
+    Returns:
+        StatementLambdaElement: The statement, returning the columns of `select_goal_rows`
+        ordered by ID.
+    """
+    return lambda_stmt(
+        lambda: union_all(
+            select(
+                Goal.id, Goal.name, Goal.description, Goal.status, Goal.priority, Goal.due_date,
+                Goal.parent_id,
+            ).where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None)),
+            select(
+                GoalArchive.id, GoalArchive.name, GoalArchive.description, GoalArchive.status,
+                GoalArchive.priority, GoalArchive.due_date, GoalArchive.parent_id,
+            ).where(GoalArchive.tenant_id == tenant_id),
+        ).order_by("id")
+    )
+
+def select_archived_goal_by_id(tenant_id: str, goal_id: int) -> StatementLambdaElement:
+    """Select an archived goal of a tenant by ID.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the goal.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(GoalArchive).where(
+            GoalArchive.id == goal_id, GoalArchive.tenant_id == tenant_id
+        )
+    )
+
+def select_archived_goal_rows_by_ids(
+    tenant_id: str, goal_ids: List[int]
+) -> StatementLambdaElement:
+    """Select the columns of the archived goals of a tenant with the given IDs, in a single
+    `IN` query.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_ids (List[int]): The IDs of the goals.
+
+    Returns:
+        StatementLambdaElement: The statement, returning the columns of `select_goal_rows`.
+    """
+    return lambda_stmt(
+        lambda: select(
+            GoalArchive.id, GoalArchive.name, GoalArchive.description, GoalArchive.status,
+            GoalArchive.priority, GoalArchive.due_date, GoalArchive.parent_id,
+        ).where(GoalArchive.id.in_(goal_ids), GoalArchive.tenant_id == tenant_id)
+    )
+
+def select_existing_goal_ids(tenant_id: str, goal_ids: List[int]) -> StatementLambdaElement:
+    """Select the IDs of the live or archived goals of a tenant among the given IDs, in a
+    single query.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_ids (List[int]): The IDs of the goals.
+
+    Returns:
+        StatementLambdaElement: The statement, returning the IDs found.
+    """
+    return lambda_stmt(
+        lambda: union_all(
+            select(Goal.id).where(
+                Goal.id.in_(goal_ids), Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None)
+            ),
+            select(GoalArchive.id).where(
+                GoalArchive.id.in_(goal_ids), GoalArchive.tenant_id == tenant_id
+            ),
+        )
+    )
+
+def select_goal_children(tenant_id: str, goal_id: int) -> StatementLambdaElement:
+    """Select the sub-goals of a goal of a tenant, ordered by ID.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the parent goal.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(Goal)
+        .where(Goal.tenant_id == tenant_id, Goal.parent_id == goal_id, Goal.deleted_at.is_(None))
+        .order_by(Goal.id)
+    )
+
+def _subtree_cte() -> CTE:
+    tenant_id = bindparam("tenant_id")
+    columns = (
+        Goal.id, Goal.name, Goal.description, Goal.status, Goal.priority, Goal.due_date,
+        Goal.parent_id,
+    )
+    subtree = (
+        select(*columns, literal(0, Integer).label("depth"))
+        .where(Goal.id == bindparam("goal_id"), Goal.tenant_id == tenant_id,
+               Goal.deleted_at.is_(None))
+        .cte("subtree", recursive=True)
+    )
+    return subtree.union_all(
+        select(*columns, subtree.c.depth + 1)
+        .join(subtree, Goal.parent_id == subtree.c.id)
+        .where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None),
+               subtree.c.depth < MAX_TREE_DEPTH)
+    )
+
+def _build_subtree_rows() -> Select:
+    subtree = _subtree_cte()
+    return select(subtree).order_by(subtree.c.depth, subtree.c.id)
+
+def _build_progress() -> Select:
+    subtree = _subtree_cte()
+    descendant = subtree.c.depth > 0
+    completed = subtree.c.status == GoalStatus.COMPLETED
+
+    # The archived sub-goals are completed or abandoned, they are counted by a
+    # search of the parent index of the archive for every goal of the subtree.
+    def archived_children(*criteria) -> ScalarSelect:
+        return select(func.count()).where(
+            GoalArchive.tenant_id == bindparam("tenant_id"),
+            GoalArchive.parent_id == subtree.c.id,
+            *criteria,
+        ).scalar_subquery()
+
+    return select(
+        func.count().label("nodes"),
+        func.count(case((and_(subtree.c.depth == 0, completed), 1))).label("root_completed"),
+        (
+            func.count(case((descendant, 1)))
+            + func.coalesce(func.sum(archived_children()), 0)
+        ).label("descendants"),
+        (
+            func.count(case((and_(descendant, completed), 1)))
+            + func.coalesce(
+                func.sum(archived_children(GoalArchive.status == GoalStatus.COMPLETED)), 0
+            )
+        ).label("completed"),
+    ).select_from(subtree)
+
+def _build_ancestor_ids() -> Select:
+    tenant_id = bindparam("tenant_id")
+    ancestors = (
+        select(Goal.id, Goal.parent_id, literal(0, Integer).label("depth"))
+        .where(Goal.id == bindparam("goal_id"), Goal.tenant_id == tenant_id,
+               Goal.deleted_at.is_(None))
+        .cte("ancestors", recursive=True)
+    )
+    ancestors = ancestors.union_all(
+        select(Goal.id, Goal.parent_id, ancestors.c.depth + 1)
+        .join(ancestors, Goal.id == ancestors.c.parent_id)
+        .where(Goal.tenant_id == tenant_id, Goal.deleted_at.is_(None),
+               ancestors.c.depth < MAX_TREE_DEPTH)
+    )
+    return select(ancestors.c.id)
+
+# The recursive statements are built once with named parameters: `params` copies
+# them with the values, keeping the cache key of their compiled form.
+_SUBTREE_ROWS = _build_subtree_rows()
+_PROGRESS = _build_progress()
+_ANCESTOR_IDS = _build_ancestor_ids()
+
+def select_goal_subtree_rows(tenant_id: str, goal_id: int) -> Select:
+    """Select the columns of a goal of a tenant and of all its sub-goals, in one query.
+
+    The sub-goals are found by a recursive CTE walking the `parent_id` index,
+    level by level, up to `MAX_TREE_DEPTH` levels below the goal.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the root goal.
+
+    Returns:
+        Select: The statement, returning the columns of `select_goal_rows` and the
+        `depth` below the root, ordered by depth and ID. No row if the goal does not exist.
+    """
+    return _SUBTREE_ROWS.params(tenant_id=tenant_id, goal_id=goal_id)
+
+def select_goal_progress(tenant_id: str, goal_id: int) -> Select:
+    """Select the completion counts of the subtree of a goal of a tenant, in one query.
+
+    The archived sub-goals are counted, but not their own sub-goals.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the root goal.
+
+    Returns:
+        Select: The statement, returning one row with `nodes`, 0 if the goal does not
+        exist, `root_completed`, 1 if the goal is completed, `descendants` and the
+        `completed` descendants.
+    """
+    return _PROGRESS.params(tenant_id=tenant_id, goal_id=goal_id)
+
+def select_goal_ancestor_ids(tenant_id: str, goal_id: int) -> Select:
+    """Select the IDs of a goal of a tenant and of its ancestors, in one query.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the goal.
+
+    Returns:
+        Select: The statement, returning `id`, no row if the goal does not exist.
+    """
+    return _ANCESTOR_IDS.params(tenant_id=tenant_id, goal_id=goal_id)
+
+def select_goals_due_between(
+    after_due: datetime, after_id: int, due_before: datetime, limit: int
+) -> StatementLambdaElement:
+    """Select a page of the open goals due in a date range, in due date and ID order.
+
+    The pages are read by keyset on `(due_date, id)`, so every page is a range
+    scan of the `due_date` index starting where the previous one stopped. The
+    scan spans every tenant, for the reminder scheduler.
+
+    Args:
+        after_due (datetime): The due date of the last goal of the previous page,
+        or the start of the range, included when `after_id` is 0.
+        after_id (int): The ID of the last goal of the previous page, 0 for the first page.
+        due_before (datetime): The end of the range, excluded.
+        limit (int): The maximum number of goals.
+
+    Returns:
+        StatementLambdaElement: The statement, returning `id`, `tenant_id`, `name`,
+        `status`, `priority` and `due_date`.
+    """
+    return lambda_stmt(
+        lambda: select(
+            Goal.id, Goal.tenant_id, Goal.name, Goal.status, Goal.priority, Goal.due_date
+        )
+        .where(
+            or_(Goal.due_date > after_due, and_(Goal.due_date == after_due, Goal.id > after_id)),
+            Goal.due_date < due_before,
+            Goal.status.not_in(CLOSED_STATUSES),
+            Goal.deleted_at.is_(None),
+        )
+        .order_by(Goal.due_date, Goal.id)
+        .limit(limit)
+    )
+
+def select_goals_changed_since(tenant_id: str, since: int, limit: int) -> StatementLambdaElement:
+    """Select the goals of a tenant changed after a change sequence value, in change order.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        since (int): The change sequence value.
+        limit (int): The maximum number of goals.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(Goal)
+        .where(Goal.tenant_id == tenant_id, Goal.change_seq > since, Goal.deleted_at.is_(None))
+        .order_by(Goal.change_seq)
+        .limit(limit)
+    )
+
+def select_tombstones_since(tenant_id: str, since: int, limit: int) -> StatementLambdaElement:
+    """Select the tombstones of a tenant recorded after a change sequence value, in change order.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        since (int): The change sequence value.
+        limit (int): The maximum number of tombstones.
+
+    Returns:
+        StatementLambdaElement: The statement.
+    """
+    return lambda_stmt(
+        lambda: select(GoalTombstone)
+        .where(GoalTombstone.tenant_id == tenant_id, GoalTombstone.change_seq > since)
+        .order_by(GoalTombstone.change_seq)
+        .limit(limit)
+    )
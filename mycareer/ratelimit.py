@@ -0,0 +1,225 @@
+"""
+ratelimit.py
+
+This module protects the database from clients sending too many requests.
+
+Two limits are applied by an ASGI middleware to the requests of the API endpoints:
+    - a token bucket per client and route, answering 429 when it is empty,
+    - a cap on the requests in flight, defaulting to the size of the connection pool,
+      answering 503 instead of queueing without limit. The imports and the job
+      transfers, which last minutes, have their own cap so that they do not take the
+      slots of the short requests.
+
+Both answers carry a `Retry-After` header. The state is kept in process, every
+operation is O(1) and the bucket table is bounded with LRU eviction.
+
+Classes:
+    RateLimiter: Token buckets per key in a bounded table.
+    ConcurrencyLimiter: A cap on the number of requests in flight.
+    AdmissionControlMiddleware: The ASGI middleware applying both limits.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+from mycareer.metrics import metrics
+from mycareer.routing import TRANSFER_ROUTES, route_key
+
+rate_limit_rps: float = float(os.getenv("RATE_LIMIT_RPS", "0"))
+rate_limit_burst: float = float(os.getenv("RATE_LIMIT_BURST", "0"))
+rate_limit_max_keys: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+admission_max_in_flight: Optional[int] = (
+    int(os.getenv("ADMISSION_MAX_IN_FLIGHT")) if os.getenv("ADMISSION_MAX_IN_FLIGHT") else None
+)
+admission_max_transfers: int = int(os.getenv("ADMISSION_MAX_TRANSFERS", "2"))
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+class RateLimiter:
+    """
+    ## Description
+
+    Token buckets per key in a bounded table.
+
+    ## Args
+
+        rate (float): The number of tokens added per second.
+
+        burst (float): The capacity of a bucket, at least one token so that a request
+        can pass.
+
+        max_keys (int): The maximum number of buckets, the least recently used is evicted.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10_000) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, now: Optional[float] = None) -> float:
+        """Take a token from the bucket of a key.
+
+        Args:
+            key (str): The key of the bucket.
+            now (Optional[float]): The current monotonic time, for tests.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the delay in seconds until one is available.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.burst, now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                return 0.0
+            return (1 - bucket.tokens) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+class ConcurrencyLimiter:
+    """
+    ## Description
+
+    A cap on the number of requests in flight.
+
+    ## Args
+
+        limit (int): The maximum number of requests in flight.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Admit a request if the cap is not reached.
+
+        Returns:
+            bool: Whether the request is admitted.
+        """
+        with self._lock:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Release the slot of a finished request."""
+        with self._lock:
+            self.in_flight -= 1
+
+def _pool_size() -> int:
+    from mycareer.database import get_engine  # pylint: disable=import-outside-toplevel
+    size = getattr(get_engine().pool, "size", None)
+    return size() if callable(size) else 1
+
+class AdmissionControlMiddleware:
+    """
+    ## Description
+
+    The ASGI middleware applying the rate limit and the concurrency cap to the
+    requests whose path starts with one of the protected prefixes.
+
+    ## Args
+
+        app (ASGIApp): The wrapped application.
+
+        rate (float): The requests per second allowed per client and route, 0 to disable.
+
+        burst (float): The burst allowed per client and route, 0 for twice the rate.
+
+        max_keys (int): The maximum number of buckets.
+
+        max_in_flight (int | None): The maximum number of requests in flight, None for
+        the size of the connection pool, 0 to disable. The transfers are not counted.
+
+        max_transfers (int): The maximum number of transfers in flight, 0 to disable.
+
+        prefixes (Tuple[str, ...]): The path prefixes of the protected endpoints.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        app,
+        rate: float = rate_limit_rps,
+        burst: float = rate_limit_burst,
+        max_keys: int = rate_limit_max_keys,
+        max_in_flight: Optional[int] = admission_max_in_flight,
+        max_transfers: int = admission_max_transfers,
+        prefixes: Tuple[str, ...] = ("/v1/",),
+    ) -> None:
+        self.app = app
+        self.prefixes = prefixes
+        self.rate_limiter = RateLimiter(rate, burst or 2 * rate, max_keys) if rate > 0 else None
+        self.transfer_limiter = ConcurrencyLimiter(max_transfers) if max_transfers else None
+        self._max_in_flight = max_in_flight
+        self._concurrency_limiter: Optional[ConcurrencyLimiter] = None
+
+    @property
+    def concurrency_limiter(self) -> Optional[ConcurrencyLimiter]:
+        """The concurrency limiter, sized on first use."""
+        if self._concurrency_limiter is None and self._max_in_flight != 0:
+            limit = self._max_in_flight if self._max_in_flight is not None else _pool_size()
+            self._concurrency_limiter = ConcurrencyLimiter(limit)
+        return self._concurrency_limiter
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {route_key(scope['path'])}"
+        if self.rate_limiter is not None:
+            client = scope.get("client") or ("unknown", 0)
+            retry_after = self.rate_limiter.acquire(f"{client[0]} {route}")
+            if retry_after:
+                metrics.increment("admission.rate_limited")
+                await _reject(send, 429, "Too many requests", retry_after)
+                return
+
+        if route in TRANSFER_ROUTES:
+            limiter = self.transfer_limiter
+        else:
+            limiter = self.concurrency_limiter
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        if not limiter.try_acquire():
+            metrics.increment("admission.overloaded")
+            await _reject(send, 503, "Server overloaded", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+async def _reject(send: Callable, status: int, detail: str, retry_after: float) -> None:
+    body = f'{{"detail":"{detail}"}}'.encode()
+    headers: List[Tuple[bytes, bytes]] = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
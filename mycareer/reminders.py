@@ -0,0 +1,254 @@
+"""
+reminders.py
+
+This module sends reminders for the goals approaching their due date.
+
+A scheduler started by the application lifespan ticks every
+`REMINDER_INTERVAL_SECONDS`. The reminder window ends `REMINDER_WINDOW_HOURS`
+after the tick, and a persistent watermark records where the previous tick
+stopped. Each tick only reads the open goals due between the watermark and the
+end of the window, the ones that entered the window since the previous tick,
+with range scans of the `due_date` index, and emits them in batches to a sink.
+The scan spans every tenant, the reminders carry the tenant of their goal.
+
+The range is claimed by moving the watermark in the same transaction as the
+scan, and the transaction is committed once the sink accepted every batch, so:
+    - the workers of a deployment never remind the same range twice,
+    - a range whose emission failed is scanned again by the next tick, and the
+      reminders already emitted for it are sent again (at least once delivery).
+
+A goal whose due date is moved into a range already scanned is not reminded.
+
+Classes:
+    ReminderSink: The base class of the reminder sinks.
+    LogReminderSink: A sink writing the reminders to the log.
+    FileReminderSink: A sink appending the reminders to a JSON lines file.
+    ReminderScheduler: Finds the goals entering the reminder window and emits their reminders.
+
+Functions:
+    create_reminder_sink: Creates the sink matching a URL.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from mycareer.database import get_engine
+from mycareer.metrics import metrics
+from mycareer.models import ReminderWatermark
+from mycareer.queries import select_goals_due_between
+from mycareer.schemas import GoalReminder
+
+DUE_DATE_SCAN: str = "due_date"
+
+reminder_interval: float = float(os.getenv("REMINDER_INTERVAL_SECONDS", "0"))
+reminder_window_hours: float = float(os.getenv("REMINDER_WINDOW_HOURS", "24"))
+reminder_batch_size: int = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+reminder_sink_url: str = os.getenv("REMINDER_SINK", "log")
+
+logger = logging.getLogger(__name__)
+
+class ReminderSink(ABC):
+    """
+    ## Description
+
+    The base class of the reminder sinks. Subclasses implement `emit`.
+    """
+
+    @abstractmethod
+    def emit(self, reminders: List[GoalReminder]) -> None:
+        """Emit a batch of reminders.
+
+        Args:
+            reminders (List[GoalReminder]): The reminders.
+
+        Raises:
+            Exception: If the batch was not accepted, the range is then scanned again.
+        """
+
+    def close(self) -> None:
+        """Release the resources held by the sink."""
+
+class LogReminderSink(ReminderSink):
+    """
+    ## Description
+
+    A sink writing one log record per reminder.
+
+    ## Args
+
+        log (logging.Logger): The logger. Defaults to the logger of the module.
+    """
+
+    def __init__(self, log: Optional[logging.Logger] = None) -> None:
+        self.log = log or logger
+
+    def emit(self, reminders: List[GoalReminder]) -> None:
+        for reminder in reminders:
+            self.log.info("Goal %d \"%s\" of tenant %s is due on %s", reminder.goal_id,
+                          reminder.name, reminder.tenant_id, reminder.due_date.isoformat())
+
+class FileReminderSink(ReminderSink):
+    """
+    ## Description
+
+    A sink appending the reminders to a JSON lines file, one object per reminder.
+
+    ## Args
+
+        path (str): The path of the file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, reminders: List[GoalReminder]) -> None:
+        data = "".join(reminder.model_dump_json() + "\n" for reminder in reminders)
+        with self._lock, open(self.path, "a", encoding="utf-8") as stream:
+            stream.write(data)
+            stream.flush()
+            os.fsync(stream.fileno())
+
+def create_reminder_sink(url: str) -> ReminderSink:
+    """Create the sink matching a URL.
+
+    Args:
+        url (str): `log` for a log sink, or `file://<path>` for a JSON lines file sink.
+
+    Returns:
+        ReminderSink: The reminder sink.
+
+    Raises:
+        ValueError: If the URL scheme is not supported.
+    """
+    if not url or url == "log":
+        return LogReminderSink()
+    if url.startswith("file://"):
+        return FileReminderSink(url[len("file://"):])
+    raise ValueError(f"Unsupported reminder sink URL: {url}")
+
+class ReminderScheduler:
+    """
+    ## Description
+
+    Finds the open goals entering the reminder window and emits their reminders.
+
+    ## Args
+
+        sink (ReminderSink): The sink receiving the reminders.
+
+        window (timedelta): How long before their due date the goals are reminded.
+
+        batch_size (int): The number of goals read and emitted at once.
+    """
+
+    def __init__(
+        self,
+        sink: ReminderSink,
+        window: timedelta = timedelta(hours=reminder_window_hours),
+        batch_size: int = reminder_batch_size,
+    ) -> None:
+        self.sink = sink
+        self.window = window
+        self.batch_size = batch_size
+
+    def tick(self, session: Session, now: Optional[datetime] = None) -> int:
+        """Emit the reminders of the goals entering the window since the previous tick.
+
+        The first tick of a database starts the range at `now`, the goals
+        already overdue are not reminded.
+
+        Args:
+            session (Session): The database session.
+            now (Optional[datetime]): The current UTC date, for tests.
+
+        Returns:
+            int: The number of reminders emitted, 0 if another worker claimed the range.
+        """
+        now = now or datetime.utcnow()
+        due_before = now + self.window
+        due_after = self._claim(session, now, due_before)
+        if due_after is None:
+            return 0
+
+        emitted = 0
+        after_due, after_id = due_after, 0
+        try:
+            while True:
+                rows = session.execute(
+                    select_goals_due_between(after_due, after_id, due_before, self.batch_size)
+                ).all()
+                if not rows:
+                    break
+                self.sink.emit([
+                    GoalReminder(goal_id=goal_id, tenant_id=tenant_id, name=name, status=status,
+                                 priority=priority, due_date=due_date)
+                    for goal_id, tenant_id, name, status, priority, due_date in rows
+                ])
+                emitted += len(rows)
+                after_id, after_due = rows[-1].id, rows[-1].due_date
+        except Exception:
+            session.rollback()
+            raise
+        session.commit()
+        metrics.increment("reminders.emitted", emitted)
+        return emitted
+
+    @staticmethod
+    def _claim(session: Session, now: datetime, due_before: datetime) -> Optional[datetime]:
+        watermark = session.get(ReminderWatermark, DUE_DATE_SCAN)
+        if watermark is None:
+            session.add(ReminderWatermark(name=DUE_DATE_SCAN, due_before=due_before))
+            try:
+                session.flush()
+            except IntegrityError:
+                session.rollback()
+                return None
+            return now
+
+        due_after = watermark.due_before
+        if due_after >= due_before:
+            session.rollback()
+            return None
+        claimed = session.execute(
+            update(ReminderWatermark)
+            .where(ReminderWatermark.name == DUE_DATE_SCAN,
+                   ReminderWatermark.due_before == due_after)
+            .values(due_before=due_before)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            session.rollback()
+            return None
+        return due_after
+
+    async def run(self, interval: float = reminder_interval) -> None:
+        """Tick periodically, until cancelled.
+
+        The ticks run in a worker thread, so the event loop keeps serving requests.
+        A failed tick is logged and its range is scanned again by the next one.
+
+        Args:
+            interval (float): The delay in seconds between two ticks.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                emitted = await run_in_threadpool(self._tick_once)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("The goal reminders failed")
+            else:
+                if emitted:
+                    logger.info("Emitted %d goal reminders", emitted)
+
+    def _tick_once(self) -> int:
+        with Session(get_engine()) as session:
+            return self.tick(session)
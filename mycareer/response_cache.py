@@ -0,0 +1,240 @@
+"""
+response_cache.py
+
+This module provides the cache of the goal list responses.
+
+Identical list requests are served from the cache of the worker. The bodies are
+kept gzip compressed, keyed by the tenant and the parsed query parameters, in
+an LRU bounded by their total size. Every write to the goals bumps the version
+of the goal table through the invalidation bus, which drops the cached bodies
+in every worker.
+
+The responses carry a weak `ETag`, answered with 304 when it matches
+`If-None-Match`, and a `Cache-Control` header so that the proxies can keep them
+too. They vary on `Accept-Encoding` and on the tenant header.
+
+The cache is disabled unless `RESPONSE_CACHE_BYTES` is set.
+
+Classes:
+    CachedResponse: A compressed response body with its entity tag.
+    ResponseCache: A size-bounded LRU cache of compressed response bodies.
+
+Functions:
+    cache_key: Gets the cache key of a request from its parsed parameters.
+    accepts_gzip: Gets whether an `Accept-Encoding` header accepts gzip.
+    cached_response: Serves a response from the cache, rendering it on a miss.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from mycareer.invalidation import invalidation_bus
+from mycareer.metrics import metrics
+from mycareer.tenancy import TENANT_HEADER
+
+COMPRESS_LEVEL: int = 6
+
+response_cache_bytes: int = int(os.getenv("RESPONSE_CACHE_BYTES", "0"))
+response_cache_max_age: int = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "0"))
+
+class CachedResponse:
+    """
+    ## Description
+
+    A gzip compressed response body with its entity tag.
+
+    ## Args
+
+        body (bytes): The uncompressed body.
+    """
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes) -> None:
+        self.body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        # Weak, as the compressed and uncompressed bodies share the tag.
+        self.etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an `If-None-Match` header against the entity tag.
+
+        Args:
+            if_none_match (Optional[str]): The value of the header.
+
+        Returns:
+            bool: Whether the client already has the body.
+        """
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag.removeprefix("W/") in tags
+
+class ResponseCache:
+    """
+    ## Description
+
+    A size-bounded LRU cache of compressed response bodies, dropped when the
+    version of the goal table changes.
+
+    ## Args
+
+        max_bytes (int): The maximum total size of the compressed bodies, 0 to disable the cache.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache keeps entries."""
+        return self.max_bytes > 0
+
+    @property
+    def version(self) -> int:
+        """The version of the goal table, bumped by every write."""
+        return self._version
+
+    @property
+    def size(self) -> int:
+        """The total size of the compressed bodies."""
+        return self._size
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Get a cached response.
+
+        Args:
+            key (Hashable): The key of the request.
+
+        Returns:
+            Optional[CachedResponse]: The response, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, version: int, body: bytes) -> CachedResponse:
+        """Compress and cache a body, evicting the least recently used ones when full.
+
+        The body is not kept when the version changed while it was rendered, or
+        when it is larger than the cache.
+
+        Args:
+            key (Hashable): The key of the request.
+            version (int): The version of the goal table read before rendering the body.
+            body (bytes): The uncompressed body.
+
+        Returns:
+            CachedResponse: The compressed response.
+        """
+        entry = CachedResponse(body)
+        if not self.enabled or len(entry.body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if version != self._version:
+                return entry
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+        return entry
+
+    def invalidate(self, _goal_id: Optional[int] = None) -> None:
+        """Bump the version of the goal table and drop every cached response.
+
+        Args:
+            _goal_id (Optional[int]): The ID of the changed goal, unused: any
+            write can change any list.
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def cache_key(tenant_id: str, **params: Any) -> Tuple[Hashable, ...]:
+    """Get the cache key of a request from its parsed parameters.
+
+    The parameters are the values validated by the endpoint, so the order of the
+    query string, the unknown parameters and the spellings of a value, like
+    `true` and `1`, do not split the cache.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+        **params (Any): The parsed parameters of the endpoint.
+
+    Returns:
+        Tuple[Hashable, ...]: The key.
+    """
+    return (tenant_id, *sorted(params.items()))
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Get whether an `Accept-Encoding` header accepts gzip.
+
+    Args:
+        accept_encoding (Optional[str]): The value of the header.
+
+    Returns:
+        bool: Whether a gzip body can be sent.
+    """
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = params.strip().removeprefix("q=")
+            return not params or quality.rstrip("0.") != ""
+    return False
+
+async def cached_response(
+    request: Request, key: Hashable, render: Callable[[], Awaitable[bytes]],
+    media_type: str = "application/json",
+) -> Response:
+    """Serve a response from the cache, rendering and caching it on a miss.
+
+    Args:
+        request (Request): The request.
+        key (Hashable): The key of the request, from `cache_key`.
+        render (Callable[[], Awaitable[bytes]]): The coroutine function rendering the
+        uncompressed body.
+        media_type (str): The media type of the body.
+
+    Returns:
+        Response: A 304 response if the client has the body, otherwise the body,
+        compressed if the client accepts gzip.
+    """
+    invalidation_bus.poll()
+    entry = response_cache.get(key)
+    if entry is None:
+        metrics.increment("response_cache.misses")
+        version = response_cache.version
+        entry = response_cache.set(key, version, await render())
+    else:
+        metrics.increment("response_cache.hits")
+
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"private, max-age={response_cache_max_age}",
+        "Vary": f"Accept-Encoding, {TENANT_HEADER}",
+    }
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.body, media_type=media_type, headers=headers)
+    return Response(content=gzip.decompress(entry.body), media_type=media_type, headers=headers)
+
+response_cache = ResponseCache(response_cache_bytes)
+invalidation_bus.subscribe(response_cache.invalidate)
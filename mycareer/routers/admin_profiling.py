@@ -0,0 +1,158 @@
+"""
+This module defines the admin endpoints for the memory diagnostics of a worker.
+
+The endpoints answer 404 unless `PROFILING_TOKEN` is set, and 403 without it in the
+`X-Admin-Token` header. They describe the worker answering the request only, so with
+several workers the diagnostics are read from one worker at a time. The snapshots and
+the walks of the heap take a while on a large heap, so the endpoints run on the
+thread pool instead of the event loop.
+
+Functions:
+    get_tracemalloc: Endpoint to get the status of tracemalloc.
+    start_tracemalloc: Endpoint to start tracemalloc.
+    stop_tracemalloc: Endpoint to stop tracemalloc.
+    take_snapshot: Endpoint to compare a new snapshot with the previous one.
+    get_route_allocations: Endpoint to get the allocations of the requests by route.
+    get_gc: Endpoint to get the statistics of the garbage collector.
+    get_sessions: Endpoint to get the size of the identity maps of the live sessions.
+"""
+
+from typing import Annotated, Any, Dict, List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from mycareer.profiling import allocation_tracker, gc_stats, require_admin, session_stats
+
+router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["profiling"],
+    dependencies=[Depends(require_admin)],
+)
+
+@router.get("/tracemalloc", tags=["profiling"])
+def get_tracemalloc() -> Dict[str, Any]:
+    """
+    ## Description
+
+    Endpoint to get the status of tracemalloc and the memory of the worker.
+
+    ## Returns
+
+        Dict[str, Any]: Whether tracemalloc runs, the traced bytes now and at the peak,
+        its own overhead and the resident memory of the process.
+    """
+    return allocation_tracker.status()
+
+@router.post("/tracemalloc/start", tags=["profiling"])
+def start_tracemalloc(frames: Annotated[int, Query(ge=1, le=100)] = 1) -> Dict[str, Any]:
+    """
+    ## Description
+
+    Endpoint to start tracemalloc and take the snapshot the next one is compared with.
+    The `/v1/` requests are measured from then on.
+
+    ## Args
+
+        frames (int): The number of frames kept per allocation. Defaults to 1.
+
+    ## Returns
+
+        Dict[str, Any]: The status of tracemalloc.
+    """
+    return allocation_tracker.start(frames)
+
+@router.post("/tracemalloc/stop", tags=["profiling"])
+def stop_tracemalloc() -> Dict[str, Any]:
+    """
+    ## Description
+
+    Endpoint to stop tracemalloc, dropping its snapshot and the allocations by route.
+
+    ## Returns
+
+        Dict[str, Any]: The status of tracemalloc.
+    """
+    return allocation_tracker.stop()
+
+@router.post("/tracemalloc/snapshot", tags=["profiling"])
+def take_snapshot(
+    limit: Annotated[int, Query(ge=1, le=500)] = 20,
+    key_type: Literal["lineno", "filename", "traceback"] = "lineno",
+) -> List[Dict[str, Any]]:
+    """
+    ## Description
+
+    Endpoint to take a snapshot and compare it with the previous one, which it replaces.
+
+    ## Args
+
+        limit (int): The number of allocation sites returned. Defaults to 20.
+
+        key_type (str): Group the allocations by `lineno`, `filename` or `traceback`.
+        Defaults to `lineno`.
+
+    ## Returns
+
+        List[Dict[str, Any]]: The sites whose size changed most since the previous
+        snapshot.
+
+    ## Raises
+
+        HTTPException: If tracemalloc is not running.
+    """
+    try:
+        return allocation_tracker.snapshot_diff(limit, key_type)
+    except RuntimeError as error:
+        raise HTTPException(status_code=409, detail=str(error)) from error
+
+@router.get("/routes", tags=["profiling"])
+def get_route_allocations(
+    limit: Annotated[int, Query(ge=1, le=100)] = 10,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    ## Description
+
+    Endpoint to get the allocations of the measured `/v1/` requests by route, since
+    tracemalloc was started.
+
+    ## Args
+
+        limit (int): The number of allocation sites returned per route. Defaults to 10.
+
+    ## Returns
+
+        Dict[str, Dict[str, Any]]: By method and route, the requests seen and measured,
+        the largest peak, the bytes retained per request, and the sites holding the
+        most bytes while the response is sent.
+    """
+    return allocation_tracker.routes(limit)
+
+@router.get("/gc", tags=["profiling"])
+def get_gc() -> Dict[str, Any]:
+    """
+    ## Description
+
+    Endpoint to get the statistics of the garbage collector.
+
+    ## Returns
+
+        Dict[str, Any]: The thresholds, counts and collections by generation, the
+        tracked, frozen and uncollectable objects.
+    """
+    return gc_stats()
+
+@router.get("/sessions", tags=["profiling"])
+def get_sessions(limit: Annotated[int, Query(ge=1, le=100)] = 10) -> Dict[str, Any]:
+    """
+    ## Description
+
+    Endpoint to get the size of the identity maps of the live database sessions.
+
+    ## Args
+
+        limit (int): The number of sessions returned, the largest first. Defaults to 10.
+
+    ## Returns
+
+        Dict[str, Any]: The number of live sessions, the objects of their identity
+        maps, and the largest sessions with their objects by class.
+    """
+    return session_stats(limit)
@@ -0,0 +1,77 @@
+"""
+This module defines the API endpoints for the analytics of the goals in the My Career API.
+
+The analytics are aggregate queries over the status history of the goals of the
+tenant of the request.
+
+Functions:
+    get_time_in_status: Endpoint to get the time spent by the goals in each status.
+    get_closed_goals: Endpoint to get the goals completed and abandoned per period.
+"""
+
+from datetime import datetime
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from mycareer.database import get_read_session
+from mycareer.dbpool import run_db
+from mycareer.history import get_closed_goals_by_period, get_time_in_status as fetch_time_in_status
+from mycareer.schemas import AnalyticsPeriod, ClosedGoalsPeriod, StatusTime
+from mycareer.tenancy import TenantDep
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+
+router = APIRouter(
+    prefix="/v1/analytics",
+    tags=["analytics"]
+)
+
+@router.get("/time-in-status", response_model=List[StatusTime], tags=["analytics"])
+async def get_time_in_status(
+    session: ReadSessionDep, tenant_id: TenantDep, goal_id: Optional[int] = None
+) -> List[StatusTime]:
+    """
+    ## Description
+
+    Endpoint to get the time spent by the goals in each status.
+
+    The current status of a goal lasts until now.
+
+    ## Args
+
+        goal_id (int | None): The ID of a goal, None for every goal.
+
+    ## Returns
+
+        List[StatusTime]: The time in every status reached, in the order of the statuses.
+    """
+    return await run_db(session, fetch_time_in_status, session, tenant_id, goal_id)
+
+@router.get("/closed-goals", response_model=List[ClosedGoalsPeriod], tags=["analytics"])
+async def get_closed_goals(
+    session: ReadSessionDep,
+    tenant_id: TenantDep,
+    period: AnalyticsPeriod = AnalyticsPeriod.WEEK,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[ClosedGoalsPeriod]:
+    """
+    ## Description
+
+    Endpoint to get the goals completed and abandoned per period, and the completion rate.
+
+    ## Args
+
+        period (AnalyticsPeriod): `week` or `month`. Defaults to `week`.
+
+        since (datetime | None): The start of the range, included.
+
+        until (datetime | None): The end of the range, excluded.
+
+    ## Returns
+
+        List[ClosedGoalsPeriod]: The periods with a closed goal, in order.
+    """
+    return await run_db(
+        session, get_closed_goals_by_period, session, tenant_id, period, since, until
+    )
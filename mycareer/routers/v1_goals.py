@@ -1,21 +1,61 @@
 """
 This module defines the API endpoints for managing goals in the My Career API.
 
+Every endpoint acts on the goals of the tenant of the request, the goals of the
+other tenants answer 404 as if they did not exist.
+
+The database work of the endpoints goes through `run_db`, which runs it on the
+dedicated database threads when they are enabled, so the caches are read and the
+changes published on the event loop, around it.
+
 Functions:
     get_goals: Endpoint to get all goals.
+    get_goals_delta: Endpoint to get the goals changed since a change sequence value.
+    batch_get_goals: Endpoint to get many goals by ID in one call.
+    query_goals: Endpoint to run a declarative query of goals.
+    import_goals_file: Endpoint to import goals in bulk from a CSV or NDJSON body.
     create_goal: Endpoint to create a new goal.
     get_goal: Endpoint to get a single goal by ID.
+    get_goal_subtree: Endpoint to get a goal and all its sub-goals.
+    get_goal_progress_rollup: Endpoint to get the progress of a goal rolled up from its sub-goals.
     delete_goal: Endpoint to delete a goal by ID.
 """
 
-from typing import Annotated, List
-from fastapi import Depends, APIRouter, HTTPException
-from sqlmodel import Session, select
-from mycareer.database import get_session
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import Annotated, List, Optional
+from fastapi import Depends, APIRouter, HTTPException, Query, Request, Response
+from sqlalchemy import Row
+from sqlmodel import Session
+from mycareer.archive import restore_goal
+from mycareer.cache import goal_cache
+from mycareer.database import get_read_session, get_write_session
+from mycareer.dbpool import run_db
+from mycareer.goal_query import run_goal_query
+from mycareer.history import record_goal_event
+from mycareer.importer import IMPORT_FORMATS, GoalImportOptions, detect_format, import_goals
+from mycareer.invalidation import invalidation_bus
 from mycareer.models import Goal
-from mycareer.schemas import GoalCreate, GoalRead
+from mycareer.queries import (
+    select_archived_goal_by_id, select_goal_by_id, select_goal_subtree_rows
+)
+from mycareer.response_cache import cache_key, cached_response, response_cache
+from mycareer.rows import (
+    encode_goal_node_rows, encode_goal_rows, fetch_goal_rows, fetch_goal_rows_by_ids,
+    goal_row_to_dict
+)
+from mycareer.schemas import (
+    GoalBatch, GoalBatchGet, GoalCreate, GoalDelta, GoalImportReport, GoalNode, GoalProgress,
+    GoalQuery, GoalQueryResult, GoalRead
+)
+from mycareer.sync import get_changes_since, goal_sequence, next_change_seq, record_tombstone
+from mycareer.tenancy import TenantDep
+from mycareer.tree import check_parent, get_goal_progress, reparent_children
+
+IMPORT_SPOOL_SIZE: int = 1024 * 1024
 
-SessionDep = Annotated[Session, Depends(get_session)]
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+WriteSessionDep = Annotated[Session, Depends(get_write_session)]
 
 router = APIRouter(
     prefix="/v1/goals",
@@ -23,26 +63,193 @@ router = APIRouter(
 )
 
 @router.get("", response_model=List[GoalRead], tags=["goals"])
-async def get_goals(session: SessionDep) -> List[GoalRead]:
+async def get_goals(
+    request: Request,
+    session: ReadSessionDep,
+    tenant_id: TenantDep,
+    include_archived: bool = False,
+) -> List[GoalRead]:
     """
     ## Description
 
     Endpoint to get all goals.
 
+    The goals are read as plain rows and encoded directly, without ORM instances
+    nor response validation. With the response cache enabled, the compressed body
+    is served from the cache until the next write to the goals.
+
+    ## Args
+
+        include_archived (bool): Whether to add the archived goals, ordered by ID with the others.
+
     ## Returns
         
         List[GoalRead]: A list containing all goals.
     """
-    goals = session.exec(select(Goal)).all()
-    return goals
+    def render() -> bytes:
+        return encode_goal_rows(fetch_goal_rows(session, tenant_id, include_archived))
+
+    if response_cache.enabled:
+        return await cached_response(
+            request, cache_key(tenant_id, include_archived=include_archived),
+            lambda: run_db(session, render),
+        )
+    return Response(content=await run_db(session, render), media_type="application/json")
+
+@router.get("/delta", response_model=GoalDelta, tags=["goals"])
+async def get_goals_delta(
+    session: ReadSessionDep,
+    tenant_id: TenantDep,
+    since: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 500,
+) -> GoalDelta:
+    """
+    ## Description
+
+    Endpoint to get the goals inserted, updated or deleted since a change sequence value.
+
+    ## Args
+
+        since (int): The `next_since` value of the previous call, 0 for a full sync.
+
+        limit (int): The maximum number of changes to return.
+
+    ## Returns
+
+        GoalDelta: The changed goals, the deleted goal IDs and the value to resume from.
+    """
+    goals, tombstones, next_since, has_more = await run_db(
+        session, get_changes_since, session, tenant_id, since, limit
+    )
+    return {
+        "goals": goals,
+        "deleted": [tombstone.goal_id for tombstone in tombstones],
+        "next_since": next_since,
+        "has_more": has_more,
+    }
+
+@router.post("/batch-get", response_model=GoalBatch, tags=["goals"])
+async def batch_get_goals(
+    request: GoalBatchGet, session: ReadSessionDep, tenant_id: TenantDep
+) -> GoalBatch:
+    """
+    ## Description
+
+    Endpoint to get many goals by ID in one call.
+
+    The goal cache is consulted for every ID and the misses are read with a
+    single `IN` query, then from the archive if some are still missing.
+
+    ## Args
+
+        request (GoalBatchGet): The IDs of the goals.
+
+    ## Returns
+
+        GoalBatch: The goals found, in the order of the requested IDs, and the missing IDs.
+    """
+    goal_ids = list(dict.fromkeys(request.ids))
+    found = {}
+    if goal_cache.enabled:
+        invalidation_bus.poll()
+        for goal_id in goal_ids:
+            cached_goal = goal_cache.get(tenant_id, goal_id)
+            if cached_goal is not None:
+                found[goal_id] = cached_goal
+
+    for archived in (False, True):
+        misses = [goal_id for goal_id in goal_ids if goal_id not in found]
+        if not misses:
+            break
+        rows = await run_db(
+            session, fetch_goal_rows_by_ids, session, tenant_id, misses, archived
+        )
+        for row in rows:
+            found[row.id] = goal_row_to_dict(row)
+            goal_cache.set(tenant_id, row.id, found[row.id])
+
+    return {
+        "goals": [found[goal_id] for goal_id in goal_ids if goal_id in found],
+        "missing": [goal_id for goal_id in goal_ids if goal_id not in found],
+    }
+
+@router.post("/query", response_model=GoalQueryResult, tags=["goals"])
+async def query_goals(
+    query: GoalQuery, session: ReadSessionDep, tenant_id: TenantDep
+) -> GoalQueryResult:
+    """
+    ## Description
+
+    Endpoint to run a declarative query of goals, in place of a list and a read per goal.
+
+    The page of goals is read with the filters, the sort and the fields of the
+    query. The parents, the sub-goals and the history of the whole page are each
+    read with one batched query, and the aggregates over all the matching goals
+    with one more.
+
+    ## Args
+
+        query (GoalQuery): The filters, sort, page, fields, included data and aggregates.
+
+    ## Returns
+
+        GoalQueryResult: The goals of the page, whether more follow and the aggregates.
+    """
+    return await run_db(session, run_goal_query, session, tenant_id, query)
+
+@router.post("/import", response_model=GoalImportReport, tags=["goals"])
+async def import_goals_file(
+    request: Request,
+    session: WriteSessionDep,
+    tenant_id: TenantDep,
+    file_format: Annotated[Optional[str], Query(alias="format")] = None,
+) -> GoalImportReport:
+    """
+    ## Description
+
+    Endpoint to import goals in bulk from a CSV or NDJSON body.
+
+    The body is spooled to a temporary file past 1 MiB, then parsed, validated
+    and inserted in chunks in a worker thread, so the event loop stays free.
+
+    ## Args
+
+        file_format (str | None): `csv` or `ndjson`, defaults to the one of the `Content-Type`.
+
+    ## Returns
+
+        GoalImportReport: The number of goals imported and the rejected rows.
+
+    ## Raises
+
+        HTTPException: If the format is missing or not supported.
+    """
+    file_format = file_format or detect_format(request.headers.get("content-type"))
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=415, detail="Expected a text/csv or application/x-ndjson body"
+        )
+
+    with SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as body:
+        async for data in request.stream():
+            body.write(data)
+        body.seek(0)
+        return await run_db(
+            session, import_goals, session, tenant_id, body,
+            GoalImportOptions(file_format=file_format), offload=True
+        )
 
 @router.post("", response_model=GoalRead, tags=["goals"])
-async def create_goal(goal: GoalCreate, session: SessionDep) -> GoalRead:
+async def create_goal(
+    goal: GoalCreate, session: WriteSessionDep, tenant_id: TenantDep
+) -> GoalRead:
     """
     ## Description
 
     Endpoint to create a new goal.
 
+    The creation is recorded in the status history, in the same transaction.
+
     ## Args
 
         goal (GoalCreate): The goal object to be created.
@@ -50,20 +257,43 @@ async def create_goal(goal: GoalCreate, session: SessionDep) -> GoalRead:
     ## Returns
 
         GoalRead: The created goal object.
+
+    ## Raises
+
+        HTTPException: If the parent goal does not exist or is nested too deep.
     """
-    db_goal = Goal.from_orm(goal)
-    session.add(db_goal)
-    session.commit()
-    session.refresh(db_goal)
+    def create() -> Goal:
+        try:
+            check_parent(session, tenant_id, goal.parent_id)
+        except ValueError as error:
+            raise HTTPException(status_code=422, detail=str(error)) from error
+
+        db_goal = Goal.model_validate(goal)
+        db_goal.tenant_id = tenant_id
+        db_goal.change_seq = next_change_seq(session, goal_sequence(tenant_id))
+        session.add(db_goal)
+        session.flush()
+        record_goal_event(session, db_goal)
+        session.commit()
+        session.refresh(db_goal)
+        return db_goal
+
+    db_goal = await run_db(session, create)
+    invalidation_bus.publish([db_goal.id])
     return db_goal
 
 @router.put("/{goal_id}", response_model=GoalRead, tags=["goals"])
-async def update_goal(goal_id: int, goal: GoalCreate, session: SessionDep) -> GoalRead:
+async def update_goal(
+    goal_id: int, goal: GoalCreate, session: WriteSessionDep, tenant_id: TenantDep
+) -> GoalRead:
     """
     ## Description
 
     Endpoint to update an existing goal by ID.
 
+    A change of the status or the priority is recorded in the status history, in
+    the same transaction.
+
     ## Args
 
         goal_id (int): The ID of the goal to be updated.
@@ -73,24 +303,45 @@ async def update_goal(goal_id: int, goal: GoalCreate, session: SessionDep) -> Go
     ## Returns
 
         GoalRead: The updated goal object.
-    """
-    db_goal = session.get(Goal, goal_id)
-    if not db_goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
 
-    for key, value in goal.dict().items():
-        setattr(db_goal, key, value)
+    ## Raises
 
-    session.commit()
-    session.refresh(db_goal)
+        HTTPException: If the goal with the given ID does not exist, or if the parent
+        goal does not exist, is the goal or one of its sub-goals, or is nested too deep.
+    """
+    def update() -> Goal:
+        db_goal = session.execute(select_goal_by_id(tenant_id, goal_id)).scalar_one_or_none()
+        if not db_goal:
+            db_goal = restore_goal(session, tenant_id, goal_id)
+        if not db_goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        try:
+            check_parent(session, tenant_id, goal.parent_id, goal_id)
+        except ValueError as error:
+            raise HTTPException(status_code=422, detail=str(error)) from error
+
+        previous_status, previous_priority = db_goal.status, db_goal.priority
+        for key, value in goal.model_dump().items():
+            setattr(db_goal, key, value)
+        db_goal.change_seq = next_change_seq(session, goal_sequence(tenant_id))
+        db_goal.updated_at = datetime.utcnow()
+        if (db_goal.status, db_goal.priority) != (previous_status, previous_priority):
+            record_goal_event(session, db_goal, previous_status)
+
+        session.commit()
+        session.refresh(db_goal)
+        return db_goal
+
+    db_goal = await run_db(session, update)
+    invalidation_bus.publish([goal_id])
     return db_goal
 
 @router.get("/{goal_id}", response_model=GoalRead, tags=["goals"])
-async def get_goal(goal_id: int, session: SessionDep) -> GoalRead:
+async def get_goal(goal_id: int, session: ReadSessionDep, tenant_id: TenantDep) -> GoalRead:
     """
     ## Description
 
-    Endpoint to get a single goal by ID.
+    Endpoint to get a single goal by ID, falling back to the archived goals.
 
     ## Args
 
@@ -104,17 +355,97 @@ async def get_goal(goal_id: int, session: SessionDep) -> GoalRead:
 
         HTTPException: If the goal with the given ID does not exist.
     """
-    goal = session.get(Goal, goal_id)
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
+    if goal_cache.enabled:
+        invalidation_bus.poll()
+        cached_goal = goal_cache.get(tenant_id, goal_id)
+        if cached_goal is not None:
+            return cached_goal
+
+    def read() -> Goal:
+        goal = session.execute(select_goal_by_id(tenant_id, goal_id)).scalar_one_or_none()
+        if not goal:
+            goal = session.execute(
+                select_archived_goal_by_id(tenant_id, goal_id)
+            ).scalar_one_or_none()
+        if not goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+        return goal
+
+    goal = await run_db(session, read)
+    if goal_cache.enabled:
+        goal_cache.set(
+            tenant_id, goal_id, GoalRead.model_validate(goal, from_attributes=True).model_dump()
+        )
     return goal
 
+@router.get("/{goal_id}/subtree", response_model=List[GoalNode], tags=["goals"])
+async def get_goal_subtree(
+    goal_id: int, session: ReadSessionDep, tenant_id: TenantDep
+) -> List[GoalNode]:
+    """
+    ## Description
+
+    Endpoint to get a goal and all its sub-goals, at any depth, in one query.
+
+    The goals are read as plain rows and encoded directly, like the goal list.
+
+    ## Args
+
+        goal_id (int): The ID of the root goal.
+
+    ## Returns
+
+        List[GoalNode]: The root goal and its sub-goals, with their depth below the
+        root, ordered by depth and ID.
+
+    ## Raises
+
+        HTTPException: If the goal with the given ID does not exist.
+    """
+    def read() -> List[Row]:
+        return session.connection().execute(select_goal_subtree_rows(tenant_id, goal_id)).all()
+
+    rows = await run_db(session, read)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return Response(content=encode_goal_node_rows(rows), media_type="application/json")
+
+@router.get("/{goal_id}/progress", response_model=GoalProgress, tags=["goals"])
+async def get_goal_progress_rollup(
+    goal_id: int, session: ReadSessionDep, tenant_id: TenantDep
+) -> GoalProgress:
+    """
+    ## Description
+
+    Endpoint to get the progress of a goal, rolled up from its sub-goals in one query.
+
+    ## Args
+
+        goal_id (int): The ID of the goal.
+
+    ## Returns
+
+        GoalProgress: The share of completed sub-goals, at any depth.
+
+    ## Raises
+
+        HTTPException: If the goal with the given ID does not exist.
+    """
+    progress = await run_db(session, get_goal_progress, session, tenant_id, goal_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    return progress
+
 @router.delete("/{goal_id}", status_code=204, tags=["goals"])
-async def delete_goal(goal_id: int, session: SessionDep) -> None:
+async def delete_goal(goal_id: int, session: WriteSessionDep, tenant_id: TenantDep) -> None:
     """
     ## Description
 
-    Endpoint to delete a goal.
+    Endpoint to delete a goal, archived or not.
+
+    A live goal is soft deleted: it keeps its row, out of the indexes, until it is
+    purged. An archived goal is deleted from the archive. The sub-goals of the goal
+    are moved to its parent.
 
     ## Args
 
@@ -124,8 +455,24 @@ async def delete_goal(goal_id: int, session: SessionDep) -> None:
 
         HTTPException: If the goal with the given ID does not exist.
     """
-    goal = session.get(Goal, goal_id)
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    session.delete(goal)
-    session.commit()
+    def delete() -> List[int]:
+        goal = session.execute(select_goal_by_id(tenant_id, goal_id)).scalar_one_or_none()
+        if goal:
+            goal.deleted_at = datetime.utcnow()
+            goal.change_seq = next_change_seq(session, goal_sequence(tenant_id))
+            parent_id = goal.parent_id
+        else:
+            archived_goal = session.execute(
+                select_archived_goal_by_id(tenant_id, goal_id)
+            ).scalar_one_or_none()
+            if not archived_goal:
+                raise HTTPException(status_code=404, detail="Goal not found")
+            parent_id = archived_goal.parent_id
+            session.delete(archived_goal)
+        moved_ids = reparent_children(session, tenant_id, goal_id, parent_id)
+        record_tombstone(session, tenant_id, goal_id)
+        session.commit()
+        return moved_ids
+
+    moved_ids = await run_db(session, delete)
+    invalidation_bus.publish([goal_id, *moved_ids])
@@ -0,0 +1,220 @@
+"""
+This module defines the API endpoints for the background jobs in the My Career API.
+
+The heavy goal operations are submitted as jobs, answered at once with `202 Accepted`
+and the job, then run by the job runner of a worker. The client polls the job for its
+status and progress, then downloads its result. The jobs of the other tenants answer
+404 as if they did not exist.
+
+Functions:
+    submit_export_job: Endpoint to submit the export of the goals.
+    submit_import_job: Endpoint to submit the import of goals from a CSV or NDJSON body.
+    submit_archive_job: Endpoint to submit the archival of the closed goals.
+    get_job: Endpoint to get a job by ID.
+    get_job_result: Endpoint to download the result of a job.
+"""
+
+import contextlib
+import json
+import os
+import uuid
+from typing import Annotated, Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlmodel import Session
+from mycareer import jobs
+from mycareer.database import get_read_session, get_write_session
+from mycareer.dbpool import run_db
+from mycareer.exporter import MEDIA_TYPES
+from mycareer.importer import IMPORT_FORMATS, detect_format
+from mycareer.jobs import job_runner, submit_job
+from mycareer.models import Job, JobKind, JobStatus
+from mycareer.schemas import ArchiveJobCreate, ExportJobCreate, JobRead
+from mycareer.tenancy import TenantDep
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+WriteSessionDep = Annotated[Session, Depends(get_write_session)]
+
+router = APIRouter(
+    prefix="/v1/jobs",
+    tags=["jobs"]
+)
+
+def _to_read(job: Job) -> JobRead:
+    return JobRead(
+        id=job.id, kind=job.kind, status=job.status, progress=job.progress, total=job.total,
+        result=json.loads(job.result) if job.result else None, error=job.error,
+        attempts=job.attempts, created_at=job.created_at, started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+async def _submit(
+    session: Session, tenant_id: str, kind: JobKind, params: Dict[str, Any]
+) -> JobRead:
+    job = await run_db(
+        session, submit_job, session, tenant_id, kind, params, jobs.job_max_pending
+    )
+    if job is None:
+        raise HTTPException(status_code=429, detail="Too many jobs pending",
+                            headers={"Retry-After": str(int(jobs.job_poll_interval))})
+    job_runner.notify()
+    return _to_read(job)
+
+def _get_tenant_job(session: Session, tenant_id: str, job_id: int) -> Optional[Job]:
+    job = session.get(Job, job_id)
+    if job is None or job.tenant_id != tenant_id:
+        return None
+    return job
+
+@router.post("/export", response_model=JobRead, status_code=202, tags=["jobs"])
+async def submit_export_job(
+    export: ExportJobCreate, session: WriteSessionDep, tenant_id: TenantDep
+) -> JobRead:
+    """
+    ## Description
+
+    Endpoint to submit the export of the goals to a CSV or NDJSON file.
+
+    ## Args
+
+        export (ExportJobCreate): The format of the file and whether to export the
+        archived goals too.
+
+    ## Returns
+
+        JobRead: The queued job.
+
+    ## Raises
+
+        HTTPException: If the tenant has too many jobs pending.
+    """
+    return await _submit(session, tenant_id, JobKind.EXPORT, export.model_dump(mode="json"))
+
+@router.post("/import", response_model=JobRead, status_code=202, tags=["jobs"])
+async def submit_import_job(
+    request: Request,
+    session: WriteSessionDep,
+    tenant_id: TenantDep,
+    file_format: Annotated[Optional[str], Query(alias="format")] = None,
+) -> JobRead:
+    """
+    ## Description
+
+    Endpoint to submit the import of goals from a CSV or NDJSON body.
+
+    The body is written to `JOB_DIR`, and imported as `POST /v1/goals/import` does.
+    The result of the job is the import report.
+
+    ## Args
+
+        file_format (str | None): `csv` or `ndjson`, defaults to the one of the `Content-Type`.
+
+    ## Returns
+
+        JobRead: The queued job.
+
+    ## Raises
+
+        HTTPException: If the format is missing or not supported, or the tenant has
+        too many jobs pending.
+    """
+    file_format = file_format or detect_format(request.headers.get("content-type"))
+    if file_format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=415, detail="Expected a text/csv or application/x-ndjson body"
+        )
+
+    os.makedirs(jobs.job_dir, exist_ok=True)
+    path = os.path.join(jobs.job_dir, f"upload-{uuid.uuid4().hex}.{file_format}")
+    try:
+        with open(path, "wb") as body:
+            async for data in request.stream():
+                body.write(data)
+        return await _submit(
+            session, tenant_id, JobKind.IMPORT, {"format": file_format, "path": path}
+        )
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+
+@router.post("/archive", response_model=JobRead, status_code=202, tags=["jobs"])
+async def submit_archive_job(
+    archive: ArchiveJobCreate, session: WriteSessionDep, tenant_id: TenantDep
+) -> JobRead:
+    """
+    ## Description
+
+    Endpoint to submit the archival of the closed goals not updated for a while.
+
+    ## Args
+
+        archive (ArchiveJobCreate): The number of days without update after which a
+        goal is archived.
+
+    ## Returns
+
+        JobRead: The queued job.
+
+    ## Raises
+
+        HTTPException: If the tenant has too many jobs pending.
+    """
+    return await _submit(session, tenant_id, JobKind.ARCHIVE, archive.model_dump())
+
+@router.get("/{job_id}", response_model=JobRead, tags=["jobs"])
+async def get_job(job_id: int, session: ReadSessionDep, tenant_id: TenantDep) -> JobRead:
+    """
+    ## Description
+
+    Endpoint to get a job by ID, with its status, its progress and its result.
+
+    ## Args
+
+        job_id (int): The ID of the job.
+
+    ## Returns
+
+        JobRead: The job.
+
+    ## Raises
+
+        HTTPException: If the job is not found.
+    """
+    job = await run_db(session, _get_tenant_job, session, tenant_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _to_read(job)
+
+@router.get("/{job_id}/result", tags=["jobs"])
+async def get_job_result(job_id: int, session: ReadSessionDep, tenant_id: TenantDep) -> Response:
+    """
+    ## Description
+
+    Endpoint to download the result of a succeeded job: the file of an export, the
+    result of the job as JSON otherwise.
+
+    ## Args
+
+        job_id (int): The ID of the job.
+
+    ## Returns
+
+        Response: The file or the result.
+
+    ## Raises
+
+        HTTPException: If the job is not found, or has not succeeded.
+    """
+    job = await run_db(session, _get_tenant_job, session, tenant_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"The job is {job.status.value}")
+    if job.result_path is None:
+        return Response(content=job.result, media_type="application/json")
+    file_format = json.loads(job.params)["format"]
+    return FileResponse(
+        job.result_path, media_type=MEDIA_TYPES[file_format],
+        filename=f"goals-{job.id}.{file_format}",
+    )
@@ -0,0 +1,26 @@
+"""
+routing.py
+
+This module names the routes of the requests, for the settings and the state kept
+by route by the middlewares.
+
+Functions:
+    route_key: Gets the route of a request path, with the numeric segments replaced.
+"""
+
+import re
+
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+# The bulk imports and the uploads and downloads of the jobs last as long as the transfer.
+TRANSFER_ROUTES = ("POST /v1/goals/import", "POST /v1/jobs/import", "GET /v1/jobs/{id}/result")
+
+def route_key(path: str) -> str:
+    """Get the route of a request path, with the numeric segments replaced.
+
+    Args:
+        path (str): The request path.
+
+    Returns:
+        str: The route, e.g. `/v1/goals/{id}` for `/v1/goals/42`.
+    """
+    return NUMERIC_SEGMENT.sub("/{id}", path)
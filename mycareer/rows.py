@@ -0,0 +1,142 @@
+"""
+rows.py
+
+This module provides the ORM-free read path of the goal list.
+
+The list is read with a Core statement on the session's connection, so no `Goal`
+instance is created and nothing enters the identity map. The tuple rows are then
+encoded straight to the JSON body of the response, with the field names and
+formats of `GoalRead`.
+
+Functions:
+    fetch_goal_rows: Fetches the goal rows of a tenant as tuples.
+    fetch_goal_rows_by_ids: Fetches the rows of the goals of a tenant with the given IDs.
+    goal_row_to_dict: Converts a goal row to the fields of `GoalRead`.
+    encode_goal_rows: Encodes goal rows to a JSON array.
+    encode_goal_node_rows: Encodes subtree rows to a JSON array.
+"""
+
+import json
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import Row
+from sqlmodel import Session
+from mycareer.queries import (
+    select_archived_goal_rows_by_ids,
+    select_goal_rows,
+    select_goal_rows_by_ids,
+    select_goal_rows_with_archive,
+)
+
+def fetch_goal_rows(
+    session: Session, tenant_id: str, include_archived: bool = False
+) -> Sequence[Row]:
+    """Fetch the goal rows of a tenant as tuples, without going through the ORM.
+
+    Args:
+        session (Session): The database session, only its connection is used.
+        tenant_id (str): The ID of the tenant.
+        include_archived (bool): Whether to add the archived goals. Defaults to False.
+
+    Returns:
+        Sequence[Row]: The rows, in the column order of `select_goal_rows`.
+    """
+    statement = (
+        select_goal_rows_with_archive(tenant_id) if include_archived
+        else select_goal_rows(tenant_id)
+    )
+    return session.connection().execute(statement).all()
+
+def fetch_goal_rows_by_ids(
+    session: Session, tenant_id: str, goal_ids: List[int], archived: bool = False
+) -> Sequence[Row]:
+    """Fetch the rows of the goals of a tenant with the given IDs, without going through the ORM.
+
+    Args:
+        session (Session): The database session, only its connection is used.
+        tenant_id (str): The ID of the tenant.
+        goal_ids (List[int]): The IDs of the goals.
+        archived (bool): Whether to read the archive instead of the goals. Defaults to False.
+
+    Returns:
+        Sequence[Row]: The rows of the existing goals, in no particular order.
+    """
+    statement = (
+        select_archived_goal_rows_by_ids(tenant_id, goal_ids) if archived
+        else select_goal_rows_by_ids(tenant_id, goal_ids)
+    )
+    return session.connection().execute(statement).all()
+
+def goal_row_to_dict(row: Row) -> Dict[str, Any]:
+    """Convert a goal row to the fields of `GoalRead`.
+
+    Args:
+        row (Row): The row, in the column order of `select_goal_rows`.
+
+    Returns:
+        Dict[str, Any]: The fields of the goal.
+    """
+    goal_id, name, description, status, priority, due_date, parent_id = row
+    return {
+        "name": name,
+        "description": description,
+        "status": status,
+        "priority": priority,
+        "due_date": due_date,
+        "parent_id": parent_id,
+        "id": goal_id,
+    }
+
+def encode_goal_rows(rows: Sequence[Row]) -> bytes:
+    """Encode goal rows to a JSON array of `GoalRead` objects.
+
+    The enumerations are `str` subclasses, so they are encoded as their values.
+
+    Args:
+        rows (Sequence[Row]): The rows, in the column order of `select_goal_rows`.
+
+    Returns:
+        bytes: The JSON array.
+    """
+    return json.dumps(
+        [
+            {
+                "name": name,
+                "description": description,
+                "status": status,
+                "priority": priority,
+                "due_date": due_date.isoformat() if due_date is not None else None,
+                "parent_id": parent_id,
+                "id": goal_id,
+            }
+            for goal_id, name, description, status, priority, due_date, parent_id in rows
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def encode_goal_node_rows(rows: Sequence[Row]) -> bytes:
+    """Encode subtree rows to a JSON array of `GoalNode` objects.
+
+    Args:
+        rows (Sequence[Row]): The rows, in the column order of `select_goal_subtree_rows`.
+
+    Returns:
+        bytes: The JSON array.
+    """
+    return json.dumps(
+        [
+            {
+                "name": name,
+                "description": description,
+                "status": status,
+                "priority": priority,
+                "due_date": due_date.isoformat() if due_date is not None else None,
+                "parent_id": parent_id,
+                "id": goal_id,
+                "depth": depth,
+            }
+            for goal_id, name, description, status, priority, due_date, parent_id, depth in rows
+        ],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
@@ -1,11 +1,53 @@
 """
 This module defines the Pydantic schemas for the My Career API.
+
+The schemas only use the native features of Pydantic v2, so the validation runs in
+the compiled core without calling back into Python.
 """
-from typing import Optional
-from datetime import datetime
-from pydantic import BaseModel, Field, model_validator
+from enum import Enum
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from pydantic import BaseModel, ConfigDict, Field, GetCoreSchemaHandler
+from pydantic_core import core_schema
 from typing_extensions import Annotated
-from mycareer.models import GoalStatus, GoalPriority
+from mycareer.models import GoalStatus, GoalPriority, JobKind, JobStatus
+
+class NoneAsDefault:
+    """
+    ## Description
+
+    A marker for `Annotated` replacing a null value by a default, in the core schema.
+
+    A valid value is kept, a null value is validated as the default would be, and
+    any other value fails the validation of the annotated type.
+
+    ## Args
+
+        default (Any): The value replacing a null value.
+    """
+
+    def __init__(self, default: Any) -> None:
+        self.default = default
+
+    def __get_pydantic_core_schema__(
+        self, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        schema = handler(source)
+        # A null value passes `none_schema`, then fails the annotated type, which
+        # falls back to the default. Any other value fails `none_schema` at once, and
+        # is validated by the annotated type.
+        null_as_default = core_schema.chain_schema([
+            core_schema.none_schema(),
+            core_schema.with_default_schema(schema, default=self.default, on_error="default"),
+        ])
+        if isinstance(source, type) and issubclass(source, Enum):
+            # One error listing the values, instead of one error per choice of the union.
+            expected = ", ".join(repr(member.value) for member in source)
+            return core_schema.union_schema(
+                [null_as_default, schema], mode="left_to_right", custom_error_type="enum",
+                custom_error_context={"expected": f"{expected} or None"},
+            )
+        return core_schema.union_schema([null_as_default, schema], mode="left_to_right")
 
 class GoalBase(BaseModel):
     """
@@ -22,12 +64,15 @@ class GoalBase(BaseModel):
         priority (GoalPriority): The priority of the goal.
         
         due_date (Optional[datetime]): The due date of the goal.
+
+        parent_id (Optional[int]): The ID of the parent goal, None for a root goal.
     """
     name: Annotated[str, Field(..., min_length=1)]
     description: Optional[str] = None
     status: GoalStatus = GoalStatus.TO_REFINE
     priority: GoalPriority = GoalPriority.MEDIUM
     due_date: Optional[datetime] = None
+    parent_id: Optional[int] = None
 
 class GoalCreate(GoalBase):
     """
@@ -41,26 +86,19 @@ class GoalCreate(GoalBase):
         
         description (Optional[str]): A description of the goal.
         
-        status (Optional[GoalStatus]): The status of the goal.
+        status (GoalStatus): The status of the goal, `to refine` when None.
         
-        priority (Optional[GoalPriority]): The priority of the goal.
+        priority (GoalPriority): The priority of the goal, `medium` when None.
         
         due_date (Optional[datetime]): The due date of the goal.
+
+        parent_id (Optional[int]): The ID of the parent goal, None for a root goal.
     """
     description: Optional[str] = None
-    status: Optional[GoalStatus] = GoalStatus.TO_REFINE
-    priority: Optional[GoalPriority] = GoalPriority.MEDIUM
+    status: Annotated[GoalStatus, NoneAsDefault(GoalStatus.TO_REFINE)] = GoalStatus.TO_REFINE
+    priority: Annotated[GoalPriority, NoneAsDefault(GoalPriority.MEDIUM)] = GoalPriority.MEDIUM
     due_date: Optional[datetime] = None
-
-    @model_validator(mode='before')
-    @classmethod
-    def set_defaults(cls, values):
-        """Set default values for status and priority if they are None."""
-        if values.get('status') is None:
-            values['status'] = GoalStatus.TO_REFINE
-        if values.get('priority') is None:
-            values['priority'] = GoalPriority.MEDIUM
-        return values
+    parent_id: Optional[int] = None
 
 class GoalRead(GoalBase):
     """
@@ -81,12 +119,12 @@ class GoalRead(GoalBase):
         priority (GoalPriority): The priority of the goal.
         
         due_date (Optional[datetime]): The due date of the goal.
+
+        parent_id (Optional[int]): The ID of the parent goal, None for a root goal.
     """
-    id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        """Pydantic configuration for GoalRead."""
-        orm_mode = True
+    id: int
 
 class GoalUpdate(BaseModel):
     """
@@ -111,3 +149,480 @@ class GoalUpdate(BaseModel):
     status: Optional[GoalStatus] = None
     priority: Optional[GoalPriority] = None
     due_date: Optional[datetime] = None
+
+BATCH_GET_MAX_IDS: int = 100
+
+class GoalBatchGet(BaseModel):
+    """
+    ## Description
+
+    Schema for fetching many goals by ID.
+
+    ## Attributes
+
+        ids (List[int]): The IDs of the goals, at most `BATCH_GET_MAX_IDS`.
+    """
+    ids: Annotated[List[int], Field(..., min_length=1, max_length=BATCH_GET_MAX_IDS)]
+
+class GoalBatch(BaseModel):
+    """
+    ## Description
+
+    Schema for the goals fetched by ID.
+
+    ## Attributes
+
+        goals (List[GoalRead]): The goals found, in the order of the requested IDs.
+
+        missing (List[int]): The requested IDs without a goal.
+    """
+    goals: List[GoalRead]
+    missing: List[int]
+
+QUERY_MAX_LIMIT: int = 500
+QUERY_MAX_IDS: int = 1000
+
+class GoalField(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the fields of a goal that a query can select.
+    """
+    NAME = "name"
+    DESCRIPTION = "description"
+    STATUS = "status"
+    PRIORITY = "priority"
+    DUE_DATE = "due_date"
+    PARENT_ID = "parent_id"
+
+class GoalSortField(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the fields a query can sort the goals by.
+    """
+    ID = "id"
+    NAME = "name"
+    STATUS = "status"
+    PRIORITY = "priority"
+    DUE_DATE = "due_date"
+
+class GoalInclude(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the related data a query can add to every goal.
+
+    ## Attributes
+
+        PARENT (str): The parent goal, live or archived, with the selected fields.
+
+        SUB_GOALS (str): The live sub-goals, with the selected fields.
+
+        HISTORY (str): The status history, oldest first.
+    """
+    PARENT = "parent"
+    SUB_GOALS = "sub_goals"
+    HISTORY = "history"
+
+class GoalAggregate(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the aggregates a query can compute over all the matching goals.
+
+    ## Attributes
+
+        COUNT (str): The number of matching goals.
+
+        STATUS (str): The number of matching goals in every status.
+
+        PRIORITY (str): The number of matching goals of every priority.
+    """
+    COUNT = "count"
+    STATUS = "status"
+    PRIORITY = "priority"
+
+class GoalQueryFilter(BaseModel):
+    """
+    ## Description
+
+    Schema for the filters of a goal query, all of them applied.
+
+    ## Attributes
+
+        ids (Optional[List[int]]): The IDs of the goals, at most `QUERY_MAX_IDS`.
+
+        status (Optional[List[GoalStatus]]): The accepted statuses.
+
+        priority (Optional[List[GoalPriority]]): The accepted priorities.
+
+        parent_id (Optional[int]): The ID of the parent of the goals.
+
+        root_only (bool): Whether to only match the goals without a parent.
+
+        due_after (Optional[datetime]): The start of the due date range, included.
+
+        due_before (Optional[datetime]): The end of the due date range, excluded.
+
+        name_contains (Optional[str]): A text the name of the goals contains.
+    """
+    ids: Optional[Annotated[List[int], Field(min_length=1, max_length=QUERY_MAX_IDS)]] = None
+    status: Optional[Annotated[List[GoalStatus], Field(min_length=1)]] = None
+    priority: Optional[Annotated[List[GoalPriority], Field(min_length=1)]] = None
+    parent_id: Optional[int] = None
+    root_only: bool = False
+    due_after: Optional[datetime] = None
+    due_before: Optional[datetime] = None
+    name_contains: Optional[Annotated[str, Field(min_length=1)]] = None
+
+class GoalSort(BaseModel):
+    """
+    ## Description
+
+    Schema for a sort key of a goal query.
+
+    ## Attributes
+
+        field (GoalSortField): The field to sort by.
+
+        descending (bool): Whether to sort in descending order.
+    """
+    field: GoalSortField
+    descending: bool = False
+
+class GoalQueryPage(BaseModel):
+    """
+    ## Description
+
+    Schema for the page of a goal query.
+
+    ## Attributes
+
+        limit (int): The maximum number of goals, at most `QUERY_MAX_LIMIT`.
+
+        offset (int): The number of matching goals to skip.
+    """
+    limit: Annotated[int, Field(ge=1, le=QUERY_MAX_LIMIT)] = 50
+    offset: Annotated[int, Field(ge=0)] = 0
+
+class GoalQuery(BaseModel):
+    """
+    ## Description
+
+    Schema for a declarative query of goals.
+
+    ## Attributes
+
+        filters (GoalQueryFilter): The filters of the goals.
+
+        sort (List[GoalSort]): The sort keys, the ID breaking the ties. Defaults to the ID.
+
+        page (GoalQueryPage): The page of goals to return.
+
+        fields (Optional[List[GoalField]]): The fields of the goals, besides the ID.
+        Defaults to all the fields of `GoalRead`.
+
+        include (List[GoalInclude]): The related data to add to every goal.
+
+        aggregates (List[GoalAggregate]): The aggregates to compute over all the
+        matching goals, not only the page.
+    """
+    filters: GoalQueryFilter = GoalQueryFilter()
+    sort: Annotated[List[GoalSort], Field(max_length=3)] = []
+    page: GoalQueryPage = GoalQueryPage()
+    fields: Optional[List[GoalField]] = None
+    include: List[GoalInclude] = []
+    aggregates: List[GoalAggregate] = []
+
+class GoalAggregates(BaseModel):
+    """
+    ## Description
+
+    Schema for the aggregates of a goal query, only the requested ones being set.
+
+    ## Attributes
+
+        count (Optional[int]): The number of matching goals.
+
+        status (Optional[Dict[GoalStatus, int]]): The number of matching goals by status.
+
+        priority (Optional[Dict[GoalPriority, int]]): The number of matching goals by priority.
+    """
+    count: Optional[int] = None
+    status: Optional[Dict[GoalStatus, int]] = None
+    priority: Optional[Dict[GoalPriority, int]] = None
+
+class GoalQueryResult(BaseModel):
+    """
+    ## Description
+
+    Schema for the result of a goal query.
+
+    ## Attributes
+
+        goals (List[Dict[str, Any]]): The goals of the page, with their ID, the selected
+        fields and the included data.
+
+        has_more (bool): Whether more goals match after the page.
+
+        aggregates (Optional[GoalAggregates]): The aggregates, if any was requested.
+    """
+    goals: List[Dict[str, Any]]
+    has_more: bool
+    aggregates: Optional[GoalAggregates] = None
+
+class GoalDelta(BaseModel):
+    """
+    ## Description
+
+    Schema for the changes of goals after a change sequence value.
+
+    ## Attributes
+
+        goals (List[GoalRead]): The goals inserted or updated since the given value.
+
+        deleted (List[int]): The IDs of the goals deleted since the given value.
+
+        next_since (int): The value to send as `since` on the next call.
+
+        has_more (bool): Whether more changes are pending.
+    """
+    goals: List[GoalRead]
+    deleted: List[int]
+    next_since: int
+    has_more: bool
+
+class GoalImportRejection(BaseModel):
+    """
+    ## Description
+
+    Schema for a row rejected by an import.
+
+    ## Attributes
+
+        line (int): The line of the row in the imported file.
+
+        errors (List[str]): The reasons of the rejection.
+    """
+    line: int
+    errors: List[str]
+
+class GoalImportReport(BaseModel):
+    """
+    ## Description
+
+    Schema for the report of an import.
+
+    ## Attributes
+
+        imported (int): The number of goals inserted.
+
+        rejected (int): The number of rows rejected.
+
+        rejections (List[GoalImportRejection]): The first rejected rows, in file order.
+    """
+    imported: int = 0
+    rejected: int = 0
+    rejections: List[GoalImportRejection] = []
+
+class GoalReminder(BaseModel):
+    """
+    ## Description
+
+    Schema for the reminder of a goal entering the reminder window.
+
+    ## Attributes
+
+        goal_id (int): The identifier of the goal.
+
+        tenant_id (str): The tenant owning the goal.
+
+        name (str): The name of the goal.
+
+        status (GoalStatus): The status of the goal.
+
+        priority (GoalPriority): The priority of the goal.
+
+        due_date (datetime): The due date of the goal.
+    """
+    goal_id: int
+    tenant_id: str
+    name: str
+    status: GoalStatus
+    priority: GoalPriority
+    due_date: datetime
+
+class GoalNode(GoalRead):
+    """
+    ## Description
+
+    Schema for a goal of a subtree.
+
+    ## Attributes
+
+        depth (int): The number of levels below the root of the subtree, 0 for the root.
+    """
+    depth: int
+
+class GoalProgress(BaseModel):
+    """
+    ## Description
+
+    Schema for the progress of a goal, rolled up from its sub-goals.
+
+    ## Attributes
+
+        goal_id (int): The identifier of the goal.
+
+        completed (bool): Whether the goal itself is completed.
+
+        descendants (int): The number of sub-goals, at any depth.
+
+        completed_descendants (int): The number of completed sub-goals, at any depth.
+
+        progress (float): The share of completed sub-goals, or 1.0 for a completed
+        goal without sub-goals and 0.0 for an open one.
+    """
+    goal_id: int
+    completed: bool
+    descendants: int
+    completed_descendants: int
+    progress: float
+
+class AnalyticsPeriod(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the lengths of the periods of the analytics.
+
+    ## Attributes
+
+        WEEK (str): Weeks, starting on Monday.
+
+        MONTH (str): Calendar months.
+    """
+    WEEK = "week"
+    MONTH = "month"
+
+class StatusTime(BaseModel):
+    """
+    ## Description
+
+    Schema for the time spent by goals in a status.
+
+    ## Attributes
+
+        status (GoalStatus): The status.
+
+        goals (int): The number of goals that reached the status.
+
+        total_seconds (float): The time spent by these goals in the status.
+
+        average_seconds (float): The average time spent by one of these goals in the status.
+    """
+    status: GoalStatus
+    goals: int
+    total_seconds: float
+    average_seconds: float
+
+class ClosedGoalsPeriod(BaseModel):
+    """
+    ## Description
+
+    Schema for the goals completed and abandoned over a period.
+
+    ## Attributes
+
+        period_start (date): The first day of the period.
+
+        completed (int): The number of goals completed in the period.
+
+        abandoned (int): The number of goals abandoned in the period.
+
+        completion_rate (float): The share of the goals closed in the period that were completed.
+    """
+    period_start: date
+    completed: int
+    abandoned: int
+    completion_rate: float
+
+class ExportFormat(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the formats of the goal exports.
+    """
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class ExportJobCreate(BaseModel):
+    """
+    ## Description
+
+    Schema for the submission of an export job.
+
+    ## Attributes
+
+        format (ExportFormat): The format of the file. Defaults to `csv`.
+
+        include_archived (bool): Whether to export the archived goals too. Defaults to False.
+    """
+    format: ExportFormat = ExportFormat.CSV
+    include_archived: bool = False
+
+class ArchiveJobCreate(BaseModel):
+    """
+    ## Description
+
+    Schema for the submission of an archival job.
+
+    ## Attributes
+
+        after_days (float): The number of days without update after which a closed
+        goal is archived. Defaults to 90.
+    """
+    after_days: Annotated[float, Field(ge=0)] = 90
+
+class JobRead(BaseModel):
+    """
+    ## Description
+
+    Schema for reading a background job.
+
+    ## Attributes
+
+        id (int): The unique identifier for the job.
+
+        kind (JobKind): The kind of the job.
+
+        status (JobStatus): The status of the job.
+
+        progress (int): The number of items done.
+
+        total (Optional[int]): The number of items to do, None if unknown.
+
+        result (Optional[Dict[str, Any]]): The result of the job, or its partial result
+        while it runs.
+
+        error (Optional[str]): The reason of the failure.
+
+        attempts (int): The number of times a worker started the job.
+
+        created_at (datetime): The date of the submission.
+
+        started_at (Optional[datetime]): The date of the last start.
+
+        finished_at (Optional[datetime]): The date of the end.
+    """
+    id: int
+    kind: JobKind
+    status: JobStatus
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
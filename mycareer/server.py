@@ -0,0 +1,238 @@
+"""
+server.py
+
+This module holds the settings of the application server.
+
+The settings are read from the environment, overridden by the options of
+`python -m mycareer serve`, and validated before the server starts, so a wrong
+value fails the launch with the name of the setting instead of a worker at its
+first request.
+
+The defaults are tuned for a server behind a load balancer:
+    - uvloop and httptools are used when they are installed, asyncio and h11 otherwise,
+    - idle connections are kept open longer than the 60 seconds after which the
+      common load balancers close them, so the balancer closes them first and never
+      sends a request on a connection the server is closing,
+    - on `SIGTERM` the server stops accepting connections, lets the requests in flight
+      finish for `SERVER_GRACEFUL_TIMEOUT_SECONDS`, then runs the lifespan shutdown,
+      which stops the background tasks and disposes the engine pools.
+
+Uvicorn serves HTTP/2 only through the optional `zttp` protocol. `SERVER_HTTP2`
+requires it, otherwise HTTP/2 is terminated by the proxy, which reuses a few
+keep-alive HTTP/1.1 connections to the workers.
+
+Classes:
+    ServerLoop: An enumeration representing the event loops of the server.
+    ServerHttp: An enumeration representing the HTTP/1.1 implementations of the server.
+    ServerSettings: The validated settings of the application server.
+
+Functions:
+    is_installed: Tells whether a module can be imported.
+"""
+
+import importlib.util
+import inspect
+import logging
+import os
+from enum import Enum
+from typing import Any, Dict, Optional
+import uvicorn
+from pydantic import BaseModel, Field, model_validator
+from typing_extensions import Annotated, Self
+
+# The settings read from the environment, by field.
+ENV_VARS: Dict[str, str] = {
+    "host": "HOST",
+    "port": "PORT",
+    "workers": "WEB_CONCURRENCY",
+    "loop": "SERVER_LOOP",
+    "http": "SERVER_HTTP",
+    "http2": "SERVER_HTTP2",
+    "keep_alive_seconds": "SERVER_KEEP_ALIVE_SECONDS",
+    "backlog": "SERVER_BACKLOG",
+    "graceful_timeout_seconds": "SERVER_GRACEFUL_TIMEOUT_SECONDS",
+    "h11_max_incomplete_event_size": "SERVER_H11_MAX_INCOMPLETE_EVENT_SIZE",
+    "max_requests": "SERVER_MAX_REQUESTS",
+}
+
+logger = logging.getLogger(__name__)
+
+def is_installed(module_name: str) -> bool:
+    """Tell whether a module can be imported, without importing it.
+
+    Args:
+        module_name (str): The name of the module.
+
+    Returns:
+        bool: True if the module is installed.
+    """
+    return importlib.util.find_spec(module_name) is not None
+
+class ServerLoop(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the event loops of the server.
+
+    ## Attributes
+
+        AUTO (str): uvloop when it is installed, asyncio otherwise.
+
+        UVLOOP (str): The libuv based event loop.
+
+        ASYNCIO (str): The event loop of the standard library.
+    """
+    AUTO = "auto"
+    UVLOOP = "uvloop"
+    ASYNCIO = "asyncio"
+
+class ServerHttp(str, Enum):
+    """
+    ## Description
+
+    An enumeration representing the HTTP/1.1 implementations of the server.
+
+    ## Attributes
+
+        AUTO (str): httptools when it is installed, h11 otherwise.
+
+        HTTPTOOLS (str): The parser of Node.js, in C.
+
+        H11 (str): The pure Python implementation.
+    """
+    AUTO = "auto"
+    HTTPTOOLS = "httptools"
+    H11 = "h11"
+
+class ServerSettings(BaseModel):
+    """
+    ## Description
+
+    The validated settings of the application server.
+
+    ## Attributes
+
+        host (str): The address to bind. Defaults to `127.0.0.1`.
+
+        port (int): The port to bind. Defaults to 8000.
+
+        workers (int): The number of worker processes. Defaults to 1.
+
+        loop (ServerLoop): The event loop. Defaults to `auto`.
+
+        http (ServerHttp): The HTTP/1.1 implementation. Defaults to `auto`.
+
+        http2 (bool): Whether to serve HTTP/2 too, through the `zttp` protocol.
+        Defaults to False.
+
+        keep_alive_seconds (int): The delay an idle connection is kept open. Defaults to 75.
+
+        backlog (int): The maximum number of connections waiting to be accepted.
+        Defaults to 2048.
+
+        graceful_timeout_seconds (int): The delay the requests in flight have to finish
+        on shutdown. Defaults to 30.
+
+        h11_max_incomplete_event_size (int): The maximum size in bytes of the request
+        line and headers read by h11. Defaults to 16 KiB.
+
+        max_requests (Optional[int]): The number of requests after which a worker is
+        restarted, None to never restart it. Defaults to None.
+    """
+    host: str = "127.0.0.1"
+    port: Annotated[int, Field(ge=0, le=65535)] = 8000
+    workers: Annotated[int, Field(ge=1)] = 1
+    loop: ServerLoop = ServerLoop.AUTO
+    http: ServerHttp = ServerHttp.AUTO
+    http2: bool = False
+    keep_alive_seconds: Annotated[int, Field(ge=1)] = 75
+    backlog: Annotated[int, Field(ge=1)] = 2048
+    graceful_timeout_seconds: Annotated[int, Field(ge=0)] = 30
+    h11_max_incomplete_event_size: Annotated[int, Field(ge=1024)] = 16 * 1024
+    max_requests: Optional[Annotated[int, Field(ge=1)]] = None
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> Self:
+        """Read the settings from the environment, then apply the overrides.
+
+        Args:
+            **overrides (Any): The values set on the command line, None for the
+            ones not set.
+
+        Returns:
+            ServerSettings: The settings.
+
+        Raises:
+            pydantic.ValidationError: If a value is not valid.
+        """
+        values: Dict[str, Any] = {
+            field: os.environ[name] for field, name in ENV_VARS.items() if os.environ.get(name)
+        }
+        values.update((field, value) for field, value in overrides.items() if value is not None)
+        return cls.model_validate(values)
+
+    @model_validator(mode="after")
+    def check_modules(self) -> Self:
+        """Check that the loop and the protocols asked for are installed.
+
+        Returns:
+            ServerSettings: The settings.
+
+        Raises:
+            ValueError: If a module is missing.
+        """
+        for name in (self.loop.value, self.http.value):
+            if name in (ServerLoop.UVLOOP, ServerHttp.HTTPTOOLS) and not is_installed(name):
+                raise ValueError(f"{name} is not installed")
+        if self.http2:
+            if "http2" not in inspect.signature(uvicorn.Config).parameters:
+                raise ValueError("HTTP/2 needs a version of uvicorn serving it")
+            if not is_installed("zttp"):
+                raise ValueError("HTTP/2 needs the zttp package")
+            if self.http != ServerHttp.AUTO:
+                raise ValueError("HTTP/2 uses the zttp protocol, http must be auto")
+        return self
+
+    def resolved_loop(self) -> str:
+        """Get the event loop the server runs.
+
+        Returns:
+            str: `uvloop` or `asyncio`.
+        """
+        if self.loop == ServerLoop.AUTO:
+            return ServerLoop.UVLOOP.value if is_installed("uvloop") else ServerLoop.ASYNCIO.value
+        return self.loop.value
+
+    def resolved_http(self) -> str:
+        """Get the HTTP implementation the server runs.
+
+        Returns:
+            str: `zttp` for HTTP/2, `httptools` or `h11`.
+        """
+        if self.http2:
+            return "zttp"
+        if self.http == ServerHttp.AUTO:
+            return ServerHttp.HTTPTOOLS.value if is_installed("httptools") else ServerHttp.H11.value
+        return self.http.value
+
+    def uvicorn_options(self) -> Dict[str, Any]:
+        """Get the options of `uvicorn.run` matching the settings.
+
+        Returns:
+            Dict[str, Any]: The options.
+        """
+        options: Dict[str, Any] = {
+            "host": self.host,
+            "port": self.port,
+            "workers": self.workers,
+            "loop": self.resolved_loop(),
+            "http": self.resolved_http(),
+            "timeout_keep_alive": self.keep_alive_seconds,
+            "backlog": self.backlog,
+            "timeout_graceful_shutdown": self.graceful_timeout_seconds,
+            "h11_max_incomplete_event_size": self.h11_max_incomplete_event_size,
+            "limit_max_requests": self.max_requests,
+        }
+        if self.http2:
+            options["http2"] = True
+        return options
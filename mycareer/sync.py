@@ -0,0 +1,119 @@
+"""
+sync.py
+
+This module provides the change sequence used by the incremental sync of goals.
+
+Every insert, update and deletion of a goal is stamped with a value taken from
+the counter row of its tenant. The row is locked by the update until the
+transaction commits, so the values of a tenant become visible in increasing
+order and a client asking for the changes after the last value it has seen
+never misses one. The tenants do not contend on a shared counter.
+
+Functions:
+    goal_sequence: Gets the name of the goal change sequence of a tenant.
+    next_change_seq: Allocates the next values of a change sequence.
+    record_tombstone: Records the deletion of a goal.
+    get_changes_since: Gets the goals and the tombstones of a tenant changed after a value.
+"""
+
+from typing import List, Tuple
+from sqlalchemy import update
+from sqlmodel import Session, select
+from mycareer.models import ChangeSequence, Goal, GoalTombstone
+from mycareer.queries import select_goals_changed_since, select_tombstones_since
+
+GOAL_SEQUENCE: str = "goal"
+
+def goal_sequence(tenant_id: str) -> str:
+    """Get the name of the goal change sequence of a tenant.
+
+    Args:
+        tenant_id (str): The ID of the tenant.
+
+    Returns:
+        str: The name of the sequence.
+    """
+    return f"{GOAL_SEQUENCE}:{tenant_id}"
+
+def next_change_seq(session: Session, name: str, count: int = 1) -> int:
+    """Allocate the next values of a change sequence.
+
+    The counter is incremented in the session's transaction, so the values are
+    only published when the caller commits.
+
+    Args:
+        session (Session): The database session.
+        name (str): The name of the sequence.
+        count (int): The number of values to allocate. Defaults to 1.
+
+    Returns:
+        int: The last allocated value, the first one being `count - 1` lower.
+    """
+    result = session.execute(
+        update(ChangeSequence)
+        .where(ChangeSequence.name == name)
+        .values(value=ChangeSequence.value + count)
+    )
+    if result.rowcount == 0:
+        session.add(ChangeSequence(name=name, value=count))
+        session.flush()
+        return count
+    return session.exec(
+        select(ChangeSequence.value).where(ChangeSequence.name == name)
+    ).one()
+
+def record_tombstone(session: Session, tenant_id: str, goal_id: int) -> GoalTombstone:
+    """Record the deletion of a goal.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant owning the goal.
+        goal_id (int): The identifier of the deleted goal.
+
+    Returns:
+        GoalTombstone: The tombstone added to the session.
+    """
+    tombstone = GoalTombstone(
+        tenant_id=tenant_id, goal_id=goal_id,
+        change_seq=next_change_seq(session, goal_sequence(tenant_id)),
+    )
+    session.add(tombstone)
+    return tombstone
+
+def get_changes_since(
+    session: Session, tenant_id: str, since: int, limit: int
+) -> Tuple[List[Goal], List[GoalTombstone], int, bool]:
+    """Get the goals and the tombstones of a tenant changed after a sequence value.
+
+    Both tables are read through their tenant and change sequence index, so the
+    cost is proportional to the number of changes and not to the size of the table.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        since (int): The last sequence value known by the client.
+        limit (int): The maximum number of changes to return.
+
+    Returns:
+        Tuple[List[Goal], List[GoalTombstone], int, bool]: The changed goals,
+        the tombstones, the sequence value to resume from and whether more
+        changes are pending.
+    """
+    goals = session.execute(
+        select_goals_changed_since(tenant_id, since, limit + 1)
+    ).scalars().all()
+    tombstones = session.execute(
+        select_tombstones_since(tenant_id, since, limit + 1)
+    ).scalars().all()
+
+    changes = sorted([*goals, *tombstones], key=lambda change: change.change_seq)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    next_since = changes[-1].change_seq if changes else since
+
+    return (
+        [change for change in changes if isinstance(change, Goal)],
+        [change for change in changes if isinstance(change, GoalTombstone)],
+        next_since,
+        has_more,
+    )
@@ -0,0 +1,51 @@
+"""
+tenancy.py
+
+This module resolves the tenant a request acts for.
+
+Every goal belongs to a tenant, and every query on goals is scoped to the tenant
+of the request, read from the `X-Tenant-ID` header. The header is trusted: it is
+expected to be set by the gateway authenticating the caller, not by the caller.
+Requests without the header act for `DEFAULT_TENANT_ID`, or are rejected when
+it is empty.
+
+The indexes of the goal table lead with the tenant ID, so the queries of a
+tenant only read the index entries of that tenant.
+
+Functions:
+    get_tenant_id: Dependency resolving the tenant ID of a request.
+"""
+
+import os
+import re
+from typing import Annotated, Optional
+from fastapi import Depends, Header, HTTPException
+from mycareer.models import DEFAULT_TENANT_ID
+
+TENANT_HEADER: str = "X-Tenant-ID"
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+
+default_tenant_id: str = os.getenv("DEFAULT_TENANT_ID", DEFAULT_TENANT_ID)
+
+def get_tenant_id(
+    x_tenant_id: Annotated[Optional[str], Header(alias=TENANT_HEADER)] = None,
+) -> str:
+    """Resolve the tenant ID of a request.
+
+    Args:
+        x_tenant_id (Optional[str]): The value of the `X-Tenant-ID` header.
+
+    Returns:
+        str: The tenant ID, `DEFAULT_TENANT_ID` when the header is missing.
+
+    Raises:
+        HTTPException: If the header is missing without a default tenant, or is invalid.
+    """
+    tenant_id = x_tenant_id if x_tenant_id is not None else default_tenant_id
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail=f"Missing {TENANT_HEADER} header")
+    if not TENANT_ID_PATTERN.fullmatch(tenant_id):
+        raise HTTPException(status_code=400, detail=f"Invalid {TENANT_HEADER} header")
+    return tenant_id
+
+TenantDep = Annotated[str, Depends(get_tenant_id)]
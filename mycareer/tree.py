@@ -0,0 +1,108 @@
+"""
+tree.py
+
+This module maintains the hierarchy of goals and sub-goals.
+
+A goal points to its parent with `parent_id`. The subtree of a goal, and the
+ancestors of a goal, are read in one query each with a recursive CTE walking
+the `parent_id` index, so a tree is never fetched one level or one goal at a time.
+
+Functions:
+    check_parent: Checks that a goal can be moved under a parent.
+    get_goal_progress: Rolls up the progress of a goal from its subtree.
+    reparent_children: Moves the sub-goals of a goal to another parent.
+"""
+
+from typing import List, Optional
+from sqlmodel import Session
+from mycareer.models import Goal
+from mycareer.queries import (
+    MAX_TREE_DEPTH, select_archived_goal_by_id, select_goal_ancestor_ids, select_goal_children,
+    select_goal_progress,
+)
+from mycareer.schemas import GoalProgress
+from mycareer.sync import goal_sequence, next_change_seq
+
+def check_parent(
+    session: Session, tenant_id: str, parent_id: Optional[int], goal_id: Optional[int] = None
+) -> None:
+    """Check that a goal can be moved under a parent.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        parent_id (Optional[int]): The ID of the parent goal, None for a root goal.
+        goal_id (Optional[int]): The ID of the goal, None for a new goal.
+
+    Raises:
+        ValueError: If the parent does not exist, is the goal or one of its
+        sub-goals, or is `MAX_TREE_DEPTH` levels deep.
+    """
+    if parent_id is None:
+        return
+    ancestor_ids = session.execute(select_goal_ancestor_ids(tenant_id, parent_id)).scalars().all()
+    if not ancestor_ids:
+        archived_parent = session.execute(
+            select_archived_goal_by_id(tenant_id, parent_id)
+        ).scalar_one_or_none()
+        if archived_parent is None:
+            raise ValueError("Parent goal not found")
+    if goal_id is not None and goal_id in ancestor_ids:
+        raise ValueError("A goal cannot be a sub-goal of itself or of its sub-goals")
+    if len(ancestor_ids) > MAX_TREE_DEPTH:
+        raise ValueError(f"Goals cannot be nested more than {MAX_TREE_DEPTH} levels deep")
+
+def get_goal_progress(session: Session, tenant_id: str, goal_id: int) -> Optional[GoalProgress]:
+    """Roll up the progress of a goal from its subtree, in one query.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the goal.
+
+    Returns:
+        Optional[GoalProgress]: The progress, or None if the goal does not exist.
+    """
+    nodes, root_completed, descendants, completed = session.execute(
+        select_goal_progress(tenant_id, goal_id)
+    ).one()
+    if not nodes:
+        return None
+    if descendants:
+        progress = completed / descendants
+    else:
+        progress = 1.0 if root_completed else 0.0
+    return GoalProgress(
+        goal_id=goal_id,
+        completed=bool(root_completed),
+        descendants=descendants,
+        completed_descendants=completed,
+        progress=progress,
+    )
+
+def reparent_children(
+    session: Session, tenant_id: str, goal_id: int, parent_id: Optional[int]
+) -> List[int]:
+    """Move the sub-goals of a goal to another parent, in the session's transaction.
+
+    Every moved goal gets a new change sequence value, so the sync clients see the move.
+
+    Args:
+        session (Session): The database session.
+        tenant_id (str): The ID of the tenant.
+        goal_id (int): The ID of the current parent.
+        parent_id (Optional[int]): The ID of the new parent, None to make them root goals.
+
+    Returns:
+        List[int]: The IDs of the moved goals.
+    """
+    children: List[Goal] = session.execute(
+        select_goal_children(tenant_id, goal_id)
+    ).scalars().all()
+    if not children:
+        return []
+    last_seq = next_change_seq(session, goal_sequence(tenant_id), count=len(children))
+    for offset, child in enumerate(children):
+        child.parent_id = parent_id
+        child.change_seq = last_seq - len(children) + 1 + offset
+    return [child.id for child in children]
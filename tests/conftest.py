@@ -0,0 +1,62 @@
+"""
+conftest.py
+
+This module contains the fixtures shared by the test modules. A module seeding the
+database overrides `session` or `client` with a fixture of the same name, which
+requests the shared one.
+
+Fixtures:
+    session_fixture: Creates a database session on a fresh schema.
+    client_fixture: Creates a TestClient for the FastAPI app on a fresh schema.
+    job_dir_fixture: Keeps the files of the jobs in a temporary directory.
+"""
+
+from pathlib import Path
+from typing import Generator
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+from mycareer import jobs
+from mycareer.database import get_engine
+from mycareer.main import app
+
+@pytest.fixture(name="session")
+def session_fixture() -> Generator[Session, None, None]:
+    """Fixture to create a database session on a fresh schema.
+
+    Yields:
+        Session: The database session.
+    """
+    SQLModel.metadata.create_all(get_engine())
+    with Session(get_engine()) as session:
+        yield session
+    SQLModel.metadata.drop_all(get_engine())
+
+@pytest.fixture(name="client")
+def client_fixture() -> Generator[TestClient, None, None]:
+    """Fixture to create a TestClient for the FastAPI app.
+
+    This fixture sets up the database, creates a TestClient for the FastAPI app,
+    and tears down the database after the test.
+
+    Yields:
+        TestClient: The test client for making requests to the FastAPI app.
+    """
+    SQLModel.metadata.create_all(get_engine())
+    with TestClient(app) as client:
+        yield client
+    SQLModel.metadata.drop_all(get_engine())
+
+@pytest.fixture(name="job_dir")
+def job_dir_fixture(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Fixture to keep the files of the jobs in a temporary directory.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the directory of the jobs.
+
+    Returns:
+        Path: The directory of the jobs.
+    """
+    monkeypatch.setattr(jobs, "job_dir", str(tmp_path))
+    return tmp_path
@@ -0,0 +1,101 @@
+"""
+test_admin_profiling.py
+
+This module contains tests for the API endpoints defined in admin_profiling.py.
+
+Fixtures:
+    client_fixture: Enables the diagnostics for the TestClient of the FastAPI app.
+
+Functions:
+    test_profiling_disabled: Tests that the endpoints are hidden without a token.
+    test_profiling_token: Tests that the endpoints require the admin token.
+    test_tracemalloc: Tests the tracemalloc endpoints.
+    test_gc_and_sessions: Tests the garbage collector and session endpoints.
+"""
+
+from typing import Generator
+import pytest
+from fastapi.testclient import TestClient
+from mycareer import profiling
+from mycareer.main import app
+
+HEADERS = {"X-Admin-Token": "secret"}
+
+@pytest.fixture(name="client")
+def client_fixture(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> Generator[TestClient, None, None]:
+    """Fixture to enable the diagnostics for the TestClient of the FastAPI app.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the admin token.
+
+    Yields:
+        TestClient: The test client for making requests to the FastAPI app.
+    """
+    monkeypatch.setattr(profiling, "profiling_token", "secret")
+    yield client
+    profiling.allocation_tracker.stop()
+
+def test_profiling_disabled() -> None:
+    """Test that the endpoints answer 404 without `PROFILING_TOKEN`, whatever the header."""
+    with TestClient(app) as client:
+        for path in ("/admin/profiling/tracemalloc", "/admin/profiling/gc"):
+            assert client.get(path, headers=HEADERS).status_code == 404
+        assert client.post("/admin/profiling/tracemalloc/start").status_code == 404
+    assert profiling.allocation_tracker.status()["tracing"] is False
+
+def test_profiling_token(client: TestClient) -> None:
+    """Test that the endpoints answer 403 without the admin token or with another one.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    assert client.get("/admin/profiling/gc").status_code == 403
+    response = client.get("/admin/profiling/gc", headers={"X-Admin-Token": "guess"})
+    assert response.status_code == 403
+    assert client.get("/admin/profiling/gc", headers=HEADERS).status_code == 200
+
+def test_tracemalloc(client: TestClient) -> None:
+    """Test the tracemalloc endpoints, from the start to the stop.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post("/admin/profiling/tracemalloc/snapshot", headers=HEADERS)
+    assert response.status_code == 409
+
+    response = client.post("/admin/profiling/tracemalloc/start?frames=3", headers=HEADERS)
+    assert response.status_code == 200
+    assert (response.json()["tracing"], response.json()["frames"]) == (True, 3)
+    status = client.get("/admin/profiling/tracemalloc", headers=HEADERS).json()
+    assert status["tracing"] and status["overhead_bytes"] > 0
+
+    client.post("/v1/goals", json={"name": "First Goal"})
+    response = client.post(
+        "/admin/profiling/tracemalloc/snapshot?limit=5&key_type=filename", headers=HEADERS
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert set(response.json()[0]) == {"site", "size", "size_diff", "count", "count_diff"}
+
+    response = client.post(
+        "/admin/profiling/tracemalloc/snapshot?key_type=module", headers=HEADERS
+    )
+    assert response.status_code == 422
+
+    response = client.post("/admin/profiling/tracemalloc/stop", headers=HEADERS)
+    assert response.json()["tracing"] is False
+
+def test_gc_and_sessions(client: TestClient) -> None:
+    """Test the garbage collector and session endpoints.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    generations = client.get("/admin/profiling/gc", headers=HEADERS).json()["generations"]
+    assert len(generations) == 3
+    sessions = client.get("/admin/profiling/sessions?limit=1", headers=HEADERS).json()
+    assert set(sessions) == {"sessions", "objects", "largest"}
+    assert len(sessions["largest"]) <= 1
@@ -0,0 +1,189 @@
+"""
+test_archive.py
+
+This module contains tests for the archival of goals defined in mycareer.archive.
+
+Functions:
+    add_goal: Adds a goal last updated a number of days ago.
+    test_archive_goals: Tests the archive_goals function.
+    test_archive_goals_of_tenant: Tests the archival of the goals of one tenant.
+    test_archive_goals_interrupted: Tests that the batches archived before a failure are published.
+    test_restore_goal: Tests the restore_goal function.
+    test_run_archival: Tests the run_archival coroutine.
+    test_purge_deleted_goals: Tests the purge_deleted_goals function.
+    test_goal_ids_not_reused: Tests that the IDs of archived and purged goals are not given again.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import Session, select
+from mycareer import archive
+from mycareer.archive import archive_goals, purge_deleted_goals, restore_goal, run_archival
+from mycareer.models import Goal, GoalArchive, GoalStatus
+
+def add_goal(session: Session, name: str, status: GoalStatus, days_ago: int) -> Goal:
+    """Add a goal last updated a number of days ago.
+
+    Args:
+        session (Session): The database session.
+        name (str): The name of the goal.
+        status (GoalStatus): The status of the goal.
+        days_ago (int): The number of days since the last update.
+
+    Returns:
+        Goal: The goal.
+    """
+    goal = Goal(name=name, status=status, updated_at=datetime.utcnow() - timedelta(days=days_ago))
+    session.add(goal)
+    session.commit()
+    return goal
+
+def test_archive_goals(session: Session) -> None:
+    """Test the archive_goals function.
+
+    This test checks if only the goals in a terminal status older than the
+    threshold are moved, keeping their ID and fields, across several batches.
+
+    Args:
+        session (Session): The database session.
+    """
+    for index in range(3):
+        add_goal(session, f"Completed {index}", GoalStatus.COMPLETED, 100)
+    add_goal(session, "Abandoned", GoalStatus.ABANDONED, 100)
+    add_goal(session, "Recent", GoalStatus.COMPLETED, 1)
+    add_goal(session, "In progress", GoalStatus.IN_PROGRESS, 100)
+    deleted = add_goal(session, "Deleted", GoalStatus.COMPLETED, 100)
+    deleted.deleted_at = datetime.utcnow()
+    session.commit()
+
+    assert archive_goals(session, datetime.utcnow() - timedelta(days=90), batch_size=2) == 4
+
+    remaining = session.exec(select(Goal.name).order_by(Goal.id)).all()
+    assert remaining == ["Recent", "In progress", "Deleted"]
+    archived = session.exec(select(GoalArchive).order_by(GoalArchive.id)).all()
+    assert [goal.id for goal in archived] == [1, 2, 3, 4]
+    assert archived[3].name == "Abandoned"
+    assert archived[3].status == GoalStatus.ABANDONED
+    assert archive_goals(session, datetime.utcnow() - timedelta(days=90)) == 0
+
+def test_archive_goals_of_tenant(session: Session) -> None:
+    """Test the archival of the goals of one tenant, with its progress reports.
+
+    Args:
+        session (Session): The database session.
+    """
+    for index in range(3):
+        add_goal(session, f"Completed {index}", GoalStatus.COMPLETED, 100)
+    other = add_goal(session, "Other tenant", GoalStatus.COMPLETED, 100)
+    other.tenant_id = "acme"
+    session.commit()
+
+    progress = []
+    archived = archive_goals(session, datetime.utcnow() - timedelta(days=90), batch_size=2,
+                             tenant_id="default", on_progress=progress.append)
+    assert archived == 3
+    assert progress == [2, 3]
+    assert session.exec(select(Goal.name)).all() == ["Other tenant"]
+
+def test_archive_goals_interrupted(session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the batches archived before a failure are published to the invalidation bus.
+
+    Args:
+        session (Session): The database session.
+        monkeypatch (pytest.MonkeyPatch): The fixture to record the published messages.
+    """
+    for index in range(3):
+        add_goal(session, f"Completed {index}", GoalStatus.COMPLETED, 100)
+    published = []
+    monkeypatch.setattr(archive.invalidation_bus, "publish", published.append)
+
+    def interrupt(archived: int) -> None:
+        raise RuntimeError(f"Interrupted after {archived} goals")
+
+    with pytest.raises(RuntimeError):
+        archive_goals(session, datetime.utcnow() - timedelta(days=90), batch_size=2,
+                      on_progress=interrupt)
+    assert len(session.exec(select(GoalArchive)).all()) == 2
+    assert published == [[None]]
+
+def test_restore_goal(session: Session) -> None:
+    """Test the restore_goal function.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Completed", GoalStatus.COMPLETED, 100)
+    archive_goals(session, datetime.utcnow() - timedelta(days=90))
+
+    assert restore_goal(session, "acme", 1) is None
+    goal = restore_goal(session, "default", 1)
+    session.commit()
+    assert goal.id == 1
+    assert goal.name == "Completed"
+    assert session.get(GoalArchive, 1) is None
+    assert restore_goal(session, "default", 1) is None
+
+def test_run_archival(session: Session) -> None:
+    """Test the run_archival coroutine.
+
+    This test checks if the goals are archived by the periodic task and if it
+    stops when cancelled.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Completed", GoalStatus.COMPLETED, 100)
+
+    async def run() -> None:
+        task = asyncio.create_task(run_archival(interval=0.01, after_days=90))
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if session.get(GoalArchive, 1, populate_existing=True) is not None:
+                break
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert session.get(GoalArchive, 1) is not None
+
+def test_purge_deleted_goals(session: Session) -> None:
+    """Test the purge_deleted_goals function.
+
+    This test checks if only the goals deleted before the date are purged,
+    across several batches.
+
+    Args:
+        session (Session): The database session.
+    """
+    for index, days_ago in enumerate((40, 40, 40, 1)):
+        goal = add_goal(session, f"Deleted {index}", GoalStatus.IN_PROGRESS, days_ago)
+        goal.deleted_at = datetime.utcnow() - timedelta(days=days_ago)
+    add_goal(session, "Live", GoalStatus.IN_PROGRESS, 40)
+    session.commit()
+
+    assert purge_deleted_goals(session, datetime.utcnow() - timedelta(days=30), batch_size=2) == 3
+    assert session.exec(select(Goal.name).order_by(Goal.id)).all() == ["Deleted 3", "Live"]
+
+def test_goal_ids_not_reused(session: Session) -> None:
+    """Test that the ID of the last goal is not given again once it is archived or
+    purged, so that the archived goal can still be restored.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Open", GoalStatus.IN_PROGRESS, 100)
+    add_goal(session, "Closed", GoalStatus.COMPLETED, 100)
+    assert archive_goals(session, datetime.utcnow() - timedelta(days=90)) == 1
+    created = add_goal(session, "Created", GoalStatus.TO_REFINE, 0)
+    assert created.id == 3
+
+    created.deleted_at = datetime.utcnow() - timedelta(days=60)
+    session.commit()
+    assert purge_deleted_goals(session, datetime.utcnow() - timedelta(days=30)) == 1
+    assert add_goal(session, "Latest", GoalStatus.TO_REFINE, 0).id == 4
+
+    assert restore_goal(session, "default", 2).name == "Closed"
+    session.commit()
+    assert session.exec(select(Goal.id).order_by(Goal.id)).all() == [1, 2, 4]
@@ -0,0 +1,59 @@
+"""
+test_cache.py
+
+This module contains tests for the goal cache defined in mycareer.cache.
+
+Functions:
+    test_disabled_cache: Tests a GoalCache with a size of 0.
+    test_lru_eviction: Tests the eviction of the least recently used goal.
+    test_invalidate: Tests the invalidate method.
+    test_other_tenant: Tests that a goal is only served to its tenant.
+"""
+
+from mycareer.cache import GoalCache
+
+def test_disabled_cache() -> None:
+    """Test a GoalCache with a size of 0.
+
+    This test checks if a disabled cache keeps nothing.
+    """
+    cache = GoalCache(0)
+    cache.set("default", 1, {"id": 1})
+    assert not cache.enabled
+    assert cache.get("default", 1) is None
+
+def test_lru_eviction() -> None:
+    """Test the eviction of the least recently used goal."""
+    cache = GoalCache(2)
+    cache.set("default", 1, {"id": 1})
+    cache.set("default", 2, {"id": 2})
+    cache.get("default", 1)
+    cache.set("default", 3, {"id": 3})
+
+    assert cache.get("default", 1) == {"id": 1}
+    assert cache.get("default", 2) is None
+    assert cache.get("default", 3) == {"id": 3}
+
+def test_invalidate() -> None:
+    """Test the invalidate method.
+
+    This test checks if a goal ID removes one goal and None removes all goals.
+    """
+    cache = GoalCache(10)
+    cache.set("default", 1, {"id": 1})
+    cache.set("default", 2, {"id": 2})
+
+    cache.invalidate(1)
+    assert cache.get("default", 1) is None
+    assert len(cache) == 1
+
+    cache.invalidate(None)
+    assert len(cache) == 0
+
+def test_other_tenant() -> None:
+    """Test that a goal is only served to its tenant."""
+    cache = GoalCache(10)
+    cache.set("acme", 1, {"id": 1})
+
+    assert cache.get("acme", 1) == {"id": 1}
+    assert cache.get("globex", 1) is None
@@ -0,0 +1,136 @@
+"""
+test_cli.py
+
+This module contains tests for the command line interface defined in mycareer.cli.
+
+Functions:
+    test_default_workers: Tests the default_workers function.
+    test_serve_arguments: Tests the parsing of the serve command.
+    test_serve: Tests the serve command.
+    test_import_goals_file: Tests the import-goals command.
+    test_archive_goals: Tests the archive-goals command.
+    test_generate_goals: Tests the generate-goals command.
+"""
+
+import json
+import pytest
+import uvicorn
+from sqlmodel import Session, SQLModel, func, select
+from mycareer import datagen
+from mycareer.cli import build_parser, default_workers, main, serve
+from mycareer.database import get_engine
+from mycareer.models import Goal, GoalArchive, GoalStatus
+
+def test_default_workers(monkeypatch) -> None:
+    """Test the default_workers function.
+
+    This test checks if there is at least one worker and if `WEB_CONCURRENCY`
+    overrides the value.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert default_workers() >= 1
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert default_workers() == 3
+
+def test_serve_arguments() -> None:
+    """Test the parsing of the serve command."""
+    args = build_parser().parse_args(["serve", "--port", "9000", "--workers", "4"])
+    assert args.handler is serve
+    assert args.port == 9000
+    assert args.workers == 4
+    assert args.keep_alive_seconds is None
+
+def test_serve(monkeypatch) -> None:
+    """Test the serve command.
+
+    This test checks if the validated settings of the environment and the command
+    line are passed to uvicorn, and if an invalid setting fails the launch.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    runs = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **options: runs.append((app, options)))
+    monkeypatch.setenv("SERVER_BACKLOG", "512")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    main(["serve", "--keep-alive", "90", "--http", "h11"])
+    app, options = runs[0]
+    assert app == "mycareer.main:app"
+    assert (options["workers"], options["backlog"]) == (3, 512)
+    assert (options["timeout_keep_alive"], options["http"]) == (90, "h11")
+
+    monkeypatch.setenv("SERVER_BACKLOG", "0")
+    with pytest.raises(SystemExit) as error:
+        main(["serve"])
+    assert "backlog" in str(error.value)
+    assert len(runs) == 1
+
+def test_import_goals_file(tmp_path, capsys) -> None:
+    """Test the import-goals command.
+
+    This test checks if the format is taken from the extension of the file, if
+    the goals are imported for the given tenant and if the report is printed as JSON.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+        capsys (CaptureFixture): The pytest output capture fixture.
+    """
+    path = tmp_path / "goals.csv"
+    path.write_text("name,status\nFirst Goal,blocked\nSecond Goal,unknown\n", encoding="utf-8")
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        main(["import-goals", str(path), "--tenant", "acme"])
+        with Session(get_engine()) as session:
+            goals = session.exec(select(Goal)).all()
+            assert [(goal.tenant_id, goal.name) for goal in goals] == [("acme", "First Goal")]
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["imported"] == 1
+    assert report["rejections"][0]["line"] == 3
+
+def test_archive_goals(capsys) -> None:
+    """Test the archive-goals command.
+
+    Args:
+        capsys (CaptureFixture): The pytest output capture fixture.
+    """
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        with Session(get_engine()) as session:
+            session.add(Goal(name="First Goal", status=GoalStatus.COMPLETED))
+            session.commit()
+        main(["archive-goals", "--after-days", "-1"])
+        with Session(get_engine()) as session:
+            assert session.get(GoalArchive, 1).name == "First Goal"
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+
+    assert capsys.readouterr().out == "Archived 1 goals\n"
+
+def test_generate_goals(tmp_path, monkeypatch, capsys) -> None:
+    """Test the generate-goals command, loading into the database and into a snapshot.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the snapshot cache directory.
+        capsys (CaptureFixture): The pytest output capture fixture.
+    """
+    monkeypatch.setattr(datagen, "datagen_cache_dir", str(tmp_path))
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        main(["generate-goals", "--goals", "20", "--tenants", "default,acme"])
+        with Session(get_engine()) as session:
+            assert session.exec(select(func.count()).select_from(Goal)).one() == 20
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+    assert capsys.readouterr().out == "Generated 20 goals from ID 1\n"
+
+    main(["generate-goals", "--goals", "20", "--seed", "1", "--snapshot"])
+    path = capsys.readouterr().out.strip()
+    assert path == str(datagen.snapshot_path(20, 1, ["default"]))
+    assert (tmp_path / path.rsplit("/", 1)[1]).exists()
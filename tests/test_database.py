@@ -4,12 +4,46 @@ test_database.py
 This module contains tests for the database connection and session management
 defined in mycareer.database.
 
+Fixtures:
+    replicas_fixture: Creates two replica engines on SQLite files.
+
 Functions:
     test_get_session: Tests the get_session function.
+    test_replica_router_round_robin: Tests the ReplicaRouter class with the round robin strategy.
+    test_replica_router_least_connections: Tests the ReplicaRouter class with the least
+        connections strategy.
+    test_replica_router_with_bad_arguments: Tests the ReplicaRouter class with bad arguments.
+    test_read_your_writes: Tests that a client reads from the primary after a write.
 """
 
-from sqlmodel import Session
-from mycareer.database import get_session
+from typing import Generator, List
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel, create_engine
+from mycareer import database
+from mycareer.database import ReplicaRouter, get_engine, get_session
+from mycareer.main import app
+
+@pytest.fixture(name="replicas")
+def replicas_fixture(tmp_path) -> Generator[List[Engine], None, None]:
+    """Fixture to create two replica engines on SQLite files.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+
+    Yields:
+        List[Engine]: The replica engines, with an empty schema.
+    """
+    replicas = [
+        create_engine(f"sqlite:///{tmp_path / name}", connect_args={"check_same_thread": False})
+        for name in ("replica_1.db", "replica_2.db")
+    ]
+    for replica in replicas:
+        SQLModel.metadata.create_all(replica)
+    yield replicas
+    for replica in replicas:
+        replica.dispose()
 
 def test_get_session() -> None:
     """Test the get_session function.
@@ -23,3 +57,60 @@ def test_get_session() -> None:
     session = next(session_generator)
     assert isinstance(session, Session)
     session.close()
+
+def test_replica_router_round_robin(replicas: List[Engine]) -> None:
+    """Test the ReplicaRouter class with the round robin strategy.
+
+    Args:
+        replicas (List[Engine]): The replica engines.
+    """
+    router = ReplicaRouter(replicas)
+    assert [router.choose() for _ in range(4)] == [*replicas, *replicas]
+
+def test_replica_router_least_connections(replicas: List[Engine]) -> None:
+    """Test the ReplicaRouter class with the least connections strategy.
+
+    This test checks if the replica with a checked out connection is avoided.
+
+    Args:
+        replicas (List[Engine]): The replica engines.
+    """
+    router = ReplicaRouter(replicas, "least_connections")
+    with replicas[0].connect():
+        assert router.choose() is replicas[1]
+    with replicas[1].connect():
+        assert router.choose() is replicas[0]
+
+def test_replica_router_with_bad_arguments(replicas: List[Engine]) -> None:
+    """Test the ReplicaRouter class with bad arguments.
+
+    Args:
+        replicas (List[Engine]): The replica engines.
+    """
+    with pytest.raises(ValueError):
+        ReplicaRouter([])
+    with pytest.raises(ValueError):
+        ReplicaRouter(replicas, "random")
+
+def test_read_your_writes(replicas: List[Engine], monkeypatch) -> None:
+    """Test that a client reads from the primary after a write.
+
+    The replicas are empty and never catch up, so a goal is only visible
+    when the read is served by the primary.
+
+    Args:
+        replicas (List[Engine]): The replica engines.
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    router = ReplicaRouter(replicas)
+    monkeypatch.setattr(database, "get_replica_router", lambda: router)
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        with TestClient(app) as writer:
+            writer.post("/v1/goals", json={"name": "New Goal"})
+            assert len(writer.get("/v1/goals").json()) == 1
+
+        with TestClient(app) as reader:
+            assert reader.get("/v1/goals").json() == []
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
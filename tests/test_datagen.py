@@ -0,0 +1,125 @@
+"""
+test_datagen.py
+
+This module contains tests for the data generator defined in mycareer.datagen.
+
+Fixtures:
+    cache_dir_fixture: Points the snapshot cache to a temporary directory.
+
+Functions:
+    test_generate_goals_is_deterministic: Tests that a seed always gives the same goals.
+    test_generate_goals_distributions: Tests the distributions of the generated goals.
+    test_load_goals: Tests the load_goals function.
+    test_snapshots: Tests the get_snapshot and restore_snapshot functions.
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Generator
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, SQLModel, select
+from mycareer import datagen
+from mycareer.database import get_engine
+from mycareer.datagen import generate_goals, get_snapshot, load_goals, restore_snapshot
+from mycareer.models import ChangeSequence, Goal, GoalStatus, GoalStatusEvent, GoalTombstone
+
+TENANTS = ("default", "acme")
+
+@pytest.fixture(name="cache_dir")
+def cache_dir_fixture(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Generator[Path, None, None]:
+    """Fixture to point the snapshot cache to a temporary directory.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the cache directory.
+
+    Yields:
+        Path: The cache directory.
+    """
+    monkeypatch.setattr(datagen, "datagen_cache_dir", str(tmp_path / "cache"))
+    yield tmp_path / "cache"
+
+def test_generate_goals_is_deterministic() -> None:
+    """Test that a seed always gives the same goals, and another seed other goals."""
+    assert list(generate_goals(100, seed=1)) == list(generate_goals(100, seed=1))
+    assert list(generate_goals(100, seed=1)) != list(generate_goals(100, seed=2))
+    assert [goal["id"] for goal in generate_goals(3, first_id=10)] == [10, 11, 12]
+
+def test_generate_goals_distributions() -> None:
+    """Test the distributions of the generated goals.
+
+    This test checks if every status appears near its weight, if the tenants are
+    skewed, if some due dates and descriptions are null and the lengths of the
+    others vary, and if the sub-goals point to earlier goals of their tenant.
+    """
+    goals = list(generate_goals(10_000, tenants=TENANTS))
+    statuses = Counter(goal["status"] for goal in goals)
+    total = sum(datagen.STATUS_WEIGHTS.values())
+    for status, weight in datagen.STATUS_WEIGHTS.items():
+        assert statuses[status] / len(goals) == pytest.approx(weight / total, abs=0.02)
+
+    tenants = Counter(goal["tenant_id"] for goal in goals)
+    assert tenants["default"] > tenants["acme"] > 0
+    assert 0.25 < sum(goal["due_date"] is None for goal in goals) / len(goals) < 0.4
+    lengths = [len(goal["description"]) for goal in goals if goal["description"]]
+    assert 0.7 < len(lengths) / len(goals) < 0.8
+    assert min(lengths) < 20 and max(lengths) > 500
+
+    by_id = {goal["id"]: goal for goal in goals}
+    sub_goals = [goal for goal in goals if goal["parent_id"] is not None]
+    assert 0.35 < len(sub_goals) / len(goals) < 0.45
+    assert all(goal["parent_id"] < goal["id"] for goal in sub_goals)
+    assert all(by_id[goal["parent_id"]]["tenant_id"] == goal["tenant_id"] for goal in sub_goals)
+
+def test_load_goals() -> None:
+    """Test the load_goals function.
+
+    This test checks if the goals get their history, their tombstones and the
+    values of the change sequences of their tenants, and if a second load
+    follows the IDs of the first one.
+    """
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        with Session(get_engine()) as session:
+            assert load_goals(session, 500, tenants=TENANTS, chunk_size=100) == 1
+            assert load_goals(session, 10, seed=1, tenants=TENANTS) == 501
+
+            goals = session.exec(select(Goal)).all()
+            assert len(goals) == 510
+            for tenant_id in TENANTS:
+                seqs = sorted(goal.change_seq for goal in goals if goal.tenant_id == tenant_id)
+                assert seqs == list(range(1, len(seqs) + 1))
+                assert session.get(ChangeSequence, f"goal:{tenant_id}").value == len(seqs)
+
+            events = session.exec(select(func.count()).select_from(GoalStatusEvent)).one()
+            refined = sum(goal.status == GoalStatus.TO_REFINE for goal in goals)
+            assert events == 2 * len(goals) - refined
+            tombstones = session.exec(select(GoalTombstone.goal_id)).all()
+            assert sorted(tombstones) == [goal.id for goal in goals if goal.deleted_at]
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+
+def test_snapshots(cache_dir: Path) -> None:
+    """Test that a snapshot is generated once, then restored into the database.
+
+    Args:
+        cache_dir (Path): The cache directory.
+    """
+    path = get_snapshot(300, seed=3)
+    assert path.parent == cache_dir
+    modified = path.stat().st_mtime_ns
+    assert get_snapshot(300, seed=3) == path
+    assert path.stat().st_mtime_ns == modified
+    assert get_snapshot(300, seed=4) != path
+    assert not list(cache_dir.glob("*.tmp"))
+
+    try:
+        restore_snapshot(get_engine(), path)
+        with Session(get_engine()) as session:
+            names = session.exec(select(Goal.name).order_by(Goal.id)).all()
+        assert names == [goal["name"] for goal in generate_goals(300, seed=3)]
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
@@ -0,0 +1,188 @@
+"""
+test_dbpool.py
+
+This module contains tests for the database thread pool defined in mycareer.dbpool.
+
+Fixtures:
+    executor_fixture: Creates a database thread pool, shut down after the test.
+
+Functions:
+    test_run_db_without_pool: Tests that the work runs on the event loop when the pool is disabled.
+    test_executor_runs_jobs: Tests that the jobs run on the threads, in the context of the caller.
+    test_executor_binds_session_to_thread: Tests the connection affinity of the threads.
+    test_executor_rejects_when_full: Tests that a full queue answers 503.
+    test_executor_checks_pool: Tests that the threads must leave a connection of the pool.
+    test_goal_endpoints_on_pool: Tests the goal endpoints with the pool enabled.
+"""
+
+import asyncio
+import threading
+from typing import Generator
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlmodel import Session, SQLModel, create_engine
+from mycareer import dbpool, deadline
+from mycareer.database import get_engine
+from mycareer.dbpool import DatabaseExecutor, run_db
+from mycareer.main import app
+from mycareer.metrics import metrics
+
+@pytest.fixture(name="executor")
+def executor_fixture() -> Generator[DatabaseExecutor, None, None]:
+    """Fixture to create a database thread pool of 2 threads and a queue of 2 jobs.
+
+    Yields:
+        DatabaseExecutor: The pool.
+    """
+    executor = DatabaseExecutor(2, 2)
+    yield executor
+    executor.shutdown()
+
+def test_run_db_without_pool() -> None:
+    """Test that the work runs on the event loop when the pool is disabled, and in
+    the default thread pool when it is offloaded."""
+    async def run() -> tuple:
+        return (
+            await run_db(None, lambda: threading.current_thread().name),
+            await run_db(None, lambda: threading.current_thread().name, offload=True),
+        )
+
+    assert not dbpool.db_executor.enabled
+    inline, offloaded = asyncio.run(run())
+    assert inline == threading.current_thread().name
+    assert offloaded != inline and not offloaded.startswith("mycareer-db-")
+
+def test_executor_runs_jobs(executor: DatabaseExecutor) -> None:
+    """Test that the jobs run on the threads of the pool, in the context of the caller.
+
+    This test checks if the deadline of the caller is seen by the job, if the
+    errors are raised to the caller and if the jobs are counted.
+
+    Args:
+        executor (DatabaseExecutor): The pool.
+    """
+    def job() -> tuple:
+        return threading.current_thread().name, deadline.remaining()
+
+    def failing_job() -> None:
+        raise ValueError("Failed job")
+
+    async def run() -> tuple:
+        with deadline.deadline_scope(5):
+            result = await executor.submit(None, job)
+        with pytest.raises(ValueError, match="Failed job"):
+            await executor.submit(None, failing_job)
+        return result
+
+    jobs = metrics.get("db_pool.jobs")
+    name, remaining = asyncio.run(run())
+    assert name.startswith("mycareer-db-")
+    assert 0 < remaining <= 5
+    assert metrics.get("db_pool.jobs") == jobs + 2
+    assert executor.stats() == {"threads": 2, "busy": 0, "queued": 0, "queue_size": 2}
+
+def test_executor_binds_session_to_thread() -> None:
+    """Test that the sessions of the jobs of a thread use the connection of the thread,
+    and are bound to their engine again after the job."""
+    executor = DatabaseExecutor(1, 2)
+
+    async def run() -> list:
+        connections = []
+        for _ in range(2):
+            with Session(get_engine()) as session:
+                connections.append(await executor.submit(session, session.connection))
+                assert session.bind is get_engine()
+        return connections
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert first is second
+    assert first.closed
+
+def test_executor_rejects_when_full() -> None:
+    """Test that a job submitted to a full queue is rejected with a 503."""
+    executor = DatabaseExecutor(1, 1)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_job() -> None:
+        started.set()
+        release.wait(5)
+
+    async def run() -> None:
+        running = executor.submit(None, blocking_job)
+        started.wait(5)
+        queued = executor.submit(None, lambda: None)
+        with pytest.raises(HTTPException) as error:
+            executor.submit(None, lambda: None)
+        assert error.value.status_code == 503
+        assert error.value.headers == {"Retry-After": "1"}
+        assert executor.stats()["queued"] == 1
+        release.set()
+        await asyncio.gather(running, queued)
+
+    rejected = metrics.get("db_pool.rejected")
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert metrics.get("db_pool.rejected") == rejected + 1
+
+def test_executor_checks_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the threads must leave a connection of a bounded engine pool, and that
+    the application does not start otherwise.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to enable the pool.
+    """
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=4, max_overflow=2)
+    DatabaseExecutor(5, 8).check_pool(engine)
+    for threads in (6, 7):
+        with pytest.raises(ValueError):
+            DatabaseExecutor(threads, 8).check_pool(engine)
+    DatabaseExecutor(0, 8).check_pool(engine)
+    DatabaseExecutor(50, 8).check_pool(create_engine("sqlite://", poolclass=NullPool))
+    unbounded = create_engine("sqlite://", poolclass=QueuePool, max_overflow=-1)
+    DatabaseExecutor(50, 8).check_pool(unbounded)
+
+    monkeypatch.setattr(dbpool, "db_executor", DatabaseExecutor(15, 8))
+    with pytest.raises(ValueError):
+        with TestClient(app):
+            pass
+    assert dbpool.db_executor.stats()["threads"] == 0
+
+def test_goal_endpoints_on_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the goal endpoints with the pool enabled.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to enable the pool.
+    """
+    monkeypatch.setattr(dbpool, "db_executor", DatabaseExecutor(2, 8))
+    SQLModel.metadata.create_all(get_engine())
+    jobs = metrics.get("db_pool.jobs")
+    try:
+        with TestClient(app) as client:
+            parent = client.post("/v1/goals", json={"name": "Parent Goal"}).json()
+            goal = client.post("/v1/goals", json={"name": "Goal", "parent_id": parent["id"]}).json()
+            client.put(f"/v1/goals/{goal['id']}",
+                       json={"name": "Goal", "parent_id": parent["id"], "status": "completed"})
+
+            assert client.get(f"/v1/goals/{goal['id']}").json()["status"] == "completed"
+            assert [item["id"] for item in client.get("/v1/goals").json()] == [
+                parent["id"], goal["id"]
+            ]
+            assert client.get(f"/v1/goals/{parent['id']}/progress").json()["progress"] == 1.0
+            assert len(client.get(f"/v1/goals/{parent['id']}/subtree").json()) == 2
+            assert client.get("/v1/goals/999").status_code == 404
+            assert client.delete(f"/v1/goals/{parent['id']}").status_code == 204
+            assert client.get(f"/v1/goals/{goal['id']}").json()["parent_id"] is None
+            assert len(client.get("/v1/analytics/time-in-status").json()) == 2
+            assert client.get("/metrics").json()["db_pool"]["threads"] == 2
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+    assert metrics.get("db_pool.jobs") >= jobs + 10
+    assert dbpool.db_executor.stats()["threads"] == 0
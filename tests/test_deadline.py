@@ -0,0 +1,206 @@
+"""
+test_deadline.py
+
+This module contains tests for the request deadlines defined in mycareer.deadline.
+
+Functions:
+    build_app: Builds an application protected by the deadline middleware.
+    test_parse_timeouts: Tests the parse_timeouts function.
+    test_request_timeout: Tests the request_timeout function.
+    test_request_timeout_long_route: Tests that the cap does not shorten a longer route deadline.
+    test_sqlite_statement_interrupted: Tests the interruption of a SQLite statement.
+    test_middleware_timeout: Tests the 504 answer of the middleware.
+    test_middleware_database_timeout: Tests the 504 answer on an interrupted statement.
+    test_middleware_error_after_deadline: Tests that the other errors are not turned into 504.
+    test_middleware_job_transfers: Tests the deadline of the uploads and downloads of the jobs.
+"""
+
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import create_engine
+from mycareer import deadline
+from mycareer.database import instrument_engine
+from mycareer.deadline import DeadlineMiddleware, deadline_scope, parse_timeouts, request_timeout
+from mycareer.metrics import metrics
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE counter(value) AS "
+    "(SELECT 1 UNION ALL SELECT value + 1 FROM counter WHERE value < 100000000) "
+    "SELECT COUNT(*) FROM counter"
+)
+
+def build_app(tmp_path) -> FastAPI:
+    """Build an application protected by the deadline middleware.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+
+    Returns:
+        FastAPI: The application, with a slow handler and a slow query.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}")
+    instrument_engine(engine)
+    application = FastAPI()
+    application.add_middleware(DeadlineMiddleware)
+    application.state.engine = engine
+
+    @application.get("/v1/sleep")
+    async def sleep() -> dict:
+        await asyncio.sleep(5)
+        return {}
+
+    @application.get("/v1/query")
+    async def query() -> dict:
+        with engine.connect() as connection:
+            return {"count": connection.execute(SLOW_QUERY).scalar()}
+
+    return application
+
+def test_parse_timeouts() -> None:
+    """Test the parse_timeouts function."""
+    assert not parse_timeouts("")
+    assert parse_timeouts("GET /v1/goals=5; GET /v1/goals/{id}=0.5") == {
+        "GET /v1/goals": 5.0,
+        "GET /v1/goals/{id}": 0.5,
+    }
+
+def test_request_timeout(monkeypatch) -> None:
+    """Test the request_timeout function.
+
+    This test checks the route timeouts, the default timeout and the header
+    override capped to the maximum.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(deadline, "default_timeout", 10.0)
+    monkeypatch.setattr(deadline, "timeout_cap", 30.0)
+    monkeypatch.setattr(deadline, "route_timeouts", {"GET /v1/goals/{id}": 1.0})
+
+    assert request_timeout("GET", "/v1/goals/7") == 1.0
+    assert request_timeout("GET", "/v1/goals") == 10.0
+    assert request_timeout("GET", "/v1/goals", "2.5") == 2.5
+    assert request_timeout("GET", "/v1/goals", "600") == 30.0
+    assert request_timeout("GET", "/v1/goals", "soon") == 10.0
+    assert request_timeout("GET", "/v1/goals", "-1") == 10.0
+
+def test_request_timeout_long_route(monkeypatch) -> None:
+    """Test that the `X-Request-Timeout` header of an import is capped by the deadline
+    of the route, not cut to `REQUEST_TIMEOUT_CAP_SECONDS`.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(deadline, "timeout_cap", 30.0)
+    assert request_timeout("POST", "/v1/goals/import") == 600.0
+    assert request_timeout("POST", "/v1/goals/import", "1000") == 600.0
+    assert request_timeout("POST", "/v1/goals/import", "120") == 120.0
+    monkeypatch.setattr(deadline, "timeout_cap", 900.0)
+    assert request_timeout("POST", "/v1/goals/import", "1000") == 900.0
+
+def test_sqlite_statement_interrupted(tmp_path) -> None:
+    """Test the interruption of a SQLite statement.
+
+    This test checks if a statement is interrupted at the deadline and if its
+    connection goes back to the pool in a usable state.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    engine = build_app(tmp_path).state.engine
+    timeouts = metrics.get("timeouts.database")
+
+    with deadline_scope(0.05):
+        with pytest.raises(OperationalError, match="interrupted"):
+            with engine.connect() as connection:
+                connection.execute(SLOW_QUERY)
+
+    assert engine.pool.checkedout() == 0
+    assert metrics.get("timeouts.database") == timeouts + 1
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+def test_middleware_timeout(tmp_path) -> None:
+    """Test the 504 answer of the middleware on a slow handler.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    client = TestClient(build_app(tmp_path))
+    timeouts = metrics.get("timeouts.requests")
+
+    response = client.get("/v1/sleep", headers={"X-Request-Timeout": "0.05"})
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request timed out"}
+    assert metrics.get("timeouts.requests") == timeouts + 1
+
+def test_middleware_database_timeout(tmp_path) -> None:
+    """Test the 504 answer of the middleware on an interrupted statement.
+
+    The handler blocks the event loop, so only the database can stop it.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    application = build_app(tmp_path)
+    client = TestClient(application)
+
+    response = client.get("/v1/query", headers={"X-Request-Timeout": "0.05"})
+
+    assert response.status_code == 504
+    assert application.state.engine.pool.checkedout() == 0
+
+def test_middleware_error_after_deadline() -> None:
+    """Test that an error of the handler raised after the deadline is not answered 504."""
+    application = FastAPI()
+    application.add_middleware(DeadlineMiddleware)
+
+    @application.get("/v1/fail")
+    async def fail() -> dict:
+        time.sleep(0.1)
+        raise ValueError("Not a timeout")
+
+    client = TestClient(application)
+    with pytest.raises(ValueError):
+        client.get("/v1/fail", headers={"X-Request-Timeout": "0.05"})
+
+def test_middleware_job_transfers(monkeypatch) -> None:
+    """Test that the downloads of the job results outlive the default deadline, which
+    still applies to the other job endpoints.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(deadline, "default_timeout", 0.05)
+    assert request_timeout("POST", "/v1/jobs/import") == 600.0
+    assert request_timeout("GET", "/v1/jobs/42/result") == 600.0
+
+    application = FastAPI()
+    application.add_middleware(DeadlineMiddleware)
+
+    async def chunks():
+        for _ in range(4):
+            await asyncio.sleep(0.05)
+            yield b"goal\n"
+
+    @application.get("/v1/jobs/{job_id}/result")
+    async def get_result(job_id: int) -> StreamingResponse:
+        assert job_id == 42
+        return StreamingResponse(chunks())
+
+    @application.get("/v1/jobs/{job_id}")
+    async def get_job(job_id: int) -> dict:
+        await asyncio.sleep(0.2)
+        return {"id": job_id}
+
+    client = TestClient(application)
+    response = client.get("/v1/jobs/42/result")
+    assert (response.status_code, response.text) == (200, "goal\n" * 4)
+    assert client.get("/v1/jobs/42").status_code == 504
@@ -0,0 +1,116 @@
+"""
+test_exporter.py
+
+This module contains tests for the goal exports defined in mycareer.exporter.
+
+Fixtures:
+    session_fixture: Seeds the database session with a few goals.
+
+Functions:
+    test_count_goals: Tests the count_goals function.
+    test_export_csv: Tests the export_goals function with a CSV file.
+    test_export_ndjson: Tests the export_goals function with an NDJSON file.
+"""
+
+import io
+import json
+from datetime import datetime
+import pytest
+from sqlmodel import Session, select
+from mycareer.exporter import GoalExportOptions, count_goals, export_goals
+from mycareer.importer import GoalImportOptions, import_goals
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with a few goals.
+
+    The tenant has the goals 1 to 3 and the archived goal 4, the goal 5 is
+    deleted and the goal 6 belongs to another tenant.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    session.add_all([
+        Goal(id=1, name="First", description="multi\nline", priority=GoalPriority.HIGH),
+        Goal(id=2, name="Second", parent_id=1, status=GoalStatus.IN_PROGRESS,
+             due_date=datetime(2025, 3, 1)),
+        Goal(id=3, name="Third, with a comma"),
+        Goal(id=5, name="Deleted", deleted_at=datetime(2025, 1, 1)),
+        Goal(id=6, tenant_id="acme", name="Other"),
+        GoalArchive(id=4, name="Archived", status=GoalStatus.COMPLETED,
+                    priority=GoalPriority.MEDIUM, change_seq=0,
+                    updated_at=datetime(2025, 1, 1)),
+    ])
+    session.commit()
+    return session
+
+def test_count_goals(session: Session) -> None:
+    """Test the count_goals function.
+
+    Args:
+        session (Session): The database session.
+    """
+    assert count_goals(session, "default") == 3
+    assert count_goals(session, "default", include_archived=True) == 4
+    assert count_goals(session, "globex", include_archived=True) == 0
+
+def test_export_csv(session: Session) -> None:
+    """Test the export_goals function with a CSV file.
+
+    This test checks if the goals are written in pages with their progress, the
+    archived ones last, and if the file imports back the same goals into the tenant,
+    where their parents exist.
+
+    Args:
+        session (Session): The database session.
+    """
+    stream, progress = io.BytesIO(), []
+    options = GoalExportOptions(file_format="csv", include_archived=True, chunk_size=2)
+    written = export_goals(session, "default", stream, options, progress.append)
+    assert written == 4
+    assert progress == [2, 3, 4]
+    lines = stream.getvalue().decode().splitlines()
+    assert lines[0] == "id,name,description,status,priority,due_date,parent_id"
+    assert lines[1:3] == ['1,First,"multi', 'line",to refine,high,,']
+    assert lines[3] == "2,Second,,in progress,medium,2025-03-01T00:00:00,1"
+    assert lines[-1] == "4,Archived,,completed,medium,,"
+
+    stream.seek(0)
+    report = import_goals(session, "default", stream, GoalImportOptions(file_format="csv"))
+    assert report.imported == 4 and report.rejected == 0
+    imported = session.exec(
+        select(Goal).where(Goal.tenant_id == "default", Goal.id > 6).order_by(Goal.id)
+    ).all()
+    assert [(goal.name, goal.description, goal.status, goal.priority, goal.due_date,
+             goal.parent_id) for goal in imported[:3]] == [
+        ("First", "multi\nline", GoalStatus.TO_REFINE, GoalPriority.HIGH, None, None),
+        ("Second", None, GoalStatus.IN_PROGRESS, GoalPriority.MEDIUM, datetime(2025, 3, 1), 1),
+        ("Third, with a comma", None, GoalStatus.TO_REFINE, GoalPriority.MEDIUM, None, None),
+    ]
+
+    stream.seek(0)
+    report = import_goals(session, "globex", stream, GoalImportOptions(file_format="csv"))
+    assert (report.imported, [rejection.line for rejection in report.rejections]) == (3, [4])
+
+def test_export_ndjson(session: Session) -> None:
+    """Test the export_goals function with an NDJSON file, and an unsupported format.
+
+    Args:
+        session (Session): The database session.
+    """
+    stream = io.BytesIO()
+    assert export_goals(session, "default", stream, GoalExportOptions(file_format="ndjson")) == 3
+    goals = [json.loads(line) for line in stream.getvalue().decode().splitlines()]
+    assert [goal["id"] for goal in goals] == [1, 2, 3]
+    assert goals[1] == {
+        "id": 2, "name": "Second", "description": None, "status": "in progress",
+        "priority": "medium", "due_date": "2025-03-01T00:00:00", "parent_id": 1,
+    }
+    assert not stream.closed
+
+    with pytest.raises(ValueError):
+        export_goals(session, "default", io.BytesIO(), GoalExportOptions(file_format="xml"))
@@ -0,0 +1,196 @@
+"""
+test_goal_query.py
+
+This module contains tests for the goal queries defined in mycareer.goal_query.
+
+Fixtures:
+    session_fixture: Seeds the database session with a small tree of goals.
+
+Functions:
+    count_statements: Counts the statements executed by the engine.
+    test_batch_loader: Tests that the BatchLoader loads every key once, in one call.
+    test_run_goal_query_filters: Tests the filters of a goal query.
+    test_run_goal_query_sort_and_page: Tests the sort, the page and the fields of a goal query.
+    test_run_goal_query_includes: Tests the included data and the aggregates of a goal query.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session
+from mycareer.database import get_engine
+from mycareer.goal_query import BatchLoader, run_goal_query
+from mycareer.history import record_goal_event
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus
+from mycareer.schemas import GoalQuery
+
+TENANT = "default"
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with a small tree of goals.
+
+    The tree is 1 -> (2 -> (4, 5), 3) and 7 under the archived goal 6, with 4
+    completed and 3 due in March. A goal 8 of another tenant and a deleted goal
+    9 are never matched.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    goals = [
+        Goal(id=1, name="Root Goal", priority=GoalPriority.HIGH),
+        Goal(id=2, name="First Sub-goal", parent_id=1, status=GoalStatus.IN_PROGRESS),
+        Goal(id=3, name="Second Sub-goal", parent_id=1, due_date=datetime(2025, 3, 1)),
+        Goal(id=4, name="First Leaf", parent_id=2, status=GoalStatus.COMPLETED),
+        Goal(id=5, name="Second Leaf", parent_id=2, priority=GoalPriority.LOW),
+        Goal(id=7, name="Orphan_Goal", parent_id=6),
+        Goal(id=8, tenant_id="acme", name="Other Goal"),
+        Goal(id=9, name="Deleted Goal", deleted_at=datetime(2025, 1, 1)),
+    ]
+    session.add_all(goals)
+    session.add(GoalArchive(id=6, name="Archived Goal", status=GoalStatus.COMPLETED,
+                            priority=GoalPriority.MEDIUM,
+                            change_seq=0, updated_at=datetime(2025, 1, 1)))
+    session.flush()
+    for goal in goals:
+        record_goal_event(session, goal)
+    session.commit()
+    return session
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    """Count the statements executed by the engine.
+
+    Yields:
+        List[str]: The statements, filled while the context is open.
+    """
+    statements: List[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+
+def _ids(session: Session, body: dict) -> List[int]:
+    result = run_goal_query(session, TENANT, GoalQuery.model_validate(body))
+    return [goal["id"] for goal in result["goals"]]
+
+def test_batch_loader() -> None:
+    """Test that the BatchLoader loads the unknown keys once, in one call, and
+    neither the primed keys nor the keys found missing before."""
+    calls = []
+
+    def load(keys: List[int]) -> dict:
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(load)
+    loader.prime(1, 100)
+    assert loader.load_many([1, 2, 3, 2]) == {1: 100, 2: 20}
+    assert loader.load_many([2, 3, 4]) == {2: 20, 4: 40}
+    assert calls == [[2, 3], [4]]
+
+def test_run_goal_query_filters(session: Session) -> None:
+    """Test the filters of a goal query, every one alone then together.
+
+    Args:
+        session (Session): The database session.
+    """
+    cases = [
+        ({}, [1, 2, 3, 4, 5, 7]),
+        ({"ids": [4, 1, 8, 9]}, [1, 4]),
+        ({"status": ["in progress", "completed"]}, [2, 4]),
+        ({"priority": ["low", "high"]}, [1, 5]),
+        ({"parent_id": 2}, [4, 5]),
+        ({"root_only": True}, [1]),
+        ({"due_after": "2025-03-01T00:00:00", "due_before": "2025-04-01T00:00:00"}, [3]),
+        ({"name_contains": "Leaf"}, [4, 5]),
+        ({"name_contains": "_"}, [7]),
+        ({"parent_id": 2, "priority": ["low"]}, [5]),
+    ]
+    for filters, expected in cases:
+        assert _ids(session, {"filters": filters}) == expected, filters
+
+def test_run_goal_query_sort_and_page(session: Session) -> None:
+    """Test the sort, the page and the fields of a goal query.
+
+    The statuses and the priorities are sorted in the order of their enumeration.
+
+    Args:
+        session (Session): The database session.
+    """
+    assert _ids(session, {"sort": [{"field": "name"}]}) == [4, 2, 7, 1, 5, 3]
+    assert _ids(session, {"sort": [{"field": "priority", "descending": True}]}) == [
+        1, 2, 3, 4, 7, 5
+    ]
+    assert _ids(session, {"sort": [{"field": "status"}, {"field": "id", "descending": True}]}) == [
+        7, 5, 3, 1, 2, 4
+    ]
+
+    result = run_goal_query(session, TENANT, GoalQuery.model_validate(
+        {"page": {"limit": 2, "offset": 1}, "fields": ["name", "status"]}
+    ))
+    assert result == {
+        "goals": [
+            {"id": 2, "name": "First Sub-goal", "status": GoalStatus.IN_PROGRESS},
+            {"id": 3, "name": "Second Sub-goal", "status": GoalStatus.TO_REFINE},
+        ],
+        "has_more": True,
+    }
+    last_page = run_goal_query(session, TENANT, GoalQuery.model_validate(
+        {"page": {"limit": 2, "offset": 4}, "fields": []}
+    ))
+    assert last_page == {"goals": [{"id": 5}, {"id": 7}], "has_more": False}
+
+def test_run_goal_query_includes(session: Session) -> None:
+    """Test the included data and the aggregates of a goal query.
+
+    This test checks if the parents come from the page, the goals or the archive,
+    if the sub-goals and the history are attached to their goals, if the
+    aggregates cover all the matching goals, and if the whole query runs one
+    statement per kind of data.
+
+    Args:
+        session (Session): The database session.
+    """
+    query = GoalQuery.model_validate({
+        "filters": {"ids": [2, 3, 4, 7]},
+        "page": {"limit": 3},
+        "fields": ["name"],
+        "include": ["parent", "sub_goals", "history"],
+        "aggregates": ["count", "status"],
+    })
+    with count_statements() as statements:
+        result = run_goal_query(session, TENANT, query)
+
+    assert len(statements) == 5
+    first, second, third = result["goals"]
+    assert first["parent"] == {"id": 1, "name": "Root Goal"}
+    assert third["parent"] == {"id": 2, "name": "First Sub-goal"}
+    assert [goal["id"] for goal in first["sub_goals"]] == [4, 5]
+    assert second["sub_goals"] == third["sub_goals"] == []
+    assert [event["status"] for event in first["history"]] == [GoalStatus.IN_PROGRESS]
+    assert result["has_more"]
+    assert result["aggregates"]["count"] == 4
+    assert result["aggregates"]["status"][GoalStatus.TO_REFINE] == 2
+    assert "priority" not in result["aggregates"]
+
+    query = GoalQuery.model_validate({"filters": {"ids": [7]}, "include": ["parent"]})
+    with count_statements() as statements:
+        result = run_goal_query(session, TENANT, query)
+    assert len(statements) == 3
+    assert result["goals"][0]["parent"]["name"] == "Archived Goal"
+
+    query = GoalQuery.model_validate({"filters": {"ids": [999]}, "include": ["history"]})
+    with count_statements() as statements:
+        assert run_goal_query(session, TENANT, query)["goals"] == []
+    assert len(statements) == 1
@@ -0,0 +1,182 @@
+"""
+test_history.py
+
+This module contains tests for the status history defined in mycareer.history.
+
+Fixtures:
+    session_fixture: Seeds the database session with a history of two goals.
+
+Functions:
+    test_get_time_in_status: Tests the get_time_in_status function.
+    test_get_time_in_status_of_a_goal: Tests the get_time_in_status function for one goal.
+    test_get_time_in_status_of_deleted_goals: Tests that the time of a deleted goal stops.
+    test_get_closed_goals_by_period: Tests the get_closed_goals_by_period function.
+    test_record_imported_goal_events: Tests the record_imported_goal_events function.
+    test_select_time_in_status_reads_goal_index: Tests the plan of the time in status statement.
+"""
+
+from datetime import date, datetime
+import pytest
+from sqlalchemy import insert, text
+from sqlmodel import Session, select
+from mycareer.database import get_engine
+from mycareer.history import (
+    get_closed_goals_by_period, get_time_in_status, record_imported_goal_events,
+    select_time_in_status
+)
+from mycareer.models import Goal, GoalPriority, GoalStatus, GoalStatusEvent, GoalTombstone
+from mycareer.schemas import AnalyticsPeriod
+
+TENANT = "default"
+NOW = datetime(2025, 1, 20)
+
+def _event(goal_id, status, previous_status, changed_at, priority=GoalPriority.MEDIUM):
+    return GoalStatusEvent(
+        tenant_id=TENANT, goal_id=goal_id, status=status, previous_status=previous_status,
+        priority=priority, changed_at=changed_at,
+    )
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with a history of two goals.
+
+    The goal 1 is in progress for 2 days from Monday 2025-01-06, then completed,
+    with a change of its priority after. The goal 2 is in progress for 1 day from
+    Wednesday 2025-01-15, then abandoned. An event of another tenant is ignored.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    session.add_all([
+        _event(1, GoalStatus.IN_PROGRESS, None, datetime(2025, 1, 6)),
+        _event(1, GoalStatus.COMPLETED, GoalStatus.IN_PROGRESS, datetime(2025, 1, 8)),
+        _event(1, GoalStatus.COMPLETED, GoalStatus.COMPLETED, datetime(2025, 1, 16),
+               GoalPriority.HIGH),
+        _event(2, GoalStatus.IN_PROGRESS, None, datetime(2025, 1, 15)),
+        _event(2, GoalStatus.ABANDONED, GoalStatus.IN_PROGRESS, datetime(2025, 1, 16)),
+        GoalStatusEvent(tenant_id="acme", goal_id=3, status=GoalStatus.COMPLETED,
+                        priority=GoalPriority.LOW, changed_at=datetime(2025, 1, 7)),
+    ])
+    session.commit()
+    return session
+
+def test_get_time_in_status(session: Session) -> None:
+    """Test the get_time_in_status function.
+
+    This test checks if a status lasts until the next event, or until now, and
+    if a change of the priority does not split the time of the status.
+
+    Args:
+        session (Session): The database session.
+    """
+    day = 86400
+    times = get_time_in_status(session, TENANT, now=NOW)
+
+    assert [time.status for time in times] == [
+        GoalStatus.IN_PROGRESS, GoalStatus.COMPLETED, GoalStatus.ABANDONED
+    ]
+    assert times[0].goals == 2
+    assert times[0].total_seconds == pytest.approx(3 * day, abs=0.01)
+    assert times[0].average_seconds == pytest.approx(1.5 * day, abs=0.01)
+    assert times[1].goals == 1
+    assert times[1].total_seconds == pytest.approx(12 * day, abs=0.01)
+    assert times[2].total_seconds == pytest.approx(4 * day, abs=0.01)
+
+def test_get_time_in_status_of_a_goal(session: Session) -> None:
+    """Test the get_time_in_status function for one goal.
+
+    Args:
+        session (Session): The database session.
+    """
+    times = get_time_in_status(session, TENANT, goal_id=2, now=NOW)
+    assert [(time.status, time.goals) for time in times] == [
+        (GoalStatus.IN_PROGRESS, 1), (GoalStatus.ABANDONED, 1)
+    ]
+    assert not get_time_in_status(session, TENANT, goal_id=3, now=NOW)
+
+def test_get_time_in_status_of_deleted_goals(session: Session) -> None:
+    """Test that the current status of a deleted goal, soft deleted or purged, lasts
+    until its deletion, and that the deletions of another tenant are ignored.
+
+    Args:
+        session (Session): The database session.
+    """
+    day = 86400
+    session.add_all([
+        _event(4, GoalStatus.IN_PROGRESS, None, datetime(2025, 1, 17)),
+        GoalTombstone(tenant_id=TENANT, goal_id=4, change_seq=1, deleted_at=datetime(2025, 1, 18)),
+        GoalTombstone(tenant_id=TENANT, goal_id=2, change_seq=2, deleted_at=datetime(2025, 1, 18)),
+        GoalTombstone(tenant_id="acme", goal_id=1, change_seq=1, deleted_at=datetime(2025, 1, 9)),
+    ])
+    session.commit()
+
+    times = get_time_in_status(session, TENANT, now=NOW)
+    assert [(time.status, time.goals) for time in times] == [
+        (GoalStatus.IN_PROGRESS, 3), (GoalStatus.COMPLETED, 1), (GoalStatus.ABANDONED, 1)
+    ]
+    assert times[0].total_seconds == pytest.approx(4 * day, abs=0.01)
+    assert times[1].total_seconds == pytest.approx(12 * day, abs=0.01)
+    assert times[2].total_seconds == pytest.approx(2 * day, abs=0.01)
+
+def test_get_closed_goals_by_period(session: Session) -> None:
+    """Test the get_closed_goals_by_period function.
+
+    This test checks if the closed goals are counted once, in the week or month
+    they were closed, and if the range is applied.
+
+    Args:
+        session (Session): The database session.
+    """
+    weeks = get_closed_goals_by_period(session, TENANT, AnalyticsPeriod.WEEK)
+    assert [(week.period_start, week.completed, week.abandoned) for week in weeks] == [
+        (date(2025, 1, 6), 1, 0), (date(2025, 1, 13), 0, 1)
+    ]
+    assert weeks[0].completion_rate == 1.0
+
+    months = get_closed_goals_by_period(session, TENANT, AnalyticsPeriod.MONTH)
+    assert [(month.period_start, month.completion_rate) for month in months] == [
+        (date(2025, 1, 1), 0.5)
+    ]
+
+    weeks = get_closed_goals_by_period(
+        session, TENANT, AnalyticsPeriod.WEEK, since=datetime(2025, 1, 9), until=NOW
+    )
+    assert [week.period_start for week in weeks] == [date(2025, 1, 13)]
+
+def test_record_imported_goal_events(session: Session) -> None:
+    """Test the record_imported_goal_events function.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.connection().execute(insert(Goal.__table__), [
+        {"tenant_id": TENANT, "name": f"Goal {seq}", "status": GoalStatus.NOT_STARTED,
+         "priority": GoalPriority.LOW, "change_seq": seq, "updated_at": NOW}
+        for seq in (1, 2, 3)
+    ])
+    record_imported_goal_events(session, TENANT, 2, 3)
+    session.commit()
+
+    events = session.exec(
+        select(GoalStatusEvent).where(GoalStatusEvent.changed_at == NOW)
+    ).all()
+    assert [(event.goal_id, event.status, event.previous_status) for event in events] == [
+        (2, GoalStatus.NOT_STARTED, None), (3, GoalStatus.NOT_STARTED, None)
+    ]
+
+def test_select_time_in_status_reads_goal_index(session: Session) -> None:
+    """Test that the time in status is computed along the goal index, without a sort.
+
+    Args:
+        session (Session): The database session.
+    """
+    compiled = select_time_in_status(TENANT, NOW).compile(
+        get_engine(), compile_kwargs={"literal_binds": True}
+    )
+    plan = [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()]
+    assert any("INDEX ix_goalstatusevent_goal_id (tenant_id=?)" in detail
+               for detail in plan), plan
+    assert not any("TEMP B-TREE FOR ORDER BY" in detail for detail in plan), plan
@@ -0,0 +1,217 @@
+"""
+test_importer.py
+
+This module contains tests for the bulk import defined in mycareer.importer.
+
+Functions:
+    test_detect_format: Tests the detect_format function.
+    test_import_csv: Tests the import_goals function with a CSV file.
+    test_import_ndjson: Tests the import_goals function with an NDJSON file.
+    test_import_malformed_csv: Tests the rejection of the unreadable rows of a CSV file.
+    test_import_max_rejections: Tests the bound on the rejected rows detailed in the report.
+    test_import_resume: Tests the progress reports of an import and its resumption.
+    test_import_unknown_parents: Tests the rejection of the rows with an unknown parent.
+"""
+
+import io
+from datetime import datetime
+import pytest
+from sqlmodel import Session, select
+from mycareer.importer import GoalImportOptions, detect_format, import_goals
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus
+from mycareer.schemas import GoalImportReport
+
+def test_detect_format() -> None:
+    """Test the detect_format function."""
+    assert detect_format("text/csv; charset=utf-8") == "csv"
+    assert detect_format("application/x-ndjson") == "ndjson"
+    assert detect_format("application/json") is None
+    assert detect_format(None) is None
+
+def test_import_csv(session: Session) -> None:
+    """Test the import_goals function with a CSV file.
+
+    This test checks if the valid rows are inserted in chunks with increasing
+    change sequence values, if empty cells get the defaults and if the invalid
+    rows are reported with their line.
+
+    Args:
+        session (Session): The database session.
+    """
+    data = (
+        "﻿name,description,status,priority,due_date\n"
+        "first,,,,\n"
+        ",no name,,,\n"
+        "second,\"multi\nline\",completed,high,2024-10-22T00:00:00\n"
+        "third,,bad,,\n"
+        "fourth,,,low,\n"
+    )
+    report = import_goals(
+        session, "default", io.BytesIO(data.encode()),
+        GoalImportOptions(file_format="csv", chunk_size=2),
+    )
+
+    assert report.imported == 3
+    assert report.rejected == 2
+    assert [rejection.line for rejection in report.rejections] == [3, 6]
+    assert report.rejections[0].errors[0].startswith("name:")
+    assert report.rejections[1].errors[0].startswith("status:")
+
+    goals = session.exec(select(Goal).order_by(Goal.id)).all()
+    assert [goal.name for goal in goals] == ["first", "second", "fourth"]
+    assert [goal.change_seq for goal in goals] == [1, 2, 3]
+    assert goals[0].description is None
+    assert goals[0].status == GoalStatus.TO_REFINE
+    assert goals[1].description == "multi\nline"
+    assert goals[1].status == GoalStatus.COMPLETED
+    assert goals[2].priority == GoalPriority.LOW
+
+def test_import_ndjson(session: Session) -> None:
+    """Test the import_goals function with an NDJSON file.
+
+    This test checks if blank lines are skipped and if malformed lines and
+    non-object values are reported.
+
+    Args:
+        session (Session): The database session.
+    """
+    data = (
+        b'{"name": "first", "priority": "high"}\n'
+        b"\n"
+        b"{not json}\n"
+        b"[1, 2]\n"
+        b'{"name": "second"}'
+    )
+    options = GoalImportOptions(file_format="ndjson")
+    report = import_goals(session, "default", io.BytesIO(data), options)
+
+    assert report.imported == 2
+    assert [(rejection.line, rejection.errors) for rejection in report.rejections] == [
+        (3, ["invalid JSON: Expecting property name enclosed in double quotes"]),
+        (4, ["row: expected an object"]),
+    ]
+    assert [goal.name for goal in session.exec(select(Goal)).all()] == ["first", "second"]
+
+def test_import_malformed_csv(session: Session) -> None:
+    """Test the rejection of the unreadable rows of a CSV file.
+
+    This test checks if the rows with invalid UTF-8 or a field over the limit of the
+    csv module are reported with their line and the next rows still imported, and
+    if an unreadable header stops the file.
+
+    Args:
+        session (Session): The database session.
+    """
+    data = (
+        b"name,priority\n"
+        b"first,high\n"
+        b"caf\xe9,low\n"
+        b'"multi\nline",\n'
+        b'"' + b"x" * 200_000 + b'",low\n'
+        b"second,\n"
+    )
+    options = GoalImportOptions(file_format="csv")
+    report = import_goals(session, "default", io.BytesIO(data), options)
+
+    assert report.imported == 3
+    assert [(rejection.line, rejection.errors) for rejection in report.rejections] == [
+        (3, ["invalid UTF-8: invalid continuation byte"]),
+        (6, ["invalid CSV: field larger than field limit (131072)"]),
+    ]
+    names = session.exec(select(Goal.name).order_by(Goal.id)).all()
+    assert names == ["first", "multi\nline", "second"]
+
+    report = import_goals(
+        session, "default", io.BytesIO(b"n\xe9me\nthird\n"), GoalImportOptions(file_format="csv")
+    )
+    assert (report.imported, report.rejected) == (0, 1)
+    assert report.rejections[0].errors == ["invalid UTF-8: invalid continuation byte"]
+
+def test_import_max_rejections(session: Session) -> None:
+    """Test the bound on the rejected rows detailed in the report.
+
+    Args:
+        session (Session): The database session.
+    """
+    data = b"{}\n" * 5
+    report = import_goals(
+        session, "default", io.BytesIO(data),
+        GoalImportOptions(file_format="ndjson", max_rejections=2),
+    )
+    assert report.imported == 0
+    assert report.rejected == 5
+    assert len(report.rejections) == 2
+    with pytest.raises(ValueError):
+        import_goals(session, "default", io.BytesIO(data), GoalImportOptions(file_format="xml"))
+
+def test_import_resume(session: Session) -> None:
+    """Test the progress reports of an import and its resumption.
+
+    This test checks if the progress is reported in the transaction of every
+    chunk, and if an import resumed from a report skips the records already read
+    and completes the report.
+
+    Args:
+        session (Session): The database session.
+    """
+    data = b'{"name": "first"}\n{}\n{"name": "second"}\n{"name": "third"}\n{"name": "fourth"}\n'
+    progress = []
+
+    def on_progress(read: int, report: GoalImportReport) -> None:
+        assert session.in_transaction()
+        progress.append((read, report.model_copy(deep=True)))
+
+    report = import_goals(session, "default", io.BytesIO(data),
+                          GoalImportOptions(file_format="ndjson", chunk_size=2), on_progress)
+    assert [(read, partial.imported, partial.rejected) for read, partial in progress] == [
+        (3, 2, 1), (5, 4, 1)
+    ]
+    assert report.imported == 4
+
+    read, partial = progress[0]
+    options = GoalImportOptions(file_format="ndjson", chunk_size=2, skip=read, report=partial)
+    resumed = import_goals(session, "acme", io.BytesIO(data), options)
+    assert resumed == report
+    assert partial.imported == 2
+    names = session.exec(select(Goal.name).where(Goal.tenant_id == "acme")).all()
+    assert names == ["third", "fourth"]
+
+def test_import_unknown_parents(session: Session) -> None:
+    """Test the rejection of the rows with an unknown parent.
+
+    This test checks if a row is only imported under a live or archived goal of
+    the tenant, and if the rows pointing to a missing goal or to a goal of another
+    tenant are reported with their line.
+
+    Args:
+        session (Session): The database session.
+    """
+    parent = Goal(name="parent", change_seq=1)
+    other = Goal(tenant_id="t2", name="other", change_seq=1)
+    session.add_all([parent, other])
+    session.add(GoalArchive(
+        id=100, name="archived", status=GoalStatus.COMPLETED, priority=GoalPriority.LOW,
+        change_seq=2, updated_at=datetime(2024, 1, 1),
+    ))
+    session.commit()
+
+    data = (
+        f'{{"name": "under parent", "parent_id": {parent.id}}}\n'
+        '{"name": "under missing", "parent_id": 999}\n'
+        f'{{"name": "under other tenant", "parent_id": {other.id}}}\n'
+        '{"name": "under archived", "parent_id": 100}\n'
+        '{"name": "root"}\n'
+    ).encode()
+    report = import_goals(session, "default", io.BytesIO(data),
+                          GoalImportOptions(file_format="ndjson", chunk_size=3))
+
+    assert (report.imported, report.rejected) == (3, 2)
+    assert [(rejection.line, rejection.errors) for rejection in report.rejections] == [
+        (2, ["parent_id: Parent goal not found"]), (3, ["parent_id: Parent goal not found"]),
+    ]
+    goals = session.exec(
+        select(Goal.name, Goal.parent_id).where(Goal.tenant_id == "default").order_by(Goal.id)
+    ).all()
+    assert goals == [
+        ("parent", None), ("under parent", parent.id), ("under archived", 100), ("root", None)
+    ]
@@ -0,0 +1,69 @@
+"""
+test_invalidation.py
+
+This module contains tests for the invalidation buses defined in mycareer.invalidation.
+
+Functions:
+    test_local_bus: Tests the LocalInvalidationBus class.
+    test_sqlite_bus_between_processes: Tests the SQLiteInvalidationBus class with two buses.
+    test_create_invalidation_bus: Tests the create_invalidation_bus function.
+"""
+
+import pytest
+from mycareer.invalidation import (
+    InvalidationBus, LocalInvalidationBus, SQLiteInvalidationBus, create_invalidation_bus
+)
+
+def test_local_bus() -> None:
+    """Test the LocalInvalidationBus class.
+
+    This test checks if the subscribers are called when publishing.
+    """
+    received = []
+    bus = LocalInvalidationBus()
+    bus.subscribe(received.append)
+
+    bus.publish([1, None])
+    bus.poll()
+
+    assert received == [1, None]
+
+def test_sqlite_bus_between_processes(tmp_path) -> None:
+    """Test the SQLiteInvalidationBus class with two buses.
+
+    This test checks if a message published by one bus is received once by
+    a second bus sharing the same file, as two workers would.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    path = str(tmp_path / "bus.db")
+    first, second = SQLiteInvalidationBus(path), SQLiteInvalidationBus(path)
+    first_received, second_received = [], []
+    first.subscribe(first_received.append)
+    second.subscribe(second_received.append)
+
+    first.publish([7])
+    first.poll()
+    second.poll()
+    second.poll()
+
+    assert first_received == [7]
+    assert second_received == [7]
+    first.close()
+    second.close()
+
+def test_create_invalidation_bus(tmp_path) -> None:
+    """Test the create_invalidation_bus function.
+
+    Args:
+        tmp_path (Path): A temporary directory.
+    """
+    assert isinstance(create_invalidation_bus(""), LocalInvalidationBus)
+    bus = create_invalidation_bus(f"sqlite:///{tmp_path / 'bus.db'}")
+    assert isinstance(bus, SQLiteInvalidationBus)
+    bus.close()
+    with pytest.raises(ValueError):
+        create_invalidation_bus("redis://localhost")
+    with pytest.raises(TypeError):
+        InvalidationBus()  # pylint: disable=abstract-class-instantiated
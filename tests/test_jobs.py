@@ -0,0 +1,246 @@
+"""
+test_jobs.py
+
+This module contains tests for the background jobs defined in mycareer.jobs.
+
+Functions:
+    add_upload: Writes the file of an import job.
+    run_jobs: Runs the queued jobs until the queue is empty.
+    test_submit_job: Tests the submit_job function.
+    test_run_jobs: Tests that the runner runs the jobs of every kind.
+    test_failed_job: Tests that a job raising an error fails.
+    test_interrupted_job: Tests that an interrupted import is queued again and resumes.
+    test_recover_jobs: Tests the recover_jobs function.
+    test_requeued_job: Tests that a start queued again by the recovery stops writing.
+    test_job_runner: Tests that the started runner runs the submitted jobs.
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session, select
+from mycareer import jobs
+from mycareer.database import get_engine
+from mycareer.jobs import JobRunner, recover_jobs, submit_job
+from mycareer.models import Goal, GoalArchive, GoalStatus, Job, JobKind, JobStatus
+
+# The files of the jobs are written in a temporary directory.
+pytestmark = pytest.mark.usefixtures("job_dir")
+
+def add_upload(name: str, count: int) -> str:
+    """Write the NDJSON file of an import job, in the directory of the jobs.
+
+    Args:
+        name (str): The name of the file.
+        count (int): The number of goals.
+
+    Returns:
+        str: The path of the file.
+    """
+    path = os.path.join(jobs.job_dir, name)
+    with open(path, "w", encoding="utf-8") as upload:
+        upload.writelines(f'{{"name": "Goal {index}"}}\n' for index in range(count))
+    return path
+
+def run_jobs(runner: JobRunner) -> int:
+    """Run the queued jobs until the queue is empty.
+
+    Args:
+        runner (JobRunner): The runner.
+
+    Returns:
+        int: The number of jobs run.
+    """
+    count = 0
+    while runner._run_next():  # pylint: disable=protected-access
+        count += 1
+    return count
+
+def test_submit_job(session: Session) -> None:
+    """Test that the jobs are queued until the tenant has too many of them pending.
+
+    Args:
+        session (Session): The database session.
+    """
+    first = submit_job(session, "default", JobKind.ARCHIVE, {"after_days": 90}, max_pending=2)
+    assert first.status == JobStatus.QUEUED
+    assert json.loads(first.params) == {"after_days": 90}
+    assert submit_job(session, "default", JobKind.ARCHIVE, {}, max_pending=2) is not None
+    assert submit_job(session, "default", JobKind.ARCHIVE, {}, max_pending=2) is None
+    assert submit_job(session, "acme", JobKind.ARCHIVE, {}, max_pending=2) is not None
+
+    first.status = JobStatus.SUCCEEDED
+    session.commit()
+    assert submit_job(session, "default", JobKind.ARCHIVE, {}, max_pending=2) is not None
+
+def test_run_jobs(session: Session) -> None:
+    """Test that the runner runs the jobs of every kind, in order, with their results.
+
+    Args:
+        session (Session): The database session.
+    """
+    path = add_upload("upload.ndjson", 3)
+    submit_job(session, "default", JobKind.IMPORT, {"format": "ndjson", "path": path})
+    submit_job(session, "default", JobKind.EXPORT, {"format": "csv", "include_archived": True})
+    session.add(Goal(name="Closed", status=GoalStatus.COMPLETED, updated_at=datetime(2020, 1, 1)))
+    session.commit()
+    submit_job(session, "default", JobKind.ARCHIVE, {"after_days": 90})
+
+    assert run_jobs(JobRunner(workers=0)) == 3
+    imported, exported, archived = session.exec(select(Job).order_by(Job.id)).all()
+    assert all(job.status == JobStatus.SUCCEEDED for job in (imported, exported, archived))
+    assert all(job.attempts == 1 and job.finished_at for job in (imported, exported, archived))
+
+    assert json.loads(imported.result) == {"imported": 3, "rejected": 0, "rejections": []}
+    assert (imported.progress, imported.total) == (3, None)
+    assert not os.path.exists(path)
+
+    assert json.loads(exported.result) == {"exported": 4}
+    assert (exported.progress, exported.total) == (4, 4)
+    assert exported.result_path == os.path.join(jobs.job_dir, f"{exported.id}.csv")
+    with open(exported.result_path, encoding="utf-8") as export:
+        assert len(export.read().splitlines()) == 5
+    assert os.listdir(jobs.job_dir) == [f"{exported.id}.csv"]
+
+    assert json.loads(archived.result) == {"archived": 1}
+    assert session.exec(select(GoalArchive.name)).all() == ["Closed"]
+
+def test_failed_job(session: Session) -> None:
+    """Test that a job raising an error fails with the error, and is not run again.
+
+    Args:
+        session (Session): The database session.
+    """
+    job = submit_job(session, "default", JobKind.IMPORT,
+                     {"format": "ndjson", "path": os.path.join(jobs.job_dir, "missing")})
+    assert run_jobs(JobRunner(workers=0)) == 1
+    session.refresh(job)
+    assert job.status == JobStatus.FAILED
+    assert "No such file" in job.error
+    assert job.finished_at is not None
+    assert run_jobs(JobRunner(workers=0)) == 0
+
+def test_interrupted_job(session: Session) -> None:
+    """Test that an import interrupted by the stop of its runner is queued again, and
+    resumes after its last committed chunk.
+
+    Args:
+        session (Session): The database session.
+    """
+    path = add_upload("upload.ndjson", 1200)
+    job = submit_job(session, "default", JobKind.IMPORT, {"format": "ndjson", "path": path})
+    runner = JobRunner(workers=0)
+    runner._stopping.set()  # pylint: disable=protected-access
+    assert runner._run_next()  # pylint: disable=protected-access
+    session.refresh(job)
+    assert (job.status, job.attempts, job.progress) == (JobStatus.QUEUED, 0, 500)
+    assert json.loads(job.result)["imported"] == 500
+    assert len(session.exec(select(Goal.id)).all()) == 500
+
+    assert run_jobs(JobRunner(workers=0)) == 1
+    session.refresh(job)
+    assert (job.status, job.attempts, job.progress) == (JobStatus.SUCCEEDED, 1, 1200)
+    assert json.loads(job.result)["imported"] == 1200
+    names = session.exec(select(Goal.name).order_by(Goal.id)).all()
+    assert names == [f"Goal {index}" for index in range(1200)]
+
+def test_recover_jobs(session: Session) -> None:
+    """Test the recover_jobs function.
+
+    This test checks if the running jobs with a stale heartbeat are queued again,
+    or failed after too many attempts, and if the jobs finished long ago are
+    deleted with their files.
+
+    Args:
+        session (Session): The database session.
+    """
+    now = datetime(2025, 1, 2)
+    stale, fresh = now - timedelta(minutes=5), now - timedelta(seconds=10)
+    path = add_upload("expired.ndjson", 1)
+    session.add_all([
+        Job(id=1, kind=JobKind.ARCHIVE, status=JobStatus.RUNNING, attempts=1, heartbeat_at=stale),
+        Job(id=2, kind=JobKind.ARCHIVE, status=JobStatus.RUNNING, attempts=3, heartbeat_at=stale),
+        Job(id=3, kind=JobKind.ARCHIVE, status=JobStatus.RUNNING, attempts=1, heartbeat_at=fresh),
+        Job(id=4, kind=JobKind.IMPORT, status=JobStatus.FAILED, finished_at=datetime(2025, 1, 1),
+            params=json.dumps({"format": "ndjson", "path": path})),
+        Job(id=5, kind=JobKind.ARCHIVE, status=JobStatus.SUCCEEDED, finished_at=fresh),
+        Job(id=6, kind=JobKind.ARCHIVE),
+    ])
+    session.commit()
+
+    assert recover_jobs(session, now, stale_seconds=120, max_attempts=3, retention_hours=12) == 2
+    statuses = dict(session.exec(select(Job.id, Job.status)).all())
+    assert statuses == {1: JobStatus.QUEUED, 2: JobStatus.FAILED, 3: JobStatus.RUNNING,
+                        5: JobStatus.SUCCEEDED, 6: JobStatus.QUEUED}
+    assert session.get(Job, 2).error == "The job stopped 3 times"
+    assert not os.path.exists(path)
+
+def test_requeued_job(session: Session) -> None:
+    """Test that a start whose job was queued again by the recovery while it ran rolls
+    back its chunk and stops, and does not overwrite the job of the next start.
+
+    Args:
+        session (Session): The database session.
+    """
+    def claim_then_requeue(stale_session: Session) -> Job:
+        stale = JobRunner._claim(stale_session)  # pylint: disable=protected-access
+        session.execute(update(Job).values(heartbeat_at=datetime.utcnow() - timedelta(hours=1)))
+        session.commit()
+        assert recover_jobs(session) == 1
+        return stale
+
+    path = add_upload("upload.ndjson", 1200)
+    job = submit_job(session, "default", JobKind.IMPORT, {"format": "ndjson", "path": path})
+    with Session(get_engine()) as stale_session:
+        JobRunner(workers=0)._execute(  # pylint: disable=protected-access
+            stale_session, claim_then_requeue(stale_session)
+        )
+    session.refresh(job)
+    assert (job.status, job.attempts, job.progress) == (JobStatus.QUEUED, 1, 0)
+    assert not session.exec(select(Goal.id)).all()
+
+    assert run_jobs(JobRunner(workers=0)) == 1
+    session.refresh(job)
+    assert (job.status, job.attempts, job.progress) == (JobStatus.SUCCEEDED, 2, 1200)
+    assert len(session.exec(select(Goal.id)).all()) == 1200
+
+    job = submit_job(session, "default", JobKind.EXPORT, {"format": "csv"})
+    with Session(get_engine()) as stale_session:
+        stale = claim_then_requeue(stale_session)
+        assert run_jobs(JobRunner(workers=0)) == 1
+        JobRunner(workers=0)._execute(stale_session, stale)  # pylint: disable=protected-access
+    session.refresh(job)
+    assert (job.status, job.attempts, job.result) == (
+        JobStatus.SUCCEEDED, 2, json.dumps({"exported": 1200})
+    )
+
+def test_job_runner(session: Session) -> None:
+    """Test that the started runner runs the jobs queued before its start and the
+    submitted ones, and stops.
+
+    Args:
+        session (Session): The database session.
+    """
+    submit_job(session, "default", JobKind.ARCHIVE, {"after_days": 90})
+
+    async def run() -> None:
+        runner = JobRunner(workers=2, poll_interval=60)
+        await runner.start()
+        assert runner.stats() == {"workers": 2, "tasks": 3}
+        submit_job(session, "default", JobKind.ARCHIVE, {"after_days": 90})
+        runner.notify()
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            statuses = session.exec(
+                select(Job.status).execution_options(populate_existing=True)
+            ).all()
+            if statuses == [JobStatus.SUCCEEDED] * 2:
+                break
+        await runner.stop()
+        assert runner.stats()["tasks"] == 0
+
+    asyncio.run(run())
+    assert session.exec(select(Job.status)).all() == [JobStatus.SUCCEEDED] * 2
@@ -6,10 +6,14 @@ verify the responses.
 
 Functions:
     test_root: Tests the root endpoint ("/").
+    test_lazy_routers: Tests the inclusion of the routers by the lifespan handler.
+    test_metrics: Tests the metrics endpoint.
 """
 
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from mycareer.main import app
+from mycareer import main
+from mycareer.main import app, lifespan
 
 client = TestClient(app)
 
@@ -26,3 +30,33 @@ def test_echo() -> None:
     response = client.get("/echo")
     assert response.status_code == 200
     assert response.json() == {"message": "echo"}
+
+def test_lazy_routers(monkeypatch) -> None:
+    """Test the inclusion of the routers by the lifespan handler.
+
+    This test checks if an application without routers gets them on startup
+    when the routers are loaded lazily.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(main, "lazy_routers", True)
+    lazy_app = FastAPI(lifespan=lifespan)
+    lazy_app.state.routers_included = False
+    assert not any(route.path == "/v1/goals" for route in lazy_app.routes)
+
+    with TestClient(lazy_app):
+        assert lazy_app.state.routers_included
+    assert any(route.path == "/v1/goals" for route in lazy_app.routes)
+
+def test_metrics() -> None:
+    """Test the metrics endpoint.
+
+    This test checks if the metrics endpoint returns the counters, the
+    hit rate of the compiled statement cache and the state of the database threads.
+    """
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert isinstance(response.json()["counters"], dict)
+    assert 0 <= response.json()["compiled_cache_hit_rate"] <= 1
+    assert set(response.json()["db_pool"]) == {"threads", "busy", "queued", "queue_size"}
@@ -0,0 +1,38 @@
+"""
+test_metrics.py
+
+This module contains tests for the metrics defined in mycareer.metrics.
+
+Functions:
+    test_metrics: Tests the Metrics class.
+    test_compiled_cache_hit_rate: Tests the compiled_cache_hit_rate function.
+"""
+
+from collections import defaultdict
+from mycareer.metrics import Metrics, compiled_cache_hit_rate, metrics
+
+def test_metrics() -> None:
+    """Test the Metrics class."""
+    registry = Metrics()
+    registry.increment("requests")
+    registry.increment("requests", 2)
+
+    assert registry.get("requests") == 3
+    assert registry.get("unknown") == 0
+    assert registry.snapshot() == {"requests": 3}
+
+    registry.reset()
+    assert not registry.snapshot()
+
+def test_compiled_cache_hit_rate(monkeypatch) -> None:
+    """Test the compiled_cache_hit_rate function.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(metrics, "_counters", defaultdict(float))
+    assert compiled_cache_hit_rate() == 0.0
+
+    metrics.increment("db.compiled_cache.hits", 3)
+    metrics.increment("db.compiled_cache.misses", 1)
+    assert compiled_cache_hit_rate() == 0.75
@@ -0,0 +1,163 @@
+"""
+test_profiling.py
+
+This module contains tests for the memory diagnostics defined in mycareer.profiling.
+
+Fixtures:
+    tracker_fixture: Creates an allocation tracker, stopped after the test.
+
+Functions:
+    build_app: Builds an application measured by the allocation middleware.
+    test_snapshot_diff: Tests the comparison of the snapshots of the tracker.
+    test_middleware_disabled: Tests that the requests are not measured before the start.
+    test_middleware_routes: Tests the allocations of the requests by route.
+    test_middleware_sampling: Tests that one request in a number of them is measured.
+    test_gc_stats: Tests the gc_stats function.
+    test_session_stats: Tests the session_stats function.
+"""
+
+import gc
+from typing import Generator, List
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel
+from mycareer.database import get_engine
+from mycareer.models import Goal
+from mycareer.profiling import AllocationMiddleware, AllocationTracker, gc_stats, session_stats
+
+@pytest.fixture(name="tracker")
+def tracker_fixture() -> Generator[AllocationTracker, None, None]:
+    """Fixture to create an allocation tracker, stopped after the test.
+
+    Yields:
+        AllocationTracker: The tracker.
+    """
+    tracker = AllocationTracker(max_sites=5, sample_every=1)
+    yield tracker
+    tracker.stop()
+
+def build_app(tracker: AllocationTracker) -> FastAPI:
+    """Build an application measured by the allocation middleware.
+
+    Args:
+        tracker (AllocationTracker): The tracker of the middleware.
+
+    Returns:
+        FastAPI: The application, with a handler returning a large body.
+    """
+    application = FastAPI()
+    application.add_middleware(AllocationMiddleware, tracker=tracker)
+
+    @application.get("/v1/items/{item_id}")
+    async def get_item(item_id: int) -> List[str]:
+        return [f"item {item_id} {index}" for index in range(10_000)]
+
+    @application.get("/other")
+    async def other() -> dict:
+        return {}
+
+    return application
+
+def test_snapshot_diff(tracker: AllocationTracker) -> None:
+    """Test that each snapshot is compared with the previous one, and that there is no
+    snapshot before the start.
+
+    Args:
+        tracker (AllocationTracker): The tracker.
+    """
+    with pytest.raises(RuntimeError):
+        tracker.snapshot_diff()
+
+    status = tracker.start(frames=2)
+    assert (status["tracing"], status["frames"]) == (True, 2)
+    held = [bytearray(1000) for _ in range(1000)]
+    sites = tracker.snapshot_diff(limit=3)
+    assert len(sites) == 3
+    assert sites[0]["site"].startswith(f"{__file__}:")
+    assert sites[0]["size_diff"] >= 1_000_000 and sites[0]["count_diff"] >= 1000
+
+    del held
+    sites = tracker.snapshot_diff(limit=1, key_type="filename")
+    assert sites[0]["site"] == __file__ and sites[0]["size_diff"] <= -1_000_000
+    assert " <- " in tracker.snapshot_diff(limit=1, key_type="traceback")[0]["site"]
+
+    assert tracker.stop()["tracing"] is False
+    with pytest.raises(RuntimeError):
+        tracker.snapshot_diff()
+
+def test_middleware_disabled(tracker: AllocationTracker) -> None:
+    """Test that the requests are not measured before the start of the tracker.
+
+    Args:
+        tracker (AllocationTracker): The tracker.
+    """
+    with TestClient(build_app(tracker)) as client:
+        assert client.get("/v1/items/1").status_code == 200
+    assert tracker.routes() == {}
+
+def test_middleware_routes(tracker: AllocationTracker) -> None:
+    """Test the allocations of the requests by route.
+
+    This test checks if the requests are grouped by route, if only the `/v1/` ones
+    are measured, and if the sites alive while the body is sent are the ones of the
+    handler and of its JSON body.
+
+    Args:
+        tracker (AllocationTracker): The tracker.
+    """
+    tracker.start()
+    with TestClient(build_app(tracker)) as client:
+        for item_id in (1, 2, 3):
+            assert len(client.get(f"/v1/items/{item_id}").json()) == 10_000
+        client.get("/other")
+
+    routes = tracker.routes(limit=3)
+    assert list(routes) == ["GET /v1/items/{id}"]
+    allocations = routes["GET /v1/items/{id}"]
+    assert (allocations["requests"], allocations["measured"]) == (3, 3)
+    assert allocations["peak_bytes"] >= 500_000
+    assert len(allocations["sites"]) == 3
+    assert allocations["sites"][0]["size"] >= 100_000
+    assert tracker.stop()["tracing"] is False
+    assert tracker.routes() == {}
+
+def test_middleware_sampling() -> None:
+    """Test that the first request of each route, then one in `sample_every`, are measured."""
+    tracker = AllocationTracker(sample_every=3)
+    tracker.start()
+    try:
+        with TestClient(build_app(tracker)) as client:
+            for item_id in range(7):
+                client.get(f"/v1/items/{item_id}")
+        allocations = tracker.routes()["GET /v1/items/{id}"]
+        assert (allocations["requests"], allocations["measured"]) == (7, 3)
+    finally:
+        tracker.stop()
+
+def test_gc_stats() -> None:
+    """Test that the statistics of the garbage collector cover its three generations."""
+    stats = gc_stats()
+    assert stats["enabled"] is gc.isenabled()
+    assert len(stats["thresholds"]) == len(stats["generations"]) == len(stats["objects"]) == 3
+    assert all("collections" in generation for generation in stats["generations"])
+    assert stats["garbage"] == len(gc.garbage)
+
+def test_session_stats() -> None:
+    """Test that the identity maps of the live sessions are counted by class."""
+    SQLModel.metadata.create_all(get_engine())
+    try:
+        with Session(get_engine()) as session:
+            session.add_all([Goal(name=f"Goal {index}") for index in range(3)])
+            session.commit()
+            goals = [session.get(Goal, goal_id) for goal_id in (1, 2, 3)]
+            session.add(Goal(name="New"))
+            stats = session_stats(limit=100)
+            assert stats["sessions"] >= 1 and stats["objects"] >= 3
+            assert {
+                "identity_map": 3, "new": 1, "in_transaction": True, "classes": {"Goal": 3},
+            } in stats["largest"]
+            assert len(session_stats(limit=1)["largest"]) == 1
+            assert len(goals) == 3
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
@@ -0,0 +1,162 @@
+"""
+test_queries.py
+
+This module contains tests for the statements defined in mycareer.queries.
+
+Fixtures:
+    session_fixture: Seeds the database session with two goals.
+
+Functions:
+    test_select_goals: Tests the select_goals function.
+    test_select_goal_by_id: Tests the select_goal_by_id function.
+    test_select_goal_by_id_uses_compiled_cache: Tests that the statement is compiled once.
+    test_deleted_goals_are_filtered: Tests that the statements skip the soft deleted goals.
+    test_select_goals_changed_since_uses_partial_index: Tests the plan of the delta statement.
+    test_statements_are_scoped_to_the_tenant: Tests that the goals of other tenants are skipped.
+    test_select_goal_rows_uses_tenant_index: Tests that the list reads the index of the tenant.
+    test_select_goal_subtree_rows_uses_parent_index: Tests the plan of the subtree statement.
+"""
+
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+from mycareer.database import get_engine
+from mycareer.metrics import metrics
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus
+from mycareer.queries import (
+    select_archived_goal_by_id, select_goal_by_id, select_goal_rows, select_goal_rows_by_ids,
+    select_goal_subtree_rows, select_goals, select_goals_changed_since
+)
+
+TENANT = "default"
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with two goals.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    session.add_all([Goal(name="First Goal"), Goal(name="Second Goal")])
+    session.commit()
+    return session
+
+def test_select_goals(session: Session) -> None:
+    """Test the select_goals function.
+
+    Args:
+        session (Session): The database session.
+    """
+    goals = session.execute(select_goals(TENANT)).scalars().all()
+    assert sorted(goal.name for goal in goals) == ["First Goal", "Second Goal"]
+
+def test_select_goal_by_id(session: Session) -> None:
+    """Test the select_goal_by_id function.
+
+    This test checks if the bound ID changes between calls of the same statement.
+
+    Args:
+        session (Session): The database session.
+    """
+    assert session.execute(select_goal_by_id(TENANT, 1)).scalar_one().name == "First Goal"
+    assert session.execute(select_goal_by_id(TENANT, 2)).scalar_one().name == "Second Goal"
+    assert session.execute(select_goal_by_id(TENANT, 3)).scalar_one_or_none() is None
+
+def test_select_goal_by_id_uses_compiled_cache(session: Session) -> None:
+    """Test that the statement is compiled once and then served by the cache.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.execute(select_goal_by_id(TENANT, 1))
+    hits = metrics.get("db.compiled_cache.hits")
+    misses = metrics.get("db.compiled_cache.misses")
+
+    for goal_id in range(2, 12):
+        session.execute(select_goal_by_id(TENANT, goal_id))
+
+    assert metrics.get("db.compiled_cache.hits") == hits + 10
+    assert metrics.get("db.compiled_cache.misses") == misses
+
+def test_deleted_goals_are_filtered(session: Session) -> None:
+    """Test that the statements skip the soft deleted goals.
+
+    Args:
+        session (Session): The database session.
+    """
+    goal = session.get(Goal, 2)
+    goal.deleted_at = datetime.utcnow()
+    session.commit()
+
+    assert session.execute(select_goal_by_id(TENANT, 2)).scalar_one_or_none() is None
+    assert [row.name for row in session.execute(select_goal_rows(TENANT))] == ["First Goal"]
+
+def test_select_goals_changed_since_uses_partial_index(session: Session) -> None:
+    """Test that the delta statement searches the partial index of the live goals.
+
+    Args:
+        session (Session): The database session.
+    """
+    compiled = select_goals_changed_since(TENANT, 0, 10).compile(
+        get_engine(), compile_kwargs={"literal_binds": True}
+    )
+    plan = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert any("USING INDEX ix_goal_change_seq (tenant_id=? AND change_seq>?)" in row[-1]
+               for row in plan), plan
+
+def test_statements_are_scoped_to_the_tenant(session: Session) -> None:
+    """Test that the statements skip the goals of the other tenants.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.add_all([
+        Goal(tenant_id="acme", name="Acme Goal"),
+        GoalArchive(id=4, tenant_id="acme", name="Archived Acme Goal",
+                    status=GoalStatus.COMPLETED, priority=GoalPriority.LOW, change_seq=0,
+                    updated_at=datetime.utcnow()),
+    ])
+    session.commit()
+
+    assert [row.name for row in session.execute(select_goal_rows("acme"))] == ["Acme Goal"]
+    assert [row.id for row in session.execute(select_goal_rows_by_ids("acme", [1, 3]))] == [3]
+    assert session.execute(select_goal_by_id("acme", 1)).scalar_one_or_none() is None
+    assert session.execute(select_goal_by_id(TENANT, 3)).scalar_one_or_none() is None
+    assert session.execute(select_archived_goal_by_id("acme", 4)).scalar_one().id == 4
+    assert session.execute(select_archived_goal_by_id(TENANT, 4)).scalar_one_or_none() is None
+
+def test_select_goal_rows_uses_tenant_index(session: Session) -> None:
+    """Test that the list searches the index of the tenant and needs no sort.
+
+    Args:
+        session (Session): The database session.
+    """
+    compiled = select_goal_rows(TENANT).compile(
+        get_engine(), compile_kwargs={"literal_binds": True}
+    )
+    plan = [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()]
+    assert any("USING INDEX ix_goal_tenant_id (tenant_id=?)" in detail for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
+
+def test_select_goal_subtree_rows_uses_parent_index(session: Session) -> None:
+    """Test that the subtree statement walks the parent index, one search per goal.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.add_all([Goal(name="Sub-goal", parent_id=1), Goal(name="Leaf", parent_id=3)])
+    session.commit()
+    rows = session.execute(select_goal_subtree_rows(TENANT, 1)).all()
+    assert [(row.id, row.depth) for row in rows] == [(1, 0), (3, 1), (4, 2)]
+
+    compiled = select_goal_subtree_rows(TENANT, 1).compile(
+        get_engine(), compile_kwargs={"literal_binds": True}
+    )
+    plan = [row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()]
+    assert any("USING INDEX ix_goal_parent_id (tenant_id=? AND parent_id=?)" in detail
+               for detail in plan), plan
+    assert not any(detail.startswith("SCAN goal") for detail in plan), plan
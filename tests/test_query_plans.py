@@ -0,0 +1,397 @@
+"""
+test_query_plans.py
+
+This module checks the plans of the statements emitted by the API endpoints and
+the background jobs.
+
+The data set of `mycareer.datagen` is seeded, then every step of a scenario calls an endpoint
+or runs a job while the statements reaching the database are captured. Every
+statement is explained with its captured parameters, `EXPLAIN QUERY PLAN` on
+SQLite and `EXPLAIN (COSTS OFF)` on Postgres, and the plans are compared with the
+snapshots of `tests/query_plans/<dialect>/<step>.txt`, kept for review. A full
+scan of a table, or a sort in a temporary B-tree, fails the test unless it is
+allowed for the step in `ALLOWED`, with the reason.
+
+The snapshots are written again with `UPDATE_QUERY_PLANS=1`. The Postgres ones are
+also written the first time `POSTGRES_TEST_URL` points to a server, when
+`tests/query_plans/postgresql` does not exist yet. Any other missing snapshot fails.
+
+Functions:
+    seed_database: Seeds the database with the generated data set.
+    capture_statements: Captures the statements executed by an engine.
+    explain: Gets the plan of a statement, one line per node.
+    find_violations: Finds the full scans and the temporary sorts of a plan.
+    run_scenario: Runs the steps of the scenario and gets the plans of their statements.
+    test_find_violations: Tests the detection of the full scans and the temporary sorts.
+    test_missing_snapshots: Tests that only the first Postgres run writes the missing snapshots.
+    test_sqlite_query_plans: Tests the plans of the statements on SQLite.
+    test_postgresql_query_plans: Tests the plans of the statements on Postgres.
+"""
+
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session, SQLModel, select
+from mycareer import database, jobs
+from mycareer.archive import archive_goals, purge_deleted_goals
+from mycareer.database import get_engine
+from mycareer.datagen import GENERATION_DATE, get_snapshot, load_goals, restore_snapshot
+from mycareer.jobs import JobRunner, recover_jobs
+from mycareer.main import app
+from mycareer.models import Goal, GoalArchive
+from mycareer.reminders import LogReminderSink, ReminderScheduler
+
+PLANS_DIR = Path(__file__).parent / "query_plans"
+TENANTS = ("default", "acme", "globex")
+SEED_GOALS = 5000
+SEED = 45
+NOW = GENERATION_DATE
+
+update_plans: bool = os.getenv("UPDATE_QUERY_PLANS", "").lower() in ("1", "true", "yes")
+postgres_url: str = os.getenv("POSTGRES_TEST_URL", "")
+
+# The plan lines allowed by step, by dialect, with the reason.
+ALLOWED: Dict[str, Dict[str, Dict[str, str]]] = {
+    "sqlite": {
+        "get_goal_subtree": {
+            "USE TEMP B-TREE FOR ORDER BY":
+                "The sub-goals are ordered by depth, which is computed by the recursive query.",
+        },
+        "get_time_in_status": {
+            "USE TEMP B-TREE FOR GROUP BY":
+                "The statuses are grouped from the window over the events of the goals.",
+            "USE TEMP B-TREE FOR count(DISTINCT)":
+                "The goals of a status are counted once over its segments.",
+        },
+        "get_closed_goals": {
+            "USE TEMP B-TREE FOR GROUP BY":
+                "The periods are computed from the dates, no index holds them.",
+        },
+    },
+    "postgresql": {
+        "get_goal_subtree": {
+            "Sort": "The sub-goals are ordered by depth, which is computed by the recursive query.",
+        },
+        "get_time_in_status": {
+            "Sort": "The window over the events of the goals and the distinct goals are sorted.",
+        },
+        "get_closed_goals": {
+            "Sort": "The periods are computed from the dates, no index holds them.",
+        },
+    },
+}
+
+def seed_database(engine: Engine) -> Dict[str, int]:
+    """Seed the database with the generated data set and archive its oldest closed goals.
+
+    SQLite databases get a copy of the cached snapshot, the others are loaded.
+    The statistics of the tables are collected, as in a database in production.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        Dict[str, int]: The IDs of goals of the first tenant used by the steps: a
+        `goal` with sub-goals, a `leaf` sub-goal of it and two `archived` goals.
+    """
+    if engine.dialect.name == "sqlite":
+        restore_snapshot(engine, get_snapshot(SEED_GOALS, SEED, TENANTS))
+    else:
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            load_goals(session, SEED_GOALS, SEED, TENANTS)
+
+    with Session(engine) as session:
+        archive_goals(session, GENERATION_DATE - timedelta(days=180))
+        session.execute(text("ANALYZE"))
+        session.commit()
+        live = (Goal.tenant_id == TENANTS[0], Goal.deleted_at.is_(None))
+        parent_ids = select(Goal.parent_id).where(*live)
+        goal_id = session.exec(
+            select(Goal.id).where(*live, Goal.id.in_(parent_ids)).order_by(Goal.id)
+        ).first()
+        archived_ids = session.exec(
+            select(GoalArchive.id).where(GoalArchive.tenant_id == TENANTS[0])
+            .order_by(GoalArchive.id).limit(2)
+        ).all()
+        return {
+            "goal": goal_id,
+            "leaf": session.exec(
+                select(Goal.id).where(*live, Goal.parent_id == goal_id).order_by(Goal.id)
+            ).first(),
+            "archived": archived_ids[0],
+            "archived_leaf": archived_ids[1],
+        }
+
+@contextmanager
+def capture_statements(engine: Engine) -> Iterator[List[Tuple[str, Sequence]]]:
+    """Capture the statements executed by an engine in the block.
+
+    Args:
+        engine (Engine): The engine.
+
+    Yields:
+        List[Tuple[str, Sequence]]: The statements and their parameters, filled
+        while the block runs. The statements run with many parameter sets are skipped.
+    """
+    statements = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, executemany) -> None:
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+def explain(connection: Connection, statement: str, parameters: Sequence) -> List[str]:
+    """Get the plan of a statement, one line per node, indented by depth.
+
+    Args:
+        connection (Connection): The connection.
+        statement (str): The statement.
+        parameters (Sequence): The parameters of the statement.
+
+    Returns:
+        List[str]: The lines of the plan, empty for a statement without one.
+    """
+    if connection.dialect.name == "sqlite":
+        depths = {0: -1}
+        lines = []
+        for node_id, parent_id, _, detail in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ):
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            lines.append("  " * depths[node_id] + detail)
+        return lines
+    plan = connection.exec_driver_sql(f"EXPLAIN (COSTS OFF) {statement}", parameters)
+    return [row[0] for row in plan]
+
+def find_violations(dialect: str, plan: List[str], allowed: Dict[str, str]) -> List[str]:
+    """Find the full scans of a table and the temporary sorts of a plan.
+
+    A scan of a common table expression or of a subquery is not a violation.
+
+    Args:
+        dialect (str): `sqlite` or `postgresql`.
+        plan (List[str]): The lines of the plan.
+        allowed (Dict[str, str]): The allowed lines, by text they contain.
+
+    Returns:
+        List[str]: The lines of the plan which are not allowed.
+    """
+    tables = set(SQLModel.metadata.tables)
+    if dialect == "sqlite":
+        scan, sort = re.compile(r"^SCAN (\w+)"), re.compile(r"TEMP B-TREE")
+    else:
+        scan, sort = re.compile(r"Seq Scan on (\w+)"), re.compile(r"^(->\s+)?(Incremental )?Sort\b")
+    violations = []
+    for line in plan:
+        detail = line.strip()
+        full_scan = scan.search(detail)
+        if (full_scan and full_scan.group(1) in tables) or sort.search(detail):
+            if not any(pattern in detail for pattern in allowed):
+                violations.append(detail)
+    return violations
+
+def _steps(client: TestClient, ids: Dict[str, int]) -> List[Tuple[str, Callable[[], object]]]:
+    goal_id, leaf_id, archived_id = ids["goal"], ids["leaf"], ids["archived"]
+    json_body = {"name": "Goal", "parent_id": goal_id, "status": "completed"}
+
+    def run_job(job: Callable[[Session], object]) -> Callable[[], object]:
+        def run() -> object:
+            with Session(get_engine()) as session:
+                return job(session)
+        return run
+
+    return [
+        ("get_goals", lambda: client.get("/v1/goals")),
+        ("get_goals_with_archive", lambda: client.get("/v1/goals?include_archived=true")),
+        ("get_goals_delta", lambda: client.get("/v1/goals/delta?since=500&limit=100")),
+        ("batch_get_goals", lambda: client.post(
+            "/v1/goals/batch-get", json={"ids": [goal_id, leaf_id, archived_id, 999_999]}
+        )),
+        ("query_goals", lambda: client.post("/v1/goals/query", json={
+            "filters": {"status": ["in progress", "blocked"]},
+            "include": ["parent", "sub_goals", "history"],
+            "aggregates": ["count", "status", "priority"],
+        })),
+        ("get_goal", lambda: client.get(f"/v1/goals/{goal_id}")),
+        ("get_archived_goal", lambda: client.get(f"/v1/goals/{archived_id}")),
+        ("get_goal_subtree", lambda: client.get(f"/v1/goals/{goal_id}/subtree")),
+        ("get_goal_progress", lambda: client.get(f"/v1/goals/{goal_id}/progress")),
+        ("create_goal", lambda: client.post("/v1/goals", json=json_body)),
+        ("update_goal", lambda: client.put(f"/v1/goals/{leaf_id}", json=json_body)),
+        ("update_archived_goal", lambda: client.put(f"/v1/goals/{archived_id}", json=json_body)),
+        ("import_goals", lambda: client.post(
+            "/v1/goals/import", content='{"name": "First"}\n{"name": "Second"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )),
+        ("delete_goal", lambda: client.delete(f"/v1/goals/{goal_id}")),
+        ("delete_archived_goal", lambda: client.delete(f"/v1/goals/{ids['archived_leaf']}")),
+        ("get_time_in_status", lambda: client.get("/v1/analytics/time-in-status")),
+        ("get_closed_goals", lambda: client.get(
+            "/v1/analytics/closed-goals?period=month&since=2024-07-01T00:00:00"
+        )),
+        ("archive_goals", run_job(lambda session: archive_goals(session, NOW, 100))),
+        ("purge_deleted_goals", run_job(lambda session: purge_deleted_goals(session, NOW, 100))),
+        ("remind_goals", run_job(
+            lambda session: ReminderScheduler(LogReminderSink(), batch_size=100).tick(
+                session, NOW + timedelta(days=1)
+            )
+        )),
+        ("submit_export_job", lambda: client.post("/v1/jobs/export", json={"format": "csv"})),
+        ("run_export_job", JobRunner(workers=0)._run_next),  # pylint: disable=protected-access
+        ("get_job", lambda: client.get("/v1/jobs/1")),
+        ("recover_jobs", run_job(lambda session: recover_jobs(session, NOW))),
+    ]
+
+def run_scenario() -> Dict[str, List[Tuple[str, List[str]]]]:
+    """Seed the database, run the steps of the scenario and get the plans of their statements.
+
+    Returns:
+        Dict[str, List[Tuple[str, List[str]]]]: The statements of every step, once
+        each, with their plans. The statements without a plan are skipped.
+    """
+    ids = seed_database(get_engine())
+
+    plans = {}
+    with TestClient(app) as client:
+        for step, call in _steps(client, ids):
+            with capture_statements(get_engine()) as statements:
+                response = call()
+            assert getattr(response, "status_code", 200) < 400, (step, response)
+            plans[step] = []
+            unique = {}
+            for statement, parameters in statements:
+                unique.setdefault(statement, parameters)
+            with get_engine().connect() as connection:
+                for statement, parameters in unique.items():
+                    plan = explain(connection, statement, parameters)
+                    if plan:
+                        plans[step].append((statement, plan))
+    return plans
+
+def _render(statements: List[Tuple[str, List[str]]]) -> str:
+    return "".join(
+        f"-- statement {number}\n"
+        + "".join(f"{line.rstrip()}\n" for line in statement.strip().splitlines())
+        + "-- plan\n" + "".join(f"{line}\n" for line in plan) + "\n"
+        for number, (statement, plan) in enumerate(statements, 1)
+    )
+
+def _check_plans(dialect: str, plans: Dict[str, List[Tuple[str, List[str]]]]) -> None:
+    directory = PLANS_DIR / dialect
+    first_run = dialect == "postgresql" and not directory.exists()
+    violations, changed, missing = [], [], []
+    for step, statements in plans.items():
+        allowed = ALLOWED[dialect].get(step, {})
+        for statement, plan in statements:
+            violations.extend(
+                f"{step}: {line}\n    {' '.join(statement.split())[:200]}"
+                for line in find_violations(dialect, plan, allowed)
+            )
+        snapshot, rendered = directory / f"{step}.txt", _render(statements)
+        if update_plans or first_run:
+            directory.mkdir(parents=True, exist_ok=True)
+            snapshot.write_text(rendered, encoding="utf-8")
+        elif not snapshot.exists():
+            missing.append(step)
+        elif snapshot.read_text(encoding="utf-8") != rendered:
+            changed.append(step)
+    assert not violations, "Full scans or temporary sorts:\n" + "\n".join(violations)
+    assert not missing, (
+        f"No snapshot for {', '.join(missing)}, review the plans and run with UPDATE_QUERY_PLANS=1"
+    )
+    assert not changed, (
+        f"The plans of {', '.join(changed)} changed, review them and run with UPDATE_QUERY_PLANS=1"
+    )
+
+def test_find_violations() -> None:
+    """Test the detection of the full scans of a table and of the temporary sorts."""
+    plan = [
+        "SCAN goal",
+        "SCAN goal USING COVERING INDEX ix_goal_status",
+        "SEARCH goal USING INDEX ix_goal_tenant_id (tenant_id=?)",
+        "  SCAN subtree",
+        "USE TEMP B-TREE FOR ORDER BY",
+    ]
+    assert find_violations("sqlite", plan, {}) == [
+        "SCAN goal", "SCAN goal USING COVERING INDEX ix_goal_status",
+        "USE TEMP B-TREE FOR ORDER BY",
+    ]
+    assert not find_violations("sqlite", plan, {"SCAN goal": "", "ORDER BY": ""})
+
+    plan = ["Sort", "  ->  Seq Scan on goal", "  ->  Index Scan using ix_goal_tenant_id on goal"]
+    assert find_violations("postgresql", plan, {}) == ["Sort", "->  Seq Scan on goal"]
+
+def test_missing_snapshots(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the first Postgres run writes the snapshots, and that the next runs
+    compare the plans with them and fail on a missing snapshot, as SQLite always does.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture, for the snapshots.
+        monkeypatch (pytest.MonkeyPatch): The fixture to write the snapshots there.
+    """
+    monkeypatch.setattr(sys.modules[__name__], "PLANS_DIR", tmp_path)
+    monkeypatch.setattr(sys.modules[__name__], "update_plans", False)
+    plans = {"get_goal": [("SELECT 1", ["SEARCH goal USING INTEGER PRIMARY KEY (rowid=?)"])]}
+    _check_plans("postgresql", plans)
+    snapshot = tmp_path / "postgresql" / "get_goal.txt"
+    assert snapshot.read_text(encoding="utf-8").startswith("-- statement 1\nSELECT 1\n")
+
+    _check_plans("postgresql", plans)
+    with pytest.raises(AssertionError, match="get_goal changed"):
+        _check_plans("postgresql", {"get_goal": [("SELECT 1", ["Index Scan using goal_pkey"])]})
+    with pytest.raises(AssertionError, match="No snapshot for list_goals"):
+        _check_plans("postgresql", {**plans, "list_goals": plans["get_goal"]})
+    with pytest.raises(AssertionError, match="No snapshot for get_goal"):
+        _check_plans("sqlite", plans)
+    assert not (tmp_path / "sqlite").exists()
+
+    monkeypatch.setattr(sys.modules[__name__], "update_plans", True)
+    _check_plans("sqlite", plans)
+    assert (tmp_path / "sqlite" / "get_goal.txt").exists()
+
+def test_sqlite_query_plans(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the plans of the statements of every step on SQLite against the snapshots.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture, for the files of the jobs.
+        monkeypatch (pytest.MonkeyPatch): The fixture to run the jobs in the steps only.
+    """
+    monkeypatch.setattr(jobs, "job_dir", str(tmp_path))
+    monkeypatch.setattr(jobs.job_runner, "workers", 0)
+    try:
+        _check_plans("sqlite", run_scenario())
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+
+@pytest.mark.skipif(not postgres_url, reason="POSTGRES_TEST_URL is not set")
+def test_postgresql_query_plans(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the plans of the statements of every step on Postgres against the snapshots.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture, for the files of the jobs.
+        monkeypatch (pytest.MonkeyPatch): The fixture to point the application to Postgres,
+        and to run the jobs in the steps only.
+    """
+    monkeypatch.setattr(jobs, "job_dir", str(tmp_path))
+    monkeypatch.setattr(jobs.job_runner, "workers", 0)
+    database.dispose_engines()
+    monkeypatch.setattr(database, "database_url", postgres_url)
+    try:
+        _check_plans("postgresql", run_scenario())
+    finally:
+        SQLModel.metadata.drop_all(get_engine())
+        database.dispose_engines()
@@ -0,0 +1,155 @@
+"""
+test_ratelimit.py
+
+This module contains tests for the admission control defined in mycareer.ratelimit.
+
+Functions:
+    build_app: Builds an application protected by the admission control middleware.
+    test_rate_limiter: Tests the refill of a token bucket.
+    test_rate_limiter_slow_rate: Tests a rate below one request per two seconds.
+    test_rate_limiter_eviction: Tests the bound of the bucket table.
+    test_concurrency_limiter: Tests the ConcurrencyLimiter class.
+    test_middleware_rate_limit: Tests the 429 answer of the middleware.
+    test_middleware_overload: Tests the 503 answer of the middleware.
+    test_middleware_transfers: Tests that the transfers have their own cap.
+"""
+
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mycareer.ratelimit import AdmissionControlMiddleware, ConcurrencyLimiter, RateLimiter
+
+def build_app(**options) -> FastAPI:
+    """Build an application protected by the admission control middleware.
+
+    Args:
+        **options: The options of the middleware.
+
+    Returns:
+        FastAPI: The application, with `/v1/items/{item_id}`, `/v1/jobs/{job_id}/result`
+        and `/echo` endpoints.
+    """
+    application = FastAPI()
+    application.add_middleware(AdmissionControlMiddleware, **options)
+
+    @application.get("/v1/items/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        await asyncio.sleep(0)
+        return {"id": item_id}
+
+    @application.get("/v1/jobs/{job_id}/result")
+    async def get_result(job_id: int) -> dict:
+        await asyncio.sleep(0)
+        return {"id": job_id}
+
+    @application.get("/echo")
+    async def echo() -> dict:
+        return {"message": "echo"}
+
+    return application
+
+def _middleware(application: FastAPI) -> AdmissionControlMiddleware:
+    middleware = application.middleware_stack
+    while not isinstance(middleware, AdmissionControlMiddleware):
+        middleware = middleware.app
+    return middleware
+
+def test_rate_limiter() -> None:
+    """Test the refill of a token bucket."""
+    limiter = RateLimiter(rate=2, burst=2)
+
+    assert limiter.acquire("client", now=0) == 0
+    assert limiter.acquire("client", now=0) == 0
+    assert limiter.acquire("client", now=0) == 0.5
+    assert limiter.acquire("other", now=0) == 0
+    assert limiter.acquire("client", now=0.5) == 0
+
+def test_rate_limiter_slow_rate() -> None:
+    """Test that a bucket holds at least one token when twice the rate is below one, so
+    the requests pass once the bucket is refilled.
+    """
+    limiter = RateLimiter(rate=0.1, burst=0.2)
+
+    assert limiter.acquire("client", now=0) == 0
+    assert limiter.acquire("client", now=5) == 5
+    assert limiter.acquire("client", now=10) == 0
+    assert limiter.acquire("client", now=100) == 0
+
+def test_rate_limiter_eviction() -> None:
+    """Test the bound of the bucket table.
+
+    This test checks if the least recently used bucket is evicted.
+    """
+    limiter = RateLimiter(rate=1, burst=1, max_keys=2)
+    limiter.acquire("first", now=0)
+    limiter.acquire("second", now=0)
+    limiter.acquire("first", now=0)
+    limiter.acquire("third", now=0)
+
+    assert len(limiter) == 2
+    assert limiter.acquire("second", now=0) == 0
+
+def test_concurrency_limiter() -> None:
+    """Test the ConcurrencyLimiter class."""
+    limiter = ConcurrencyLimiter(1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+
+def test_middleware_rate_limit() -> None:
+    """Test the 429 answer of the middleware.
+
+    This test checks if the requests over the burst are rejected with a
+    `Retry-After` header, and if the unprotected endpoints are not limited.
+    """
+    client = TestClient(build_app(rate=0.001, burst=2, max_in_flight=0))
+
+    assert client.get("/v1/items/1").status_code == 200
+    assert client.get("/v1/items/2").status_code == 200
+    response = client.get("/v1/items/3")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    assert client.get("/echo").status_code == 200
+
+def test_middleware_overload() -> None:
+    """Test the 503 answer of the middleware.
+
+    This test checks if a request is rejected when the cap of requests in
+    flight is reached, and admitted again once a slot is released.
+    """
+    application = build_app(max_in_flight=1)
+    client = TestClient(application)
+    assert client.get("/v1/items/1").status_code == 200
+
+    middleware = _middleware(application)
+    middleware.concurrency_limiter.try_acquire()
+
+    response = client.get("/v1/items/1")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    middleware.concurrency_limiter.release()
+    assert client.get("/v1/items/1").status_code == 200
+
+def test_middleware_transfers() -> None:
+    """Test that the transfers have their own cap.
+
+    This test checks if the transfers in flight do not take the slots of the
+    other requests, and if a transfer over its own cap is rejected.
+    """
+    application = build_app(max_in_flight=1, max_transfers=1)
+    client = TestClient(application)
+    assert client.get("/v1/jobs/1/result").status_code == 200
+
+    middleware = _middleware(application)
+    middleware.transfer_limiter.try_acquire()
+    assert client.get("/v1/items/1").status_code == 200
+    response = client.get("/v1/jobs/2/result")
+    assert response.status_code == 503
+
+    middleware.transfer_limiter.release()
+    middleware.concurrency_limiter.try_acquire()
+    assert client.get("/v1/jobs/2/result").status_code == 200
+    assert client.get("/v1/items/1").status_code == 503
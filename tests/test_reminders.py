@@ -0,0 +1,171 @@
+"""
+test_reminders.py
+
+This module contains tests for the due date reminders defined in mycareer.reminders.
+
+Classes:
+    ListSink: A sink keeping the emitted batches in memory.
+
+Functions:
+    add_goal: Adds a goal due at a date.
+    test_tick: Tests the tick method of the scheduler.
+    test_tick_claims_the_range: Tests that a range is reminded by a single scheduler.
+    test_tick_with_failing_sink: Tests that a range is scanned again after a failed emission.
+    test_tick_uses_due_date_index: Tests that the scan is a search of the due date index.
+    test_file_sink: Tests the FileReminderSink class.
+    test_create_reminder_sink: Tests the create_reminder_sink function.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import List
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+from mycareer.database import get_engine
+from mycareer.models import Goal, GoalStatus
+from mycareer.queries import select_goals_due_between
+from mycareer.reminders import (
+    FileReminderSink, LogReminderSink, ReminderScheduler, ReminderSink, create_reminder_sink
+)
+from mycareer.schemas import GoalReminder
+
+NOW = datetime(2024, 11, 25, 12, 0)
+
+class ListSink(ReminderSink):
+    """
+    ## Description
+
+    A sink keeping the emitted batches in memory.
+    """
+
+    def __init__(self) -> None:
+        self.batches: List[List[GoalReminder]] = []
+
+    def emit(self, reminders: List[GoalReminder]) -> None:
+        self.batches.append(reminders)
+
+def add_goal(session: Session, name: str, due_date: datetime,
+             status: GoalStatus = GoalStatus.IN_PROGRESS) -> None:
+    """Add a goal due at a date.
+
+    Args:
+        session (Session): The database session.
+        name (str): The name of the goal.
+        due_date (datetime): The due date of the goal.
+        status (GoalStatus): The status of the goal.
+    """
+    session.add(Goal(name=name, due_date=due_date, status=status))
+    session.commit()
+
+def test_tick(session: Session) -> None:
+    """Test the tick method of the scheduler.
+
+    This test checks if the first tick reminds the open goals due in the
+    window, in batches and in due date order, and if the next tick only
+    reminds the goals that entered the window since.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Overdue", NOW - timedelta(hours=1))
+    add_goal(session, "Soon", NOW + timedelta(hours=2))
+    add_goal(session, "Sooner", NOW + timedelta(hours=1))
+    add_goal(session, "Same time", NOW + timedelta(hours=1))
+    add_goal(session, "Completed", NOW + timedelta(hours=1), GoalStatus.COMPLETED)
+    add_goal(session, "Tomorrow", NOW + timedelta(hours=30))
+    sink = ListSink()
+    scheduler = ReminderScheduler(sink, window=timedelta(hours=24), batch_size=2)
+
+    assert scheduler.tick(session, NOW) == 3
+    assert [[reminder.name for reminder in batch] for batch in sink.batches] == [
+        ["Sooner", "Same time"], ["Soon"]
+    ]
+
+    sink.batches.clear()
+    assert scheduler.tick(session, NOW + timedelta(hours=1)) == 0
+    assert scheduler.tick(session, NOW + timedelta(hours=7)) == 1
+    assert sink.batches[0][0].name == "Tomorrow"
+    assert sink.batches[0][0].tenant_id == "default"
+    assert sink.batches[0][0].due_date == NOW + timedelta(hours=30)
+
+def test_tick_claims_the_range(session: Session) -> None:
+    """Test that a range is reminded by a single scheduler.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Soon", NOW + timedelta(hours=2))
+    first, second = ListSink(), ListSink()
+    assert ReminderScheduler(first).tick(session, NOW) == 1
+    assert ReminderScheduler(second).tick(session, NOW) == 0
+    assert not second.batches
+
+def test_tick_with_failing_sink(session: Session) -> None:
+    """Test that a range is scanned again after a failed emission.
+
+    Args:
+        session (Session): The database session.
+    """
+    add_goal(session, "Soon", NOW + timedelta(hours=2))
+    add_goal(session, "Later", NOW + timedelta(hours=3))
+
+    class FailingSink(ListSink):
+        """A sink failing on its second batch."""
+        def emit(self, reminders: List[GoalReminder]) -> None:
+            if self.batches:
+                raise ConnectionError("sink down")
+            super().emit(reminders)
+
+    with pytest.raises(ConnectionError):
+        ReminderScheduler(FailingSink(), batch_size=1).tick(session, NOW)
+
+    sink = ListSink()
+    assert ReminderScheduler(sink, batch_size=1).tick(session, NOW) == 2
+
+def test_tick_uses_due_date_index(session: Session) -> None:
+    """Test that the scan is a search of the due date index.
+
+    Args:
+        session (Session): The database session.
+    """
+    statement = select_goals_due_between(NOW, 0, NOW + timedelta(days=1), 500)
+    compiled = statement.compile(get_engine(), compile_kwargs={"literal_binds": True})
+    plan = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert any("USING INDEX ix_goal_due_date (due_date>? AND due_date<?)" in row[-1]
+               for row in plan), plan
+
+def test_file_sink(tmp_path) -> None:
+    """Test the FileReminderSink class.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+    """
+    path = tmp_path / "reminders.jsonl"
+    sink = FileReminderSink(str(path))
+    reminder = GoalReminder(goal_id=1, tenant_id="acme", name="Soon",
+                            status=GoalStatus.IN_PROGRESS, priority="high", due_date=NOW)
+    sink.emit([reminder])
+    sink.emit([reminder])
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {
+        "goal_id": 1, "tenant_id": "acme", "name": "Soon", "status": "in progress",
+        "priority": "high", "due_date": "2024-11-25T12:00:00",
+    }
+
+def test_create_reminder_sink(tmp_path) -> None:
+    """Test the create_reminder_sink function.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory fixture.
+    """
+    assert isinstance(create_reminder_sink("log"), LogReminderSink)
+    sink = create_reminder_sink(f"file://{tmp_path}/reminders.jsonl")
+    assert isinstance(sink, FileReminderSink)
+    assert sink.path == f"{tmp_path}/reminders.jsonl"
+    with pytest.raises(ValueError):
+        create_reminder_sink("kafka://localhost")
+    with pytest.raises(TypeError):
+        ReminderSink()  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,102 @@
+"""
+test_response_cache.py
+
+This module contains tests for the response cache defined in mycareer.response_cache.
+
+Functions:
+    test_disabled_cache: Tests a ResponseCache with a size of 0.
+    test_lru_eviction_by_size: Tests the eviction of the least recently used bodies.
+    test_invalidate: Tests that a write drops the bodies and bumps the version.
+    test_set_after_invalidation: Tests that a body rendered before a write is not kept.
+    test_cached_response_matches: Tests the CachedResponse.matches method.
+    test_cache_key: Tests the cache_key function.
+    test_accepts_gzip: Tests the accepts_gzip function.
+"""
+
+import gzip
+import os
+from mycareer.response_cache import (
+    CachedResponse, ResponseCache, accepts_gzip, cache_key
+)
+
+def test_disabled_cache() -> None:
+    """Test a ResponseCache with a size of 0.
+
+    This test checks if a disabled cache keeps nothing, but still compresses.
+    """
+    cache = ResponseCache(0)
+    entry = cache.set("key", cache.version, b"[]")
+    assert not cache.enabled
+    assert gzip.decompress(entry.body) == b"[]"
+    assert cache.get("key") is None
+
+def test_lru_eviction_by_size() -> None:
+    """Test the eviction of the least recently used bodies.
+
+    This test checks if the total compressed size stays under the bound and
+    if a body larger than the cache is not kept.
+    """
+    body = os.urandom(1000)
+    entry_size = len(CachedResponse(body).body)
+    cache = ResponseCache(entry_size * 2)
+    cache.set(1, cache.version, body)
+    cache.set(2, cache.version, body)
+    cache.get(1)
+    cache.set(3, cache.version, body)
+
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.get(3) is not None
+    assert cache.size == entry_size * 2
+
+    cache.set(4, cache.version, os.urandom(entry_size * 3))
+    assert cache.get(4) is None
+    assert len(cache) == 2
+
+def test_invalidate() -> None:
+    """Test that a write drops the bodies and bumps the version."""
+    cache = ResponseCache(10_000)
+    cache.set("key", cache.version, b"[]")
+
+    cache.invalidate(1)
+    assert cache.version == 1
+    assert cache.get("key") is None
+    assert cache.size == 0
+
+def test_set_after_invalidation() -> None:
+    """Test that a body rendered before a write is not kept."""
+    cache = ResponseCache(10_000)
+    version = cache.version
+    cache.invalidate()
+    cache.set("key", version, b"[]")
+    assert cache.get("key") is None
+
+def test_cached_response_matches() -> None:
+    """Test the CachedResponse.matches method."""
+    entry = CachedResponse(b"[]")
+    assert entry.etag.startswith('W/"')
+    assert entry.matches(entry.etag)
+    assert entry.matches(entry.etag.removeprefix("W/"))
+    assert entry.matches(f'W/"other", {entry.etag}')
+    assert entry.matches("*")
+    assert not entry.matches('W/"other"')
+    assert not entry.matches(None)
+    assert CachedResponse(b"[]").etag == entry.etag
+
+def test_cache_key() -> None:
+    """Test the cache_key function.
+
+    This test checks if the order of the parameters does not change the key,
+    and if the tenant does.
+    """
+    assert cache_key("acme", a=1, b=True) == cache_key("acme", b=True, a=1)
+    assert cache_key("acme", a=1) != cache_key("globex", a=1)
+
+def test_accepts_gzip() -> None:
+    """Test the accepts_gzip function."""
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("identity")
+    assert not accepts_gzip(None)
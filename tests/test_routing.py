@@ -0,0 +1,16 @@
+"""
+test_routing.py
+
+This module contains tests for the route names defined in mycareer.routing.
+
+Functions:
+    test_route_key: Tests the route_key function.
+"""
+
+from mycareer.routing import route_key
+
+def test_route_key() -> None:
+    """Test the route_key function."""
+    assert route_key("/v1/goals/42") == "/v1/goals/{id}"
+    assert route_key("/v1/goals/42/subtree") == "/v1/goals/{id}/subtree"
+    assert route_key("/v1/goals") == "/v1/goals"
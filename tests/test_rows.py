@@ -0,0 +1,93 @@
+"""
+test_rows.py
+
+This module contains tests for the ORM-free read path defined in mycareer.rows.
+
+Fixtures:
+    session_fixture: Seeds the database session with two goals.
+
+Functions:
+    test_fetch_goal_rows: Tests the fetch_goal_rows function.
+    test_encode_goal_rows: Tests that the encoding matches the GoalRead serialization.
+    test_encode_goal_node_rows: Tests that the encoding matches the GoalNode serialization.
+"""
+
+from datetime import datetime
+from typing import List
+import pytest
+from pydantic import TypeAdapter
+from sqlmodel import Session, select
+from mycareer.database import get_engine
+from mycareer.models import Goal, GoalPriority, GoalStatus
+from mycareer.queries import select_goal_subtree_rows
+from mycareer.rows import encode_goal_node_rows, encode_goal_rows, fetch_goal_rows
+from mycareer.schemas import GoalNode, GoalRead
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with two goals, in
+    another session.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    with Session(get_engine()) as seed:
+        seed.add_all([
+            Goal(name="First Goal"),
+            Goal(
+                name="Second Goal: été",
+                description="A \"quoted\" description",
+                status=GoalStatus.COMPLETED,
+                priority=GoalPriority.HIGH,
+                due_date=datetime(2025, 6, 30, 12, 30, 15, 250),
+            ),
+        ])
+        seed.commit()
+    return session
+
+def test_fetch_goal_rows(session: Session) -> None:
+    """Test the fetch_goal_rows function.
+
+    This test checks if the rows are read without adding goals to the identity
+    map of the session.
+
+    Args:
+        session (Session): The database session.
+    """
+    rows = fetch_goal_rows(session, "default")
+
+    assert [row.name for row in rows] == ["First Goal", "Second Goal: été"]
+    assert rows[1].status == GoalStatus.COMPLETED
+    assert len(session.identity_map) == 0
+
+def test_encode_goal_rows(session: Session) -> None:
+    """Test that the encoding matches the GoalRead serialization.
+
+    Args:
+        session (Session): The database session.
+    """
+    goals = session.exec(select(Goal).order_by(Goal.id)).all()
+    expected = TypeAdapter(List[GoalRead]).dump_json(
+        [GoalRead.model_validate(goal, from_attributes=True) for goal in goals]
+    )
+    assert encode_goal_rows(fetch_goal_rows(session, "default")) == expected
+
+def test_encode_goal_node_rows(session: Session) -> None:
+    """Test that the encoding matches the GoalNode serialization.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.get(Goal, 2).parent_id = 1
+    session.commit()
+    goals = session.exec(select(Goal).order_by(Goal.id)).all()
+    expected = TypeAdapter(List[GoalNode]).dump_json([
+        GoalNode.model_validate({**GoalRead.model_validate(goal, from_attributes=True).__dict__,
+                                 "depth": depth})
+        for depth, goal in enumerate(goals)
+    ])
+    rows = session.connection().execute(select_goal_subtree_rows("default", 1)).all()
+    assert encode_goal_node_rows(rows) == expected
@@ -0,0 +1,50 @@
+"""
+test_schemas.py
+
+This module contains tests for the schemas defined in mycareer.schemas.
+
+Functions:
+    test_goal_create_none_as_default: Tests that a null status or priority takes the default.
+    test_goal_create_with_bad_status: Tests the error of an invalid status.
+    test_goal_read_from_attributes: Tests the validation of a GoalRead from a Goal.
+"""
+
+import pytest
+from pydantic import ValidationError
+from mycareer.models import Goal, GoalPriority, GoalStatus
+from mycareer.schemas import GoalCreate, GoalRead
+
+def test_goal_create_none_as_default() -> None:
+    """Test that a null status or priority takes the default, from Python and JSON input."""
+    for goal in (
+        GoalCreate.model_validate({"name": "Goal", "status": None, "priority": None}),
+        GoalCreate.model_validate_json('{"name": "Goal", "status": null, "priority": null}'),
+        GoalCreate(name="Goal"),
+    ):
+        assert goal.status == GoalStatus.TO_REFINE
+        assert goal.priority == GoalPriority.MEDIUM
+
+    goal = GoalCreate.model_validate({"name": "Goal", "status": "blocked", "priority": "high"})
+    assert (goal.status, goal.priority) == (GoalStatus.BLOCKED, GoalPriority.HIGH)
+
+def test_goal_create_with_bad_status() -> None:
+    """Test that an invalid status fails with one error listing the values."""
+    with pytest.raises(ValidationError) as error:
+        GoalCreate.model_validate({"name": "Goal", "status": "bad status"})
+    errors = error.value.errors()
+    assert [(error["type"], error["loc"]) for error in errors] == [("enum", ("status",))]
+    assert "'to refine'" in errors[0]["msg"]
+    assert errors[0]["msg"].endswith("or None")
+
+def test_goal_read_from_attributes() -> None:
+    """Test the validation of a GoalRead from the attributes of a Goal."""
+    goal = Goal(id=1, name="Goal", status=GoalStatus.COMPLETED)
+    assert GoalRead.model_validate(goal).model_dump() == {
+        "name": "Goal",
+        "description": None,
+        "status": GoalStatus.COMPLETED,
+        "priority": GoalPriority.MEDIUM,
+        "due_date": None,
+        "parent_id": None,
+        "id": 1,
+    }
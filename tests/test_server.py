@@ -0,0 +1,101 @@
+"""
+test_server.py
+
+This module contains tests for the server settings defined in mycareer.server.
+
+Functions:
+    test_server_settings_from_env: Tests the reading of the settings from the environment.
+    test_server_settings_validation: Tests the validation of the settings.
+    test_server_settings_modules: Tests the choice of the loop and of the HTTP implementation.
+    test_uvicorn_options: Tests the options of uvicorn matching the settings.
+"""
+
+import pytest
+from pydantic import ValidationError
+from mycareer import server
+from mycareer.server import ServerHttp, ServerLoop, ServerSettings
+
+def test_server_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the settings are read from the environment, then overridden.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the environment.
+    """
+    for name in server.ENV_VARS.values():
+        monkeypatch.delenv(name, raising=False)
+    assert ServerSettings.from_env() == ServerSettings()
+
+    monkeypatch.setenv("PORT", "9000")
+    monkeypatch.setenv("SERVER_KEEP_ALIVE_SECONDS", "120")
+    monkeypatch.setenv("SERVER_HTTP", "h11")
+    monkeypatch.setenv("SERVER_BACKLOG", "")
+    settings = ServerSettings.from_env(port=9001, workers=None)
+    assert (settings.port, settings.workers) == (9001, 1)
+    assert (settings.keep_alive_seconds, settings.http) == (120, ServerHttp.H11)
+    assert settings.backlog == 2048
+
+def test_server_settings_validation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the invalid settings are rejected with their name.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to set the environment.
+    """
+    cases = [
+        {"port": 70000},
+        {"workers": 0},
+        {"keep_alive_seconds": 0},
+        {"backlog": "many"},
+        {"graceful_timeout_seconds": -1},
+        {"h11_max_incomplete_event_size": 100},
+        {"max_requests": 0},
+        {"loop": "trio"},
+    ]
+    for values in cases:
+        with pytest.raises(ValidationError) as error:
+            ServerSettings(**values)
+        assert error.value.errors()[0]["loc"] == tuple(values), values
+
+    monkeypatch.setenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "soon")
+    with pytest.raises(ValidationError):
+        ServerSettings.from_env()
+
+def test_server_settings_modules(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that uvloop and httptools are chosen when they are installed, and that
+    the modules asked for must be installed.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to hide the modules.
+    """
+    installed = {"uvloop", "httptools"}
+    monkeypatch.setattr(server, "is_installed", lambda name: name in installed)
+    settings = ServerSettings()
+    assert (settings.resolved_loop(), settings.resolved_http()) == ("uvloop", "httptools")
+    settings = ServerSettings(loop=ServerLoop.ASYNCIO, http=ServerHttp.H11)
+    assert (settings.resolved_loop(), settings.resolved_http()) == ("asyncio", "h11")
+
+    installed.clear()
+    settings = ServerSettings()
+    assert (settings.resolved_loop(), settings.resolved_http()) == ("asyncio", "h11")
+    for values in ({"loop": "uvloop"}, {"http": "httptools"}, {"http2": True}):
+        with pytest.raises(ValidationError, match="not installed|zttp|HTTP/2"):
+            ServerSettings(**values)
+
+    installed.add("zttp")
+    assert ServerSettings(http2=True).resolved_http() == "zttp"
+    with pytest.raises(ValidationError, match="http must be auto"):
+        ServerSettings(http2=True, http=ServerHttp.H11)
+
+def test_uvicorn_options(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the options of uvicorn matching the settings.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The fixture to hide the modules.
+    """
+    monkeypatch.setattr(server, "is_installed", lambda name: False)
+    settings = ServerSettings(workers=4, keep_alive_seconds=90, max_requests=10_000)
+    options = settings.uvicorn_options()
+    assert options == {
+        "host": "127.0.0.1", "port": 8000, "workers": 4, "loop": "asyncio", "http": "h11",
+        "timeout_keep_alive": 90, "backlog": 2048, "timeout_graceful_shutdown": 30,
+        "h11_max_incomplete_event_size": 16384, "limit_max_requests": 10_000,
+    }
@@ -0,0 +1,64 @@
+"""
+test_startup.py
+
+This module checks what the cold start of the application loads. The import and
+first response times are measured against benchmarks/startup_budget.json by the
+startup benchmark, `python -m benchmarks.startup`, not by the tests.
+
+Functions:
+    loaded_modules: Lists the modules loaded by a script in a fresh interpreter.
+    test_import_loads_routers: Tests that the import includes the routers by default.
+    test_lazy_import: Tests that the lazy import leaves the database layer out.
+    test_lazy_first_response: Tests that the lifespan loads the routers of a lazy import.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Set
+from benchmarks.startup import ROOT
+
+DATABASE_MODULES = ("sqlalchemy", "sqlmodel", "mycareer.database", "mycareer.routers")
+
+def loaded_modules(script: str, lazy: bool) -> Set[str]:
+    """List the modules loaded by a script in a fresh interpreter.
+
+    Args:
+        script (str): The Python code to run.
+        lazy (bool): Whether the routers are loaded lazily.
+
+    Returns:
+        Set[str]: The names of the modules loaded once the script has run.
+    """
+    report = "import json, sys\nprint(json.dumps(list(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", f"{script}\n{report}"],
+        cwd=ROOT, env={**os.environ, "LAZY_ROUTERS": "1" if lazy else ""},
+        capture_output=True, text=True, check=True,
+    )
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+def test_import_loads_routers() -> None:
+    """Test that the import of mycareer.main includes the routers by default."""
+    modules = loaded_modules("import mycareer.main", lazy=False)
+    assert {"mycareer.routers.v1_goals", "mycareer.database", "sqlmodel"} <= modules
+
+def test_lazy_import() -> None:
+    """Test that with `LAZY_ROUTERS` the import of mycareer.main loads neither the
+    routers nor the database layer."""
+    modules = loaded_modules("import mycareer.main", lazy=True)
+    assert "mycareer.main" in modules
+    assert not [module for module in modules if module.startswith(DATABASE_MODULES)]
+
+def test_lazy_first_response() -> None:
+    """Test that the lifespan of a lazy import includes the routers before the first response."""
+    script = (
+        "from fastapi.testclient import TestClient\n"
+        "from mycareer.main import app\n"
+        "with TestClient(app) as client:\n"
+        "    assert client.get('/echo').status_code == 200\n"
+        "    assert any(route.path == '/v1/goals' for route in app.routes)\n"
+    )
+    modules = loaded_modules(script, lazy=True)
+    assert {"mycareer.routers.v1_goals", "mycareer.database"} <= modules
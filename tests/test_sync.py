@@ -0,0 +1,46 @@
+"""
+test_sync.py
+
+This module contains tests for the change sequence defined in mycareer.sync.
+
+Functions:
+    test_next_change_seq: Tests the next_change_seq function.
+    test_record_tombstone: Tests the record_tombstone function.
+"""
+
+from sqlmodel import Session
+from mycareer.sync import get_changes_since, goal_sequence, next_change_seq, record_tombstone
+
+def test_next_change_seq(session: Session) -> None:
+    """Test the next_change_seq function.
+
+    This test checks if the sequences start at 1, increase by one and are
+    independent from each other, one per tenant.
+
+    Args:
+        session (Session): The database session.
+    """
+    assert goal_sequence("acme") == "goal:acme"
+    assert next_change_seq(session, goal_sequence("acme")) == 1
+    assert next_change_seq(session, goal_sequence("acme")) == 2
+    assert next_change_seq(session, goal_sequence("globex")) == 1
+    session.commit()
+    assert next_change_seq(session, goal_sequence("acme"), count=3) == 5
+
+def test_record_tombstone(session: Session) -> None:
+    """Test the record_tombstone function.
+
+    This test checks if a recorded tombstone is returned as a change of its tenant only.
+
+    Args:
+        session (Session): The database session.
+    """
+    tombstone = record_tombstone(session, "acme", 42)
+    session.commit()
+
+    assert get_changes_since(session, "globex", 0, 10) == ([], [], 0, False)
+    goals, tombstones, next_since, has_more = get_changes_since(session, "acme", 0, 10)
+    assert goals == []
+    assert [change.goal_id for change in tombstones] == [42]
+    assert next_since == tombstone.change_seq
+    assert has_more is False
@@ -0,0 +1,44 @@
+"""
+test_tenancy.py
+
+This module contains tests for the tenant resolution defined in mycareer.tenancy.
+
+Functions:
+    test_get_tenant_id: Tests the get_tenant_id function with a valid header.
+    test_get_tenant_id_without_header: Tests the get_tenant_id function without a header.
+    test_get_tenant_id_with_invalid_header: Tests the get_tenant_id function with invalid headers.
+"""
+
+import pytest
+from fastapi import HTTPException
+from mycareer import tenancy
+from mycareer.tenancy import get_tenant_id
+
+def test_get_tenant_id() -> None:
+    """Test the get_tenant_id function with a valid header."""
+    assert get_tenant_id("acme") == "acme"
+    assert get_tenant_id("acme-eu_1.prod") == "acme-eu_1.prod"
+
+def test_get_tenant_id_without_header(monkeypatch) -> None:
+    """Test the get_tenant_id function without a header.
+
+    This test checks if the default tenant is used, and if the header is
+    required when the default tenant is empty.
+
+    Args:
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    assert get_tenant_id(None) == "default"
+
+    monkeypatch.setattr(tenancy, "default_tenant_id", "")
+    with pytest.raises(HTTPException) as error:
+        get_tenant_id(None)
+    assert error.value.status_code == 400
+    assert error.value.detail == "Missing X-Tenant-ID header"
+
+def test_get_tenant_id_with_invalid_header() -> None:
+    """Test the get_tenant_id function with invalid headers."""
+    for tenant_id in ("", "-acme", "acme/eu", "acme eu", "a" * 65):
+        with pytest.raises(HTTPException) as error:
+            get_tenant_id(tenant_id)
+        assert error.value.status_code == 400
@@ -0,0 +1,117 @@
+"""
+test_tree.py
+
+This module contains tests for the goal hierarchy defined in mycareer.tree.
+
+Fixtures:
+    session_fixture: Seeds the database session with a small tree of goals.
+
+Functions:
+    test_check_parent: Tests the check_parent function with valid parents.
+    test_check_parent_rejects_cycles: Tests that a goal cannot be moved under its sub-goals.
+    test_check_parent_with_missing_parent: Tests the check_parent function with a missing parent.
+    test_get_goal_progress: Tests the get_goal_progress function.
+    test_reparent_children: Tests the reparent_children function.
+"""
+
+from datetime import datetime
+import pytest
+from sqlmodel import Session, select
+from mycareer.models import Goal, GoalArchive, GoalPriority, GoalStatus
+from mycareer.tree import check_parent, get_goal_progress, reparent_children
+
+TENANT = "default"
+
+@pytest.fixture(name="session")
+def session_fixture(session: Session) -> Session:
+    """Fixture to seed the database session of a fresh schema with a small tree of goals.
+
+    The tree is 1 -> (2 -> (4, 5), 3), with 4 completed, and an archived
+    completed goal 6 under 3.
+
+    Args:
+        session (Session): The database session on a fresh schema.
+
+    Returns:
+        Session: The database session.
+    """
+    session.add_all([
+        Goal(id=1, name="Root Goal"),
+        Goal(id=2, name="First Sub-goal", parent_id=1),
+        Goal(id=3, name="Second Sub-goal", parent_id=1),
+        Goal(id=4, name="First Leaf", parent_id=2, status=GoalStatus.COMPLETED),
+        Goal(id=5, name="Second Leaf", parent_id=2),
+        GoalArchive(id=6, name="Archived Leaf", parent_id=3, status=GoalStatus.COMPLETED,
+                    priority=GoalPriority.LOW, change_seq=0, updated_at=datetime.utcnow()),
+    ])
+    session.commit()
+    return session
+
+def test_check_parent(session: Session) -> None:
+    """Test the check_parent function with valid parents.
+
+    This test checks if root goals, live parents and archived parents are accepted.
+
+    Args:
+        session (Session): The database session.
+    """
+    check_parent(session, TENANT, None)
+    check_parent(session, TENANT, 5)
+    check_parent(session, TENANT, 6)
+    check_parent(session, TENANT, 3, goal_id=2)
+
+def test_check_parent_rejects_cycles(session: Session) -> None:
+    """Test that a goal cannot be moved under itself or its sub-goals.
+
+    Args:
+        session (Session): The database session.
+    """
+    for parent_id in (1, 2, 4):
+        with pytest.raises(ValueError, match="sub-goal of itself"):
+            check_parent(session, TENANT, parent_id, goal_id=1)
+
+def test_check_parent_with_missing_parent(session: Session) -> None:
+    """Test the check_parent function with a missing parent, or one of another tenant.
+
+    Args:
+        session (Session): The database session.
+    """
+    with pytest.raises(ValueError, match="Parent goal not found"):
+        check_parent(session, TENANT, 999)
+    with pytest.raises(ValueError, match="Parent goal not found"):
+        check_parent(session, "acme", 1)
+
+def test_get_goal_progress(session: Session) -> None:
+    """Test the get_goal_progress function.
+
+    This test checks if the progress counts the completed sub-goals at any depth,
+    archived ones included, and if a leaf goal follows its own status.
+
+    Args:
+        session (Session): The database session.
+    """
+    progress = get_goal_progress(session, TENANT, 1)
+    assert progress.descendants == 5
+    assert progress.completed_descendants == 2
+    assert progress.progress == pytest.approx(0.4)
+    assert not progress.completed
+
+    assert get_goal_progress(session, TENANT, 2).progress == pytest.approx(0.5)
+    assert get_goal_progress(session, TENANT, 4).progress == 1.0
+    assert get_goal_progress(session, TENANT, 5).progress == 0.0
+    assert get_goal_progress(session, TENANT, 999) is None
+    assert get_goal_progress(session, "acme", 1) is None
+
+def test_reparent_children(session: Session) -> None:
+    """Test the reparent_children function.
+
+    Args:
+        session (Session): The database session.
+    """
+    assert reparent_children(session, TENANT, 2, 1) == [4, 5]
+    session.commit()
+
+    children = session.exec(select(Goal).where(Goal.parent_id == 1).order_by(Goal.id)).all()
+    assert [goal.id for goal in children] == [2, 3, 4, 5]
+    assert children[2].change_seq < children[3].change_seq
+    assert reparent_children(session, TENANT, 2, 1) == []
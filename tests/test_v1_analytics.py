@@ -0,0 +1,83 @@
+"""
+test_v1_analytics.py
+
+This module contains tests for the API endpoints defined in v1_analytics.py.
+
+Functions:
+    test_status_history_is_recorded: Tests that the goal endpoints record the status history.
+    test_get_time_in_status: Tests the get_time_in_status endpoint.
+    test_get_closed_goals: Tests the get_closed_goals endpoint.
+"""
+
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+from mycareer.database import get_engine
+from mycareer.models import GoalPriority, GoalStatus, GoalStatusEvent
+
+def test_status_history_is_recorded(client: TestClient) -> None:
+    """Test that the goal endpoints record the status history.
+
+    This test checks if the creation, the imports and the changes of the status or
+    the priority append an event, and if the other updates do not.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    goal = client.post("/v1/goals", json={"name": "First Goal"}).json()
+    client.put(f"/v1/goals/{goal['id']}", json={"name": "Renamed Goal"})
+    client.put(f"/v1/goals/{goal['id']}", json={"name": "Renamed Goal", "status": "completed"})
+    client.put(f"/v1/goals/{goal['id']}",
+               json={"name": "Renamed Goal", "status": "completed", "priority": "high"})
+    client.post("/v1/goals/import", content='{"name": "Imported Goal"}\n',
+                headers={"Content-Type": "application/x-ndjson"})
+
+    with Session(get_engine()) as session:
+        events = session.exec(select(GoalStatusEvent).order_by(GoalStatusEvent.id)).all()
+    assert [(event.goal_id, event.status, event.previous_status, event.priority)
+            for event in events] == [
+        (goal["id"], GoalStatus.TO_REFINE, None, GoalPriority.MEDIUM),
+        (goal["id"], GoalStatus.COMPLETED, GoalStatus.TO_REFINE, GoalPriority.MEDIUM),
+        (goal["id"], GoalStatus.COMPLETED, GoalStatus.COMPLETED, GoalPriority.HIGH),
+        (goal["id"] + 1, GoalStatus.TO_REFINE, None, GoalPriority.MEDIUM),
+    ]
+
+def test_get_time_in_status(client: TestClient) -> None:
+    """Test the get_time_in_status endpoint.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    goal = client.post("/v1/goals", json={"name": "First Goal"}).json()
+    client.put(f"/v1/goals/{goal['id']}", json={"name": "First Goal", "status": "blocked"})
+    client.post("/v1/goals", json={"name": "Acme Goal"}, headers={"X-Tenant-ID": "acme"})
+
+    times = client.get("/v1/analytics/time-in-status").json()
+    assert [(time["status"], time["goals"]) for time in times] == [
+        ("to refine", 1), ("blocked", 1)
+    ]
+    assert all(time["total_seconds"] >= 0 for time in times)
+    response = client.get("/v1/analytics/time-in-status", params={"goal_id": 999})
+    assert response.json() == []
+
+def test_get_closed_goals(client: TestClient) -> None:
+    """Test the get_closed_goals endpoint.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    client.post("/v1/goals", json={"name": "First Goal", "status": "completed"})
+    client.post("/v1/goals", json={"name": "Second Goal", "status": "abandoned"})
+    client.post("/v1/goals", json={"name": "Third Goal"})
+    today = datetime.utcnow().date()
+
+    months = client.get("/v1/analytics/closed-goals", params={"period": "month"}).json()
+    assert months == [{
+        "period_start": today.replace(day=1).isoformat(),
+        "completed": 1,
+        "abandoned": 1,
+        "completion_rate": 0.5,
+    }]
+    response = client.get("/v1/analytics/closed-goals", params={"until": "2000-01-01T00:00:00"})
+    assert response.json() == []
+    assert client.get("/v1/analytics/closed-goals", params={"period": "day"}).status_code == 422
@@ -1,11 +1,9 @@
+# pylint: disable=too-many-lines
 """
 test_v1_goals.py
 
 This module contains tests for the API endpoints defined in v1_goals.py.
 
-Fixtures:
-    client_fixture: Creates a TestClient for the FastAPI app.
-
 Functions:
     initialize_goal: 
         Initializes a test goal in the database.
@@ -117,30 +115,63 @@ Functions:
 
     test_delete_non_existing_goal:
         Tests the delete_goal endpoint with a non-existing goal.
-"""
 
-from typing import Generator
-import pytest
-from fastapi.testclient import TestClient
-from sqlmodel import SQLModel
-from mycareer.main import app
-from mycareer.models import Goal
-from mycareer.database import engine, get_session
+    test_get_goals_delta:
+        Tests the get_goals_delta endpoint with inserts, updates and deletions.
 
-@pytest.fixture(name="client")
-def client_fixture() -> Generator[TestClient, None, None]:
-    """Fixture to create a TestClient for the FastAPI app.
+    test_get_goals_delta_with_limit:
+        Tests the get_goals_delta endpoint paging through the changes.
 
-    This fixture sets up the database, creates a TestClient for the FastAPI app,
-    and tears down the database after the test.
+    test_get_goal_with_cache:
+        Tests the get_goal endpoint with the goal cache enabled.
 
-    Yields:
-        TestClient: The test client for making requests to the FastAPI app.
-    """
-    SQLModel.metadata.create_all(engine)
-    with TestClient(app) as client:
-        yield client
-    SQLModel.metadata.drop_all(engine)
+    test_batch_get_goals:
+        Tests the batch_get_goals endpoint with existing, missing and repeated IDs.
+
+    test_batch_get_goals_with_cache:
+        Tests that the batch_get_goals endpoint only queries the cache misses.
+
+    test_batch_get_goals_with_too_many_ids:
+        Tests the batch_get_goals endpoint over the maximum number of IDs.
+
+    test_import_goals_file:
+        Tests the import_goals_file endpoint with CSV and NDJSON bodies.
+
+    test_import_goals_file_with_unsupported_format:
+        Tests the import_goals_file endpoint with an unsupported content type.
+
+    archive_completed_goals:
+        Archives the completed and abandoned goals, whatever their last update.
+
+    test_archived_goal_reads:
+        Tests the read endpoints on an archived goal.
+
+    test_update_archived_goal:
+        Tests that the update_goal endpoint restores an archived goal.
+
+    test_delete_archived_goal:
+        Tests the delete_goal endpoint with an archived goal.
+
+    test_goals_are_scoped_to_the_tenant:
+        Tests that the endpoints only act on the goals of the tenant of the request.
+
+    test_invalid_tenant_header:
+        Tests the endpoints with an invalid tenant header.
+
+    test_get_goals_with_response_cache:
+        Tests the get_goals endpoint with the response cache enabled.
+"""
+
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+from mycareer.archive import archive_goals
+from mycareer.cache import goal_cache
+from mycareer.models import Goal
+from mycareer.response_cache import response_cache
+from mycareer.schemas import BATCH_GET_MAX_IDS
+from mycareer.database import get_engine, get_session
 
 def initialize_goal() -> None:
     """Initializes a test goal in the database.
@@ -984,7 +1015,7 @@ def test_update_goal_with_none_due_date(client: TestClient) -> None:
 def test_delete_existing_goal(client: TestClient) -> None:
     """Test the delete_goal endpoint with an existing goal.
 
-    This test checks if the delete_goal endpoint correctly deletes an existing goal.
+    This test checks if the delete_goal endpoint correctly soft deletes an existing goal.
 
     Args:
         client (TestClient): The test client for making requests to the FastAPI app.
@@ -998,10 +1029,15 @@ def test_delete_existing_goal(client: TestClient) -> None:
     # Check the response
     assert response.status_code == 204
 
-    # Verify the goal was deleted from the database
+    # Verify the goal was soft deleted from the database
     with next(get_session()) as session:
         goal_in_db = session.get(Goal, goal.id)
-        assert goal_in_db is None
+        assert goal_in_db.deleted_at is not None
+
+    # Verify the goal is no longer served
+    assert client.get(f"/v1/goals/{goal.id}").status_code == 404
+    assert client.get("/v1/goals").json() == []
+    assert client.delete(f"/v1/goals/{goal.id}").status_code == 404
 
 def test_delete_non_existing_goal(client: TestClient) -> None:
     """Test the delete_goal endpoint with a non-existing goal.
@@ -1018,3 +1054,334 @@ def test_delete_non_existing_goal(client: TestClient) -> None:
     # Check the response
     assert response.status_code == 404
     assert response.json() == {"detail": "Goal not found"}
+
+def test_get_goals_delta(client: TestClient) -> None:
+    """Test the get_goals_delta endpoint with inserts, updates and deletions.
+
+    This test checks if the get_goals_delta endpoint returns only the goals
+    changed after the given sequence value and the IDs of the deleted goals.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    first = client.post("/v1/goals", json={"name": "First Goal"}).json()
+    second = client.post("/v1/goals", json={"name": "Second Goal"}).json()
+
+    # A full sync returns every goal
+    response = client.get("/v1/goals/delta", params={"since": 0})
+    assert response.status_code == 200
+    delta = response.json()
+    assert [goal["id"] for goal in delta["goals"]] == [first["id"], second["id"]]
+    assert delta["deleted"] == []
+    assert delta["has_more"] is False
+    since = delta["next_since"]
+
+    # Nothing changed since the full sync
+    response = client.get("/v1/goals/delta", params={"since": since})
+    assert response.json()["goals"] == []
+    assert response.json()["next_since"] == since
+
+    # Update the first goal and delete the second one
+    client.put(f"/v1/goals/{first['id']}", json={"name": "Updated Goal"})
+    client.delete(f"/v1/goals/{second['id']}")
+
+    response = client.get("/v1/goals/delta", params={"since": since})
+    assert response.status_code == 200
+    delta = response.json()
+    assert [goal["name"] for goal in delta["goals"]] == ["Updated Goal"]
+    assert delta["deleted"] == [second["id"]]
+    assert delta["next_since"] > since
+
+def test_get_goals_delta_with_limit(client: TestClient) -> None:
+    """Test the get_goals_delta endpoint paging through the changes.
+
+    This test checks if the get_goals_delta endpoint returns at most `limit`
+    changes and lets the client resume from `next_since`.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    for index in range(3):
+        client.post("/v1/goals", json={"name": f"Goal {index}"})
+
+    response = client.get("/v1/goals/delta", params={"since": 0, "limit": 2})
+    delta = response.json()
+    assert [goal["name"] for goal in delta["goals"]] == ["Goal 0", "Goal 1"]
+    assert delta["has_more"] is True
+
+    response = client.get("/v1/goals/delta", params={"since": delta["next_since"], "limit": 2})
+    delta = response.json()
+    assert [goal["name"] for goal in delta["goals"]] == ["Goal 2"]
+    assert delta["has_more"] is False
+
+def test_get_goal_with_cache(client: TestClient, monkeypatch) -> None:
+    """Test the get_goal endpoint with the goal cache enabled.
+
+    This test checks if a cached goal is served from the cache and if an
+    update or a deletion through the API invalidates it.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(goal_cache, "max_size", 10)
+    goal = initialize_goal()
+
+    assert client.get(f"/v1/goals/{goal.id}").json()["name"] == "Test Goal"
+    assert goal_cache.get("default", goal.id)["name"] == "Test Goal"
+
+    client.put(f"/v1/goals/{goal.id}", json={"name": "Updated Goal"})
+    assert goal_cache.get("default", goal.id) is None
+    assert client.get(f"/v1/goals/{goal.id}").json()["name"] == "Updated Goal"
+
+    client.delete(f"/v1/goals/{goal.id}")
+    assert client.get(f"/v1/goals/{goal.id}").status_code == 404
+    goal_cache.invalidate(None)
+
+def test_batch_get_goals(client: TestClient) -> None:
+    """Test the batch_get_goals endpoint with existing, missing and repeated IDs.
+
+    This test checks if the goals come back in the requested order, once each,
+    and if the missing IDs are reported.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    first = client.post("/v1/goals", json={"name": "First Goal"}).json()
+    second = client.post("/v1/goals", json={"name": "Second Goal", "priority": "high"}).json()
+
+    response = client.post(
+        "/v1/goals/batch-get", json={"ids": [second["id"], 999, first["id"], second["id"]]}
+    )
+
+    assert response.status_code == 200
+    batch = response.json()
+    assert batch["goals"] == [second, first]
+    assert batch["missing"] == [999]
+
+def test_batch_get_goals_with_cache(client: TestClient, monkeypatch) -> None:
+    """Test that the batch_get_goals endpoint only queries the cache misses.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(goal_cache, "max_size", 10)
+    first = client.post("/v1/goals", json={"name": "First Goal"}).json()
+    second = client.post("/v1/goals", json={"name": "Second Goal"}).json()
+    client.get(f"/v1/goals/{first['id']}")
+
+    statements = []
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, parameters))
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        response = client.post("/v1/goals/batch-get", json={"ids": [first["id"], second["id"]]})
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+        goal_cache.invalidate(None)
+
+    assert [goal["name"] for goal in response.json()["goals"]] == ["First Goal", "Second Goal"]
+    selects = [item for item in statements if item[0].lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    assert " IN " in selects[0][0]
+    assert selects[0][1] == (second["id"], "default")
+
+def test_batch_get_goals_with_too_many_ids(client: TestClient) -> None:
+    """Test the batch_get_goals endpoint over the maximum number of IDs.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post(
+        "/v1/goals/batch-get", json={"ids": list(range(1, BATCH_GET_MAX_IDS + 2))}
+    )
+    assert response.status_code == 422
+
+def test_import_goals_file(client: TestClient) -> None:
+    """Test the import_goals_file endpoint with CSV and NDJSON bodies.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post(
+        "/v1/goals/import",
+        content="name,priority\nFirst Goal,high\n,low\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["rejected"] == 1
+    assert report["rejections"][0]["line"] == 3
+
+    response = client.post(
+        "/v1/goals/import?format=ndjson",
+        content='{"name": "Second Goal"}\n',
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.json() == {"imported": 1, "rejected": 0, "rejections": []}
+
+    goals = client.get("/v1/goals").json()
+    assert [(goal["name"], goal["priority"]) for goal in goals] == [
+        ("First Goal", "high"), ("Second Goal", "medium")
+    ]
+    assert client.get("/v1/goals/delta").json()["next_since"] == 2
+
+def test_import_goals_file_with_unsupported_format(client: TestClient) -> None:
+    """Test the import_goals_file endpoint with an unsupported content type.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post("/v1/goals/import", json=[{"name": "First Goal"}])
+    assert response.status_code == 415
+
+def archive_completed_goals() -> None:
+    """Archive the completed and abandoned goals, whatever their last update."""
+    with Session(get_engine()) as session:
+        archive_goals(session, datetime.utcnow() + timedelta(days=1))
+
+def test_archived_goal_reads(client: TestClient) -> None:
+    """Test the read endpoints on an archived goal.
+
+    This test checks if the archived goal is still found by ID, alone or in a
+    batch, and if the list only shows it with `include_archived`.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    first = client.post("/v1/goals", json={"name": "First Goal", "status": "completed"}).json()
+    client.post("/v1/goals", json={"name": "Second Goal"})
+    archive_completed_goals()
+
+    assert client.get(f"/v1/goals/{first['id']}").json() == first
+    assert [goal["name"] for goal in client.get("/v1/goals").json()] == ["Second Goal"]
+    goals = client.get("/v1/goals", params={"include_archived": True}).json()
+    assert goals[0] == first
+    assert [goal["name"] for goal in goals] == ["First Goal", "Second Goal"]
+
+    batch = client.post("/v1/goals/batch-get", json={"ids": [2, first["id"], 999]}).json()
+    assert [goal["name"] for goal in batch["goals"]] == ["Second Goal", "First Goal"]
+    assert batch["missing"] == [999]
+
+def test_update_archived_goal(client: TestClient) -> None:
+    """Test that the update_goal endpoint restores an archived goal.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    goal = client.post("/v1/goals", json={"name": "First Goal", "status": "abandoned"}).json()
+    archive_completed_goals()
+
+    response = client.put(
+        f"/v1/goals/{goal['id']}", json={"name": "First Goal", "status": "in progress"}
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "in progress"
+    assert client.get("/v1/goals").json() == [response.json()]
+    assert client.get("/v1/goals", params={"include_archived": True}).json() == [response.json()]
+
+def test_delete_archived_goal(client: TestClient) -> None:
+    """Test the delete_goal endpoint with an archived goal.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    goal = client.post("/v1/goals", json={"name": "First Goal", "status": "completed"}).json()
+    archive_completed_goals()
+
+    assert client.delete(f"/v1/goals/{goal['id']}").status_code == 204
+    assert client.get(f"/v1/goals/{goal['id']}").status_code == 404
+    assert client.get("/v1/goals/delta").json()["deleted"] == [goal["id"]]
+
+def test_goals_are_scoped_to_the_tenant(client: TestClient, monkeypatch) -> None:
+    """Test that the endpoints only act on the goals of the tenant of the request.
+
+    This test checks if the goals of another tenant are not listed, not found by
+    ID, even through the goal cache, and can be neither updated nor deleted, and
+    if every tenant has its own change sequence.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(goal_cache, "max_size", 10)
+    acme = {"X-Tenant-ID": "acme"}
+    globex = {"X-Tenant-ID": "globex"}
+    goal = client.post("/v1/goals", json={"name": "Acme Goal"}, headers=acme).json()
+    client.post("/v1/goals", json={"name": "Globex Goal"}, headers=globex)
+
+    assert client.get(f"/v1/goals/{goal['id']}", headers=acme).json() == goal
+    assert client.get(f"/v1/goals/{goal['id']}", headers=globex).status_code == 404
+    assert client.get(f"/v1/goals/{goal['id']}").status_code == 404
+    assert [goal["name"] for goal in client.get("/v1/goals", headers=globex).json()] == [
+        "Globex Goal"
+    ]
+    assert client.get("/v1/goals").json() == []
+    batch = client.post("/v1/goals/batch-get", json={"ids": [goal["id"]]}, headers=globex).json()
+    assert batch == {"goals": [], "missing": [goal["id"]]}
+
+    response = client.put(f"/v1/goals/{goal['id']}", json={"name": "Taken"}, headers=globex)
+    assert response.status_code == 404
+    assert client.delete(f"/v1/goals/{goal['id']}", headers=globex).status_code == 404
+    assert client.get(f"/v1/goals/{goal['id']}", headers=acme).json()["name"] == "Acme Goal"
+
+    delta = client.get("/v1/goals/delta", headers=globex).json()
+    assert [goal["name"] for goal in delta["goals"]] == ["Globex Goal"]
+    assert delta["next_since"] == 1
+    goal_cache.invalidate(None)
+
+def test_invalid_tenant_header(client: TestClient) -> None:
+    """Test the endpoints with an invalid tenant header.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.get("/v1/goals", headers={"X-Tenant-ID": "../acme"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid X-Tenant-ID header"
+    assert client.get("/v1/goals", headers={"X-Tenant-ID": "a" * 65}).status_code == 400
+
+def test_get_goals_with_response_cache(client: TestClient, monkeypatch) -> None:
+    """Test the get_goals endpoint with the response cache enabled.
+
+    This test checks if a repeated list is served without a query, compressed,
+    with its caching headers, if a matching `If-None-Match` is answered with
+    304, and if the writes and the other tenants get a fresh list.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(response_cache, "max_bytes", 100_000)
+    client.post("/v1/goals", json={"name": "First Goal"})
+    first = client.get("/v1/goals")
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["cache-control"].startswith("private, max-age=")
+    assert first.headers["vary"] == "Accept-Encoding, X-Tenant-ID"
+
+    statements = []
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        second = client.get("/v1/goals", params={"include_archived": False})
+        plain = client.get("/v1/goals", headers={"Accept-Encoding": "identity"})
+        not_modified = client.get("/v1/goals", headers={"If-None-Match": first.headers["etag"]})
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+    assert not statements
+    assert second.json() == plain.json() == first.json()
+    assert "content-encoding" not in plain.headers
+    assert not_modified.status_code == 304
+
+    assert client.get("/v1/goals", headers={"X-Tenant-ID": "acme"}).json() == []
+    client.post("/v1/goals", json={"name": "Second Goal"})
+    assert len(client.get("/v1/goals").json()) == 2
+    client.post("/v1/goals/import", content='{"name": "Third Goal"}\n',
+                headers={"Content-Type": "application/x-ndjson"})
+    response = client.get("/v1/goals", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    response_cache.invalidate()
@@ -0,0 +1,90 @@
+"""
+test_v1_goals_query.py
+
+This module contains tests for the query_goals endpoint defined in v1_goals.py.
+
+Functions:
+    test_query_goals: Tests the query_goals endpoint with every part of a query.
+    test_query_goals_statement_count: Tests that the statements do not grow with the page.
+    test_query_goals_with_invalid_query: Tests the query_goals endpoint with invalid queries.
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from mycareer.database import get_engine
+from tests.test_v1_goals_tree import create_goal_tree
+
+def test_query_goals(client: TestClient) -> None:
+    """Test the query_goals endpoint with every part of a query.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    ids = create_goal_tree(client)
+
+    response = client.post("/v1/goals/query", json={
+        "filters": {"status": ["to refine"]},
+        "sort": [{"field": "name", "descending": True}],
+        "page": {"limit": 2},
+        "fields": ["name"],
+        "include": ["parent", "sub_goals", "history"],
+        "aggregates": ["count", "status"],
+    })
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [goal["name"] for goal in result["goals"]] == ["Second Sub-goal", "Root Goal"]
+    second, root = result["goals"]
+    assert second["parent"] == {"id": ids["root"], "name": "Root Goal"}
+    assert root["parent"] is None
+    assert [goal["id"] for goal in root["sub_goals"]] == [ids["first"], ids["second"]]
+    assert root["history"][0]["status"] == "to refine"
+    assert result["has_more"]
+    assert result["aggregates"]["count"] == 3
+    assert result["aggregates"]["status"]["completed"] == 0
+
+def test_query_goals_statement_count(client: TestClient) -> None:
+    """Test that the query_goals endpoint runs as many statements for a page of 1
+    goal as for a page of many goals.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    create_goal_tree(client)
+    for index in range(10):
+        client.post("/v1/goals", json={"name": f"Goal {index}", "parent_id": 1})
+    body = {"include": ["parent", "sub_goals", "history"], "aggregates": ["count"]}
+
+    counts = []
+    for limit in (1, 50):
+        statements = []
+        def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+            statements.append(statement)  # pylint: disable=cell-var-from-loop
+        event.listen(get_engine(), "before_cursor_execute", record)
+        try:
+            response = client.post("/v1/goals/query", json={**body, "page": {"limit": limit}})
+        finally:
+            event.remove(get_engine(), "before_cursor_execute", record)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert len(response.json()["goals"]) == 14
+    # The page, the sub-goals, the history and the aggregates: the goal of the first
+    # page has no parent, and the parents of the goals of the second one are on the page.
+    assert counts == [4, 4]
+
+def test_query_goals_with_invalid_query(client: TestClient) -> None:
+    """Test the query_goals endpoint with invalid queries.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    for body in (
+        {"fields": ["tenant_id"]},
+        {"sort": [{"field": "description"}]},
+        {"page": {"limit": 0}},
+        {"page": {"limit": 501}},
+        {"filters": {"status": []}},
+        {"include": ["children"]},
+    ):
+        assert client.post("/v1/goals/query", json=body).status_code == 422, body
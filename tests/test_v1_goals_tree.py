@@ -0,0 +1,139 @@
+"""
+test_v1_goals_tree.py
+
+This module contains tests for the sub-goal endpoints and rules defined in v1_goals.py.
+
+Functions:
+    create_goal_tree: Creates a root goal with two sub-goals, one of them with a completed sub-goal.
+    test_get_goal_subtree: Tests the get_goal_subtree endpoint.
+    test_get_goal_progress_rollup: Tests the get_goal_progress_rollup endpoint.
+    test_create_goal_with_missing_parent: Tests the create_goal endpoint with a missing parent.
+    test_update_goal_with_cyclic_parent: Tests that a goal cannot be moved under its sub-goals.
+    test_delete_goal_with_sub_goals: Tests that the delete_goal endpoint moves the sub-goals up.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from mycareer.database import get_engine
+
+def create_goal_tree(client: TestClient) -> dict:
+    """Create a root goal with two sub-goals, one of them with a completed sub-goal.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+
+    Returns:
+        dict: The IDs of the goals, by name.
+    """
+    root = client.post("/v1/goals", json={"name": "Root Goal"}).json()
+    first = client.post("/v1/goals", json={"name": "First Sub-goal", "parent_id": root["id"]})
+    second = client.post("/v1/goals", json={"name": "Second Sub-goal", "parent_id": root["id"]})
+    leaf = client.post(
+        "/v1/goals",
+        json={"name": "Leaf", "status": "completed", "parent_id": first.json()["id"]},
+    )
+    return {
+        "root": root["id"],
+        "first": first.json()["id"],
+        "second": second.json()["id"],
+        "leaf": leaf.json()["id"],
+    }
+
+def test_get_goal_subtree(client: TestClient) -> None:
+    """Test the get_goal_subtree endpoint.
+
+    This test checks if the subtree is read in one query, ordered by depth, and
+    if a missing goal or a goal of another tenant is not found.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    ids = create_goal_tree(client)
+
+    statements = []
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        response = client.get(f"/v1/goals/{ids['root']}/subtree")
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert len(statements) == 1
+    nodes = response.json()
+    assert [(node["id"], node["depth"]) for node in nodes] == [
+        (ids["root"], 0), (ids["first"], 1), (ids["second"], 1), (ids["leaf"], 2)
+    ]
+    assert nodes[3]["parent_id"] == ids["first"]
+    assert nodes[0] == {**client.get(f"/v1/goals/{ids['root']}").json(), "depth": 0}
+
+    assert client.get("/v1/goals/999/subtree").status_code == 404
+    response = client.get(f"/v1/goals/{ids['root']}/subtree", headers={"X-Tenant-ID": "acme"})
+    assert response.status_code == 404
+
+def test_get_goal_progress_rollup(client: TestClient) -> None:
+    """Test the get_goal_progress_rollup endpoint.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    ids = create_goal_tree(client)
+
+    assert client.get(f"/v1/goals/{ids['root']}/progress").json() == {
+        "goal_id": ids["root"],
+        "completed": False,
+        "descendants": 3,
+        "completed_descendants": 1,
+        "progress": pytest.approx(1 / 3),
+    }
+    assert client.get(f"/v1/goals/{ids['first']}/progress").json()["progress"] == 1.0
+    assert client.get(f"/v1/goals/{ids['second']}/progress").json()["progress"] == 0.0
+    assert client.get("/v1/goals/999/progress").status_code == 404
+
+def test_create_goal_with_missing_parent(client: TestClient) -> None:
+    """Test the create_goal endpoint with a parent that does not exist.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post("/v1/goals", json={"name": "Orphan Goal", "parent_id": 999})
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Parent goal not found"
+    assert client.get("/v1/goals").json() == []
+
+def test_update_goal_with_cyclic_parent(client: TestClient) -> None:
+    """Test that the update_goal endpoint rejects a goal moved under its sub-goals.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    ids = create_goal_tree(client)
+
+    for parent_id in (ids["root"], ids["leaf"]):
+        response = client.put(
+            f"/v1/goals/{ids['root']}", json={"name": "Root Goal", "parent_id": parent_id}
+        )
+        assert response.status_code == 422
+    response = client.put(
+        f"/v1/goals/{ids['second']}", json={"name": "Second Sub-goal", "parent_id": ids["leaf"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["parent_id"] == ids["leaf"]
+
+def test_delete_goal_with_sub_goals(client: TestClient) -> None:
+    """Test that the delete_goal endpoint moves the sub-goals to the parent.
+
+    This test checks if the moved sub-goals are in the delta of the sync clients.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    ids = create_goal_tree(client)
+    since = client.get("/v1/goals/delta").json()["next_since"]
+
+    assert client.delete(f"/v1/goals/{ids['first']}").status_code == 204
+    assert client.get(f"/v1/goals/{ids['leaf']}").json()["parent_id"] == ids["root"]
+    delta = client.get("/v1/goals/delta", params={"since": since}).json()
+    assert [goal["id"] for goal in delta["goals"]] == [ids["leaf"]]
+    assert delta["deleted"] == [ids["first"]]
@@ -0,0 +1,169 @@
+"""
+test_v1_jobs.py
+
+This module contains tests for the API endpoints defined in v1_jobs.py.
+
+Functions:
+    wait_for_job: Polls a job until it is finished.
+    test_export_job: Tests the export job endpoints, from the submission to the download.
+    test_import_job: Tests the import job endpoints.
+    test_archive_job: Tests the archival job endpoints.
+    test_job_errors: Tests the errors of the job endpoints.
+    test_job_with_database_threads: Tests that a running job leaves the database threads
+    to the requests.
+"""
+
+import json
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from mycareer import dbpool, jobs
+from mycareer.dbpool import DatabaseExecutor
+from mycareer.models import JobKind
+
+# The files of the jobs are written in a temporary directory.
+pytestmark = pytest.mark.usefixtures("job_dir")
+
+def wait_for_job(client: TestClient, job_id: int) -> dict:
+    """Poll a job until it is finished.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        job_id (int): The ID of the job.
+
+    Returns:
+        dict: The finished job.
+    """
+    for _ in range(500):
+        job = client.get(f"/v1/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"The job {job_id} did not finish")
+
+def test_export_job(client: TestClient) -> None:
+    """Test the export job endpoints, from the submission to the download of the file.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    client.post("/v1/goals", json={"name": "First Goal", "priority": "high"})
+    client.post("/v1/goals", json={"name": "Second Goal"})
+
+    response = client.post("/v1/jobs/export", json={"format": "ndjson"})
+    assert response.status_code == 202
+    assert response.json()["kind"] == "export"
+    assert response.json()["status"] in ("queued", "running", "succeeded")
+
+    job = wait_for_job(client, response.json()["id"])
+    assert job["status"] == "succeeded"
+    assert (job["progress"], job["total"], job["attempts"]) == (2, 2, 1)
+    assert job["result"] == {"exported": 2}
+
+    result = client.get(f"/v1/jobs/{job['id']}/result")
+    assert result.status_code == 200
+    assert result.headers["content-type"] == "application/x-ndjson"
+    assert f"goals-{job['id']}.ndjson" in result.headers["content-disposition"]
+    goals = [json.loads(line) for line in result.text.splitlines()]
+    assert [(goal["name"], goal["priority"]) for goal in goals] == [
+        ("First Goal", "high"), ("Second Goal", "medium")
+    ]
+
+def test_import_job(client: TestClient) -> None:
+    """Test the import job endpoints, with the report as result.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    response = client.post(
+        "/v1/jobs/import", content="name,status\nFirst,completed\n,\nSecond,\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 202
+    job = wait_for_job(client, response.json()["id"])
+    assert job["result"] == {
+        "imported": 2, "rejected": 1, "rejections": [{"line": 3, "errors": [
+            "name: Input should be a valid string"
+        ]}],
+    }
+    result = client.get(f"/v1/jobs/{job['id']}/result")
+    assert result.headers["content-type"] == "application/json"
+    assert result.json() == job["result"]
+    assert [goal["name"] for goal in client.get("/v1/goals").json()] == ["First", "Second"]
+
+    response = client.post("/v1/jobs/import", content="name\nFirst\n")
+    assert response.status_code == 415
+
+def test_archive_job(client: TestClient) -> None:
+    """Test the archival job endpoints.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+    """
+    client.post("/v1/goals", json={"name": "Closed Goal", "status": "completed"})
+    client.post("/v1/goals", json={"name": "Open Goal"})
+    response = client.post("/v1/jobs/archive", json={"after_days": 0})
+    job = wait_for_job(client, response.json()["id"])
+    assert job["result"] == {"archived": 1}
+    assert [goal["name"] for goal in client.get("/v1/goals").json()] == ["Open Goal"]
+
+    response = client.post("/v1/jobs/archive", json={"after_days": -1})
+    assert response.status_code == 422
+
+def test_job_errors(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the errors of the job endpoints.
+
+    This test checks if the jobs of the other tenants are not found, if the result
+    of an unfinished job is refused, and if a tenant with too many jobs pending is
+    asked to retry later.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (pytest.MonkeyPatch): The fixture to stop the runner and bound the
+        pending jobs.
+    """
+    monkeypatch.setattr(jobs, "job_max_pending", 1)
+    monkeypatch.setattr(jobs.job_runner, "notify", lambda: None)
+
+    job = client.post("/v1/jobs/archive", json={}).json()
+    assert job["status"] == "queued"
+    assert client.get(f"/v1/jobs/{job['id']}/result").status_code == 409
+    assert client.get(f"/v1/jobs/{job['id']}", headers={"X-Tenant-ID": "acme"}).status_code == 404
+    assert client.get("/v1/jobs/999").status_code == 404
+
+    response = client.post("/v1/jobs/export", json={})
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    response = client.post("/v1/jobs/export", json={}, headers={"X-Tenant-ID": "acme"})
+    assert response.status_code == 202
+
+def test_job_with_database_threads(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a running job leaves the database threads to the requests.
+
+    This test checks if, with `DB_THREADS=1`, the goals are listed while an archival
+    job runs, instead of waiting for the only database thread.
+
+    Args:
+        client (TestClient): The test client for making requests to the FastAPI app.
+        monkeypatch (pytest.MonkeyPatch): The fixture to enable the database threads and
+        hold the job.
+    """
+    monkeypatch.setattr(dbpool, "db_executor", DatabaseExecutor(1, 8))
+    started, release = threading.Event(), threading.Event()
+
+    def hold(_context: jobs.JobContext, _params: dict) -> dict:
+        started.set()
+        release.wait(5)
+        return {"archived": 0}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, JobKind.ARCHIVE, hold)
+    job = client.post("/v1/jobs/archive", json={}).json()
+    try:
+        assert started.wait(5)
+        response = client.get("/v1/goals", headers={"X-Request-Timeout": "1"})
+        assert response.status_code == 200
+        assert client.get(f"/v1/jobs/{job['id']}").json()["status"] == "running"
+    finally:
+        release.set()
+    assert wait_for_job(client, job["id"])["status"] == "succeeded"